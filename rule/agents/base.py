@@ -0,0 +1,53 @@
+"""Shared agent protocol for batched action selection.
+
+Bulk evaluation steps thousands of environments at once, so agents expose
+``act_batch(obs_batch, mask_batch)``: ``mask_batch`` is the ``(num_envs,
+len(ACTION_TYPES))`` boolean legal action mask produced by
+:meth:`BattleEnv.action_mask` or the vector envs, and the result is one action
+index per row.  Rows without any legal action get :data:`NO_ACTION`.
+"""
+
+from __future__ import annotations
+
+from typing import Any, Mapping, Protocol
+
+import numpy as np
+
+from env.battle_env import ACTION_TYPES
+
+#: Returned by ``act_batch`` for rows that have no legal action.
+NO_ACTION = -1
+
+_ACTION_INDEX = {action_type.name: idx for idx, action_type in enumerate(ACTION_TYPES)}
+
+
+class BatchAgent(Protocol):
+    """Agents that pick one action index per environment row."""
+
+    def act_batch(self, obs_batch: Any, mask_batch: np.ndarray) -> np.ndarray:  # pragma: no cover - protocol
+        ...
+
+
+def mask_from_observation(observation: Mapping[str, Any]) -> np.ndarray:
+    """Build a legal action mask from an observation's ``legal_actions`` payloads."""
+
+    mask = np.zeros(len(ACTION_TYPES), dtype=bool)
+    for payload in observation.get("legal_actions", ()):
+        index = _ACTION_INDEX.get(str(payload.get("action_type")))
+        if index is not None:
+            mask[index] = True
+    return mask
+
+
+def as_mask_batch(mask_batch: np.ndarray) -> np.ndarray:
+    """Validate and return ``mask_batch`` as a 2-D boolean array."""
+
+    masks = np.asarray(mask_batch, dtype=bool)
+    if masks.ndim != 2 or masks.shape[1] != len(ACTION_TYPES):
+        raise ValueError(
+            f"mask_batch must have shape (num_envs, {len(ACTION_TYPES)}), got {masks.shape}"
+        )
+    return masks
+
+
+__all__ = ["BatchAgent", "NO_ACTION", "as_mask_batch", "mask_from_observation"]
@@ -0,0 +1,303 @@
+"""Dynamic-batching inference broker for neural agents running on CPU.
+
+Self-play runs many environments that each need one policy evaluation per
+step.  Calling a model once per observation wastes most of the time on call
+overhead, so agents submit observations to an :class:`InferenceBroker`
+instead.  A background thread gathers pending requests into a batch, bounded
+by ``max_batch_size`` and by ``max_wait`` seconds after the first request
+arrived, runs one forward pass and resolves every request's future with its
+masked action distribution.
+
+Models are pluggable through the :class:`PolicyModel` protocol.
+:class:`NumpyMLP` is a dependency-free reference implementation that works on
+the ``(batch, OBSERVATION_SIZE)`` arrays produced by :class:`BattleEnv`.
+"""
+
+from __future__ import annotations
+
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from dataclasses import dataclass
+from typing import List, Optional, Protocol, Sequence, Tuple
+
+import numpy as np
+
+from env.battle_env import ACTION_TYPES, OBSERVATION_SIZE, BattleEnv
+
+#: Upper bucket edges, in seconds, of :class:`LatencyHistogram`.
+LATENCY_BUCKETS: Tuple[float, ...] = (
+    1e-4, 2.5e-4, 5e-4, 1e-3, 2.5e-3, 5e-3, 1e-2, 2.5e-2, 5e-2, 1e-1, 2.5e-1, 1.0,
+)
+
+
+class PolicyModel(Protocol):
+    """Maps a ``(batch, features)`` observation array to ``(batch, actions)`` logits."""
+
+    def forward(self, observations: np.ndarray) -> np.ndarray:  # pragma: no cover - protocol
+        ...
+
+
+class NumpyMLP:
+    """Fully connected ReLU network evaluated with NumPy matrix products."""
+
+    def __init__(
+        self,
+        layer_sizes: Sequence[int] = (OBSERVATION_SIZE, 64, len(ACTION_TYPES)),
+        *,
+        seed: Optional[int] = None,
+    ) -> None:
+        if len(layer_sizes) < 2:
+            raise ValueError("layer_sizes needs at least an input and an output size")
+        rng = np.random.default_rng(seed)
+        self.weights: List[np.ndarray] = []
+        self.biases: List[np.ndarray] = []
+        for fan_in, fan_out in zip(layer_sizes[:-1], layer_sizes[1:]):
+            scale = np.sqrt(2.0 / fan_in)
+            self.weights.append((rng.standard_normal((fan_in, fan_out)) * scale).astype(np.float32))
+            self.biases.append(np.zeros(fan_out, dtype=np.float32))
+
+    def forward(self, observations: np.ndarray) -> np.ndarray:
+        hidden = np.asarray(observations, dtype=np.float32)
+        last = len(self.weights) - 1
+        for idx, (weight, bias) in enumerate(zip(self.weights, self.biases)):
+            hidden = hidden @ weight + bias
+            if idx < last:
+                np.maximum(hidden, 0.0, out=hidden)
+        return hidden
+
+
+def masked_softmax(logits: np.ndarray, masks: np.ndarray) -> np.ndarray:
+    """Row-wise softmax over legal actions; illegal actions get probability 0."""
+
+    masks = np.asarray(masks, dtype=bool)
+    scores = np.where(masks, logits, -np.inf)
+    row_max = scores.max(axis=1, keepdims=True)
+    row_max[~np.isfinite(row_max)] = 0.0
+    weights = np.exp(scores - row_max)
+    totals = weights.sum(axis=1, keepdims=True)
+    np.divide(weights, totals, out=weights, where=totals > 0)
+    return weights
+
+
+class LatencyHistogram:
+    """Thread-safe fixed-bucket histogram of request latencies."""
+
+    def __init__(self, buckets: Sequence[float] = LATENCY_BUCKETS) -> None:
+        self.buckets = tuple(buckets)
+        self._edges = np.asarray(self.buckets)
+        self._counts = np.zeros(len(self.buckets) + 1, dtype=np.int64)
+        self._total = 0.0
+        self._lock = threading.Lock()
+
+    def record_many(self, latencies: np.ndarray) -> None:
+        indices = np.searchsorted(self._edges, latencies, side="left")
+        with self._lock:
+            np.add.at(self._counts, indices, 1)
+            self._total += float(np.sum(latencies))
+
+    @property
+    def counts(self) -> Tuple[int, ...]:
+        """Counts per bucket; the last entry counts latencies above every edge."""
+
+        with self._lock:
+            return tuple(int(count) for count in self._counts)
+
+    @property
+    def count(self) -> int:
+        return int(self._counts.sum())
+
+    @property
+    def mean(self) -> float:
+        count = self.count
+        return self._total / count if count else 0.0
+
+    def quantile(self, q: float) -> float:
+        """Upper bucket edge containing the ``q`` quantile (``inf`` for overflow)."""
+
+        counts = np.asarray(self.counts)
+        total = counts.sum()
+        if total == 0:
+            return 0.0
+        index = int(np.searchsorted(np.cumsum(counts), q * total, side="left"))
+        return self.buckets[index] if index < len(self.buckets) else float("inf")
+
+
+@dataclass(frozen=True)
+class BrokerStats:
+    """Counters reported by :meth:`InferenceBroker.stats`."""
+
+    requests: int
+    batches: int
+    queue_depth: int
+    latency_mean: float
+    latency_p50: float
+    latency_p99: float
+
+    @property
+    def mean_batch_size(self) -> float:
+        return self.requests / self.batches if self.batches else 0.0
+
+
+@dataclass
+class _Request:
+    observation: np.ndarray
+    mask: np.ndarray
+    future: Future
+    enqueued: float
+
+
+class InferenceBroker:
+    """Collects single-observation requests into batched forward passes."""
+
+    def __init__(
+        self,
+        model: PolicyModel,
+        *,
+        max_batch_size: int = 256,
+        max_wait: float = 0.002,
+    ) -> None:
+        if max_batch_size <= 0:
+            raise ValueError("max_batch_size must be positive")
+        if max_wait < 0:
+            raise ValueError("max_wait must be non-negative")
+        self.model = model
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self.latency = LatencyHistogram()
+        self._queue: "queue.Queue[Optional[_Request]]" = queue.Queue()
+        self._lock = threading.Lock()
+        self._requests = 0
+        self._batches = 0
+        self._closed = False
+        self._thread = threading.Thread(target=self._serve, name="inference-broker", daemon=True)
+        self._thread.start()
+
+    # ---- Public API
+    @property
+    def queue_depth(self) -> int:
+        return self._queue.qsize()
+
+    def submit(self, observation: np.ndarray, mask: np.ndarray) -> "Future[np.ndarray]":
+        """Queue one observation and return a future for its action distribution."""
+
+        future: "Future[np.ndarray]" = Future()
+        request = _Request(
+            observation=np.asarray(observation, dtype=np.float32),
+            mask=np.asarray(mask, dtype=bool),
+            future=future,
+            enqueued=time.perf_counter(),
+        )
+        # Holding the lock keeps every request ahead of the shutdown sentinel.
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("Inference broker is closed")
+            self._queue.put(request)
+        return future
+
+    def submit_env(self, env: BattleEnv) -> "Future[np.ndarray]":
+        return self.submit(env.encode_observation(), env.action_mask())
+
+    def infer(self, observation: np.ndarray, mask: np.ndarray, timeout: Optional[float] = None) -> np.ndarray:
+        """Blocking convenience wrapper around :meth:`submit`."""
+
+        return self.submit(observation, mask).result(timeout=timeout)
+
+    def infer_batch(self, observations: np.ndarray, masks: np.ndarray) -> np.ndarray:
+        """Evaluate an already batched input directly, bypassing the queue.
+
+        Batch environments produce whole ``(num_envs, ...)`` arrays; those
+        gain nothing from queuing and go straight to the model.
+        """
+
+        logits = self.model.forward(np.asarray(observations, dtype=np.float32))
+        return masked_softmax(logits, masks)
+
+    def stats(self) -> BrokerStats:
+        with self._lock:
+            requests, batches = self._requests, self._batches
+        return BrokerStats(
+            requests=requests,
+            batches=batches,
+            queue_depth=self.queue_depth,
+            latency_mean=self.latency.mean,
+            latency_p50=self.latency.quantile(0.5),
+            latency_p99=self.latency.quantile(0.99),
+        )
+
+    def close(self) -> None:
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._queue.put(None)
+        self._thread.join()
+
+    def __enter__(self) -> "InferenceBroker":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    # ---- Internals
+    def _serve(self) -> None:
+        stopping = False
+        while not stopping:
+            first = self._queue.get()
+            if first is None:
+                break
+            batch = [first]
+            deadline = first.enqueued + self.max_wait
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - time.perf_counter()
+                try:
+                    request = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if request is None:
+                    stopping = True
+                    break
+                batch.append(request)
+            self._run_batch(batch)
+        self._drain()
+
+    def _drain(self) -> None:
+        """Fail every request still queued once the serving loop has stopped."""
+
+        while True:
+            try:
+                request = self._queue.get_nowait()
+            except queue.Empty:
+                return
+            if request is not None:
+                request.future.set_exception(RuntimeError("broker closed"))
+
+    def _run_batch(self, batch: List[_Request]) -> None:
+        try:
+            observations = np.stack([request.observation for request in batch])
+            masks = np.stack([request.mask for request in batch])
+            probabilities = self.infer_batch(observations, masks)
+        except Exception as exc:  # noqa: BLE001 - forwarded to every caller
+            for request in batch:
+                request.future.set_exception(exc)
+            return
+        now = time.perf_counter()
+        # Record before resolving so callers that wait on a future see the stats.
+        self.latency.record_many(np.array([now - request.enqueued for request in batch]))
+        with self._lock:
+            self._requests += len(batch)
+            self._batches += 1
+        for request, row in zip(batch, probabilities):
+            request.future.set_result(row)
+
+
+__all__ = [
+    "BrokerStats",
+    "InferenceBroker",
+    "LATENCY_BUCKETS",
+    "LatencyHistogram",
+    "NumpyMLP",
+    "PolicyModel",
+    "masked_softmax",
+]
@@ -0,0 +1,334 @@
+"""Information-Set Monte Carlo Tree Search agent for :class:`BattleEnv`.
+
+The agent implements single-observer IS-MCTS: every iteration clones the
+environment, :meth:`~env.battle_env.BattleEnv.determinize` s the clone
+(resampling what the acting player cannot see) and descends one shared tree
+whose edges are action types.  Because the set of legal actions differs
+between determinizations, selection uses availability counts instead of the
+parent's visit count in the UCB exploration term.
+
+Two kinds of parallelism are supported:
+
+* **Leaf batching** – up to ``leaf_batch_size`` leaves are selected (with a
+  virtual loss so they spread over the tree) and evaluated by a single
+  :class:`LeafEvaluator` call.  :class:`ValueFunctionEvaluator` turns that into
+  one vectorised call on a ``(batch, OBSERVATION_SIZE)`` array.
+* **Root parallelism** – with ``workers > 1`` independent searches run in a
+  process pool and their root statistics are summed.
+
+Search is anytime: it stops at ``time_budget`` seconds (default
+:data:`DEFAULT_MOVE_TIME_BUDGET`, well inside the API's ``ERR_TIMEOUT``
+window) or after ``max_iterations``, whichever comes first.
+"""
+
+from __future__ import annotations
+
+import math
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Protocol, Sequence, Tuple, TypedDict
+
+import numpy as np
+
+from core.state_machine import PlayerSide
+from env.battle_env import ACTION_TYPES, BattleEnv
+
+#: Default per-move search budget in seconds.
+DEFAULT_MOVE_TIME_BUDGET = 1.0
+
+_NUM_ACTIONS = len(ACTION_TYPES)
+
+
+class LeafEvaluator(Protocol):
+    """Estimates the value of a batch of leaf positions.
+
+    Values are expected from ``PLAYER_ONE``'s point of view, matching the sign
+    convention of :class:`BattleEnv` rewards.  Stochastic evaluators may also
+    define ``reseed(seed)``; :func:`run_search` calls it so that root-parallel
+    workers, which each receive a pickled copy, draw independent streams.
+    """
+
+    def __call__(self, envs: Sequence[BattleEnv]) -> np.ndarray:  # pragma: no cover - protocol
+        ...
+
+
+class RolloutEvaluator:
+    """Evaluates leaves with uniformly random playouts."""
+
+    def __init__(self, *, max_steps: int = 50, seed: Optional[int] = None) -> None:
+        self._max_steps = max_steps
+        self._rng = np.random.default_rng(seed)
+
+    def reseed(self, seed: int) -> None:
+        """Restart the playout stream from ``seed``."""
+
+        self._rng = np.random.default_rng(seed)
+
+    def __call__(self, envs: Sequence[BattleEnv]) -> np.ndarray:
+        values = np.zeros(len(envs), dtype=np.float64)
+        for idx, env in enumerate(envs):
+            total = 0.0
+            for _ in range(self._max_steps):
+                if env.done:
+                    break
+                legal = np.flatnonzero(env.action_mask())
+                reward, _ = env.step_index(int(legal[self._rng.integers(len(legal))]))
+                total += reward
+            values[idx] = total
+        return values
+
+
+class ValueFunctionEvaluator:
+    """Evaluates a whole leaf batch with one vectorised value-function call."""
+
+    def __init__(self, value_fn: Callable[[np.ndarray], np.ndarray]) -> None:
+        self._value_fn = value_fn
+
+    def __call__(self, envs: Sequence[BattleEnv]) -> np.ndarray:
+        batch = np.stack([env.encode_observation() for env in envs])
+        return np.asarray(self._value_fn(batch), dtype=np.float64).reshape(len(envs))
+
+
+@dataclass(frozen=True)
+class SearchStats:
+    """Summary of one :meth:`ISMCTSAgent.search` call."""
+
+    iterations: int
+    elapsed: float
+    root_visits: Tuple[int, ...]
+    root_values: Tuple[float, ...]
+
+    @property
+    def simulations_per_second(self) -> float:
+        return self.iterations / self.elapsed if self.elapsed > 0 else 0.0
+
+
+class _Node:
+    __slots__ = ("action", "player", "children", "visits", "value_sum", "available")
+
+    def __init__(self, action: int = -1, player: Optional[PlayerSide] = None) -> None:
+        self.action = action
+        self.player = player  # Player who chose ``action`` to reach this node.
+        self.children: Dict[int, _Node] = {}
+        self.visits = 0
+        self.value_sum = 0.0
+        self.available = 0
+
+
+class _SearchOptions(TypedDict):
+    evaluator: LeafEvaluator
+    time_budget: Optional[float]
+    max_iterations: Optional[int]
+    exploration: float
+    leaf_batch_size: int
+    virtual_loss: float
+
+
+def _perspective(player: Optional[PlayerSide]) -> float:
+    return 1.0 if player is PlayerSide.PLAYER_ONE else -1.0
+
+
+def run_search(
+    env: BattleEnv,
+    *,
+    evaluator: LeafEvaluator,
+    seed: Optional[int],
+    time_budget: Optional[float],
+    max_iterations: Optional[int],
+    exploration: float,
+    leaf_batch_size: int,
+    virtual_loss: float,
+) -> Tuple[np.ndarray, np.ndarray, int, float]:
+    """Run one IS-MCTS search and return root ``(visits, value_sums, iterations, elapsed)``.
+
+    With a ``seed`` the evaluator's ``reseed`` hook, when it has one, is
+    called with a seed drawn from the same stream as the tree's.
+    """
+
+    if time_budget is None and max_iterations is None:
+        raise ValueError("Either time_budget or max_iterations must be set")
+    rng = np.random.default_rng(seed)
+    reseed = getattr(evaluator, "reseed", None)
+    if seed is not None and reseed is not None:
+        reseed(int(rng.integers(0, 2**63)))
+    root = _Node()
+    start = time.perf_counter()
+    deadline = start + time_budget if time_budget is not None else math.inf
+    iterations = 0
+
+    while (max_iterations is None or iterations < max_iterations) and time.perf_counter() < deadline:
+        batch_limit = leaf_batch_size
+        if max_iterations is not None:
+            batch_limit = min(batch_limit, max_iterations - iterations)
+        pending: List[Tuple[BattleEnv, List[_Node], float]] = []
+        for _ in range(batch_limit):
+            leaf_env, path, reward = _select(root, env, rng, exploration)
+            for node in path[1:]:
+                node.visits += 1
+                node.value_sum -= virtual_loss * _perspective(node.player)
+            pending.append((leaf_env, path, reward))
+
+        open_leaves = [idx for idx, (leaf_env, _, _) in enumerate(pending) if not leaf_env.done]
+        leaf_values = np.zeros(len(pending), dtype=np.float64)
+        if open_leaves:
+            leaf_values[open_leaves] = evaluator([pending[idx][0] for idx in open_leaves])
+
+        for (_, path, reward), leaf_value in zip(pending, leaf_values):
+            outcome = reward + float(leaf_value)
+            for node in path[1:]:
+                sign = _perspective(node.player)
+                node.value_sum += virtual_loss * sign + outcome * sign
+        iterations += len(pending)
+
+    elapsed = time.perf_counter() - start
+    visits = np.zeros(_NUM_ACTIONS, dtype=np.int64)
+    value_sums = np.zeros(_NUM_ACTIONS, dtype=np.float64)
+    for action, child in root.children.items():
+        visits[action] = child.visits
+        value_sums[action] = child.value_sum
+    return visits, value_sums, iterations, elapsed
+
+
+def _select(
+    root: _Node, env: BattleEnv, rng: np.random.Generator, exploration: float
+) -> Tuple[BattleEnv, List[_Node], float]:
+    sim = env.clone(copy_rng=False)
+    sim.determinize(rng)
+    node = root
+    path = [root]
+    total_reward = 0.0
+    while not sim.done:
+        legal = np.flatnonzero(sim.action_mask())
+        untried = [int(action) for action in legal if int(action) not in node.children]
+        for action in legal:
+            child = node.children.get(int(action))
+            if child is not None:
+                child.available += 1
+        player = sim.active_player
+        if untried:
+            action = untried[int(rng.integers(len(untried)))]
+            child = _Node(action, player)
+            child.available = 1
+            node.children[action] = child
+            reward, _ = sim.step_index(action)
+            path.append(child)
+            return sim, path, total_reward + reward
+        node = max(
+            (node.children[int(action)] for action in legal),
+            key=lambda child: _ucb(child, exploration),
+        )
+        reward, _ = sim.step_index(node.action)
+        total_reward += reward
+        path.append(node)
+    return sim, path, total_reward
+
+
+def _ucb(node: _Node, exploration: float) -> float:
+    if node.visits == 0:
+        return math.inf
+    mean = node.value_sum * _perspective(node.player) / node.visits
+    return mean + exploration * math.sqrt(math.log(max(node.available, 1)) / node.visits)
+
+
+class ISMCTSAgent:
+    """Anytime IS-MCTS agent with leaf batching and root parallelism."""
+
+    def __init__(
+        self,
+        *,
+        evaluator: Optional[LeafEvaluator] = None,
+        time_budget: Optional[float] = DEFAULT_MOVE_TIME_BUDGET,
+        max_iterations: Optional[int] = None,
+        exploration: float = 1.4,
+        leaf_batch_size: int = 8,
+        virtual_loss: float = 1.0,
+        workers: int = 1,
+        seed: Optional[int] = None,
+    ) -> None:
+        if leaf_batch_size <= 0:
+            raise ValueError("leaf_batch_size must be positive")
+        if workers <= 0:
+            raise ValueError("workers must be positive")
+        self._evaluator = evaluator or RolloutEvaluator(seed=seed)
+        self._time_budget = time_budget
+        self._max_iterations = max_iterations
+        self._exploration = exploration
+        self._leaf_batch_size = leaf_batch_size
+        self._virtual_loss = virtual_loss
+        self._workers = workers
+        self._rng = np.random.default_rng(seed)
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self.last_stats: Optional[SearchStats] = None
+
+    def search(self, env: BattleEnv) -> SearchStats:
+        """Search from ``env`` and return the aggregated root statistics."""
+
+        if env.done:
+            raise ValueError("Cannot search from a finished game")
+        seeds = self._rng.integers(0, 2**63, size=self._workers).tolist()
+        options = _SearchOptions(
+            evaluator=self._evaluator,
+            time_budget=self._time_budget,
+            max_iterations=self._max_iterations,
+            exploration=self._exploration,
+            leaf_batch_size=self._leaf_batch_size,
+            virtual_loss=self._virtual_loss,
+        )
+        if self._workers == 1:
+            results = [run_search(env, seed=seeds[0], **options)]
+        else:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(max_workers=self._workers)
+            futures = [self._pool.submit(run_search, env, seed=seed, **options) for seed in seeds]
+            results = [future.result() for future in futures]
+
+        visits = sum((result[0] for result in results), np.zeros(_NUM_ACTIONS, dtype=np.int64))
+        value_sums = sum((result[1] for result in results), np.zeros(_NUM_ACTIONS, dtype=np.float64))
+        iterations = sum(result[2] for result in results)
+        elapsed = max(result[3] for result in results)
+        stats = SearchStats(
+            iterations=int(iterations),
+            elapsed=elapsed,
+            root_visits=tuple(int(v) for v in visits),
+            root_values=tuple(
+                float(total / count) if count else 0.0 for total, count in zip(value_sums, visits)
+            ),
+        )
+        self.last_stats = stats
+        return stats
+
+    def select_action(self, env: BattleEnv) -> int:
+        """Return the index into :data:`ACTION_TYPES` of the most visited legal action."""
+
+        stats = self.search(env)
+        visits = np.asarray(stats.root_visits, dtype=np.float64)
+        visits[~env.action_mask()] = -1.0
+        return int(visits.argmax())
+
+    def act(self, env: BattleEnv) -> Dict[str, object]:
+        """Return the chosen action in the dictionary form accepted by ``env.step``."""
+
+        return {"action_type": ACTION_TYPES[self.select_action(env)].name}
+
+    def close(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(cancel_futures=True)
+            self._pool = None
+
+    def __enter__(self) -> "ISMCTSAgent":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+
+__all__ = [
+    "DEFAULT_MOVE_TIME_BUDGET",
+    "ISMCTSAgent",
+    "LeafEvaluator",
+    "RolloutEvaluator",
+    "SearchStats",
+    "ValueFunctionEvaluator",
+    "run_search",
+]
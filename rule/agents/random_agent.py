@@ -1,7 +1,55 @@
+"""Uniform random baseline agent."""
+
+from __future__ import annotations
+
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+from agents.base import NO_ACTION, as_mask_batch, mask_from_observation
+from env.battle_env import ACTION_TYPES
 
-from typing import Dict, Any
 
 class RandomAgent:
-    """示例 Agent：返回一个空动作。实战中应输出结构化 JSON 动作。"""
+    """Picks uniformly among the legal actions.
+
+    ``act_batch`` draws one uniform score per action, masks the illegal ones
+    and takes the row-wise argmax, which selects each legal action with equal
+    probability in a single vectorised pass.
+    """
+
+    def __init__(self, seed: Optional[int] = None) -> None:
+        self._rng = np.random.default_rng(seed)
+
+    def reseed(self, seed: int) -> None:
+        """Restart the random stream, e.g. from a match seed for reproducible games."""
+
+        self._rng = np.random.default_rng(seed)
+
+    def fingerprint(self) -> str:
+        """Identity used by match caches.
+
+        Matches reseed the agent from the game seed, so its behaviour does not
+        depend on the generator state and every instance is equivalent.
+        """
+
+        return type(self).__name__
+
+    def act_batch(self, obs_batch: Any, mask_batch: np.ndarray) -> np.ndarray:
+        masks = as_mask_batch(mask_batch)
+        scores = self._rng.random(masks.shape)
+        scores[~masks] = -1.0
+        actions = scores.argmax(axis=1)
+        actions[~masks.any(axis=1)] = NO_ACTION
+        return actions
+
     def act(self, observation: Dict[str, Any]) -> Dict[str, Any]:
-        return {}
+        """Return a random legal action payload, or ``{}`` when there is none."""
+
+        action = int(self.act_batch(None, mask_from_observation(observation)[None])[0])
+        if action == NO_ACTION:
+            return {}
+        return {"action_type": ACTION_TYPES[action].name}
+
+
+__all__ = ["RandomAgent"]
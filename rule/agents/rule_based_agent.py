@@ -0,0 +1,57 @@
+"""Table-driven scripted agent choosing actions by a fixed priority order."""
+
+from __future__ import annotations
+
+from typing import Any, Dict, Sequence
+
+import numpy as np
+
+from agents.base import NO_ACTION, as_mask_batch, mask_from_observation
+from core.state_machine import ActionType
+from env.battle_env import ACTION_TYPES
+
+#: Default preference: attach, attack, then end the turn.  Only actions with a
+#: per-turn limit come before ``END_TURN``, so the agent always finishes a turn.
+DEFAULT_PRIORITY: tuple[ActionType, ...] = (
+    ActionType.ATTACH_ENERGY,
+    ActionType.DECLARE_ATTACK,
+    ActionType.END_TURN,
+    ActionType.RETREAT,
+    ActionType.PLAY_CARD,
+    ActionType.USE_ABILITY,
+    ActionType.PASS,
+)
+
+
+class RuleBasedAgent:
+    """Always plays the highest-priority legal action.
+
+    The priority order is compiled into a rank table once, so ``act_batch`` is
+    a single masked ``argmin`` over the batch.  Action types missing from
+    ``priority`` rank after every listed one, in enumeration order.
+    """
+
+    def __init__(self, priority: Sequence[ActionType] = DEFAULT_PRIORITY) -> None:
+        if len(set(priority)) != len(priority):
+            raise ValueError("priority contains duplicate action types")
+        self.priority = tuple(priority)
+        ordered = list(self.priority) + [t for t in ACTION_TYPES if t not in self.priority]
+        self._ranks = np.empty(len(ACTION_TYPES), dtype=np.int64)
+        for rank, action_type in enumerate(ordered):
+            self._ranks[ACTION_TYPES.index(action_type)] = rank
+
+    def act_batch(self, obs_batch: Any, mask_batch: np.ndarray) -> np.ndarray:
+        masks = as_mask_batch(mask_batch)
+        ranks = np.where(masks, self._ranks, len(ACTION_TYPES))
+        actions = ranks.argmin(axis=1)
+        actions[~masks.any(axis=1)] = NO_ACTION
+        return actions
+
+    def act(self, observation: Dict[str, Any]) -> Dict[str, Any]:
+        action = int(self.act_batch(None, mask_from_observation(observation)[None])[0])
+        if action == NO_ACTION:
+            return {}
+        return {"action_type": ACTION_TYPES[action].name}
+
+
+__all__ = ["DEFAULT_PRIORITY", "RuleBasedAgent"]
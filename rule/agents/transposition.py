@@ -0,0 +1,202 @@
+"""Fixed-size transposition table for tree search over :class:`BattleEnv`.
+
+Different move orders frequently reach the same position (attaching energy and
+then playing a card, or the reverse).  The table lets a search share visit
+counts and value estimates between those transpositions.  Entries are keyed by
+the 64-bit :meth:`BattleEnv.state_key` and stored in preallocated NumPy arrays,
+so the table never allocates after construction.
+
+Each bucket has two slots:
+
+* slot 0 is *depth-preferred*: it keeps the entry searched to the greatest
+  depth and is only replaced by an entry of equal or greater depth;
+* slot 1 is *always-replace*: it receives everything else, including entries
+  evicted from slot 0.
+
+Buckets are guarded by a fixed number of striped locks so the threads of one
+search can share a table without serialising on a single lock.
+"""
+
+from __future__ import annotations
+
+import threading
+from dataclasses import dataclass
+from typing import Optional
+
+import numpy as np
+
+_EMPTY = -1
+_PROBES, _HITS, _STORES, _REPLACEMENTS = range(4)
+
+
+@dataclass(frozen=True)
+class TableEntry:
+    """Snapshot of a stored position."""
+
+    key: int
+    depth: int
+    visits: int
+    value_sum: float
+
+    @property
+    def value(self) -> float:
+        return self.value_sum / self.visits if self.visits else 0.0
+
+
+@dataclass(frozen=True)
+class TableStats:
+    """Counters describing how well the table is working."""
+
+    probes: int
+    hits: int
+    stores: int
+    replacements: int
+    occupied: int
+    capacity: int
+
+    @property
+    def hit_rate(self) -> float:
+        return self.hits / self.probes if self.probes else 0.0
+
+    @property
+    def fill_rate(self) -> float:
+        return self.occupied / self.capacity if self.capacity else 0.0
+
+
+class TranspositionTable:
+    """Two-slot bucketed table with depth-preferred/always-replace policy."""
+
+    def __init__(self, num_buckets: int = 1 << 16, *, lock_stripes: int = 64) -> None:
+        if num_buckets <= 0 or lock_stripes <= 0:
+            raise ValueError("num_buckets and lock_stripes must be positive")
+        buckets = 1 << (num_buckets - 1).bit_length()
+        stripes = min(1 << (lock_stripes - 1).bit_length(), buckets)
+        self._bucket_mask = buckets - 1
+        self._stripe_mask = stripes - 1
+        self._keys = np.zeros((buckets, 2), dtype=np.uint64)
+        self._depths = np.full((buckets, 2), _EMPTY, dtype=np.int32)
+        self._visits = np.zeros((buckets, 2), dtype=np.int64)
+        self._value_sums = np.zeros((buckets, 2), dtype=np.float64)
+        self._locks = [threading.Lock() for _ in range(stripes)]
+        self._counters = np.zeros((stripes, 4), dtype=np.int64)
+
+    @property
+    def capacity(self) -> int:
+        return self._keys.size
+
+    # ------------------------------------------------------------------ access
+    def probe(self, key: int) -> Optional[TableEntry]:
+        """Return the entry stored for ``key`` or ``None``."""
+
+        bucket, stripe = self._locate(key)
+        with self._locks[stripe]:
+            self._counters[stripe, _PROBES] += 1
+            slot = self._find(bucket, key)
+            if slot is None:
+                return None
+            self._counters[stripe, _HITS] += 1
+            return TableEntry(
+                key=key,
+                depth=int(self._depths[bucket, slot]),
+                visits=int(self._visits[bucket, slot]),
+                value_sum=float(self._value_sums[bucket, slot]),
+            )
+
+    def store(self, key: int, *, depth: int, visits: int, value_sum: float) -> None:
+        """Insert or overwrite the entry for ``key``."""
+
+        if depth < 0:
+            raise ValueError("depth must be non-negative")
+        bucket, stripe = self._locate(key)
+        with self._locks[stripe]:
+            slot = self._find(bucket, key)
+            if slot is None:
+                slot = self._choose_slot(bucket, depth, stripe)
+            self._write(bucket, slot, key, depth, visits, value_sum)
+            self._counters[stripe, _STORES] += 1
+
+    def update(self, key: int, value: float, *, depth: int = 0) -> None:
+        """Record one more visit of ``key`` with backed-up ``value``.
+
+        This is the MCTS backup operation: visits and value sums accumulate in
+        place and the stored depth keeps the maximum seen so far.
+        """
+
+        bucket, stripe = self._locate(key)
+        with self._locks[stripe]:
+            slot = self._find(bucket, key)
+            if slot is None:
+                slot = self._choose_slot(bucket, depth, stripe)
+                self._write(bucket, slot, key, depth, 1, value)
+            else:
+                self._visits[bucket, slot] += 1
+                self._value_sums[bucket, slot] += value
+                if depth > self._depths[bucket, slot]:
+                    self._depths[bucket, slot] = depth
+            self._counters[stripe, _STORES] += 1
+
+    def clear(self) -> None:
+        for lock in self._locks:
+            lock.acquire()
+        try:
+            self._keys.fill(0)
+            self._depths.fill(_EMPTY)
+            self._visits.fill(0)
+            self._value_sums.fill(0.0)
+            self._counters.fill(0)
+        finally:
+            for lock in self._locks:
+                lock.release()
+
+    def stats(self) -> TableStats:
+        totals = self._counters.sum(axis=0)
+        return TableStats(
+            probes=int(totals[_PROBES]),
+            hits=int(totals[_HITS]),
+            stores=int(totals[_STORES]),
+            replacements=int(totals[_REPLACEMENTS]),
+            occupied=int((self._depths != _EMPTY).sum()),
+            capacity=self.capacity,
+        )
+
+    # ----------------------------------------------------------------- helpers
+    def _locate(self, key: int) -> tuple[int, int]:
+        bucket = key & self._bucket_mask
+        return bucket, bucket & self._stripe_mask
+
+    def _find(self, bucket: int, key: int) -> Optional[int]:
+        keys = self._keys[bucket]
+        depths = self._depths[bucket]
+        if depths[0] != _EMPTY and int(keys[0]) == key:
+            return 0
+        if depths[1] != _EMPTY and int(keys[1]) == key:
+            return 1
+        return None
+
+    def _choose_slot(self, bucket: int, depth: int, stripe: int) -> int:
+        depths = self._depths[bucket]
+        if depths[0] == _EMPTY:
+            return 0
+        if depth >= depths[0]:
+            # Demote the depth-preferred entry into the always-replace slot.
+            if depths[1] != _EMPTY:
+                self._counters[stripe, _REPLACEMENTS] += 1
+            self._keys[bucket, 1] = self._keys[bucket, 0]
+            self._depths[bucket, 1] = self._depths[bucket, 0]
+            self._visits[bucket, 1] = self._visits[bucket, 0]
+            self._value_sums[bucket, 1] = self._value_sums[bucket, 0]
+            return 0
+        if depths[1] != _EMPTY:
+            self._counters[stripe, _REPLACEMENTS] += 1
+        return 1
+
+    def _write(
+        self, bucket: int, slot: int, key: int, depth: int, visits: int, value_sum: float
+    ) -> None:
+        self._keys[bucket, slot] = key
+        self._depths[bucket, slot] = depth
+        self._visits[bucket, slot] = visits
+        self._value_sums[bucket, slot] = value_sum
+
+
+__all__ = ["TableEntry", "TableStats", "TranspositionTable"]
@@ -0,0 +1,19 @@
+"""Offline analysis tools built on top of the core and rules packages."""
+
+from .deck_stats import (
+    SUPPORTER_MODIFIER,
+    BoardGoal,
+    DeckStatsConfig,
+    DeckStatsEngine,
+    DeckStatsReport,
+    simulate_chunk,
+)
+
+__all__ = [
+    "BoardGoal",
+    "DeckStatsConfig",
+    "DeckStatsEngine",
+    "DeckStatsReport",
+    "SUPPORTER_MODIFIER",
+    "simulate_chunk",
+]
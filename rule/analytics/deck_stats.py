@@ -0,0 +1,306 @@
+"""Monte Carlo consistency analysis for deck lists.
+
+The engine plays the first few turns of many solitaire games with a deck:
+shuffle, draw an opening hand (taking mulligans), set prizes, then draw a card
+each turn and play every trainer that has an IR rule attached.  Trainer effects
+are executed by :class:`~rules.engine.RuleEngine`, so cards such as Nest Ball or
+Professor's Research are described with the same ``SearchDeck``/``Draw`` atomic
+effects used by the battle rules.  After each turn the configured
+:class:`BoardGoal` objects are checked, giving turn-N probabilities of reaching
+a board state.
+
+Games are simulated in chunks on a process pool and aggregated as they
+complete.  :meth:`DeckStatsEngine.stream` yields a report after every chunk
+with Wilson confidence intervals, which lets long jobs stop as soon as the
+intervals are tight enough.
+"""
+
+from __future__ import annotations
+
+import os
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from dataclasses import dataclass, field
+from statistics import NormalDist
+from typing import Dict, Iterator, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+
+from core.cards import Deck
+from core.deck_sampling import batched_permutations
+from core.random_control import RNGStreams, StreamKey, generator_from_seed_sequence
+from rules.engine import EffectContext, RuleEngine
+from rules.errors import EffectExecutionError, OncePerTurnViolation
+from rules.schema import CardRule
+
+#: Modifier identifier that card rules use to mark Supporter cards.
+SUPPORTER_MODIFIER = "supporter"
+
+_PLAYER = "p1"
+
+
+@dataclass(frozen=True)
+class BoardGoal:
+    """Minimum card counts per zone that together define a target board.
+
+    ``requirements`` maps a zone name (``"hand"``, ``"bench"``, ``"discard"`` …)
+    to the minimum number of copies of each card that must be in that zone.
+    """
+
+    name: str
+    requirements: Mapping[str, Mapping[str, int]]
+
+    def is_met(self, player_state: Mapping[str, List[str]]) -> bool:
+        for zone, cards in self.requirements.items():
+            contents = player_state.get(zone, [])
+            for card_name, minimum in cards.items():
+                if contents.count(card_name) < minimum:
+                    return False
+        return True
+
+
+@dataclass(frozen=True)
+class DeckStatsConfig:
+    """Picklable description of a deck analysis job."""
+
+    cards: Tuple[str, ...]
+    goals: Tuple[BoardGoal, ...]
+    card_rules: Mapping[str, CardRule] = field(default_factory=dict)
+    basic_names: frozenset[str] = frozenset()
+    turns: int = 3
+    hand_size: int = 7
+    prize_count: int = 6
+    going_first: bool = True
+
+    def __post_init__(self) -> None:
+        if self.basic_names and self.basic_names.isdisjoint(self.cards):
+            raise ValueError(
+                f"None of the basic_names {sorted(self.basic_names)} is in the deck; "
+                "every opening hand would be a mulligan"
+            )
+
+    @classmethod
+    def from_deck(
+        cls,
+        deck: Deck,
+        goals: Sequence[BoardGoal],
+        *,
+        card_rules: Optional[Mapping[str, CardRule]] = None,
+        basic_names: frozenset[str] = frozenset(),
+        turns: int = 3,
+        hand_size: int = 7,
+        prize_count: int = 6,
+        going_first: bool = True,
+    ) -> "DeckStatsConfig":
+        return cls(
+            cards=tuple(card.name for card in deck),
+            goals=tuple(goals),
+            card_rules=dict(card_rules or {}),
+            basic_names=basic_names,
+            turns=turns,
+            hand_size=hand_size,
+            prize_count=prize_count,
+            going_first=going_first,
+        )
+
+
+@dataclass(frozen=True)
+class DeckStatsReport:
+    """Aggregated goal probabilities after ``games`` simulated games.
+
+    ``probabilities[goal][t]`` is the probability of meeting ``goal`` by the
+    end of turn ``t + 1``; ``half_widths`` holds the matching confidence
+    interval half widths.
+    """
+
+    games: int
+    probabilities: Dict[str, np.ndarray]
+    half_widths: Dict[str, np.ndarray]
+    converged: bool
+
+    @property
+    def max_half_width(self) -> float:
+        return max((float(widths.max()) for widths in self.half_widths.values()), default=0.0)
+
+
+def simulate_chunk(config: DeckStatsConfig, key: StreamKey, games: int) -> np.ndarray:
+    """Simulate ``games`` games and return a ``(goals, turns)`` hit-count array."""
+
+    rng = generator_from_seed_sequence(key.seed_sequence())
+    engine = RuleEngine()
+    cards = config.cards
+    opening = config.hand_size + config.prize_count
+    hits = np.zeros((len(config.goals), config.turns), dtype=np.int64)
+    orders = batched_permutations(rng, games, len(cards))
+
+    for order in orders:
+        order_list = order.tolist()
+        if config.basic_names:
+            while not any(cards[idx] in config.basic_names for idx in order_list[: config.hand_size]):
+                order_list = rng.permutation(len(cards)).tolist()
+        names = [cards[idx] for idx in order_list]
+        player_state: Dict[str, List[str]] = {
+            "hand": names[: config.hand_size],
+            "prizes": names[config.hand_size : opening],
+            "deck": names[opening:],
+            "discard": [],
+            "bench": [],
+        }
+        context = EffectContext(
+            controller=_PLAYER,
+            state={"players": {_PLAYER: player_state}},
+            turn_identifier="turn-1",
+        )
+        if config.going_first:
+            context.runtime.claim_once_per_turn(SUPPORTER_MODIFIER, "turn-1")
+
+        reached = [False] * len(config.goals)
+        for turn in range(config.turns):
+            context.turn_identifier = f"turn-{turn + 1}"
+            if player_state["deck"]:
+                player_state["hand"].append(player_state["deck"].pop(0))
+            _play_trainers(engine, config.card_rules, context, player_state)
+            for goal_index, goal in enumerate(config.goals):
+                if not reached[goal_index] and goal.is_met(player_state):
+                    reached[goal_index] = True
+                    hits[goal_index, turn:] += 1
+    return hits
+
+
+def _play_trainers(
+    engine: RuleEngine,
+    card_rules: Mapping[str, CardRule],
+    context: EffectContext,
+    player_state: Dict[str, List[str]],
+) -> None:
+    """Play trainers from hand until none of them can be played any more."""
+
+    hand = player_state["hand"]
+    blocked: set[str] = set()
+    progress = True
+    while progress:
+        progress = False
+        for card_name in list(hand):
+            rule = card_rules.get(card_name)
+            if rule is None or card_name in blocked:
+                continue
+            hand.remove(card_name)
+            try:
+                engine.execute(rule, context)
+            except OncePerTurnViolation:
+                hand.append(card_name)
+                blocked.add(card_name)
+                continue
+            except EffectExecutionError:
+                pass  # A failed search still uses up the card.
+            player_state["discard"].append(card_name)
+            progress = True
+            break
+
+
+class DeckStatsEngine:
+    """Runs :func:`simulate_chunk` jobs on a process pool and aggregates them."""
+
+    def __init__(
+        self,
+        config: DeckStatsConfig,
+        *,
+        workers: Optional[int] = None,
+        chunk_games: int = 2_000,
+        master_seed: Optional[int] = None,
+        confidence: float = 0.95,
+    ) -> None:
+        if chunk_games <= 0:
+            raise ValueError("chunk_games must be positive")
+        if not 0.0 < confidence < 1.0:
+            raise ValueError("confidence must be between 0 and 1")
+        self._config = config
+        self._workers = workers
+        self._chunk_games = chunk_games
+        self._streams = RNGStreams(master_seed)
+        self._z = NormalDist().inv_cdf(0.5 + confidence / 2.0)
+
+    def stream(
+        self, *, max_games: int, tolerance: Optional[float] = None
+    ) -> Iterator[DeckStatsReport]:
+        """Yield a report after every completed chunk.
+
+        Iteration stops after ``max_games`` games or, when ``tolerance`` is
+        given, as soon as every confidence interval half width is below it.
+        Outstanding chunks are cancelled when the consumer stops early.
+        """
+
+        if max_games <= 0:
+            raise ValueError("max_games must be positive")
+        chunk_sizes = [self._chunk_games] * (max_games // self._chunk_games)
+        if max_games % self._chunk_games:
+            chunk_sizes.append(max_games % self._chunk_games)
+        keys = [self._streams.key(env_index=index) for index in range(len(chunk_sizes))]
+        jobs = list(zip(keys, chunk_sizes))
+
+        hits = np.zeros((len(self._config.goals), self._config.turns), dtype=np.int64)
+        games = 0
+        for chunk_hits, chunk_games in self._run_chunks(jobs):
+            hits += chunk_hits
+            games += chunk_games
+            report = self._report(hits, games, tolerance)
+            yield report
+            if report.converged:
+                return
+
+    def run(self, *, max_games: int, tolerance: Optional[float] = None) -> DeckStatsReport:
+        """Run the analysis to completion and return the final report."""
+
+        report: Optional[DeckStatsReport] = None
+        for report in self.stream(max_games=max_games, tolerance=tolerance):
+            pass
+        assert report is not None
+        return report
+
+    def _run_chunks(self, jobs: List[Tuple[StreamKey, int]]) -> Iterator[Tuple[np.ndarray, int]]:
+        if self._workers == 0:
+            for key, size in jobs:
+                yield simulate_chunk(self._config, key, size), size
+            return
+
+        workers = self._workers or os.cpu_count() or 1
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            max_in_flight = 2 * workers
+            pending: Dict[Future, int] = {}
+            queue = list(jobs)
+            try:
+                while queue or pending:
+                    while queue and len(pending) < max_in_flight:
+                        key, size = queue.pop(0)
+                        pending[pool.submit(simulate_chunk, self._config, key, size)] = size
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        size = pending.pop(future)
+                        yield future.result(), size
+            finally:
+                for future in pending:
+                    future.cancel()
+
+    def _report(self, hits: np.ndarray, games: int, tolerance: Optional[float]) -> DeckStatsReport:
+        z = self._z
+        p = hits / games
+        denominator = 1.0 + z * z / games
+        half_width = z * np.sqrt(p * (1.0 - p) / games + z * z / (4.0 * games * games)) / denominator
+        probabilities = {goal.name: p[idx] for idx, goal in enumerate(self._config.goals)}
+        half_widths = {goal.name: half_width[idx] for idx, goal in enumerate(self._config.goals)}
+        converged = tolerance is not None and bool((half_width <= tolerance).all())
+        return DeckStatsReport(
+            games=games,
+            probabilities=probabilities,
+            half_widths=half_widths,
+            converged=converged,
+        )
+
+
+__all__ = [
+    "BoardGoal",
+    "DeckStatsConfig",
+    "DeckStatsEngine",
+    "DeckStatsReport",
+    "SUPPORTER_MODIFIER",
+    "simulate_chunk",
+]
@@ -5,14 +5,22 @@ from __future__ import annotations
 from dataclasses import dataclass, field
 from hashlib import sha256
 import json
-from typing import Any, Dict, List, Optional
+import os
+from pathlib import Path
+from threading import Lock
+from typing import Annotated, Any, Dict, List, Optional
 from uuid import uuid4
 
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Query
 from pydantic import BaseModel, Field
 
+from core.card_search import CardSearchIndex
 from env.simple_env import SimpleEnv
 
+#: Optional path of a persisted card search index; built from the corpus and
+#: written there on first use when missing.
+CARD_INDEX_ENV = "PTCG_CARD_INDEX"
+
 
 @dataclass
 class EnvironmentSession:
@@ -69,6 +77,21 @@ class LegalActionsResponse(BaseModel):
     actions: List[Dict[str, Any]]
 
 
+class CardSearchHit(BaseModel):
+    card_id: str
+    name: str
+    score: float
+
+
+class CardSearchResponse(BaseModel):
+    query: str
+    page: int
+    page_size: int
+    total: int
+    results: List[CardSearchHit]
+    facets: Dict[str, Dict[str, int]]
+
+
 class EnvironmentManager:
     """In-memory registry of running environments."""
 
@@ -127,6 +150,27 @@ class EnvironmentManager:
 
 
 manager = EnvironmentManager()
+_card_index: Optional[CardSearchIndex] = None
+_card_index_lock = Lock()
+
+
+def get_card_index() -> CardSearchIndex:
+    """Return the card search index, loading or building it once on first use."""
+
+    global _card_index
+    with _card_index_lock:
+        if _card_index is None:
+            configured = os.environ.get(CARD_INDEX_ENV)
+            path = Path(configured) if configured else None
+            if path is not None and path.exists():
+                _card_index = CardSearchIndex.load(path)
+            else:
+                _card_index = CardSearchIndex.from_corpus()
+                if path is not None:
+                    _card_index.save(path)
+        return _card_index
+
+
 app = FastAPI(title="PTCG Rule Service", version="0.1.0")
 
 
@@ -153,3 +197,38 @@ def legal_actions(envId: str) -> LegalActionsResponse:
 @app.get("/env/replay", response_model=ReplayResponse)
 def get_replay(envId: str) -> ReplayResponse:
     return manager.replay(env_id=envId)
+
+
+@app.get("/cards/search", response_model=CardSearchResponse)
+def search_cards(
+    q: str = "",
+    supertype: Annotated[Optional[List[str]], Query()] = None,
+    subtypes: Annotated[Optional[List[str]], Query()] = None,
+    types: Annotated[Optional[List[str]], Query()] = None,
+    regulationMark: Annotated[Optional[List[str]], Query()] = None,
+    legality: Annotated[Optional[List[str]], Query()] = None,
+    page: Annotated[int, Query(ge=1)] = 1,
+    page_size: Annotated[int, Query(ge=1, le=100)] = 20,
+) -> CardSearchResponse:
+    filters = {
+        facet: values
+        for facet, values in (
+            ("supertype", supertype),
+            ("subtypes", subtypes),
+            ("types", types),
+            ("regulationMark", regulationMark),
+            ("legality", legality),
+        )
+        if values
+    }
+    result = get_card_index().search(
+        q, filters=filters, offset=(page - 1) * page_size, limit=page_size
+    )
+    return CardSearchResponse(
+        query=q,
+        page=page,
+        page_size=page_size,
+        total=result.total,
+        results=[CardSearchHit(card_id=hit.card_id, name=hit.name, score=hit.score) for hit in result.hits],
+        facets=result.facets,
+    )
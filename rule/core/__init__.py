@@ -1,19 +1,38 @@
 """Core helpers for the Pokémon TCG environment."""
 
+from .card_db import DEFAULT_CORPUS_DIR, CardDatabase
+from .card_search import CardSearchIndex, SearchHit, SearchResult
+from .card_tables import BoardOptions, BoardView, CardTables
+from .damage import DamageModifiers, DamageTables
 from .cards import (
     Card,
+    CardDefinition,
     CardSuperType,
     CardTracker,
     Deck,
+    DeckListCache,
+    ParsedDeckList,
     Zone,
     ZoneType,
+    default_decklist_cache,
     load_deck_from_json,
     load_deck_from_json_file,
     load_deck_from_limitless,
     reset_card_uid_counter,
 )
+from .deck_sampling import (
+    OpeningHandSampler,
+    OpeningHandStats,
+    batched_permutations,
+    batched_top_cards,
+)
+from .journal import JournalFullError, UndoJournal
+from .legality import DeckValidator
 from .random_control import (
+    BufferedRNG,
     RNGSnapshot,
+    RNGStreams,
+    StreamKey,
     generator_from_seed_sequence,
     generator_state_digest,
     global_rng,
@@ -30,17 +49,41 @@ __all__ = [
     "Phase",
     "PlayerSide",
     "StateSnapshot",
+    "BoardOptions",
+    "BoardView",
     "Card",
+    "CardDatabase",
+    "CardDefinition",
+    "CardSearchIndex",
+    "CardTables",
+    "DEFAULT_CORPUS_DIR",
+    "DamageModifiers",
+    "DamageTables",
+    "SearchHit",
+    "SearchResult",
     "CardSuperType",
     "CardTracker",
     "Deck",
+    "DeckListCache",
+    "ParsedDeckList",
     "Zone",
     "ZoneType",
+    "default_decklist_cache",
     "load_deck_from_json",
     "load_deck_from_json_file",
     "load_deck_from_limitless",
     "reset_card_uid_counter",
+    "OpeningHandSampler",
+    "OpeningHandStats",
+    "batched_permutations",
+    "batched_top_cards",
+    "DeckValidator",
+    "JournalFullError",
+    "UndoJournal",
+    "BufferedRNG",
     "RNGSnapshot",
+    "RNGStreams",
+    "StreamKey",
     "generator_from_seed_sequence",
     "generator_state_digest",
     "global_rng",
@@ -0,0 +1,108 @@
+"""Read-only database of card printings loaded from the card corpus.
+
+The corpus maintained by ``ptcg-data-update-tool`` stores one JSON file per
+set under ``cards/en``; every file is a list of card objects in the
+pokemontcg.io format.  :class:`CardDatabase` loads them once and gives every
+printing a dense integer index (its ``def index``).  Derived tables such as
+the search index in :mod:`core.card_search` are arrays over that index, so
+they can be combined without any lookups by string id.
+"""
+
+from __future__ import annotations
+
+import json
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Mapping, Optional, Sequence
+
+#: Location of the English card corpus in a checkout of this repository.
+DEFAULT_CORPUS_DIR = Path(__file__).resolve().parents[2] / "ptcg-data-update-tool" / "cards" / "en"
+
+#: Set metadata (``ptcgoCode``, legalities, release dates) for the corpus.
+DEFAULT_SETS_FILE = DEFAULT_CORPUS_DIR.parents[1] / "setdata.json"
+
+#: Formats that appear in the ``legalities`` field of a printing.
+FORMATS = ("standard", "expanded", "unlimited")
+
+CardRecord = Mapping[str, Any]
+
+
+def iter_corpus(directory: Path = DEFAULT_CORPUS_DIR) -> Iterator[CardRecord]:
+    """Yield every card of the set files in ``directory``, in file name order."""
+
+    for path in sorted(Path(directory).glob("*.json")):
+        with path.open("r", encoding="utf-8") as handle:
+            yield from json.load(handle)
+
+
+def load_sets(path: Path = DEFAULT_SETS_FILE) -> List[Mapping[str, Any]]:
+    """Set records of ``setdata.json`` (the API response or its ``data`` list)."""
+
+    with Path(path).open("r", encoding="utf-8") as handle:
+        payload = json.load(handle)
+    return list(payload["data"] if isinstance(payload, Mapping) else payload)
+
+
+def set_id_of(card_id: str) -> str:
+    """Set id of a card id such as ``"base1-4"`` (``"base1"``)."""
+
+    return card_id.rsplit("-", 1)[0]
+
+
+class CardDatabase:
+    """All printings of a corpus, addressed by ``def index``."""
+
+    def __init__(self, cards: Iterable[CardRecord]) -> None:
+        self._cards: List[CardRecord] = list(cards)
+        self._index: Dict[str, int] = {}
+        for def_index, card in enumerate(self._cards):
+            if card["id"] in self._index:
+                raise ValueError(f"Duplicate card id {card['id']!r} in corpus")
+            self._index[card["id"]] = def_index
+
+    @classmethod
+    def from_corpus(cls, directory: Path = DEFAULT_CORPUS_DIR) -> "CardDatabase":
+        directory = Path(directory)
+        if not directory.is_dir():
+            raise FileNotFoundError(f"Card corpus directory not found: {directory}")
+        return cls(iter_corpus(directory))
+
+    # ---- Public API
+    def __len__(self) -> int:
+        return len(self._cards)
+
+    def __iter__(self) -> Iterator[CardRecord]:
+        return iter(self._cards)
+
+    def __getitem__(self, def_index: int) -> CardRecord:
+        return self._cards[def_index]
+
+    def __contains__(self, card_id: object) -> bool:
+        return card_id in self._index
+
+    @property
+    def cards(self) -> Sequence[CardRecord]:
+        return self._cards
+
+    def index_of(self, card_id: str) -> int:
+        """``def index`` of ``card_id``; raises ``KeyError`` if unknown."""
+
+        return self._index[card_id]
+
+    def get(self, card_id: str) -> Optional[CardRecord]:
+        def_index = self._index.get(card_id)
+        return None if def_index is None else self._cards[def_index]
+
+    def ids(self) -> List[str]:
+        return [card["id"] for card in self._cards]
+
+
+__all__ = [
+    "CardDatabase",
+    "CardRecord",
+    "DEFAULT_CORPUS_DIR",
+    "DEFAULT_SETS_FILE",
+    "FORMATS",
+    "iter_corpus",
+    "load_sets",
+    "set_id_of",
+]
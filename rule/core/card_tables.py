@@ -0,0 +1,333 @@
+"""Precomputed evolution and energy-cost tables for action generation.
+
+Generating Evolve, Attack and Retreat actions means matching the cards in
+hand against the Pokémon in play and the energy attached to them on every
+step.  :class:`CardTables` derives everything needed for that from the card
+corpus once:
+
+* an evolution graph over name classes (printings sharing a name share a
+  class): ``parent``/``grandparent`` arrays and a CSR list of children.
+  ``grandparent`` gives the Rare Candy style Basic -> Stage 2 skip;
+* every attack cost as a count vector over :data:`ENERGY_TYPES`, stored
+  back to back per printing (``attack_offsets`` indexes ``attack_costs``),
+  plus retreat costs and the energy each Energy card provides.
+
+:func:`can_pay` then checks any number of costs against attached energy in
+one vectorised expression, and :meth:`CardTables.options` evaluates a
+:class:`BoardView` (the acting player's Pokémon, attached energy and hand)
+into the :class:`BoardOptions` used by
+:meth:`env.battle_env.ActionRulebook.legal_actions`.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .card_db import DEFAULT_CORPUS_DIR, CardDatabase
+
+#: Energy types in cost vectors; Colorless is last and payable by any type.
+ENERGY_TYPES = (
+    "Grass",
+    "Fire",
+    "Water",
+    "Lightning",
+    "Psychic",
+    "Fighting",
+    "Darkness",
+    "Metal",
+    "Fairy",
+    "Colorless",
+)
+COLORLESS = ENERGY_TYPES.index("Colorless")
+_ENERGY_INDEX = {name: position for position, name in enumerate(ENERGY_TYPES)}
+
+#: Stage of a name class; classes that are neither are :data:`OTHER_STAGE`.
+STAGES = {"Basic": 0, "Stage 1": 1, "Stage 2": 2}
+OTHER_STAGE = -1
+
+NO_CLASS = -1
+
+#: Maximum number of Pokémon a player may have in play (Active plus Bench).
+MAX_IN_PLAY = 6
+
+RARE_CANDY = "Rare Candy"
+
+
+def cost_vector(cost: Iterable[str]) -> np.ndarray:
+    """Count vector over :data:`ENERGY_TYPES` of a printed cost list."""
+
+    vector = np.zeros(len(ENERGY_TYPES), dtype=np.int8)
+    for symbol in cost:
+        if symbol == "Free":
+            continue
+        try:
+            vector[_ENERGY_INDEX[symbol]] += 1
+        except KeyError:
+            raise ValueError(f"Unknown energy type in cost: {symbol!r}") from None
+    return vector
+
+
+def can_pay(costs: np.ndarray, energy: np.ndarray) -> np.ndarray:
+    """Whether ``energy`` pays ``costs``, broadcasting over leading axes.
+
+    Each typed requirement needs that many energy of its type; Colorless is
+    paid by whatever is left, so the total must also cover the total cost.
+    Energy counted as Colorless (e.g. most Special Energy) only pays
+    Colorless requirements.
+    """
+
+    typed = (costs[..., :COLORLESS] <= energy[..., :COLORLESS]).all(axis=-1)
+    return typed & (energy.sum(axis=-1) >= costs.sum(axis=-1))
+
+
+@dataclass(frozen=True)
+class BoardView:
+    """The acting player's cards that matter for action generation.
+
+    ``pokemon`` holds the ``def index`` of every Pokémon in play, Active
+    first; ``energy[i]`` counts the energy attached to ``pokemon[i]`` per
+    :data:`ENERGY_TYPES`; ``fresh[i]`` marks Pokémon put into play or evolved
+    this turn, which cannot evolve again.
+    """
+
+    pokemon: np.ndarray
+    energy: np.ndarray
+    hand: np.ndarray
+    fresh: np.ndarray
+
+    @classmethod
+    def from_cards(
+        cls,
+        tables: "CardTables",
+        pokemon: Sequence[int],
+        attached: Sequence[Sequence[int]],
+        hand: Sequence[int] = (),
+        fresh: Optional[Sequence[bool]] = None,
+    ) -> "BoardView":
+        """Build a view from ``def index`` lists; ``attached[i]`` are Energy cards."""
+
+        return cls(
+            pokemon=np.asarray(pokemon, dtype=np.int64),
+            energy=np.stack([tables.energy_of(cards) for cards in attached])
+            if len(attached)
+            else np.zeros((0, len(ENERGY_TYPES)), dtype=np.int32),
+            hand=np.asarray(hand, dtype=np.int64),
+            fresh=np.zeros(len(pokemon), dtype=np.bool_)
+            if fresh is None
+            else np.asarray(fresh, dtype=np.bool_),
+        )
+
+
+@dataclass(frozen=True)
+class BoardOptions:
+    """What the acting player can do with a :class:`BoardView`.
+
+    ``attacks`` lists the rows of :attr:`CardTables.attack_costs` the Active
+    Pokémon can pay for; ``evolutions`` and ``stage_skips`` are
+    ``(hand position, in-play position)`` pairs for normal evolution and for
+    Rare Candy.
+    """
+
+    attacks: np.ndarray
+    can_retreat: bool
+    playable: np.ndarray
+    can_attach: bool
+    evolutions: np.ndarray
+    stage_skips: np.ndarray
+
+
+class CardTables:
+    """Evolution graph and cost vectors over the printings of a :class:`CardDatabase`."""
+
+    def __init__(self, database: CardDatabase) -> None:
+        count = len(database)
+        self.database = database
+        self.class_names: List[str] = []
+        class_ids: Dict[str, int] = {}
+        self.name_class = np.zeros(count, dtype=np.int32)
+        for def_index, card in enumerate(database):
+            class_id = class_ids.setdefault(card["name"], len(class_ids))
+            if class_id == len(self.class_names):
+                self.class_names.append(card["name"])
+            self.name_class[def_index] = class_id
+        self._class_ids = class_ids
+        classes = len(self.class_names)
+
+        self.is_pokemon = np.zeros(count, dtype=np.bool_)
+        self.is_trainer = np.zeros(count, dtype=np.bool_)
+        self.is_energy = np.zeros(count, dtype=np.bool_)
+        self.retreat_cost = np.zeros(count, dtype=np.int8)
+        self.has_ability = np.zeros(count, dtype=np.bool_)
+        self.energy_provided = np.zeros((count, len(ENERGY_TYPES)), dtype=np.int8)
+        self.stage = np.full(classes, OTHER_STAGE, dtype=np.int8)
+        self.parent = np.full(classes, NO_CLASS, dtype=np.int32)
+        attack_counts = np.zeros(count, dtype=np.int64)
+        costs: List[np.ndarray] = []
+        rare_candy: List[int] = []
+
+        for def_index, card in enumerate(database):
+            supertype = card.get("supertype")
+            subtypes = card.get("subtypes") or ()
+            class_id = self.name_class[def_index]
+            if supertype == "Pokémon":
+                self.is_pokemon[def_index] = True
+                self.retreat_cost[def_index] = card.get("convertedRetreatCost") or 0
+                self.has_ability[def_index] = bool(card.get("abilities"))
+                for subtype, stage in STAGES.items():
+                    if subtype in subtypes and self.stage[class_id] == OTHER_STAGE:
+                        self.stage[class_id] = stage
+                parent = class_ids.get(card.get("evolvesFrom") or "", NO_CLASS)
+                if parent != NO_CLASS and self.parent[class_id] == NO_CLASS:
+                    self.parent[class_id] = parent
+                attacks = card.get("attacks") or ()
+                attack_counts[def_index] = len(attacks)
+                costs.extend(cost_vector(attack.get("cost") or ()) for attack in attacks)
+            elif supertype == "Energy":
+                self.is_energy[def_index] = True
+                self.energy_provided[def_index] = self._provided(card)
+            else:
+                self.is_trainer[def_index] = True
+                if card["name"] == RARE_CANDY:
+                    rare_candy.append(def_index)
+
+        has_parent = self.parent != NO_CLASS
+        self.grandparent = np.full(classes, NO_CLASS, dtype=np.int32)
+        self.grandparent[has_parent] = self.parent[self.parent[has_parent]]
+        order = np.argsort(self.parent, kind="stable")
+        order = order[self.parent[order] != NO_CLASS]
+        self.children = order.astype(np.int32)
+        self.child_offsets = np.zeros(classes + 1, dtype=np.int64)
+        np.cumsum(np.bincount(self.parent[order], minlength=classes), out=self.child_offsets[1:])
+
+        self.attack_offsets = np.zeros(count + 1, dtype=np.int64)
+        np.cumsum(attack_counts, out=self.attack_offsets[1:])
+        self.attack_costs = (
+            np.stack(costs) if costs else np.zeros((0, len(ENERGY_TYPES)), dtype=np.int8)
+        )
+        self.attack_total = self.attack_costs.sum(axis=1, dtype=np.int32)
+        self.attack_card = np.repeat(np.arange(count, dtype=np.int32), attack_counts)
+        self.is_rare_candy = np.zeros(count, dtype=np.bool_)
+        self.is_rare_candy[rare_candy] = True
+
+    @classmethod
+    def from_corpus(cls, directory: Path = DEFAULT_CORPUS_DIR) -> "CardTables":
+        return cls(CardDatabase.from_corpus(directory))
+
+    # ---- Public API
+    def class_of(self, name: str) -> int:
+        return self._class_ids.get(name, NO_CLASS)
+
+    def evolves_to(self, name: str) -> List[str]:
+        """Names that evolve directly from ``name``."""
+
+        class_id = self.class_of(name)
+        if class_id == NO_CLASS:
+            return []
+        start, stop = self.child_offsets[class_id], self.child_offsets[class_id + 1]
+        return [self.class_names[child] for child in self.children[start:stop]]
+
+    def energy_of(self, cards: Sequence[int]) -> np.ndarray:
+        """Energy provided by the Energy cards ``cards`` (``def`` indices)."""
+
+        return self.energy_provided[np.asarray(cards, dtype=np.int64)].sum(axis=0, dtype=np.int32)
+
+    def attack_rows(self, pokemon: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """``(owner, row)`` for every attack of every Pokémon in ``pokemon``.
+
+        ``owner`` is the position in ``pokemon`` and ``row`` indexes
+        :attr:`attack_costs`.
+        """
+
+        starts = self.attack_offsets[pokemon]
+        lengths = self.attack_offsets[pokemon + 1] - starts
+        owners = np.repeat(np.arange(len(pokemon)), lengths)
+        first = np.repeat(np.cumsum(lengths) - lengths, lengths)
+        rows = np.repeat(starts, lengths) + np.arange(owners.size) - first
+        return owners, rows
+
+    def payable_attacks(self, pokemon: np.ndarray, energy: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """``(owner, row, payable)`` over all attacks of all of ``pokemon`` at once."""
+
+        owners, rows = self.attack_rows(pokemon)
+        have = energy[owners]
+        typed = (self.attack_costs[rows, :COLORLESS] <= have[:, :COLORLESS]).all(axis=1)
+        payable = typed & (self.attack_total[rows] <= energy.sum(axis=1)[owners])
+        return owners, rows, payable
+
+    def evolution_pairs(self, cards: np.ndarray, pokemon: np.ndarray) -> np.ndarray:
+        """``(H, P)`` matrix: hand card ``h`` evolves in-play Pokémon ``p``."""
+
+        return self.parent[self.name_class[cards]][:, None] == self.name_class[pokemon][None, :]
+
+    def stage_skip_pairs(self, cards: np.ndarray, pokemon: np.ndarray) -> np.ndarray:
+        """``(H, P)`` matrix: Stage 2 card ``h`` may go onto Basic ``p`` via Rare Candy."""
+
+        card_classes = self.name_class[cards]
+        targets = self.name_class[pokemon]
+        stage_two = self.is_pokemon[cards] & (self.stage[card_classes] == 2)
+        basics = self.stage[targets] == 0
+        reach = self.grandparent[card_classes][:, None] == targets[None, :]
+        return reach & stage_two[:, None] & basics[None, :]
+
+    def options(self, board: BoardView) -> BoardOptions:
+        """Evaluate everything :class:`BoardOptions` reports for ``board``."""
+
+        pokemon, hand = board.pokemon, board.hand
+        owners, rows, payable = self.payable_attacks(pokemon, board.energy)
+        attacks = rows[(owners == 0) & payable]
+        can_retreat = bool(
+            len(pokemon) > 1 and board.energy[0].sum() >= self.retreat_cost[pokemon[0]]
+        )
+
+        can_evolve = ~board.fresh
+        evolutions = np.argwhere(self.evolution_pairs(hand, pokemon) & can_evolve[None, :])
+        skips = np.argwhere(self.stage_skip_pairs(hand, pokemon) & can_evolve[None, :])
+        playable = self.is_trainer[hand] & ~self.is_rare_candy[hand]
+        if skips.size:
+            playable |= self.is_rare_candy[hand]
+        hand_classes = self.name_class[hand]
+        basics = self.is_pokemon[hand] & (self.stage[hand_classes] == 0)
+        if len(pokemon) < MAX_IN_PLAY:
+            playable |= basics
+        playable[evolutions[:, 0]] = True
+        can_attach = bool(len(pokemon) and self.is_energy[hand].any())
+        return BoardOptions(
+            attacks=attacks,
+            can_retreat=can_retreat,
+            playable=playable,
+            can_attach=can_attach,
+            evolutions=evolutions,
+            stage_skips=skips,
+        )
+
+    # ---- Internals
+    @staticmethod
+    def _provided(card) -> np.ndarray:
+        provided = np.zeros(len(ENERGY_TYPES), dtype=np.int8)
+        if "Basic" in (card.get("subtypes") or ()):
+            for name in ENERGY_TYPES[:COLORLESS]:
+                if name in card["name"]:
+                    provided[_ENERGY_INDEX[name]] = 1
+                    return provided
+        provided[COLORLESS] = 1
+        return provided
+
+
+__all__ = [
+    "BoardOptions",
+    "BoardView",
+    "COLORLESS",
+    "CardTables",
+    "ENERGY_TYPES",
+    "MAX_IN_PLAY",
+    "NO_CLASS",
+    "OTHER_STAGE",
+    "RARE_CANDY",
+    "STAGES",
+    "can_pay",
+    "cost_vector",
+]
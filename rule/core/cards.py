@@ -12,17 +12,22 @@ In addition to the data structures, convenience loaders are provided for
 importing deck lists from JSON definitions as well as the "Copy to Clipboard"
 format exported by https://limitlesstcg.com/.  Both helpers rely on the same
 underlying card creation pipeline to guarantee consistent identifiers.
+
+Limitless imports go through :class:`DeckListCache`, which parses each
+distinct deck list once and afterwards only allocates fresh card instances.
 """
 
 from __future__ import annotations
 
+from collections import OrderedDict
 from dataclasses import dataclass, field
 from enum import Enum
+import hashlib
 import itertools
 import json
 import random
 import re
-from typing import Dict, Iterable, Iterator, List, Optional
+from typing import Dict, Iterable, Iterator, List, Mapping, Optional, Tuple, Union
 
 
 class CardSuperType(Enum):
@@ -283,46 +288,187 @@ def load_deck_from_json(data: Dict) -> Deck:
 _LIMITLESS_SECTION_RE = re.compile(r"^(?P<section>[A-Za-zéÉ]+):\s*(?P<count>\d+)")
 
 
-def load_deck_from_limitless(text: str, *, name: str = "Limitless Deck") -> Deck:
-    """Parse the ``Copy to Clipboard`` format from LimitlessTCG."""
+@dataclass(frozen=True)
+class CardDefinition:
+    """Printing-level card identity shared by every copy of a card."""
 
-    tracker = CardTracker()
-    cards: List[Card] = []
-    current_supertype: Optional[CardSuperType] = None
-
-    for raw_line in text.splitlines():
-        line = raw_line.strip()
-        if not line:
-            continue
-
-        section_match = _LIMITLESS_SECTION_RE.match(line)
-        if section_match:
-            section_name = section_match.group("section")
-            current_supertype = CardSuperType.from_string(section_name)
-            continue
-
-        if current_supertype is None:
-            raise ValueError("Card line encountered before section header")
-
-        parts = line.split()
-        if len(parts) < 4:
-            raise ValueError(f"Unrecognised Limitless card line: {line!r}")
-        count = int(parts[0])
-        set_code = parts[-2]
-        number = parts[-1]
-        name_tokens = parts[1:-2]
-        card_name = " ".join(name_tokens)
-        cards.extend(
-            _build_cards(
-                name=card_name,
+    name: str
+    supertype: CardSuperType
+    set_code: str
+    number: str
+    metadata: Dict[str, str] = field(default_factory=dict, compare=False, hash=False)
+
+    @property
+    def key(self) -> Tuple[str, CardSuperType, str, str]:
+        return (self.name, self.supertype, self.set_code, self.number)
+
+
+@dataclass(frozen=True)
+class ParsedDeckList:
+    """A deck list resolved to ``(def_id, count)`` pairs of a :class:`DeckListCache`."""
+
+    content_hash: str
+    entries: Tuple[Tuple[int, int], ...]
+
+    @property
+    def total_cards(self) -> int:
+        return sum(count for _, count in self.entries)
+
+
+def _limitless_content_hash(text: str) -> str:
+    lines = (line.strip() for line in text.splitlines())
+    normalised = "\n".join(line for line in lines if line)
+    return hashlib.sha256(normalised.encode("utf-8")).hexdigest()
+
+
+class DeckListCache:
+    """Caches parsed Limitless deck lists keyed by a hash of their content.
+
+    Card definitions are interned so that a ``def_id`` identifies the same
+    printing across every deck list parsed by the cache.  Parsing a list that
+    was seen before (modulo blank lines and indentation) costs one hash
+    computation; :meth:`materialize` then only allocates the new :class:`Card`
+    instances with fresh UIDs.
+    """
+
+    def __init__(self, maxsize: Optional[int] = 4096) -> None:
+        self._maxsize = maxsize
+        self._definitions: List[CardDefinition] = []
+        self._definition_ids: Dict[Tuple[str, CardSuperType, str, str], int] = {}
+        self._parsed: "OrderedDict[str, ParsedDeckList]" = OrderedDict()
+        self._sections: Dict[str, CardSuperType] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._parsed)
+
+    def definition(self, def_id: int) -> CardDefinition:
+        return self._definitions[def_id]
+
+    def intern(self, definition: CardDefinition) -> int:
+        """Return the ``def_id`` of ``definition``, registering it if needed."""
+
+        def_id = self._definition_ids.get(definition.key)
+        if def_id is None:
+            def_id = len(self._definitions)
+            self._definitions.append(definition)
+            self._definition_ids[definition.key] = def_id
+        return def_id
+
+    def parse_limitless(self, text: str) -> ParsedDeckList:
+        """Parse the ``Copy to Clipboard`` format, reusing cached results."""
+
+        content_hash = _limitless_content_hash(text)
+        parsed = self._parsed.get(content_hash)
+        if parsed is not None:
+            self.hits += 1
+            self._parsed.move_to_end(content_hash)
+            return parsed
+        self.misses += 1
+        parsed = ParsedDeckList(content_hash, tuple(self._parse_entries(text)))
+        self._parsed[content_hash] = parsed
+        if self._maxsize is not None and len(self._parsed) > self._maxsize:
+            self._parsed.popitem(last=False)
+        return parsed
+
+    def materialize(
+        self,
+        parsed: ParsedDeckList,
+        *,
+        name: str = "Limitless Deck",
+        tracker: Optional[CardTracker] = None,
+    ) -> Deck:
+        """Create a :class:`Deck` with fresh card UIDs from a parsed list."""
+
+        cards: List[Card] = []
+        for def_id, count in parsed.entries:
+            definition = self._definitions[def_id]
+            cards.extend(
+                _build_cards(
+                    name=definition.name,
+                    supertype=definition.supertype,
+                    set_code=definition.set_code,
+                    number=definition.number,
+                    count=count,
+                    metadata=definition.metadata,
+                )
+            )
+        return Deck(name=name, cards=cards, tracker=tracker or CardTracker())
+
+    def load_limitless(self, text: str, *, name: str = "Limitless Deck") -> Deck:
+        return self.materialize(self.parse_limitless(text), name=name)
+
+    def parse_many(
+        self, decklists: Union[Mapping[str, str], Iterable[Tuple[str, str]]]
+    ) -> Dict[str, ParsedDeckList]:
+        """Parse a whole tournament export given as ``name -> deck list`` pairs.
+
+        Identical lists (mirror matches, netdecks) are parsed once; the
+        returned mapping preserves the input order.
+        """
+
+        items = decklists.items() if isinstance(decklists, Mapping) else decklists
+        return {name: self.parse_limitless(text) for name, text in items}
+
+    def load_many(
+        self, decklists: Union[Mapping[str, str], Iterable[Tuple[str, str]]]
+    ) -> Dict[str, Deck]:
+        """Parse and materialize every deck of a tournament export."""
+
+        return {
+            name: self.materialize(parsed, name=name)
+            for name, parsed in self.parse_many(decklists).items()
+        }
+
+    def _section_supertype(self, section_name: str) -> CardSuperType:
+        supertype = self._sections.get(section_name)
+        if supertype is None:
+            supertype = CardSuperType.from_string(section_name)
+            self._sections[section_name] = supertype
+        return supertype
+
+    def _parse_entries(self, text: str) -> Iterator[Tuple[int, int]]:
+        current_supertype: Optional[CardSuperType] = None
+        for raw_line in text.splitlines():
+            line = raw_line.strip()
+            if not line:
+                continue
+
+            section_match = _LIMITLESS_SECTION_RE.match(line)
+            if section_match:
+                current_supertype = self._section_supertype(section_match.group("section"))
+                continue
+
+            if current_supertype is None:
+                raise ValueError("Card line encountered before section header")
+
+            parts = line.split()
+            if len(parts) < 4:
+                raise ValueError(f"Unrecognised Limitless card line: {line!r}")
+            count = int(parts[0])
+            definition = CardDefinition(
+                name=" ".join(parts[1:-2]),
                 supertype=current_supertype,
-                set_code=set_code,
-                number=number,
-                count=count,
+                set_code=parts[-2],
+                number=parts[-1],
             )
-        )
+            yield self.intern(definition), count
 
-    return Deck(name=name, cards=cards, tracker=tracker)
+
+_DEFAULT_DECKLIST_CACHE = DeckListCache()
+
+
+def default_decklist_cache() -> DeckListCache:
+    """Return the process-wide cache used by :func:`load_deck_from_limitless`."""
+
+    return _DEFAULT_DECKLIST_CACHE
+
+
+def load_deck_from_limitless(text: str, *, name: str = "Limitless Deck") -> Deck:
+    """Parse the ``Copy to Clipboard`` format from LimitlessTCG."""
+
+    return _DEFAULT_DECKLIST_CACHE.load_limitless(text, name=name)
 
 
 def load_deck_from_json_file(path: str) -> Deck:
@@ -0,0 +1,248 @@
+"""Batched damage calculation from printed attack damage, Weakness and Resistance.
+
+Every attack's ``damage`` string is parsed once when the tables are built:
+``"30"`` is fixed damage, ``"30+"``, ``"30×"`` and ``"30-"`` are a base
+that the attack text adds to, multiplies or subtracts from, ``"?"`` is
+damage the text computes entirely and an empty string is no damage.  Rows
+line up with :attr:`core.card_tables.CardTables.attack_costs`, so the row of
+a payable attack found during action generation is also its damage row.
+
+:meth:`DamageTables.damage` resolves any number of ``(attack, attacker,
+defender)`` triples at once, in the order of the rules:
+
+1. base damage, completed with the ``times``/``extra`` the text computed;
+2. ``BEFORE_WEAKNESS`` modifiers (effects on the Attacking Pokémon);
+3. Weakness (usually ×2) when an attacker type matches, Active only;
+4. Resistance (usually −30) when an attacker type matches, Active only,
+   never taking damage below zero;
+5. ``AFTER_RESISTANCE`` modifiers (effects on the Defending Pokémon);
+6. clamping at zero.
+
+Steps 3 and 4 only apply to attacks that would do damage.
+"""
+
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterable, Optional, Tuple
+
+import numpy as np
+import numpy.typing as npt
+
+from .card_db import DEFAULT_CORPUS_DIR, CardDatabase
+from .card_tables import ENERGY_TYPES, CardTables
+
+#: Pokémon types usable in Weakness and Resistance masks.
+POKEMON_TYPES = ENERGY_TYPES + ("Dragon",)
+_TYPE_BIT = {name: 1 << position for position, name in enumerate(POKEMON_TYPES)}
+
+#: Kinds of printed damage, stored per attack row.
+NO_DAMAGE = 0
+FIXED = 1
+PLUS = 2
+TIMES = 3
+MINUS = 4
+VARIABLE = 5
+_KIND_BY_SUFFIX = {"": FIXED, "+": PLUS, "×": TIMES, "x": TIMES, "-": MINUS}
+
+#: Stages at which a :class:`DamageModifiers` entry applies.
+BEFORE_WEAKNESS = 0
+AFTER_RESISTANCE = 1
+
+#: Operations of a :class:`DamageModifiers` entry.
+ADD = 0
+MULTIPLY = 1
+
+_DAMAGE_RE = re.compile(r"^(\d+)\s*([+×x-]?)$")
+
+
+def parse_damage(text: Optional[str]) -> Tuple[int, int]:
+    """``(kind, base)`` of a printed damage string such as ``"30+"``."""
+
+    text = (text or "").strip()
+    if not text:
+        return NO_DAMAGE, 0
+    if text == "?":
+        return VARIABLE, 0
+    match = _DAMAGE_RE.match(text)
+    if match is None:
+        raise ValueError(f"Unrecognised attack damage: {text!r}")
+    return _KIND_BY_SUFFIX[match.group(2)], int(match.group(1))
+
+
+def type_mask(types: Iterable[str]) -> int:
+    """Bit mask over :data:`POKEMON_TYPES` of ``types``; unknown types are ignored."""
+
+    mask = 0
+    for name in types:
+        mask |= _TYPE_BIT.get(name, 0)
+    return mask
+
+
+@dataclass(frozen=True)
+class DamageModifiers:
+    """A stack of damage modifiers for a batch of attacks.
+
+    Entry ``i`` applies ``op[i]`` with ``amount[i]`` to pair ``pair[i]`` at
+    ``stage[i]``.  Within a stage all multipliers are applied before all
+    additions, so the order entries were pushed in does not matter.
+    """
+
+    pair: np.ndarray
+    stage: np.ndarray
+    op: np.ndarray
+    amount: np.ndarray
+
+    @classmethod
+    def stack(cls, entries: Iterable[Tuple[int, int, int, int]]) -> "DamageModifiers":
+        """Build a stack from ``(pair, stage, op, amount)`` tuples."""
+
+        rows = np.asarray(list(entries), dtype=np.int64).reshape(-1, 4)
+        return cls(pair=rows[:, 0], stage=rows[:, 1], op=rows[:, 2], amount=rows[:, 3])
+
+    def apply(self, damage: np.ndarray, stage: int) -> None:
+        """Apply the entries of ``stage`` to ``damage`` in place."""
+
+        selected = self.stage == stage
+        scale = selected & (self.op == MULTIPLY)
+        if scale.any():
+            np.multiply.at(damage, self.pair[scale], self.amount[scale])
+        shift = selected & (self.op == ADD)
+        if shift.any():
+            np.add.at(damage, self.pair[shift], self.amount[shift])
+
+
+class DamageTables:
+    """Printed damage, types, Weakness and Resistance of every printing.
+
+    Attack arrays are indexed by attack row (see :class:`CardTables`), card
+    arrays by ``def index``.  A card with two Weaknesses or Resistances gets
+    the union of their types and the value of the first one; printed pairs
+    always share the value.
+    """
+
+    def __init__(self, tables: CardTables) -> None:
+        database = tables.database
+        count = len(database)
+        self.tables = tables
+        self.attack_kind = np.zeros(len(tables.attack_card), dtype=np.int8)
+        self.attack_base = np.zeros(len(tables.attack_card), dtype=np.int32)
+        self.types = np.zeros(count, dtype=np.uint16)
+        self.weakness_types = np.zeros(count, dtype=np.uint16)
+        self.weakness_factor = np.ones(count, dtype=np.int32)
+        self.weakness_bonus = np.zeros(count, dtype=np.int32)
+        self.resistance_types = np.zeros(count, dtype=np.uint16)
+        self.resistance_value = np.zeros(count, dtype=np.int32)
+
+        for def_index, card in enumerate(database):
+            if not tables.is_pokemon[def_index]:
+                continue
+            row = tables.attack_offsets[def_index]
+            for attack in card.get("attacks") or ():
+                self.attack_kind[row], self.attack_base[row] = parse_damage(attack.get("damage"))
+                row += 1
+            self.types[def_index] = type_mask(card.get("types") or ())
+            weaknesses = card.get("weaknesses") or ()
+            if weaknesses:
+                self.weakness_types[def_index] = type_mask(item["type"] for item in weaknesses)
+                value = weaknesses[0].get("value") or "×2"
+                if value[:1] in ("×", "x"):
+                    self.weakness_factor[def_index] = int(value[1:])
+                else:
+                    self.weakness_bonus[def_index] = int(value)
+            resistances = card.get("resistances") or ()
+            if resistances:
+                self.resistance_types[def_index] = type_mask(item["type"] for item in resistances)
+                self.resistance_value[def_index] = int(resistances[0].get("value") or "-30")
+
+    @classmethod
+    def from_corpus(cls, directory: Path = DEFAULT_CORPUS_DIR) -> "DamageTables":
+        return cls(CardTables(CardDatabase.from_corpus(directory)))
+
+    # ---- Public API
+    def damage(
+        self,
+        rows: npt.ArrayLike,
+        attackers: npt.ArrayLike,
+        defenders: npt.ArrayLike,
+        *,
+        times: Optional[npt.ArrayLike] = None,
+        extra: Optional[npt.ArrayLike] = None,
+        active: Optional[npt.ArrayLike] = None,
+        modifiers: Optional[DamageModifiers] = None,
+    ) -> np.ndarray:
+        """Damage done by attack ``rows[i]`` of ``attackers[i]`` to ``defenders[i]``.
+
+        ``times`` multiplies ``×`` attacks (default 1) and ``extra`` is the
+        amount ``+``/``-`` attacks add or subtract and the whole damage of
+        ``?`` attacks (default 0).  ``active`` marks defenders that are the
+        Active Pokémon (default all); Benched Pokémon take no Weakness or
+        Resistance.  Attackers and defenders are ``def`` indices.
+        """
+
+        rows = np.asarray(rows, dtype=np.int64)
+        attackers = np.asarray(attackers, dtype=np.int64)
+        defenders = np.asarray(defenders, dtype=np.int64)
+        kind = self.attack_kind[rows]
+        base = self.attack_base[rows]
+        times = np.ones(rows.size, dtype=np.int32) if times is None else np.asarray(times)
+        extra = np.zeros(rows.size, dtype=np.int32) if extra is None else np.asarray(extra)
+
+        damage = np.select(
+            [kind == PLUS, kind == TIMES, kind == MINUS, kind == VARIABLE, kind == FIXED],
+            [base + extra, base * times, base - extra, extra, base],
+            0,
+        ).astype(np.int64)
+        if modifiers is not None:
+            modifiers.apply(damage, BEFORE_WEAKNESS)
+
+        hits = (kind != NO_DAMAGE) & (damage > 0)
+        if active is not None:
+            hits &= np.asarray(active, dtype=np.bool_)
+        attacker_types = self.types[attackers]
+        weak = hits & ((attacker_types & self.weakness_types[defenders]) != 0)
+        damage = np.where(
+            weak,
+            damage * self.weakness_factor[defenders] + self.weakness_bonus[defenders],
+            damage,
+        )
+        resisted = hits & ((attacker_types & self.resistance_types[defenders]) != 0)
+        damage = np.maximum(damage + np.where(resisted, self.resistance_value[defenders], 0), 0)
+
+        if modifiers is not None:
+            modifiers.apply(damage, AFTER_RESISTANCE)
+        return np.maximum(damage, 0)
+
+    def attack_damage(
+        self, def_index: int, attack: int, defender: int, *, times: int = 1, extra: int = 0, active: bool = True
+    ) -> int:
+        """Damage of attack number ``attack`` of ``def_index`` to ``defender``."""
+
+        start, stop = self.tables.attack_offsets[def_index], self.tables.attack_offsets[def_index + 1]
+        if not 0 <= attack < stop - start:
+            raise IndexError(f"Card {def_index} has no attack {attack}")
+        result = self.damage(
+            [start + attack], [def_index], [defender], times=[times], extra=[extra], active=[active]
+        )
+        return int(result[0])
+
+
+__all__ = [
+    "ADD",
+    "AFTER_RESISTANCE",
+    "BEFORE_WEAKNESS",
+    "DamageModifiers",
+    "DamageTables",
+    "FIXED",
+    "MINUS",
+    "MULTIPLY",
+    "NO_DAMAGE",
+    "PLUS",
+    "POKEMON_TYPES",
+    "TIMES",
+    "VARIABLE",
+    "parse_damage",
+    "type_mask",
+]
@@ -0,0 +1,234 @@
+"""Vectorised deck shuffling and opening-hand statistics.
+
+Deck-building questions such as "how often do I mulligan?" or "how often is my
+only copy of Rare Candy prized?" need millions of simulated shuffles.  Shuffling
+lists of :class:`~core.cards.Card` objects one deck at a time is far too slow
+for that, so this module works on integer index arrays instead: a deck is
+turned into a vector of card-name ids once and thousands of games are permuted
+at the same time as rows of a ``(games, deck_size)`` array.
+
+Whether a card is a Basic Pokémon decides every mulligan.  Deck lists imported
+from Limitless carry no stage information, so the sampler either takes an
+explicit ``is_basic`` predicate, resolves stages by name from
+:class:`~core.card_tables.CardTables` built over the card corpus, or reads the
+stage from card metadata and refuses to guess when there is none.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+
+from .card_tables import NO_CLASS, STAGES, CardTables
+from .cards import Card, CardSuperType
+from .random_control import global_rng
+
+
+def batched_permutations(
+    rng: np.random.Generator, games: int, deck_size: int
+) -> np.ndarray:
+    """Return a ``(games, deck_size)`` array where each row is a permutation.
+
+    Rows are produced by a single :meth:`numpy.random.Generator.permuted` call,
+    so the cost is one vectorised pass instead of ``games`` Python shuffles.
+    """
+
+    if games < 0 or deck_size < 0:
+        raise ValueError("games and deck_size must be non-negative")
+    dtype = np.int16 if deck_size <= np.iinfo(np.int16).max else np.int32
+    base = np.broadcast_to(np.arange(deck_size, dtype=dtype), (games, deck_size))
+    return rng.permuted(base, axis=1)
+
+
+def batched_top_cards(
+    rng: np.random.Generator, games: int, deck_size: int, count: int
+) -> np.ndarray:
+    """Return the first ``count`` positions of ``games`` random permutations.
+
+    Opening hands and prizes only look at the top few cards of a shuffled deck,
+    so a partial Fisher-Yates shuffle vectorised across games is used: ``count``
+    column swaps instead of permuting all ``deck_size`` columns of every row.
+    """
+
+    if not 0 <= count <= deck_size:
+        raise ValueError("count must be between 0 and deck_size")
+    dtype = np.int16 if deck_size <= np.iinfo(np.int16).max else np.int32
+    order = np.tile(np.arange(deck_size, dtype=dtype), (games, 1))
+    rows = np.arange(games)
+    for position in range(count):
+        picks = rng.integers(position, deck_size, size=games)
+        chosen = order[rows, picks]
+        order[rows, picks] = order[:, position]
+        order[:, position] = chosen
+    return order[:, :count]
+
+
+def default_is_basic(card: Card) -> bool:
+    """Return ``True`` when ``card``'s metadata marks it as a Basic Pokémon.
+
+    The stage is read from an ``evolvesFrom`` entry or a ``stage``/``subtypes``
+    value.  Pokémon without any of them raise ``ValueError`` instead of being
+    guessed; use :func:`corpus_is_basic` or an explicit predicate for them.
+    """
+
+    if card.supertype is not CardSuperType.POKEMON:
+        return False
+    if card.metadata.get("evolvesFrom"):
+        return False
+    stage = card.metadata.get("stage") or card.metadata.get("subtypes")
+    if not stage:
+        raise ValueError(
+            f"No stage is known for {card.name!r}; pass is_basic or card tables to resolve it"
+        )
+    return "Basic" in str(stage)
+
+
+def corpus_is_basic(tables: CardTables) -> Callable[[Card], bool]:
+    """Predicate resolving a card's stage by name from ``tables``.
+
+    Pokémon whose name is not in the corpus raise ``ValueError``.
+    """
+
+    def is_basic(card: Card) -> bool:
+        if card.supertype is not CardSuperType.POKEMON:
+            return False
+        class_id = tables.class_of(card.name)
+        if class_id == NO_CLASS:
+            raise ValueError(f"Pokémon {card.name!r} is not in the card corpus")
+        return bool(tables.stage[class_id] == STAGES["Basic"])
+
+    return is_basic
+
+
+@dataclass(frozen=True)
+class OpeningHandStats:
+    """Aggregated opening-hand and prize statistics.
+
+    Prize statistics are conditioned on hands that contain a Basic Pokémon
+    because a mulligan reshuffles the deck before prizes are set.
+    """
+
+    samples: int
+    basic_probability: float
+    mulligan_rate: float
+    in_hand_probability: Dict[str, float]
+    prized_any_probability: Dict[str, float]
+    prized_all_probability: Dict[str, float]
+    expected_prized: Dict[str, float]
+
+
+class OpeningHandSampler:
+    """Samples opening hands and prize cards for a fixed deck list.
+
+    Basic Pokémon are identified by ``is_basic`` when given, otherwise by
+    their stage in ``tables``, otherwise by :func:`default_is_basic`.
+    """
+
+    def __init__(
+        self,
+        cards: Iterable[Card],
+        *,
+        hand_size: int = 7,
+        prize_count: int = 6,
+        is_basic: Optional[Callable[[Card], bool]] = None,
+        tables: Optional[CardTables] = None,
+    ) -> None:
+        card_list = list(cards)
+        if hand_size + prize_count > len(card_list):
+            raise ValueError("Deck is too small for the requested hand and prize sizes")
+        if is_basic is not None:
+            predicate = is_basic
+        elif tables is not None:
+            predicate = corpus_is_basic(tables)
+        else:
+            predicate = default_is_basic
+        self._hand_size = hand_size
+        self._prize_count = prize_count
+        self._names: List[str] = []
+        name_index: Dict[str, int] = {}
+        ids = []
+        for card in card_list:
+            if card.name not in name_index:
+                name_index[card.name] = len(self._names)
+                self._names.append(card.name)
+            ids.append(name_index[card.name])
+        self._name_index = name_index
+        self._name_ids = np.asarray(ids, dtype=np.int32)
+        self._basic_mask = np.fromiter((predicate(card) for card in card_list), dtype=bool)
+
+    @property
+    def deck_size(self) -> int:
+        return len(self._name_ids)
+
+    @property
+    def card_names(self) -> Sequence[str]:
+        return tuple(self._names)
+
+    def sample(
+        self,
+        games: int,
+        *,
+        key_cards: Optional[Iterable[str]] = None,
+        rng: Optional[np.random.Generator] = None,
+        chunk_size: int = 65_536,
+    ) -> OpeningHandStats:
+        """Simulate ``games`` opening hands and return aggregated statistics."""
+
+        if games <= 0:
+            raise ValueError("games must be positive")
+        rng = rng or global_rng()
+        keys = list(key_cards) if key_cards is not None else list(self._names)
+        unknown = [name for name in keys if name not in self._name_index]
+        if unknown:
+            raise ValueError(f"Key cards not found in deck: {unknown!r}")
+        key_ids = np.asarray([self._name_index[name] for name in keys], dtype=np.int32)
+        # One-hot lookup turning card positions into per-key-card counts.
+        one_hot = (self._name_ids[:, None] == key_ids[None, :]).astype(np.int8)
+        copies = one_hot.sum(axis=0)
+
+        hand_end = self._hand_size
+        prize_end = hand_end + self._prize_count
+        basic_hands = 0
+        in_hand = np.zeros(len(keys), dtype=np.int64)
+        prized_any = np.zeros(len(keys), dtype=np.int64)
+        prized_all = np.zeros(len(keys), dtype=np.int64)
+        prized_total = np.zeros(len(keys), dtype=np.int64)
+
+        remaining = games
+        while remaining:
+            batch = min(chunk_size, remaining)
+            remaining -= batch
+            order = batched_top_cards(rng, batch, self.deck_size, prize_end)
+            hands = order[:, :hand_end]
+            has_basic = self._basic_mask[hands].any(axis=1)
+            basic_hands += int(has_basic.sum())
+            in_hand += (one_hot[hands].sum(axis=1) > 0).sum(axis=0)
+
+            prizes = order[has_basic, hand_end:prize_end]
+            prize_counts = one_hot[prizes].sum(axis=1)
+            prized_any += (prize_counts > 0).sum(axis=0)
+            prized_all += (prize_counts == copies).sum(axis=0)
+            prized_total += prize_counts.sum(axis=0)
+
+        conditioned = max(basic_hands, 1)
+        return OpeningHandStats(
+            samples=games,
+            basic_probability=basic_hands / games,
+            mulligan_rate=1.0 - basic_hands / games,
+            in_hand_probability=dict(zip(keys, (in_hand / games).tolist())),
+            prized_any_probability=dict(zip(keys, (prized_any / conditioned).tolist())),
+            prized_all_probability=dict(zip(keys, (prized_all / conditioned).tolist())),
+            expected_prized=dict(zip(keys, (prized_total / conditioned).tolist())),
+        )
+
+
+__all__ = [
+    "OpeningHandSampler",
+    "OpeningHandStats",
+    "batched_permutations",
+    "batched_top_cards",
+    "corpus_is_basic",
+    "default_is_basic",
+]
@@ -3,6 +3,7 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
+from typing import List
 
 
 @dataclass
@@ -36,4 +37,15 @@ class IllegalActionError(GameRuleViolation):
         super().__init__(message, details=ErrorDetails(code=self.error_code, message=message))
 
 
-__all__ = ["ErrorDetails", "GameRuleViolation", "IllegalActionError"]
+class DeckValidationError(GameRuleViolation):
+    """Raised when a deck breaks the construction rules of a format."""
+
+    error_code = "ERR_INVALID_DECK"
+
+    def __init__(self, errors: List[ErrorDetails]) -> None:
+        message = "; ".join(error.message for error in errors) or "Invalid deck"
+        super().__init__(message, details=ErrorDetails(code=self.error_code, message=message))
+        self.errors = list(errors)
+
+
+__all__ = ["DeckValidationError", "ErrorDetails", "GameRuleViolation", "IllegalActionError"]
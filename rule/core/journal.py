@@ -0,0 +1,208 @@
+"""Preallocated undo journal for make/unmake style search.
+
+Tree search can either clone the state before every move or apply the move
+in place and take it back afterwards.  :class:`UndoJournal` supports the
+second style: every mutation is written as one fixed-size record (an opcode,
+the mutated object, a key and the previous value) into parallel ring buffers
+that are allocated once up front.  :meth:`UndoJournal.mark` opens a step and
+:meth:`UndoJournal.undo` replays the records of the most recent steps in
+reverse, so undoing costs time proportional to the mutations it reverts.
+
+The journal is a rolling window: when a new step or mutation does not fit,
+the oldest steps are forgotten to make room, so a long game never gets stuck
+and only the last ``max_steps`` steps (fewer if they hold more than
+``capacity`` mutations) can be undone.
+
+Supported mutations are attribute assignment, item assignment/insertion and
+list insertion/removal, which covers :class:`~env.battle_env.BattleEnv` and
+the built-in effect handlers in :mod:`rules.effects`.
+"""
+
+from __future__ import annotations
+
+from typing import Any, List, MutableMapping, MutableSequence, Optional
+
+_MISSING = object()
+
+_SET_ATTR = 0
+_SET_ITEM = 1
+_DEL_ITEM = 2
+_LIST_INSERTED = 3
+_LIST_REMOVED = 4
+
+
+class JournalFullError(RuntimeError):
+    """Raised when the current step alone needs more than ``capacity`` mutations."""
+
+
+class UndoJournal:
+    """Fixed-capacity rolling log of reversible mutations grouped into steps.
+
+    Positions are absolute counters; a record lives in slot
+    ``position % capacity`` and a step in slot ``step % max_steps``.
+    """
+
+    def __init__(self, capacity: int = 4096, *, max_steps: int = 1024) -> None:
+        if capacity <= 0 or max_steps <= 0:
+            raise ValueError("capacity and max_steps must be positive")
+        self.capacity = capacity
+        self.max_steps = max_steps
+        self._ops: List[int] = [0] * capacity
+        self._targets: List[Any] = [None] * capacity
+        self._keys: List[Any] = [None] * capacity
+        self._values: List[Any] = [None] * capacity
+        self._start = 0
+        self._end = 0
+        self._step_starts: List[int] = [0] * max_steps
+        self._step_payloads: List[Any] = [None] * max_steps
+        self._first_step = 0
+        self._next_step = 0
+
+    # ---- Introspection
+    @property
+    def size(self) -> int:
+        """Number of mutation records currently held."""
+
+        return self._end - self._start
+
+    @property
+    def steps(self) -> int:
+        """Number of steps that can be undone."""
+
+        return self._next_step - self._first_step
+
+    # ---- Recording
+    def mark(self, payload: Any = None) -> None:
+        """Open a new step; ``payload`` is handed back when the step is undone.
+
+        When ``max_steps`` steps are already held the oldest one is forgotten.
+        """
+
+        if self.steps == self.max_steps:
+            self._drop_oldest()
+        slot = self._next_step % self.max_steps
+        self._step_starts[slot] = self._end
+        self._step_payloads[slot] = payload
+        self._next_step += 1
+
+    def set_attr(self, target: Any, name: str, value: Any) -> None:
+        """``setattr(target, name, value)`` with the old value recorded."""
+
+        self._record(_SET_ATTR, target, name, getattr(target, name))
+        setattr(target, name, value)
+
+    def set_item(self, target: MutableMapping[Any, Any], key: Any, value: Any) -> None:
+        """``target[key] = value`` with the old value (or its absence) recorded."""
+
+        old = target.get(key, _MISSING)
+        if old is _MISSING:
+            self._record(_DEL_ITEM, target, key, None)
+        else:
+            self._record(_SET_ITEM, target, key, old)
+        target[key] = value
+
+    def list_append(self, target: MutableSequence[Any], value: Any) -> None:
+        self._record(_LIST_INSERTED, target, len(target), None)
+        target.append(value)
+
+    def list_pop(self, target: MutableSequence[Any], index: int = -1) -> Any:
+        if index < 0:
+            index += len(target)
+        value = target.pop(index)
+        self._record(_LIST_REMOVED, target, index, value)
+        return value
+
+    # ---- Undo
+    def undo(self, steps: int = 1) -> Any:
+        """Revert the last ``steps`` steps and return the payload of the oldest one."""
+
+        if not 0 < steps <= self.steps:
+            raise ValueError(f"Cannot undo {steps} step(s); {self.steps} available")
+        self._next_step -= steps
+        slot = self._next_step % self.max_steps
+        payload = self._step_payloads[slot]
+        self._rewind(self._step_starts[slot])
+        for step in range(self._next_step, self._next_step + steps):
+            self._step_payloads[step % self.max_steps] = None
+        return payload
+
+    def clear(self) -> None:
+        """Forget all history without reverting it."""
+
+        self._release(self._start, self._end)
+        for step in range(self._first_step, self._next_step):
+            self._step_payloads[step % self.max_steps] = None
+        self._start = self._end = 0
+        self._first_step = self._next_step = 0
+
+    # ---- Internals
+    def _record(self, op: int, target: Any, key: Any, value: Any) -> None:
+        while self._end - self._start == self.capacity:
+            if self.steps <= 1:
+                raise JournalFullError(
+                    f"Undo journal holds at most {self.capacity} mutations per step"
+                )
+            self._drop_oldest()
+        slot = self._end % self.capacity
+        self._ops[slot] = op
+        self._targets[slot] = target
+        self._keys[slot] = key
+        self._values[slot] = value
+        self._end += 1
+
+    def _drop_oldest(self) -> None:
+        self._step_payloads[self._first_step % self.max_steps] = None
+        self._first_step += 1
+        start = (
+            self._step_starts[self._first_step % self.max_steps] if self.steps else self._end
+        )
+        self._release(self._start, start)
+        self._start = start
+
+    def _release(self, start: int, stop: int) -> None:
+        capacity = self.capacity
+        for position in range(start, stop):
+            slot = position % capacity
+            self._targets[slot] = self._keys[slot] = self._values[slot] = None
+
+    def _rewind(self, position: int) -> None:
+        ops, targets, keys, values = self._ops, self._targets, self._keys, self._values
+        capacity = self.capacity
+        for idx in range(self._end - 1, position - 1, -1):
+            slot = idx % capacity
+            op, target, key, value = ops[slot], targets[slot], keys[slot], values[slot]
+            if op == _SET_ATTR:
+                setattr(target, key, value)
+            elif op == _SET_ITEM:
+                target[key] = value
+            elif op == _DEL_ITEM:
+                del target[key]
+            elif op == _LIST_INSERTED:
+                target.pop(key)
+            else:
+                target.insert(key, value)
+            targets[slot] = values[slot] = keys[slot] = None
+        self._end = position
+
+
+def journal_set_attr(journal: Optional[UndoJournal], target: Any, name: str, value: Any) -> None:
+    """Assign through ``journal`` when one is active, directly otherwise."""
+
+    if journal is None:
+        setattr(target, name, value)
+    else:
+        journal.set_attr(target, name, value)
+
+
+def journal_set_item(
+    journal: Optional[UndoJournal], target: MutableMapping[Any, Any], key: Any, value: Any
+) -> None:
+    """Item assignment through ``journal`` when one is active, directly otherwise."""
+
+    if journal is None:
+        target[key] = value
+    else:
+        journal.set_item(target, key, value)
+
+
+__all__ = ["JournalFullError", "UndoJournal", "journal_set_attr", "journal_set_item"]
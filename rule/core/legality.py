@@ -0,0 +1,336 @@
+"""Deck construction checks against precomputed card tables.
+
+:class:`DeckValidator` turns the card corpus into flat per-definition arrays
+once: a format bitset per printing (one bit per entry of
+:data:`~core.card_db.FORMATS` for ``Legal``, another for ``Banned``), the
+regulation mark, a name-equivalence class id and the copy limit of every
+class.  Reprints share a name and therefore a class, so four copies spread
+over several printings are counted together; Basic Energy is unlimited.
+
+Validating a deck resolves each distinct card to its definition with one
+dict lookup and then checks format legality, regulation marks, copy limits,
+deck size and the Basic Pokémon requirement with array gathers, so the cost
+is linear in the deck.  :meth:`DeckValidator.validate_many` concatenates a
+whole tournament export into one flat array and runs every check once for
+all decks.  Problems are reported as :class:`~core.errors.ErrorDetails`.
+"""
+
+from __future__ import annotations
+
+from collections import Counter
+from pathlib import Path
+from typing import Dict, Iterable, List, Mapping, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from .card_db import (
+    DEFAULT_CORPUS_DIR,
+    DEFAULT_SETS_FILE,
+    FORMATS,
+    CardDatabase,
+    load_sets,
+    set_id_of,
+)
+from .cards import Deck, DeckListCache, default_decklist_cache
+from .errors import DeckValidationError, ErrorDetails
+
+ERR_UNKNOWN_CARD = "ERR_UNKNOWN_CARD"
+ERR_BANNED = "ERR_BANNED"
+ERR_NOT_LEGAL = "ERR_NOT_LEGAL"
+ERR_REGULATION_MARK = "ERR_REGULATION_MARK"
+ERR_COPY_LIMIT = "ERR_COPY_LIMIT"
+ERR_DECK_SIZE = "ERR_DECK_SIZE"
+ERR_NO_BASIC_POKEMON = "ERR_NO_BASIC_POKEMON"
+
+DEFAULT_DECK_SIZE = 60
+DEFAULT_COPY_LIMIT = 4
+
+#: Subtypes of which a deck may hold a single card, whatever its name.
+SINGLETON_SUBTYPES = ("ACE SPEC", "Radiant")
+
+FORMAT_BITS = {name: 1 << position for position, name in enumerate(FORMATS)}
+
+#: A deck to validate: a materialised deck or a Limitless deck list.
+DeckLike = Union[Deck, str]
+
+_UNLIMITED = np.iinfo(np.int32).max
+_NO_GROUP = -1
+
+
+def _is_basic_energy(card: Mapping) -> bool:
+    return card.get("supertype") == "Energy" and "Basic" in (card.get("subtypes") or ())
+
+
+def _energy_key(name: str) -> str:
+    name = name.strip()
+    return name[len("Basic ") :] if name.startswith("Basic ") else name
+
+
+class DeckValidator:
+    """Checks decks against the construction rules of a format."""
+
+    def __init__(
+        self,
+        database: CardDatabase,
+        sets: Iterable[Mapping] = (),
+        *,
+        deck_size: int = DEFAULT_DECK_SIZE,
+        copy_limit: int = DEFAULT_COPY_LIMIT,
+        decklist_cache: Optional[DeckListCache] = None,
+    ) -> None:
+        self.database = database
+        self.deck_size = deck_size
+        self._decklists = decklist_cache or default_decklist_cache()
+        count = len(database)
+        self.legal_bits = np.zeros(count, dtype=np.uint8)
+        self.banned_bits = np.zeros(count, dtype=np.uint8)
+        self.regulation_marks = np.zeros(count, dtype=np.uint8)
+        self.basic_pokemon = np.zeros(count, dtype=np.bool_)
+        self.basic_energy = np.zeros(count, dtype=np.bool_)
+        self.name_class = np.zeros(count, dtype=np.int32)
+        self.singleton_group = np.full(count, _NO_GROUP, dtype=np.int8)
+        self.class_names: List[str] = []
+
+        codes = {record["id"]: record.get("ptcgoCode") for record in sets}
+        class_ids: Dict[str, int] = {}
+        limits: List[int] = []
+        self._by_printing: Dict[Tuple[str, str], int] = {}
+        self._basic_energy: Dict[str, int] = {}
+        for def_index, card in enumerate(database):
+            legalities = card.get("legalities") or {}
+            energy = _is_basic_energy(card)
+            for name, bit in FORMAT_BITS.items():
+                if energy or legalities.get(name) == "Legal":
+                    self.legal_bits[def_index] |= bit
+                elif legalities.get(name) == "Banned":
+                    self.banned_bits[def_index] |= bit
+            mark = card.get("regulationMark") or ""
+            self.regulation_marks[def_index] = ord(mark) if len(mark) == 1 else 0
+            subtypes = card.get("subtypes") or ()
+            self.basic_pokemon[def_index] = card.get("supertype") == "Pokémon" and "Basic" in subtypes
+            self.basic_energy[def_index] = energy
+            for group, subtype in enumerate(SINGLETON_SUBTYPES):
+                if subtype in subtypes:
+                    self.singleton_group[def_index] = group
+
+            name = card["name"]
+            class_id = class_ids.get(name)
+            if class_id is None:
+                class_id = class_ids[name] = len(self.class_names)
+                self.class_names.append(name)
+                limits.append(copy_limit)
+            if energy:
+                limits[class_id] = _UNLIMITED
+                self._basic_energy.setdefault(_energy_key(name), def_index)
+            elif "Prism Star" in subtypes:
+                limits[class_id] = 1
+            self.name_class[def_index] = class_id
+
+            code = codes.get(set_id_of(card["id"]))
+            if code:
+                self._by_printing[(code, card["number"])] = def_index
+        self.copy_limits = np.asarray(limits, dtype=np.int64)
+        self._resolved: Dict[Tuple[str, str, str], int] = {}
+
+    @classmethod
+    def from_corpus(
+        cls,
+        directory: Path = DEFAULT_CORPUS_DIR,
+        sets_file: Path = DEFAULT_SETS_FILE,
+        **options,
+    ) -> "DeckValidator":
+        return cls(CardDatabase.from_corpus(directory), load_sets(sets_file), **options)
+
+    # ---- Public API
+    def resolve(self, name: str, set_code: str, number: str) -> int:
+        """``def index`` of a deck list entry, or ``-1`` if it is unknown.
+
+        Entries are matched by set code and collector number.  Basic Energy,
+        which deck lists often cite with placeholder printings, falls back to
+        its name.
+        """
+
+        key = (name, set_code, number)
+        def_index = self._resolved.get(key)
+        if def_index is None:
+            def_index = self._by_printing.get((set_code, number))
+            if def_index is None:
+                def_index = self._basic_energy.get(_energy_key(name), -1)
+            self._resolved[key] = def_index
+        return def_index
+
+    def validate(
+        self,
+        deck: DeckLike,
+        fmt: str = "standard",
+        *,
+        regulation_marks: Optional[Iterable[str]] = None,
+    ) -> List[ErrorDetails]:
+        """Problems with ``deck`` in format ``fmt``; empty when the deck is legal.
+
+        ``regulation_marks`` additionally restricts non-energy cards to the
+        given marks (e.g. ``"GHI"``).
+        """
+
+        return self.validate_many([("deck", deck)], fmt, regulation_marks=regulation_marks)["deck"]
+
+    def check(
+        self,
+        deck: DeckLike,
+        fmt: str = "standard",
+        *,
+        regulation_marks: Optional[Iterable[str]] = None,
+    ) -> None:
+        """Raise :class:`~core.errors.DeckValidationError` if ``deck`` is not legal."""
+
+        errors = self.validate(deck, fmt, regulation_marks=regulation_marks)
+        if errors:
+            raise DeckValidationError(errors)
+
+    def validate_many(
+        self,
+        decks: Union[Mapping[str, DeckLike], Iterable[Tuple[str, DeckLike]]],
+        fmt: str = "standard",
+        *,
+        regulation_marks: Optional[Iterable[str]] = None,
+    ) -> Dict[str, List[ErrorDetails]]:
+        """Validate many decks at once, keyed like the input."""
+
+        if fmt not in FORMAT_BITS:
+            raise ValueError(f"Unknown format {fmt!r}; expected one of {FORMATS}")
+        items = list(decks.items() if isinstance(decks, Mapping) else decks)
+        deck_ids: List[int] = []
+        defs: List[int] = []
+        counts: List[int] = []
+        labels: List[str] = []
+        for deck_id, (_, deck) in enumerate(items):
+            for def_index, count, label in self._entries(deck):
+                deck_ids.append(deck_id)
+                defs.append(def_index)
+                counts.append(count)
+                labels.append(label)
+        errors = self._check(
+            np.asarray(deck_ids, dtype=np.int64),
+            np.asarray(defs, dtype=np.int64),
+            np.asarray(counts, dtype=np.int64),
+            labels,
+            len(items),
+            FORMAT_BITS[fmt],
+            fmt,
+            regulation_marks,
+        )
+        return {name: deck_errors for (name, _), deck_errors in zip(items, errors)}
+
+    # ---- Internals
+    def _entries(self, deck: DeckLike) -> List[Tuple[int, int, str]]:
+        if isinstance(deck, str):
+            parsed = self._decklists.parse_limitless(deck)
+            printings = [
+                (self._decklists.definition(def_id), count) for def_id, count in parsed.entries
+            ]
+            keys = [((card.name, card.set_code, card.number), count) for card, count in printings]
+        else:
+            keys = list(Counter((card.name, card.set_code, card.number) for card in deck).items())
+        return [(self.resolve(*key), count, " ".join(key)) for key, count in keys]
+
+    def _describe(self, def_index: int) -> str:
+        card = self.database[def_index]
+        return f"{card['name']} ({card['id']})"
+
+    def _check(
+        self,
+        deck_ids: np.ndarray,
+        defs: np.ndarray,
+        counts: np.ndarray,
+        labels: Sequence[str],
+        num_decks: int,
+        bit: int,
+        fmt: str,
+        regulation_marks: Optional[Iterable[str]],
+    ) -> List[List[ErrorDetails]]:
+        errors: List[List[ErrorDetails]] = [[] for _ in range(num_decks)]
+
+        def report(code: str, deck_id: int, message: str) -> None:
+            errors[deck_id].append(ErrorDetails(code=code, message=message))
+
+        known = defs >= 0
+        safe = np.where(known, defs, 0)
+        for row in np.flatnonzero(~known):
+            report(ERR_UNKNOWN_CARD, deck_ids[row], f"Unknown card {labels[row]}")
+
+        banned = known & ((self.banned_bits[safe] & bit) != 0)
+        for row in np.flatnonzero(banned):
+            report(ERR_BANNED, deck_ids[row], f"{self._describe(defs[row])} is banned in {fmt}")
+        illegal = known & ~banned & ((self.legal_bits[safe] & bit) == 0)
+        for row in np.flatnonzero(illegal):
+            report(ERR_NOT_LEGAL, deck_ids[row], f"{self._describe(defs[row])} is not legal in {fmt}")
+
+        if regulation_marks is not None:
+            allowed = np.zeros(256, dtype=np.bool_)
+            allowed[[ord(mark) for mark in regulation_marks]] = True
+            off_mark = known & ~self.basic_energy[safe] & ~allowed[self.regulation_marks[safe]]
+            for row in np.flatnonzero(off_mark):
+                mark = chr(self.regulation_marks[defs[row]]) if self.regulation_marks[defs[row]] else "none"
+                report(
+                    ERR_REGULATION_MARK,
+                    deck_ids[row],
+                    f"{self._describe(defs[row])} has regulation mark {mark}",
+                )
+
+        num_classes = len(self.class_names)
+        class_keys = deck_ids[known] * num_classes + self.name_class[defs[known]]
+        keys, inverse = np.unique(class_keys, return_inverse=True)
+        totals = np.bincount(inverse, weights=counts[known]).astype(np.int64)
+        for key, total in zip(keys, totals):
+            limit = self.copy_limits[key % num_classes]
+            if total > limit:
+                report(
+                    ERR_COPY_LIMIT,
+                    int(key // num_classes),
+                    f"{total} copies of {self.class_names[key % num_classes]} (limit {limit})",
+                )
+
+        groups = self.singleton_group[safe]
+        grouped = known & (groups != _NO_GROUP)
+        group_keys = deck_ids[grouped] * len(SINGLETON_SUBTYPES) + groups[grouped]
+        keys, inverse = np.unique(group_keys, return_inverse=True)
+        totals = np.bincount(inverse, weights=counts[grouped]).astype(np.int64)
+        for key, total in zip(keys, totals):
+            if total > 1:
+                subtype = SINGLETON_SUBTYPES[key % len(SINGLETON_SUBTYPES)]
+                report(
+                    ERR_COPY_LIMIT,
+                    int(key // len(SINGLETON_SUBTYPES)),
+                    f"{total} {subtype} cards (limit 1)",
+                )
+
+        sizes = np.bincount(deck_ids, weights=counts, minlength=num_decks).astype(np.int64)
+        for deck_id in np.flatnonzero(sizes != self.deck_size):
+            report(
+                ERR_DECK_SIZE,
+                deck_id,
+                f"Deck has {sizes[deck_id]} cards; exactly {self.deck_size} required",
+            )
+        basics = np.bincount(
+            deck_ids, weights=counts * (known & self.basic_pokemon[safe]), minlength=num_decks
+        )
+        for deck_id in np.flatnonzero(basics == 0):
+            report(ERR_NO_BASIC_POKEMON, deck_id, "Deck has no Basic Pokémon")
+        return errors
+
+
+__all__ = [
+    "DEFAULT_COPY_LIMIT",
+    "DEFAULT_DECK_SIZE",
+    "DeckLike",
+    "DeckValidator",
+    "ERR_BANNED",
+    "ERR_COPY_LIMIT",
+    "ERR_DECK_SIZE",
+    "ERR_NOT_LEGAL",
+    "ERR_NO_BASIC_POKEMON",
+    "ERR_REGULATION_MARK",
+    "ERR_UNKNOWN_CARD",
+    "FORMAT_BITS",
+    "SINGLETON_SUBTYPES",
+]
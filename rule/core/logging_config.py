@@ -1,12 +1,288 @@
+"""Logging setup for simulations that log every step.
 
+:func:`setup_logging` configures the ``ptcg`` logger so that the calling
+thread only creates a record and puts it on a queue; formatting and I/O run
+on a :class:`logging.handlers.QueueListener` thread.  Records are queued
+unformatted, so message arguments should be immutable values.
+
+Per-step records are best written through :class:`StepLoggerAdapter`, which
+attaches ``env_id``, ``turn``, ``player`` and ``state_key`` to each record
+only when the record is actually created: disabled levels cost one check,
+and sampled-out records are dropped before a record is built.
+:class:`StructuredFormatter` renders those fields on the listener thread.
+
+Two ways to keep volume down at millions of steps:
+
+* ``sample_rates`` keeps only a fraction of the records below ``WARNING``
+  for each logger name prefix (see :class:`SamplingFilter`);
+* ``flight_recorder`` keeps the last N records below the output level in
+  memory and writes them out only when an ``ERROR`` is logged (see
+  :class:`FlightRecorder`).
+"""
+
+from __future__ import annotations
+
+import atexit
 import logging
+import queue
+import sys
+import threading
+from collections import deque
 from logging import Logger
+from logging.handlers import QueueHandler, QueueListener
+from typing import Any, Deque, Dict, List, Mapping, MutableMapping, Optional, TextIO, Tuple
 
 DEFAULT_FORMAT = "[%(asctime)s] %(levelname)s %(name)s: %(message)s"
 DEFAULT_DATEFMT = "%H:%M:%S"
 
-def setup_logging(level: int = logging.INFO) -> Logger:
-    logging.basicConfig(level=level, format=DEFAULT_FORMAT, datefmt=DEFAULT_DATEFMT)
-    logger = logging.getLogger("ptcg")
+#: Record attributes set by :class:`StepLoggerAdapter`, in output order.
+STEP_FIELDS = ("env_id", "turn", "player", "state_key")
+
+ROOT_LOGGER = "ptcg"
+
+_listener: Optional[QueueListener] = None
+_source_sampler: Optional["SamplingFilter"] = None
+_setup_lock = threading.Lock()
+
+
+class StructuredFormatter(logging.Formatter):
+    """Formatter appending the step fields present on a record as ``key=value``."""
+
+    def __init__(self, fmt: str = DEFAULT_FORMAT, datefmt: str = DEFAULT_DATEFMT) -> None:
+        super().__init__(fmt, datefmt)
+
+    def format(self, record: logging.LogRecord) -> str:
+        line = super().format(record)
+        fields = []
+        for name in STEP_FIELDS:
+            value = getattr(record, name, None)
+            if value is None:
+                continue
+            if name == "state_key":
+                value = f"{value:016x}"
+            fields.append(f"{name}={value}")
+        return f"{line} {' '.join(fields)}" if fields else line
+
+
+class StepLoggerAdapter(logging.LoggerAdapter):
+    """Logger adapter capturing the state of one environment with each record.
+
+    ``env`` only needs ``turn_number``, ``active_player`` and ``state_key()``
+    (see :class:`~env.battle_env.BattleEnv`).  The fields are read when the
+    record is created, so records stay correct after the env moves on.
+
+    When :func:`setup_logging` was given ``sample_rates`` (and no flight
+    recorder, which needs every record), sampling happens here, before the
+    record and its fields are built.
+    """
+
+    def __init__(self, logger: Logger, env: Any, env_id: Any = None) -> None:
+        super().__init__(logger, {})
+        self.env = env
+        self.env_id = env_id
+
+    def isEnabledFor(self, level: int) -> bool:
+        if not self.logger.isEnabledFor(level):
+            return False
+        sampler = _source_sampler
+        return sampler is None or sampler.keep(self.logger.name, level)
+
+    def process(self, msg: Any, kwargs: MutableMapping[str, Any]) -> Tuple[Any, MutableMapping[str, Any]]:
+        env = self.env
+        extra = {
+            "env_id": self.env_id,
+            "turn": env.turn_number,
+            "player": env.active_player.name,
+            "state_key": env.state_key(),
+            "sampled": _source_sampler is not None,
+        }
+        extra.update(kwargs.get("extra") or {})
+        kwargs["extra"] = extra
+        return msg, kwargs
+
+
+class SamplingFilter(logging.Filter):
+    """Keep roughly ``rate`` of the records below ``WARNING`` per logger prefix.
+
+    ``rates`` maps logger names to keep rates in ``[0, 1]``; the longest
+    matching prefix wins and unmatched loggers are kept.  Sampling is
+    deterministic: a rate of ``0.01`` keeps every 100th record of that
+    prefix.  Records with a true ``sampled`` attribute were already sampled
+    at the source and pass unchanged.
+    """
+
+    def __init__(self, rates: Mapping[str, float]) -> None:
+        super().__init__()
+        for name, rate in rates.items():
+            if not 0.0 <= rate <= 1.0:
+                raise ValueError(f"Sampling rate for {name!r} must be within [0, 1]")
+        self._rates = dict(rates)
+        self._prefixes = sorted(rates, key=len, reverse=True)
+        self._resolved: Dict[str, Optional[str]] = {}
+        self._counters: Dict[str, float] = {prefix: 0.0 for prefix in rates}
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        return getattr(record, "sampled", False) or self.keep(record.name, record.levelno)
+
+    def keep(self, name: str, level: int) -> bool:
+        """Sampling decision for one record of logger ``name`` at ``level``."""
+
+        if level >= logging.WARNING:
+            return True
+        prefix = self._resolved.get(name, "")
+        if prefix == "":
+            prefix = self._resolve(name)
+        if prefix is None:
+            return True
+        rate = self._rates[prefix]
+        with self._lock:
+            credit = self._counters[prefix] + rate
+            keep = credit >= 1.0
+            self._counters[prefix] = credit - 1.0 if keep else credit
+        return keep
+
+    def _resolve(self, name: str) -> Optional[str]:
+        match = None
+        for prefix in self._prefixes:
+            if name == prefix or name.startswith(prefix + "."):
+                match = prefix
+                break
+        self._resolved[name] = match
+        return match
+
+
+class FlightRecorder(logging.Handler):
+    """Ring buffer of recent records, written to ``target`` when an error occurs.
+
+    Records at or above ``threshold`` are assumed to be emitted by the normal
+    handlers and are not buffered; records below it are kept (the last
+    ``capacity`` of them).  A record at ``flush_level`` or above triggers a
+    dump of the buffer to ``target``, oldest first.
+    """
+
+    def __init__(
+        self,
+        capacity: int,
+        target: logging.Handler,
+        *,
+        threshold: int = logging.INFO,
+        flush_level: int = logging.ERROR,
+    ) -> None:
+        super().__init__(logging.NOTSET)
+        if capacity <= 0:
+            raise ValueError("capacity must be positive")
+        self.target = target
+        self.threshold = threshold
+        self.flush_level = flush_level
+        self._records: Deque[logging.LogRecord] = deque(maxlen=capacity)
+
+    @property
+    def records(self) -> List[logging.LogRecord]:
+        return list(self._records)
+
+    def emit(self, record: logging.LogRecord) -> None:
+        if record.levelno < self.threshold:
+            self._records.append(record)
+        if record.levelno >= self.flush_level:
+            self.dump()
+
+    def dump(self) -> None:
+        """Write the buffered records to ``target`` and clear the buffer.
+
+        Deliberately not :meth:`flush`, which :func:`logging.shutdown` calls
+        on exit.
+        """
+
+        records = list(self._records)
+        self._records.clear()
+        for record in records:
+            # Bypass the target's filters: a dump is only useful when complete.
+            self.target.emit(record)
+
+
+class _DeferredQueueHandler(QueueHandler):
+    """Queue handler that leaves formatting to the listener thread."""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
+def setup_logging(
+    level: int = logging.INFO,
+    *,
+    stream: Optional[TextIO] = None,
+    sample_rates: Optional[Mapping[str, float]] = None,
+    flight_recorder: int = 0,
+) -> Logger:
+    """Configure the ``ptcg`` logger with a background writer and return it.
+
+    Calling it again replaces the previous configuration.  With
+    ``flight_recorder`` > 0 the logger accepts ``DEBUG`` records and keeps
+    the last ``flight_recorder`` records below ``level`` for error dumps.
+    """
+
+    global _listener, _source_sampler
+    with _setup_lock:
+        _stop_listener()
+        output = logging.StreamHandler(stream if stream is not None else sys.stderr)
+        output.setFormatter(StructuredFormatter())
+        records: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+        enqueue = _DeferredQueueHandler(records)
+        enqueue.setLevel(level)
+        sampler = SamplingFilter(sample_rates) if sample_rates else None
+        if sampler is not None:
+            enqueue.addFilter(sampler)
+        _source_sampler = sampler if flight_recorder <= 0 else None
+
+        logger = logging.getLogger(ROOT_LOGGER)
+        for handler in list(logger.handlers):
+            logger.removeHandler(handler)
+            handler.close()
+        logger.propagate = False
+        if flight_recorder > 0:
+            # Added first so a dump precedes the error that triggered it.
+            logger.addHandler(FlightRecorder(flight_recorder, enqueue, threshold=level))
+            logger.setLevel(logging.DEBUG)
+        else:
+            logger.setLevel(level)
+        logger.addHandler(enqueue)
+
+        _listener = QueueListener(records, output, respect_handler_level=True)
+        _listener.start()
     logger.debug("Logging initialized.")
     return logger
+
+
+def shutdown_logging() -> None:
+    """Write out queued records and stop the background writer."""
+
+    with _setup_lock:
+        _stop_listener()
+
+
+def _stop_listener() -> None:
+    global _listener, _source_sampler
+    _source_sampler = None
+    if _listener is not None:
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.flush()
+        _listener = None
+
+
+atexit.register(shutdown_logging)
+
+
+__all__ = [
+    "DEFAULT_DATEFMT",
+    "DEFAULT_FORMAT",
+    "FlightRecorder",
+    "ROOT_LOGGER",
+    "STEP_FIELDS",
+    "SamplingFilter",
+    "StepLoggerAdapter",
+    "StructuredFormatter",
+    "setup_logging",
+    "shutdown_logging",
+]
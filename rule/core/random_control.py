@@ -6,7 +6,7 @@ import hashlib
 import json
 import os
 import random
-from dataclasses import dataclass
+from dataclasses import dataclass, replace
 from typing import Optional
 
 import numpy as np
@@ -99,6 +99,155 @@ def generator_state_digest(generator: np.random.Generator) -> str:
     return hashlib.sha256(json.dumps(state, sort_keys=True).encode("utf8")).hexdigest()
 
 
+@dataclass(frozen=True)
+class StreamKey:
+    """Coordinates identifying an independent random stream.
+
+    A game is reproducible from the ``(master_seed, worker_id, env_index,
+    episode_index)`` tuple alone: the stream is derived through
+    :class:`numpy.random.SeedSequence` spawn keys, so it does not depend on how
+    many other streams were created before it or on the global RNG state.
+    """
+
+    master_seed: int
+    worker_id: int = 0
+    env_index: int = 0
+    episode_index: int = 0
+
+    def seed_sequence(self) -> np.random.SeedSequence:
+        return np.random.SeedSequence(
+            self.master_seed,
+            spawn_key=(self.worker_id, self.env_index, self.episode_index),
+        )
+
+    def with_episode(self, episode_index: int) -> "StreamKey":
+        return replace(self, episode_index=episode_index)
+
+    def next_episode(self) -> "StreamKey":
+        return self.with_episode(self.episode_index + 1)
+
+    def as_tuple(self) -> tuple[int, int, int, int]:
+        return (self.master_seed, self.worker_id, self.env_index, self.episode_index)
+
+
+class BufferedRNG:
+    """Generator wrapper that serves common draws from pre-generated buffers.
+
+    Games consume randomness in tiny pieces (a single coin flip, one shuffle of
+    a small zone).  Calling into NumPy for every draw is dominated by call
+    overhead, so coin flips and uniform floats are generated in blocks of
+    ``buffer_size`` values and handed out one by one.  The sequence of values is
+    fully determined by the underlying generator, which keeps games
+    reproducible.
+    """
+
+    def __init__(self, generator: np.random.Generator, *, buffer_size: int = 1024) -> None:
+        if buffer_size <= 0:
+            raise ValueError("buffer_size must be positive")
+        self._generator = generator
+        self._buffer_size = buffer_size
+        self._coins: np.ndarray = np.empty(0, dtype=bool)
+        self._coin_pos = 0
+        self._uniforms: np.ndarray = np.empty(0, dtype=np.float64)
+        self._uniform_pos = 0
+
+    @property
+    def generator(self) -> np.random.Generator:
+        return self._generator
+
+    def coin_flip(self) -> bool:
+        """Return ``True`` for heads."""
+
+        if self._coin_pos >= len(self._coins):
+            self._coins = self._generator.random(self._buffer_size) < 0.5
+            self._coin_pos = 0
+        value = bool(self._coins[self._coin_pos])
+        self._coin_pos += 1
+        return value
+
+    def coin_flips(self, count: int) -> np.ndarray:
+        """Return ``count`` coin flips as a boolean array."""
+
+        if count < 0:
+            raise ValueError("count must be non-negative")
+        flips = np.empty(count, dtype=bool)
+        filled = 0
+        while filled < count:
+            if self._coin_pos >= len(self._coins):
+                self._coins = self._generator.random(self._buffer_size) < 0.5
+                self._coin_pos = 0
+            take = min(count - filled, len(self._coins) - self._coin_pos)
+            flips[filled : filled + take] = self._coins[self._coin_pos : self._coin_pos + take]
+            self._coin_pos += take
+            filled += take
+        return flips
+
+    def uniform(self) -> float:
+        """Return a float drawn uniformly from ``[0, 1)``."""
+
+        if self._uniform_pos >= len(self._uniforms):
+            self._uniforms = self._generator.random(self._buffer_size)
+            self._uniform_pos = 0
+        value = float(self._uniforms[self._uniform_pos])
+        self._uniform_pos += 1
+        return value
+
+    def integer(self, high: int) -> int:
+        """Return an integer drawn uniformly from ``[0, high)``."""
+
+        if high <= 0:
+            raise ValueError("high must be positive")
+        return min(int(self.uniform() * high), high - 1)
+
+    def permutation(self, size: int) -> np.ndarray:
+        """Return a random permutation of ``range(size)``."""
+
+        return self._generator.permutation(size)
+
+    def shuffle(self, items: list) -> None:
+        """Shuffle ``items`` in place."""
+
+        order = self._generator.permutation(len(items))
+        items[:] = [items[idx] for idx in order]
+
+
+class RNGStreams:
+    """Hands out independent, reproducible random streams for parallel games.
+
+    Every stream is keyed by a :class:`StreamKey`; workers only need to agree on
+    the master seed to reproduce any game played by any other worker, without
+    sharing the module level RNG state.
+    """
+
+    def __init__(self, master_seed: Optional[int] = None) -> None:
+        if master_seed is None:
+            master_seed = _GLOBAL_SEED_SEQUENCE.generate_state(1, dtype=np.uint64)[0]
+        self._master_seed = int(master_seed)
+
+    @property
+    def master_seed(self) -> int:
+        return self._master_seed
+
+    def key(self, *, worker_id: int = 0, env_index: int = 0, episode_index: int = 0) -> StreamKey:
+        return StreamKey(self._master_seed, worker_id, env_index, episode_index)
+
+    def generator(self, key: StreamKey) -> np.random.Generator:
+        """Return a fresh generator positioned at the start of ``key``'s stream."""
+
+        return generator_from_seed_sequence(key.seed_sequence())
+
+    def buffered(self, key: StreamKey, *, buffer_size: int = 1024) -> BufferedRNG:
+        return BufferedRNG(self.generator(key), buffer_size=buffer_size)
+
+    def worker_keys(self, worker_id: int, num_envs: int, *, episode_index: int = 0) -> list[StreamKey]:
+        """Return the keys for ``num_envs`` environments hosted by one worker."""
+
+        return [
+            self.key(worker_id=worker_id, env_index=index, episode_index=episode_index)
+            for index in range(num_envs)
+        ]
+
+
 def _json_default(obj: object) -> object:
     if isinstance(obj, np.ndarray):
         return obj.tolist()
@@ -106,7 +255,10 @@ def _json_default(obj: object) -> object:
 
 
 __all__ = [
+    "BufferedRNG",
     "RNGSnapshot",
+    "RNGStreams",
+    "StreamKey",
     "generator_from_seed_sequence",
     "generator_state_digest",
     "global_rng",
@@ -1,7 +1,9 @@
 """Environment package exports."""
 
 from env.battle_env import BattleEnv
+from env.gym_env import BattleGymEnv
 from env.simple_env import SimpleEnv
+from env.vector_env import AsyncBattleVectorEnv, SyncBattleVectorEnv
 
-__all__ = ["BattleEnv", "SimpleEnv"]
+__all__ = ["AsyncBattleVectorEnv", "BattleEnv", "BattleGymEnv", "SimpleEnv", "SyncBattleVectorEnv"]
 
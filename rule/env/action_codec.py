@@ -0,0 +1,291 @@
+"""Stable integer encoding of structured actions and hierarchical masks.
+
+A structured action is an :class:`~core.state_machine.ActionType` plus
+three arguments: a *source* slot (a hand position, an in-play position or
+an attack number), a *target* slot (an in-play position) and a *payment*
+choice (an index into the ways of paying a cost).  :class:`ActionCodec`
+numbers every combination an :class:`ActionLayout` allows, type by type in
+``ActionType`` order, so index ``i`` means the same action for as long as
+the layout is unchanged.
+
+Decoding and validating an index are array lookups; agents sample from a
+flat boolean mask and never build or parse action dictionaries.  The mask
+is hierarchical: :class:`HierarchicalMask` holds one flag per action type
+and the argument flags of every type, so a policy can pick a type first and
+then its arguments from that type's ``(source, target, payment)`` block.
+
+Argument meanings per type:
+
+==================  ==================  ==========================  ===========
+type                source              target                      payment
+==================  ==================  ==========================  ===========
+``PLAY_CARD``       hand slot           in-play slot or no target   --
+``ATTACH_ENERGY``   hand slot           in-play slot                --
+``USE_ABILITY``     in-play slot        --                          --
+``RETREAT``         -- (the Active)     Benched slot                choice
+``DECLARE_ATTACK``  attack number       --                          choice
+others              --                  --                          --
+==================  ==================  ==========================  ===========
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from core.card_tables import MAX_IN_PLAY, BoardOptions, BoardView, CardTables
+from core.errors import IllegalActionError
+from core.state_machine import ActionType
+
+#: Action types in encoding order (the same order as ``env.battle_env.ACTION_TYPES``).
+CODEC_TYPES: Tuple[ActionType, ...] = tuple(ActionType)
+_TYPE_INDEX: Dict[ActionType, int] = {action: idx for idx, action in enumerate(CODEC_TYPES)}
+
+#: Types whose target axis has a trailing "no target" slot.
+_OPTIONAL_TARGET = (ActionType.PLAY_CARD,)
+#: Types that take a target slot at all.
+_TARGETED = (ActionType.PLAY_CARD, ActionType.ATTACH_ENERGY, ActionType.RETREAT)
+#: Target of the argument-free form of each type (see :meth:`ActionCodec.default_index`).
+_DEFAULT_TARGET = {ActionType.ATTACH_ENERGY: 0, ActionType.RETREAT: 1}
+
+
+@dataclass(frozen=True)
+class ActionLayout:
+    """Sizes of the argument axes; changing any of them renumbers actions."""
+
+    hand_slots: int = 20
+    in_play: int = MAX_IN_PLAY
+    attacks: int = 4
+    payments: int = 1
+
+    def shape(self, action_type: ActionType) -> Tuple[int, int, int]:
+        """``(sources, targets, payments)`` of ``action_type``."""
+
+        if action_type == ActionType.PLAY_CARD:
+            return self.hand_slots, self.in_play + 1, 1
+        if action_type == ActionType.ATTACH_ENERGY:
+            return self.hand_slots, self.in_play, 1
+        if action_type == ActionType.USE_ABILITY:
+            return self.in_play, 1, 1
+        if action_type == ActionType.RETREAT:
+            return 1, self.in_play, self.payments
+        if action_type == ActionType.DECLARE_ATTACK:
+            return self.attacks, 1, self.payments
+        return 1, 1, 1
+
+
+@dataclass(frozen=True)
+class StructuredAction:
+    """A decoded action; ``target`` is ``None`` for actions without a target."""
+
+    action_type: ActionType
+    source: int = 0
+    target: Optional[int] = None
+    payment: int = 0
+
+    def to_payload(self) -> Dict[str, object]:
+        return {
+            "action_type": self.action_type.name,
+            "source": self.source,
+            "target": self.target,
+            "payment": self.payment,
+        }
+
+
+@dataclass(frozen=True)
+class HierarchicalMask:
+    """Type flags plus the argument flags of every type.
+
+    ``arguments`` is laid out like the codec's index space;
+    :meth:`ActionCodec.arguments` returns the ``(source, target, payment)``
+    view of one type.  An action is legal when its type flag and its
+    argument flag are both set.
+    """
+
+    types: np.ndarray
+    arguments: np.ndarray
+
+
+class ActionCodec:
+    """Maps every structured action of an :class:`ActionLayout` to an integer."""
+
+    def __init__(self, layout: Optional[ActionLayout] = None) -> None:
+        self.layout = layout or ActionLayout()
+        self._shapes = [self.layout.shape(action_type) for action_type in CODEC_TYPES]
+        sizes = [sources * targets * payments for sources, targets, payments in self._shapes]
+        self.offsets = np.zeros(len(CODEC_TYPES) + 1, dtype=np.int64)
+        np.cumsum(sizes, out=self.offsets[1:])
+        self.size = int(self.offsets[-1])
+
+        self.type_of = np.repeat(np.arange(len(CODEC_TYPES), dtype=np.int8), sizes)
+        self.source_of = np.empty(self.size, dtype=np.int16)
+        self.target_of = np.empty(self.size, dtype=np.int16)
+        self.payment_of = np.empty(self.size, dtype=np.int16)
+        self._actions: List[StructuredAction] = []
+        for type_index, action_type in enumerate(CODEC_TYPES):
+            shape = self._shapes[type_index]
+            start, stop = self.offsets[type_index], self.offsets[type_index + 1]
+            grid = np.indices(shape).reshape(3, -1)
+            self.source_of[start:stop], targets, self.payment_of[start:stop] = grid
+            if action_type not in _TARGETED:
+                targets = np.full(stop - start, -1)
+            elif action_type in _OPTIONAL_TARGET:
+                targets = np.where(targets == shape[1] - 1, -1, targets)
+            self.target_of[start:stop] = targets
+            self._actions.extend(
+                StructuredAction(action_type, int(source), None if target < 0 else int(target), int(payment))
+                for source, target, payment in zip(grid[0], targets, grid[2])
+            )
+        self._defaults = np.array(
+            [self.encode(action_type, target=_DEFAULT_TARGET.get(action_type)) for action_type in CODEC_TYPES],
+            dtype=np.int64,
+        )
+
+    # ---- Public API
+    def __len__(self) -> int:
+        return self.size
+
+    def shape(self, action_type: ActionType) -> Tuple[int, int, int]:
+        return self._shapes[_TYPE_INDEX[action_type]]
+
+    def encode(
+        self,
+        action_type: ActionType,
+        source: int = 0,
+        target: Optional[int] = None,
+        payment: int = 0,
+    ) -> int:
+        """Index of an action; ``target=None`` selects "no target" where allowed."""
+
+        type_index = _TYPE_INDEX[action_type]
+        sources, targets, payments = self._shapes[type_index]
+        if target is None:
+            target = targets - 1 if action_type in _OPTIONAL_TARGET else 0
+            if action_type in _TARGETED and action_type not in _OPTIONAL_TARGET:
+                raise ValueError(f"{action_type.name} requires a target slot")
+        elif action_type not in _TARGETED or (action_type in _OPTIONAL_TARGET and target >= targets - 1):
+            raise ValueError(f"Target slot {target} is out of range for {action_type.name}")
+        if not (0 <= source < sources and 0 <= target < targets and 0 <= payment < payments):
+            raise ValueError(
+                f"Arguments ({source}, {target}, {payment}) are out of range for "
+                f"{action_type.name} with shape {(sources, targets, payments)}"
+            )
+        return int(self.offsets[type_index]) + (source * targets + target) * payments + payment
+
+    def decode(self, index: int) -> StructuredAction:
+        """The action numbered ``index``."""
+
+        if not 0 <= index < self.size:
+            raise IllegalActionError(f"Unknown action index: {index!r}.")
+        return self._actions[index]
+
+    def validate(self, index: int, mask: np.ndarray) -> StructuredAction:
+        """Decode ``index`` and check it against a flat mask from :meth:`flatten`."""
+
+        action = self.decode(index)
+        if not mask[index]:
+            raise IllegalActionError(f"Action {index} ({action.action_type.name}) is not legal.")
+        return action
+
+    def default_index(self, action_type: ActionType) -> int:
+        """Index of the argument-free form of ``action_type``.
+
+        That is source, payment and target slot 0, except no target for
+        ``PLAY_CARD`` and the first Benched slot for ``RETREAT``.  Environments
+        that do not model card arguments only accept these indices.
+        """
+
+        return int(self._defaults[_TYPE_INDEX[action_type]])
+
+    def empty_mask(self) -> HierarchicalMask:
+        return HierarchicalMask(
+            types=np.zeros(len(CODEC_TYPES), dtype=np.bool_),
+            arguments=np.zeros(self.size, dtype=np.bool_),
+        )
+
+    def arguments(self, mask: HierarchicalMask, action_type: ActionType) -> np.ndarray:
+        """Writable ``(source, target, payment)`` view of the arguments of ``action_type``."""
+
+        type_index = _TYPE_INDEX[action_type]
+        start, stop = self.offsets[type_index], self.offsets[type_index + 1]
+        return mask.arguments[start:stop].reshape(self._shapes[type_index])
+
+    def flatten(self, mask: HierarchicalMask, out: Optional[np.ndarray] = None) -> np.ndarray:
+        """Flat mask over all indices: type flag and argument flag both set."""
+
+        return np.logical_and(mask.arguments, mask.types[self.type_of], out=out)
+
+    def allow_defaults(self, mask: HierarchicalMask) -> HierarchicalMask:
+        """Mark the argument-free form of every flagged type as legal."""
+
+        mask.arguments[self._defaults[mask.types]] = True
+        return mask
+
+    def fill_from_board(
+        self,
+        mask: HierarchicalMask,
+        tables: CardTables,
+        board: BoardView,
+        options: BoardOptions,
+    ) -> HierarchicalMask:
+        """Set the argument flags ``options`` allows on ``board``.
+
+        Payment choice 0 stands for the canonical payment of a cost; further
+        choices are left for callers that enumerate alternatives.  Types
+        without any legal arguments lose their type flag.  Slots beyond the
+        layout are dropped.
+        """
+
+        layout = self.layout
+        hand = board.hand[: layout.hand_slots]
+        in_play = min(len(board.pokemon), layout.in_play)
+        no_target = layout.in_play
+
+        play = self.arguments(mask, ActionType.PLAY_CARD)
+        targeted = np.zeros(len(hand), dtype=np.bool_)
+        evolutions = _within(options.evolutions, len(hand), in_play)
+        play[evolutions[:, 0], evolutions[:, 1], 0] = True
+        targeted[evolutions[:, 0]] = True
+        skips = _within(options.stage_skips, len(hand), in_play)
+        if skips.size:
+            # Rare Candy is the card played; the Stage 2 card goes with it.
+            candies = np.flatnonzero(tables.is_rare_candy[hand])
+            play[candies[:, None], np.unique(skips[:, 1])[None, :], 0] = True
+            targeted[candies] = True
+        free = options.playable[: len(hand)] & ~targeted
+        play[np.flatnonzero(free), no_target, 0] = True
+
+        if options.can_attach:
+            attach = self.arguments(mask, ActionType.ATTACH_ENERGY)
+            attach[np.flatnonzero(tables.is_energy[hand])[:, None], np.arange(in_play)[None, :], 0] = True
+
+        abilities = np.flatnonzero(tables.has_ability[board.pokemon[:in_play]])
+        self.arguments(mask, ActionType.USE_ABILITY)[abilities, 0, 0] = True
+        if options.can_retreat:
+            self.arguments(mask, ActionType.RETREAT)[0, 1:in_play, 0] = True
+        if len(board.pokemon):
+            numbers = options.attacks - tables.attack_offsets[board.pokemon[0]]
+            self.arguments(mask, ActionType.DECLARE_ATTACK)[numbers[numbers < layout.attacks], 0, 0] = True
+        for action_type in (ActionType.END_TURN, ActionType.PASS):
+            mask.arguments[self.default_index(action_type)] = True
+
+        for type_index in np.flatnonzero(mask.types):
+            start, stop = self.offsets[type_index], self.offsets[type_index + 1]
+            if not mask.arguments[start:stop].any():
+                mask.types[type_index] = False
+        return mask
+
+
+def _within(pairs: np.ndarray, hand_slots: int, in_play: int) -> np.ndarray:
+    return pairs[(pairs[:, 0] < hand_slots) & (pairs[:, 1] < in_play)]
+
+
+__all__ = [
+    "ActionCodec",
+    "ActionLayout",
+    "CODEC_TYPES",
+    "HierarchicalMask",
+    "StructuredAction",
+]
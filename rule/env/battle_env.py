@@ -2,19 +2,39 @@
 
 from __future__ import annotations
 
+import copy
 import hashlib
 import json
-from dataclasses import asdict, dataclass, field
-from typing import Dict, Iterable, List, Optional
+import struct
+from dataclasses import asdict, dataclass, field, replace
+from typing import Dict, Iterable, List, Optional, Tuple, cast
 
 import numpy as np
 
+from core.card_tables import BoardOptions, BoardView, CardTables
 from core.errors import IllegalActionError
-from core.random_control import generator_from_seed_sequence, spawn_seed_sequence
+from core.journal import UndoJournal, journal_set_attr, journal_set_item
+from core.random_control import StreamKey, generator_from_seed_sequence, spawn_seed_sequence
 from core.state_machine import ActionType, BattleStateMachine, Phase, PlayerSide, StateSnapshot
+from env.action_codec import ActionCodec, HierarchicalMask
 from env.types import StepResult
 
 
+#: Stable ordering of action types used by integer actions and masks.
+ACTION_TYPES: Tuple[ActionType, ...] = tuple(ActionType)
+_ACTION_INDEX: Dict[ActionType, int] = {action: idx for idx, action in enumerate(ACTION_TYPES)}
+_PHASE_INDEX: Dict[Phase, int] = {phase: idx for idx, phase in enumerate(Phase)}
+_PLAYER_INDEX: Dict[PlayerSide, int] = {player: idx for idx, player in enumerate(PlayerSide)}
+
+_MASK_128 = (1 << 128) - 1
+
+#: Fields of :class:`BattleStateMachine` a transition may change.
+_MACHINE_FIELDS = ("_phase", "_active_player", "_turn_number", "_game_over_pending")
+
+#: Length of the vector produced by :meth:`BattleEnv.encode_observation`.
+OBSERVATION_SIZE = len(Phase) + 3 * len(PlayerSide) + 1 + len(ActionType)
+
+
 @dataclass(frozen=True)
 class ActionSpec:
     """Metadata describing an action that can appear in the mask."""
@@ -43,21 +63,34 @@ class TurnTracker:
     turn_number: int = 0
     usage: Dict[ActionType, int] = field(default_factory=dict)
 
-    def reset(self, *, turn_number: int) -> None:
-        self.turn_number = turn_number
-        self.usage.clear()
+    def reset(self, *, turn_number: int, journal: Optional[UndoJournal] = None) -> None:
+        if journal is None:
+            self.turn_number = turn_number
+            self.usage.clear()
+        else:
+            journal.set_attr(self, "turn_number", turn_number)
+            journal.set_attr(self, "usage", {})
 
-    def mark_used(self, action_type: ActionType) -> None:
-        self.usage[action_type] = self.usage.get(action_type, 0) + 1
+    def mark_used(self, action_type: ActionType, journal: Optional[UndoJournal] = None) -> None:
+        journal_set_item(journal, self.usage, action_type, self.usage.get(action_type, 0) + 1)
 
     def usage_count(self, action_type: ActionType) -> int:
         return self.usage.get(action_type, 0)
 
 
 class ActionRulebook:
-    """Encapsulates the environment's legal action logic."""
-
-    def __init__(self) -> None:
+    """Encapsulates the environment's legal action logic.
+
+    With ``tables``, :meth:`legal_actions` and :meth:`validate_type` accept a
+    :class:`~core.card_tables.BoardView` of the acting player's cards and
+    additionally drop actions the cards rule out: attacking without enough
+    energy, retreating without a Benched Pokémon or the retreat cost,
+    playing a card when no card in hand can be played and attaching energy
+    without an Energy card in hand.
+    """
+
+    def __init__(self, tables: Optional[CardTables] = None) -> None:
+        self._tables = tables
         main_phase = (Phase.MAIN_PHASE,)
         self._specs: Dict[ActionType, ActionSpec] = {
             ActionType.PLAY_CARD: ActionSpec(
@@ -101,7 +134,44 @@ class ActionRulebook:
             ),
         }
 
-    def legal_actions(self, snapshot: StateSnapshot, tracker: TurnTracker) -> List[ActionSpec]:
+    def legal_actions(
+        self,
+        snapshot: StateSnapshot,
+        tracker: TurnTracker,
+        board: Optional[BoardView] = None,
+    ) -> List[ActionSpec]:
+        return self._legal_specs(snapshot, tracker, self.board_options(board))
+
+    def structured_mask(
+        self,
+        codec: ActionCodec,
+        snapshot: StateSnapshot,
+        tracker: TurnTracker,
+        board: Optional[BoardView] = None,
+    ) -> HierarchicalMask:
+        """Hierarchical mask over ``codec``'s structured actions.
+
+        Without a board only the argument-free form of each legal type is
+        allowed (see :meth:`ActionCodec.default_index`).
+        """
+
+        options = self.board_options(board)
+        mask = codec.empty_mask()
+        for spec in self._legal_specs(snapshot, tracker, options):
+            mask.types[_ACTION_INDEX[spec.action_type]] = True
+        if options is None:
+            return codec.allow_defaults(mask)
+        # board_options only returns options for a board and card tables.
+        return codec.fill_from_board(
+            mask, cast(CardTables, self._tables), cast(BoardView, board), options
+        )
+
+    def _legal_specs(
+        self,
+        snapshot: StateSnapshot,
+        tracker: TurnTracker,
+        options: Optional[BoardOptions],
+    ) -> List[ActionSpec]:
         actions: List[ActionSpec] = []
         for spec in self._specs.values():
             if snapshot.phase not in spec.allowed_phases:
@@ -109,10 +179,27 @@ class ActionRulebook:
             if spec.max_uses_per_turn is not None:
                 if tracker.usage_count(spec.action_type) >= spec.max_uses_per_turn:
                     continue
+            if options is not None and not _board_allows(options, spec.action_type):
+                continue
             actions.append(spec)
         return actions
 
-    def validate(self, snapshot: StateSnapshot, tracker: TurnTracker, action: Dict[str, object]) -> ActionSpec:
+    def board_options(self, board: Optional[BoardView]) -> Optional[BoardOptions]:
+        """Evaluate ``board`` with the rulebook's card tables (``None`` without a board)."""
+
+        if board is None:
+            return None
+        if self._tables is None:
+            raise ValueError("Board views require an ActionRulebook created with card tables")
+        return self._tables.options(board)
+
+    def validate(
+        self,
+        snapshot: StateSnapshot,
+        tracker: TurnTracker,
+        action: Dict[str, object],
+        board: Optional[BoardView] = None,
+    ) -> ActionSpec:
         if not isinstance(action, dict):
             raise IllegalActionError("Action must be provided as a dictionary.")
         raw_type = action.get("action_type")
@@ -122,6 +209,16 @@ class ActionRulebook:
             action_type = ActionType[raw_type]
         except KeyError:
             raise IllegalActionError(f"Unknown action type: {raw_type!r}.")
+        return self.validate_type(snapshot, tracker, action_type, board)
+
+    def validate_type(
+        self,
+        snapshot: StateSnapshot,
+        tracker: TurnTracker,
+        action_type: ActionType,
+        board: Optional[BoardView] = None,
+    ) -> ActionSpec:
+        raw_type = action_type.name
         spec = self._specs.get(action_type)
         if spec is None:
             raise IllegalActionError(f"Action {raw_type!r} is not supported by the environment.")
@@ -133,9 +230,24 @@ class ActionRulebook:
             raise IllegalActionError(
                 f"Action {raw_type} already reached its per-turn limit of {spec.max_uses_per_turn}."
             )
+        options = self.board_options(board)
+        if options is not None and not _board_allows(options, action_type):
+            raise IllegalActionError(f"Action {raw_type} is not possible with the cards in play.")
         return spec
 
 
+def _board_allows(options: BoardOptions, action_type: ActionType) -> bool:
+    if action_type == ActionType.DECLARE_ATTACK:
+        return options.attacks.size > 0
+    if action_type == ActionType.RETREAT:
+        return options.can_retreat
+    if action_type == ActionType.PLAY_CARD:
+        return bool(options.playable.any())
+    if action_type == ActionType.ATTACH_ENERGY:
+        return options.can_attach
+    return True
+
+
 @dataclass
 class PlayerProgress:
     """Aggregated battle statistics for a player."""
@@ -157,7 +269,15 @@ class RewardConfig:
 
 
 class BattleEnv:
-    """Simplified environment that exposes legal action masking."""
+    """Simplified environment that exposes legal action masking.
+
+    With ``journal_capacity`` every applied action is recorded in an
+    :class:`~core.journal.UndoJournal` holding up to that many mutations, and
+    :meth:`undo` takes actions back in place, which lets tree search walk the
+    game tree without cloning the environment at every node.  The journal
+    keeps the last ``journal_max_steps`` actions (fewer when they need more
+    than ``journal_capacity`` mutations); older ones can no longer be undone.
+    """
 
     def __init__(
         self,
@@ -165,7 +285,15 @@ class BattleEnv:
         rulebook: Optional[ActionRulebook] = None,
         reward_config: RewardConfig | None = None,
         seed: Optional[int] = None,
+        rng_key: Optional[StreamKey] = None,
+        journal_capacity: Optional[int] = None,
+        journal_max_steps: int = 1024,
     ) -> None:
+        self._journal = (
+            UndoJournal(journal_capacity, max_steps=journal_max_steps)
+            if journal_capacity is not None
+            else None
+        )
         self._state_machine = BattleStateMachine()
         self._rulebook = rulebook or ActionRulebook()
         self._turn_tracker = TurnTracker()
@@ -175,24 +303,66 @@ class BattleEnv:
         self._damage_counters: Dict[PlayerSide, int] = {}
         self._pending_reward: float = 0.0
         self._winner: Optional[PlayerSide] = None
-        self._seed_sequence = (
-            np.random.SeedSequence(seed) if seed is not None else spawn_seed_sequence()
-        )
-        self._rng = generator_from_seed_sequence(self._seed_sequence)
+        if rng_key is None:
+            master_seed = (
+                seed
+                if seed is not None
+                else int(spawn_seed_sequence().generate_state(1, dtype=np.uint64)[0])
+            )
+            rng_key = StreamKey(master_seed)
+        self._rng_key = rng_key
+        self._rng = generator_from_seed_sequence(self._rng_key.seed_sequence())
+        self._key_used = False
 
     # ------------------------------------------------------------------
     # Public API
     # ------------------------------------------------------------------
-    def reset(self) -> Dict[str, object]:
-        self._rng = generator_from_seed_sequence(self._seed_sequence)
-        self._state_machine.reset()
-        self._turn_tracker.reset(turn_number=0)
-        self._refresh_snapshot()
-        self._progress = {player: PlayerProgress() for player in PlayerSide}
-        self._damage_counters = {player: 0 for player in PlayerSide}
-        self._pending_reward = 0.0
-        self._winner = None
-        self._auto_advance()
+    @property
+    def rng_key(self) -> StreamKey:
+        """Key of the random stream driving the current episode."""
+
+        return self._rng_key
+
+    def reset(
+        self,
+        *,
+        episode_index: Optional[int] = None,
+        rng_key: Optional[StreamKey] = None,
+    ) -> Dict[str, object]:
+        """Start a new episode.
+
+        The first reset plays the stream of :attr:`rng_key`.  Every later reset
+        without arguments moves on to the next episode's independent stream of
+        the same ``(master_seed, worker_id, env_index)`` family, so repeated
+        episodes differ but stay reproducible.  ``episode_index`` selects an
+        episode explicitly; passing the current ``rng_key.episode_index``
+        replays the episode bit for bit.  ``rng_key`` replaces the stream
+        family altogether and starts at its own episode.
+        """
+
+        if rng_key is not None:
+            self._rng_key = rng_key
+        if episode_index is not None:
+            self._rng_key = self._rng_key.with_episode(episode_index)
+        elif rng_key is None and self._key_used:
+            self._rng_key = self._rng_key.next_episode()
+        self._key_used = True
+        # Reset is not an undoable step: detach the journal while it runs.
+        journal, self._journal = self._journal, None
+        try:
+            self._rng = generator_from_seed_sequence(self._rng_key.seed_sequence())
+            self._state_machine.reset()
+            self._turn_tracker.reset(turn_number=0)
+            self._refresh_snapshot()
+            self._progress = {player: PlayerProgress() for player in PlayerSide}
+            self._damage_counters = {player: 0 for player in PlayerSide}
+            self._pending_reward = 0.0
+            self._winner = None
+            self._auto_advance()
+        finally:
+            if journal is not None:
+                journal.clear()
+            self._journal = journal
         return self._build_observation()
 
     def legal_actions(self) -> List[Dict[str, object]]:
@@ -204,25 +374,193 @@ class BattleEnv:
             return StepResult(self._build_observation(), 0.0, True, {"message": "game already finished"})
 
         spec = self._rulebook.validate(self._snapshot, self._turn_tracker, action)
-        self._turn_tracker.mark_used(spec.action_type)
-
-        self._state_machine.advance(spec.action_type)
-        self._refresh_snapshot()
-        self._auto_advance()
+        reward, done = self._apply(spec)
 
         observation = self._build_observation()
-        done = self._snapshot.phase == Phase.GAME_END
-        reward = self._consume_pending_reward()
         info = self._build_info(done)
         return StepResult(observation, reward, done, info)
 
+    def step_index(self, index: int) -> Tuple[float, bool]:
+        """Apply the action ``ACTION_TYPES[index]`` and return ``(reward, done)``.
+
+        This is the allocation-light path used by array based wrappers: no
+        observation dictionaries or state hashes are built.  Use
+        :meth:`encode_observation` and :meth:`action_mask` to read the new state.
+        """
+
+        if self._snapshot.phase == Phase.GAME_END:
+            return 0.0, True
+        if not 0 <= index < len(ACTION_TYPES):
+            raise IllegalActionError(f"Unknown action index: {index!r}.")
+        spec = self._rulebook.validate_type(self._snapshot, self._turn_tracker, ACTION_TYPES[index])
+        return self._apply(spec)
+
+    def structured_action_mask(self, codec: ActionCodec, out: Optional[np.ndarray] = None) -> np.ndarray:
+        """Flat mask over the indices of ``codec`` (see :meth:`step_structured`)."""
+
+        mask = self._rulebook.structured_mask(codec, self._snapshot, self._turn_tracker)
+        return codec.flatten(mask, out=out)
+
+    def step_structured(self, index: int, codec: ActionCodec) -> Tuple[float, bool]:
+        """Apply the structured action ``index`` of ``codec``; see :meth:`step_index`.
+
+        The environment does not model cards, so only the argument-free form
+        of each action type is accepted.
+        """
+
+        if self._snapshot.phase == Phase.GAME_END:
+            return 0.0, True
+        action = codec.decode(index)
+        if index != codec.default_index(action.action_type):
+            raise IllegalActionError(
+                f"Action {index} ({action.action_type.name}) has card arguments this environment does not model."
+            )
+        spec = self._rulebook.validate_type(self._snapshot, self._turn_tracker, action.action_type)
+        return self._apply(spec)
+
+    @property
+    def done(self) -> bool:
+        return self._snapshot.phase == Phase.GAME_END
+
+    @property
+    def winner(self) -> Optional[PlayerSide]:
+        return self._winner
+
+    @property
+    def active_player(self) -> PlayerSide:
+        return self._snapshot.active_player
+
+    @property
+    def turn_number(self) -> int:
+        return self._snapshot.turn_number
+
+    @property
+    def undo_depth(self) -> int:
+        """Number of applied actions :meth:`undo` can take back."""
+
+        return self._journal.steps if self._journal is not None else 0
+
+    def undo(self, steps: int = 1) -> None:
+        """Take back the last ``steps`` applied actions.
+
+        Every field covered by :meth:`state_hash`, including the RNG position,
+        is restored exactly.  Requires ``journal_capacity``; at most
+        :attr:`undo_depth` actions can be taken back.
+        """
+
+        if self._journal is None:
+            raise RuntimeError("undo() requires a BattleEnv created with journal_capacity")
+        state, inc, has_uint32, uinteger = self._journal.undo(steps)
+        self._rng.bit_generator.state = {
+            "bit_generator": "PCG64",
+            "state": {"state": state, "inc": inc},
+            "has_uint32": has_uint32,
+            "uinteger": uinteger,
+        }
+
+    def clone(self, *, copy_rng: bool = True) -> "BattleEnv":
+        """Return an independent copy of the environment for search.
+
+        Mutable containers are copied one level deep and the RNG state is
+        duplicated, so stepping the clone never affects the original.  Search
+        code that calls :meth:`determinize` right away can pass
+        ``copy_rng=False`` to skip duplicating a generator it will replace.
+        Clones carry no undo journal.
+        """
+
+        other = copy.copy(self)
+        other._journal = None
+        other._state_machine = copy.copy(self._state_machine)
+        other._turn_tracker = TurnTracker(
+            turn_number=self._turn_tracker.turn_number, usage=dict(self._turn_tracker.usage)
+        )
+        other._progress = {player: replace(progress) for player, progress in self._progress.items()}
+        other._damage_counters = dict(self._damage_counters)
+        if copy_rng:
+            other._rng = copy.deepcopy(self._rng)
+        return other
+
+    def determinize(self, rng: np.random.Generator) -> None:
+        """Resample everything the acting player cannot observe.
+
+        Information-set search calls this on a clone before every iteration.
+        Hidden information is currently limited to the future random stream;
+        hidden zones (opponent hand, deck order) must be reshuffled here once
+        they are modelled.
+        """
+
+        self._rng = np.random.Generator(np.random.PCG64(rng.integers(0, 2**63)))
+
+    def action_mask(self, out: Optional[np.ndarray] = None) -> np.ndarray:
+        """Return a boolean mask over :data:`ACTION_TYPES` of the legal actions."""
+
+        mask = out if out is not None else np.zeros(len(ACTION_TYPES), dtype=bool)
+        mask[:] = False
+        for spec in self._rulebook.legal_actions(self._snapshot, self._turn_tracker):
+            mask[_ACTION_INDEX[spec.action_type]] = True
+        return mask
+
+    def encode_observation(self, out: Optional[np.ndarray] = None) -> np.ndarray:
+        """Write the numeric observation vector into ``out`` and return it.
+
+        Layout: phase one-hot, active player one-hot, turn number, prizes taken
+        per player, damage per player (as a fraction of the knockout threshold)
+        and per-turn usage count of every action type.
+        """
+
+        vector = out if out is not None else np.zeros(OBSERVATION_SIZE, dtype=np.float32)
+        vector[:] = 0.0
+        vector[_PHASE_INDEX[self._snapshot.phase]] = 1.0
+        offset = len(Phase)
+        vector[offset + _PLAYER_INDEX[self._snapshot.active_player]] = 1.0
+        offset += len(PlayerSide)
+        vector[offset] = self._snapshot.turn_number
+        offset += 1
+        for player, idx in _PLAYER_INDEX.items():
+            progress = self._progress.get(player)
+            vector[offset + idx] = progress.prizes_taken if progress is not None else 0
+            vector[offset + len(PlayerSide) + idx] = (
+                self._damage_counters.get(player, 0) / self._reward_config.damage_to_knockout
+            )
+        offset += 2 * len(PlayerSide)
+        for action, count in self._turn_tracker.usage.items():
+            vector[offset + _ACTION_INDEX[action]] = count
+        return vector
+
     # ------------------------------------------------------------------
     # Internal helpers
     # ------------------------------------------------------------------
+    def _apply(self, spec: ActionSpec) -> Tuple[float, bool]:
+        if self._journal is not None:
+            rng_state = self._rng.bit_generator.state
+            position = rng_state["state"]
+            self._journal.mark(
+                (position["state"], position["inc"], rng_state["has_uint32"], rng_state["uinteger"])
+            )
+        self._turn_tracker.mark_used(spec.action_type, self._journal)
+
+        self._advance_machine(spec.action_type)
+        self._refresh_snapshot()
+        self._auto_advance()
+
+        done = self._snapshot.phase == Phase.GAME_END
+        return self._consume_pending_reward(), done
+
+    def _advance_machine(self, action: Optional[ActionType] = None) -> None:
+        self._record_machine()
+        self._state_machine.advance(action)
+
+    def _record_machine(self) -> None:
+        journal = self._journal
+        if journal is not None:
+            machine = self._state_machine
+            for name in _MACHINE_FIELDS:
+                journal.set_attr(machine, name, getattr(machine, name))
+
     def _refresh_snapshot(self) -> None:
-        self._snapshot = self._state_machine.snapshot()
+        journal_set_attr(self._journal, self, "_snapshot", self._state_machine.snapshot())
         if self._turn_tracker.turn_number != self._snapshot.turn_number:
-            self._turn_tracker.reset(turn_number=self._snapshot.turn_number)
+            self._turn_tracker.reset(turn_number=self._snapshot.turn_number, journal=self._journal)
 
     def _auto_advance(self) -> None:
         while True:
@@ -231,7 +569,7 @@ class BattleEnv:
             legal = self._rulebook.legal_actions(self._snapshot, self._turn_tracker)
             if legal or self._snapshot.phase == Phase.GAME_END:
                 break
-            self._state_machine.advance()
+            self._advance_machine()
             self._refresh_snapshot()
 
     def _build_observation(self) -> Dict[str, object]:
@@ -257,17 +595,18 @@ class BattleEnv:
         attacker = self._snapshot.active_player
         defender = attacker.opponent()
 
-        self._damage_counters[defender] += self._reward_config.damage_per_attack
+        damage = self._damage_counters[defender] + self._reward_config.damage_per_attack
+        journal_set_item(self._journal, self._damage_counters, defender, damage)
         self._push_reward(attacker, self._reward_config.damage_reward)
 
-        if self._damage_counters[defender] >= self._reward_config.damage_to_knockout:
-            self._damage_counters[defender] = 0
+        if damage >= self._reward_config.damage_to_knockout:
+            journal_set_item(self._journal, self._damage_counters, defender, 0)
             self._handle_knockout(attacker)
 
     def _handle_knockout(self, attacker: PlayerSide) -> None:
         progress = self._progress[attacker]
-        progress.knockouts += 1
-        progress.prizes_taken += 1
+        journal_set_attr(self._journal, progress, "knockouts", progress.knockouts + 1)
+        journal_set_attr(self._journal, progress, "prizes_taken", progress.prizes_taken + 1)
         self._push_reward(attacker, self._reward_config.prize_reward)
 
         if progress.prizes_taken >= self._reward_config.prizes_to_win:
@@ -276,21 +615,54 @@ class BattleEnv:
     def _declare_winner(self, player: PlayerSide) -> None:
         if self._winner is not None:
             return
-        self._winner = player
+        journal_set_attr(self._journal, self, "_winner", player)
+        self._record_machine()
         self._state_machine.mark_game_over()
         self._push_reward(player, self._reward_config.win_reward)
 
     def _push_reward(self, player: PlayerSide, amount: float) -> None:
-        if player is PlayerSide.PLAYER_ONE:
-            self._pending_reward += amount
-        else:
-            self._pending_reward -= amount
+        if player is not PlayerSide.PLAYER_ONE:
+            amount = -amount
+        journal_set_attr(self._journal, self, "_pending_reward", self._pending_reward + amount)
 
     def _consume_pending_reward(self) -> float:
         reward = self._pending_reward
-        self._pending_reward = 0.0
+        journal_set_attr(self._journal, self, "_pending_reward", 0.0)
         return reward
 
+    def state_key(self) -> int:
+        """Return a 64-bit integer key for the current environment state.
+
+        The key covers the same fields as :meth:`state_hash` but packs them as
+        fixed-width integers and hashes them with an 8-byte BLAKE2b digest, so
+        it is cheap enough to compute for every node of a tree search and can
+        be used directly as a transposition table key.
+        """
+
+        usage = self._turn_tracker.usage
+        values = [
+            _PHASE_INDEX[self._snapshot.phase],
+            _PLAYER_INDEX[self._snapshot.active_player],
+            self._snapshot.turn_number,
+            self._turn_tracker.turn_number,
+            *(usage.get(action, 0) for action in ACTION_TYPES),
+        ]
+        for player in PlayerSide:
+            progress = self._progress.get(player)
+            values.append(progress.prizes_taken if progress is not None else 0)
+            values.append(progress.knockouts if progress is not None else 0)
+            values.append(self._damage_counters.get(player, 0))
+        values.append(_PLAYER_INDEX[self._winner] if self._winner is not None else -1)
+        rng_state = self._rng.bit_generator.state["state"]
+        packed = b"".join(
+            (
+                struct.pack(f"<{len(values)}qd", *values, self._pending_reward),
+                (rng_state["state"] & _MASK_128).to_bytes(16, "little"),
+                (rng_state["inc"] & _MASK_128).to_bytes(16, "little"),
+            )
+        )
+        return int.from_bytes(hashlib.blake2b(packed, digest_size=8).digest(), "little")
+
     def state_hash(self) -> str:
         """Return a deterministic hash for the current environment state."""
 
@@ -322,6 +694,8 @@ class BattleEnv:
 
 
 __all__ = [
+    "ACTION_TYPES",
+    "OBSERVATION_SIZE",
     "ActionRulebook",
     "ActionSpec",
     "BattleEnv",
@@ -0,0 +1,119 @@
+"""Gymnasium adapter for :class:`~env.battle_env.BattleEnv`.
+
+The adapter exposes the battle through the standard ``reset(seed, options)`` /
+``step(int)`` protocol with a ``Discrete`` action space over
+:data:`~env.battle_env.ACTION_TYPES`.  Observations are dictionaries holding
+the numeric state vector and a ``MultiBinary`` legal action mask, so masked
+policies can be plugged in directly.
+
+Gymnasium is an optional dependency: without it the adapter still works but
+``observation_space``/``action_space`` are ``None``.
+"""
+
+from __future__ import annotations
+
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+
+from core.random_control import StreamKey
+from env.battle_env import ACTION_TYPES, OBSERVATION_SIZE, BattleEnv
+
+try:  # pragma: no cover - exercised only when gymnasium is installed
+    import gymnasium as gym
+    from gymnasium import spaces
+except ImportError:  # pragma: no cover - optional dependency
+    gym = None
+    spaces = None
+
+_EnvBase: Any = gym.Env if gym is not None else object
+
+ObservationDict = Dict[str, np.ndarray]
+
+
+def make_spaces() -> Tuple[Any, Any]:
+    """Return ``(observation_space, action_space)`` or ``(None, None)``."""
+
+    if spaces is None:
+        return None, None
+    observation_space = spaces.Dict(
+        {
+            "observation": spaces.Box(
+                low=0.0, high=np.inf, shape=(OBSERVATION_SIZE,), dtype=np.float32
+            ),
+            "action_mask": spaces.MultiBinary(len(ACTION_TYPES)),
+        }
+    )
+    return observation_space, spaces.Discrete(len(ACTION_TYPES))
+
+
+class BattleGymEnv(_EnvBase):
+    """Gymnasium ``Env`` wrapping a single :class:`BattleEnv`."""
+
+    metadata: Dict[str, Any] = {"render_modes": []}
+
+    def __init__(
+        self,
+        env: Optional[BattleEnv] = None,
+        *,
+        max_turns: Optional[int] = None,
+    ) -> None:
+        super().__init__()
+        self.env = env or BattleEnv()
+        self.max_turns = max_turns
+        self.observation_space, self.action_space = make_spaces()
+        self._episode_index = 0
+
+    def reset(
+        self,
+        *,
+        seed: Optional[int] = None,
+        options: Optional[Dict[str, Any]] = None,
+    ) -> Tuple[ObservationDict, Dict[str, Any]]:
+        """Reset the battle.
+
+        ``seed`` starts a new stream family for this env; otherwise every reset
+        moves on to the next episode stream of the current family, so repeated
+        episodes are distinct but reproducible.  ``options["episode_index"]``
+        selects an explicit episode.  With Gymnasium installed ``seed`` also
+        seeds the inherited ``np_random`` generator.
+        """
+
+        if gym is not None:
+            super().reset(seed=seed)
+        options = options or {}
+        key = self.env.rng_key
+        if seed is not None:
+            key = StreamKey(seed, key.worker_id, key.env_index)
+            episode_index = 0
+        elif "episode_index" in options:
+            episode_index = int(options["episode_index"])
+        else:
+            episode_index = self._episode_index
+        self.env.reset(rng_key=key, episode_index=episode_index)
+        self._episode_index = episode_index + 1
+        return self._observation(), {"rng_key": self.env.rng_key.as_tuple()}
+
+    def step(self, action: int) -> Tuple[ObservationDict, float, bool, bool, Dict[str, Any]]:
+        reward, terminated = self.env.step_index(int(action))
+        truncated = (
+            not terminated and self.max_turns is not None and self.env.turn_number > self.max_turns
+        )
+        info: Dict[str, Any] = {}
+        if terminated and self.env.winner is not None:
+            info["winner"] = self.env.winner.name
+        return self._observation(), reward, terminated, truncated, info
+
+    def action_masks(self) -> np.ndarray:
+        """Legal action mask, following the ``MaskablePPO`` naming convention."""
+
+        return self.env.action_mask()
+
+    def _observation(self) -> ObservationDict:
+        return {
+            "observation": self.env.encode_observation(),
+            "action_mask": self.env.action_mask().astype(np.int8),
+        }
+
+
+__all__ = ["BattleGymEnv", "make_spaces"]
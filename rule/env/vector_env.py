@@ -0,0 +1,362 @@
+"""Batched versions of :class:`~env.battle_env.BattleEnv` for RL training.
+
+Both wrappers follow the Gymnasium vector API: ``reset(seed)`` returns
+``(observations, infos)`` and ``step(actions)`` returns ``(observations,
+rewards, terminations, truncations, infos)``.  Observations are dictionaries of
+batched arrays (``"observation"`` and ``"action_mask"``) and finished episodes
+are reset automatically within the same step.  The observation and mask an
+episode ended on are kept in ``infos["final_observation"]`` and
+``infos["final_action_mask"]`` (rows flagged by ``infos["_final_observation"]``),
+so truncated episodes can still be bootstrapped.  Actions are checked against
+the current masks before any env is stepped.
+
+* :class:`SyncBattleVectorEnv` steps every env in the calling process.
+* :class:`AsyncBattleVectorEnv` spreads contiguous groups of envs over worker
+  processes.  Actions and results travel through one
+  :mod:`multiprocessing.shared_memory` block; the pipes only carry short
+  commands, so no observation is ever pickled.
+
+Env ``i`` always draws its randomness from ``StreamKey(master_seed, 0, i,
+episode)``, which makes both wrappers produce identical trajectories for the
+same seed and actions regardless of how envs are grouped.
+"""
+
+from __future__ import annotations
+
+import multiprocessing as mp
+from multiprocessing.connection import Connection
+from multiprocessing.context import SpawnContext
+from multiprocessing.shared_memory import SharedMemory
+from typing import Any, Dict, List, Optional, Sequence, Tuple, cast
+
+import numpy as np
+
+from core.errors import IllegalActionError
+from core.random_control import RNGStreams
+from core.state_machine import PlayerSide
+from env.battle_env import ACTION_TYPES, OBSERVATION_SIZE, BattleEnv, RewardConfig
+from env.gym_env import make_spaces
+
+VectorObservation = Dict[str, np.ndarray]
+VectorStepResult = Tuple[VectorObservation, np.ndarray, np.ndarray, np.ndarray, Dict[str, Any]]
+
+_FIELDS: Tuple[Tuple[str, Any, Tuple[int, ...]], ...] = (
+    ("observation", np.float32, (OBSERVATION_SIZE,)),
+    ("reward", np.float64, ()),
+    ("actions", np.int64, ()),
+    ("action_mask", np.bool_, (len(ACTION_TYPES),)),
+    ("terminated", np.bool_, ()),
+    ("truncated", np.bool_, ()),
+    ("final_winner", np.int8, ()),
+    ("final_observation", np.float32, (OBSERVATION_SIZE,)),
+    ("final_action_mask", np.bool_, (len(ACTION_TYPES),)),
+)
+
+#: Codes written to ``infos["final_winner"]``; ``-1`` means no winner.
+WINNER_CODES: Dict[PlayerSide, int] = {player: idx for idx, player in enumerate(PlayerSide)}
+
+
+class _BatchBuffers:
+    """Typed array views carved out of one contiguous byte buffer."""
+
+    def __init__(self, buffer: Any, num_envs: int) -> None:
+        offset = 0
+        for name, dtype, shape in _FIELDS:
+            itemsize = np.dtype(dtype).itemsize
+            offset = -(-offset // itemsize) * itemsize  # align
+            array: np.ndarray = np.ndarray(
+                (num_envs, *shape), dtype=dtype, buffer=buffer, offset=offset
+            )
+            setattr(self, name, array)
+            offset += array.nbytes
+        self.observation: np.ndarray
+        self.reward: np.ndarray
+        self.actions: np.ndarray
+        self.action_mask: np.ndarray
+        self.terminated: np.ndarray
+        self.truncated: np.ndarray
+        self.final_winner: np.ndarray
+        self.final_observation: np.ndarray
+        self.final_action_mask: np.ndarray
+
+    @staticmethod
+    def nbytes(num_envs: int) -> int:
+        offset = 0
+        for _, dtype, shape in _FIELDS:
+            itemsize = np.dtype(dtype).itemsize
+            offset = -(-offset // itemsize) * itemsize
+            offset += itemsize * num_envs * int(np.prod(shape, dtype=np.int64))
+        return offset
+
+
+class _EnvGroup:
+    """A slice of envs stepped together, writing into shared batch buffers."""
+
+    def __init__(
+        self,
+        indices: Sequence[int],
+        master_seed: int,
+        max_turns: Optional[int],
+        reward_config: Optional[RewardConfig],
+    ) -> None:
+        self._indices = list(indices)
+        self._max_turns = max_turns
+        self._streams = RNGStreams(master_seed)
+        self._episodes = [0] * len(self._indices)
+        self._envs = [
+            BattleEnv(reward_config=reward_config, rng_key=self._streams.key(env_index=idx))
+            for idx in self._indices
+        ]
+
+    def reset(self, buffers: _BatchBuffers, seed: Optional[int]) -> None:
+        if seed is not None:
+            self._streams = RNGStreams(seed)
+        for slot, (idx, env) in enumerate(zip(self._indices, self._envs)):
+            self._episodes[slot] = 0
+            env.reset(rng_key=self._streams.key(env_index=idx))
+            self._write(buffers, idx, env)
+        buffers.reward[self._indices] = 0.0
+        buffers.terminated[self._indices] = False
+        buffers.truncated[self._indices] = False
+        buffers.final_winner[self._indices] = -1
+
+    def step(self, buffers: _BatchBuffers) -> None:
+        for slot, (idx, env) in enumerate(zip(self._indices, self._envs)):
+            reward, terminated = env.step_index(int(buffers.actions[idx]))
+            truncated = (
+                not terminated and self._max_turns is not None and env.turn_number > self._max_turns
+            )
+            buffers.reward[idx] = reward
+            buffers.terminated[idx] = terminated
+            buffers.truncated[idx] = truncated
+            winner = env.winner
+            buffers.final_winner[idx] = (
+                WINNER_CODES[winner] if terminated and winner is not None else -1
+            )
+            if terminated or truncated:
+                env.encode_observation(out=buffers.final_observation[idx])
+                env.action_mask(out=buffers.final_action_mask[idx])
+                self._episodes[slot] += 1
+                env.reset(episode_index=self._episodes[slot])
+            self._write(buffers, idx, env)
+
+    @staticmethod
+    def _write(buffers: _BatchBuffers, idx: int, env: BattleEnv) -> None:
+        env.encode_observation(out=buffers.observation[idx])
+        env.action_mask(out=buffers.action_mask[idx])
+
+
+class _VectorEnvBase:
+    num_envs: int
+    _buffers: _BatchBuffers
+
+    def __init__(self, num_envs: int, copy: bool) -> None:
+        if num_envs <= 0:
+            raise ValueError("num_envs must be positive")
+        self.num_envs = num_envs
+        self.copy = copy
+        self.single_observation_space, self.single_action_space = make_spaces()
+
+    def _observations(self) -> VectorObservation:
+        observation = self._buffers.observation
+        mask = self._buffers.action_mask
+        if self.copy:
+            observation, mask = observation.copy(), mask.copy()
+        return {"observation": observation, "action_mask": mask}
+
+    def _step_result(self) -> VectorStepResult:
+        buffers = self._buffers
+        arrays: Tuple[np.ndarray, ...] = (
+            buffers.reward,
+            buffers.terminated,
+            buffers.truncated,
+            buffers.final_winner,
+            buffers.final_observation,
+            buffers.final_action_mask,
+        )
+        if self.copy:
+            arrays = tuple(array.copy() for array in arrays)
+        reward, terminated, truncated, final_winner, final_observation, final_mask = arrays
+        infos = {
+            "final_winner": final_winner,
+            "final_observation": final_observation,
+            "final_action_mask": final_mask,
+            "_final_observation": terminated | truncated,
+        }
+        return self._observations(), reward, terminated, truncated, infos
+
+    def _set_actions(self, actions: Sequence[int] | np.ndarray) -> None:
+        actions = np.asarray(actions)
+        if actions.shape != (self.num_envs,):
+            raise ValueError(f"Expected {self.num_envs} actions, got shape {actions.shape}")
+        # Validate the whole batch first so an illegal action never leaves it half-stepped.
+        known = (actions >= 0) & (actions < len(ACTION_TYPES))
+        rows = np.arange(self.num_envs)
+        legal = known & self._buffers.action_mask[rows, np.where(known, actions, 0)]
+        if not legal.all():
+            env_index = int(np.flatnonzero(~legal)[0])
+            raise IllegalActionError(
+                f"Action {int(actions[env_index])} is not legal in env {env_index}."
+            )
+        self._buffers.actions[:] = actions
+
+
+class SyncBattleVectorEnv(_VectorEnvBase):
+    """Steps ``num_envs`` battles sequentially in the calling process."""
+
+    def __init__(
+        self,
+        num_envs: int,
+        *,
+        master_seed: Optional[int] = None,
+        max_turns: Optional[int] = None,
+        reward_config: Optional[RewardConfig] = None,
+        copy: bool = True,
+    ) -> None:
+        super().__init__(num_envs, copy)
+        self._storage = bytearray(_BatchBuffers.nbytes(num_envs))
+        self._buffers = _BatchBuffers(self._storage, num_envs)
+        seed = RNGStreams(master_seed).master_seed
+        self._group = _EnvGroup(range(num_envs), seed, max_turns, reward_config)
+
+    def reset(self, *, seed: Optional[int] = None) -> Tuple[VectorObservation, Dict[str, Any]]:
+        self._group.reset(self._buffers, seed)
+        return self._observations(), {}
+
+    def step(self, actions: Sequence[int] | np.ndarray) -> VectorStepResult:
+        self._set_actions(actions)
+        self._group.step(self._buffers)
+        return self._step_result()
+
+    def close(self) -> None:
+        return None
+
+
+def _worker(
+    conn: Connection,
+    shm_name: str,
+    num_envs: int,
+    indices: List[int],
+    master_seed: int,
+    max_turns: Optional[int],
+    reward_config: Optional[RewardConfig],
+) -> None:
+    shm = SharedMemory(name=shm_name)
+    buffers = _BatchBuffers(shm.buf, num_envs)
+    group = _EnvGroup(indices, master_seed, max_turns, reward_config)
+    try:
+        while True:
+            command, payload = conn.recv()
+            try:
+                if command == "reset":
+                    group.reset(buffers, payload)
+                elif command == "step":
+                    group.step(buffers)
+                elif command == "close":
+                    conn.send(("ok", None))
+                    break
+                else:
+                    raise ValueError(f"Unknown command {command!r}")
+            except Exception as exc:  # noqa: BLE001 - forwarded to the parent
+                conn.send(("error", exc))
+            else:
+                conn.send(("ok", None))
+    finally:
+        del buffers
+        shm.close()
+        conn.close()
+
+
+class AsyncBattleVectorEnv(_VectorEnvBase):
+    """Runs groups of battles in worker processes over shared memory."""
+
+    def __init__(
+        self,
+        num_envs: int,
+        *,
+        num_workers: Optional[int] = None,
+        master_seed: Optional[int] = None,
+        max_turns: Optional[int] = None,
+        reward_config: Optional[RewardConfig] = None,
+        copy: bool = True,
+        context: Optional[str] = None,
+    ) -> None:
+        super().__init__(num_envs, copy)
+        num_workers = min(num_workers or mp.cpu_count(), num_envs)
+        seed = RNGStreams(master_seed).master_seed
+        self._shm = SharedMemory(create=True, size=_BatchBuffers.nbytes(num_envs))
+        self._buffers = _BatchBuffers(self._shm.buf, num_envs)
+        self._closed = False
+        # Every start method's context exposes the same Pipe/Process API.
+        ctx = cast(SpawnContext, mp.get_context(context))
+        self._conns: List[Connection] = []
+        self._processes: List[Any] = []
+        for group in np.array_split(np.arange(num_envs), num_workers):
+            parent, child = ctx.Pipe()
+            process = ctx.Process(
+                target=_worker,
+                args=(child, self._shm.name, num_envs, group.tolist(), seed, max_turns, reward_config),
+                daemon=True,
+            )
+            process.start()
+            child.close()
+            self._conns.append(parent)
+            self._processes.append(process)
+
+    def reset(self, *, seed: Optional[int] = None) -> Tuple[VectorObservation, Dict[str, Any]]:
+        self._broadcast("reset", seed)
+        self._gather()
+        return self._observations(), {}
+
+    def step_async(self, actions: Sequence[int] | np.ndarray) -> None:
+        self._set_actions(actions)
+        self._broadcast("step", None)
+
+    def step_wait(self) -> VectorStepResult:
+        self._gather()
+        return self._step_result()
+
+    def step(self, actions: Sequence[int] | np.ndarray) -> VectorStepResult:
+        self.step_async(actions)
+        return self.step_wait()
+
+    def close(self) -> None:
+        if self._closed:
+            return
+        self._closed = True
+        for conn in self._conns:
+            try:
+                conn.send(("close", None))
+                conn.recv()
+            except (BrokenPipeError, EOFError):
+                pass
+            conn.close()
+        for process in self._processes:
+            process.join(timeout=5)
+        del self._buffers
+        self._shm.close()
+        self._shm.unlink()
+
+    def __del__(self) -> None:  # pragma: no cover - best effort cleanup
+        try:
+            self.close()
+        except Exception:
+            pass
+
+    def _broadcast(self, command: str, payload: Any) -> None:
+        if self._closed:
+            raise RuntimeError("Vector env is closed")
+        for conn in self._conns:
+            conn.send((command, payload))
+
+    def _gather(self) -> None:
+        errors = []
+        for conn in self._conns:
+            status, payload = conn.recv()
+            if status == "error":
+                errors.append(payload)
+        if errors:
+            raise errors[0]
+
+
+__all__ = ["AsyncBattleVectorEnv", "SyncBattleVectorEnv", "WINNER_CODES"]
@@ -0,0 +1,78 @@
+"""Match play, rating and agent evaluation tools built on :mod:`env`."""
+
+from .cache import (
+    CacheKey,
+    CacheLookup,
+    CacheStats,
+    MatchCache,
+    lookup,
+    play_cached,
+    ruleset_key,
+)
+from .league import INITIAL_ELO, AgentSnapshot, League, Rating
+from .match import (
+    DEFAULT_MAX_STEPS,
+    MatchJob,
+    MatchResult,
+    agent_fingerprint,
+    game_seed,
+    play_jobs,
+    play_match,
+)
+from .ratings import (
+    TrueSkillConfig,
+    elo_expected,
+    elo_update,
+    informative_pairings,
+    result_matrices,
+    trueskill_update,
+    win_probability,
+)
+from .sprt import (
+    ACCEPT_H0,
+    ACCEPT_H1,
+    INCONCLUSIVE,
+    EvaluationReport,
+    SequentialEvaluator,
+    SPRTConfig,
+    elo_to_score,
+    score_to_elo,
+    sprt_llr,
+)
+
+__all__ = [
+    "ACCEPT_H0",
+    "ACCEPT_H1",
+    "AgentSnapshot",
+    "CacheKey",
+    "CacheLookup",
+    "CacheStats",
+    "DEFAULT_MAX_STEPS",
+    "EvaluationReport",
+    "INCONCLUSIVE",
+    "INITIAL_ELO",
+    "League",
+    "MatchCache",
+    "MatchJob",
+    "MatchResult",
+    "Rating",
+    "SPRTConfig",
+    "SequentialEvaluator",
+    "TrueSkillConfig",
+    "agent_fingerprint",
+    "elo_expected",
+    "elo_to_score",
+    "elo_update",
+    "game_seed",
+    "informative_pairings",
+    "lookup",
+    "play_cached",
+    "play_jobs",
+    "play_match",
+    "result_matrices",
+    "ruleset_key",
+    "score_to_elo",
+    "sprt_llr",
+    "trueskill_update",
+    "win_probability",
+]
@@ -0,0 +1,220 @@
+"""Persistent cache of match results between frozen agents.
+
+Replays are deterministic: the same seed and the same actions give the same
+``state_hash``.  Matches between agents that are deterministic given the
+match seed (every agent in :mod:`agents` qualifies, since random agents are
+reseeded from it) therefore always end the same way, and re-running them in
+every evaluation job is wasted work.
+
+:class:`MatchCache` stores results in SQLite keyed by the content
+fingerprints of both agents (see :func:`~evaluation.match.agent_fingerprint`),
+the seed, a ruleset key and the step cap after which a game is scored as a
+draw.  :func:`ruleset_key` combines the session's
+``ruleset_version`` with :meth:`RuleRepository.fingerprint`, so editing the
+loaded rules changes the key and old results stop matching;
+:meth:`MatchCache.invalidate` removes them from the file.
+"""
+
+from __future__ import annotations
+
+import sqlite3
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, List, Mapping, Optional, Sequence, Tuple, Union
+
+from evaluation.match import DEFAULT_MAX_STEPS, MatchJob, MatchResult
+from rules.loader import RuleRepository
+
+#: Ruleset version used when callers do not name one.
+DEFAULT_RULESET_VERSION = "v0"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS match_results (
+    agent TEXT NOT NULL,
+    opponent TEXT NOT NULL,
+    seed INTEGER NOT NULL,
+    ruleset TEXT NOT NULL,
+    max_steps INTEGER NOT NULL,
+    score REAL NOT NULL,
+    turns INTEGER NOT NULL,
+    PRIMARY KEY (agent, opponent, seed, ruleset, max_steps)
+);
+CREATE INDEX IF NOT EXISTS match_results_ruleset ON match_results (ruleset);
+"""
+
+#: ``(agent, opponent, seed, ruleset, max_steps)``.
+CacheKey = Tuple[str, str, int, str, int]
+
+
+def ruleset_key(ruleset_version: str, repository: Optional[RuleRepository] = None) -> str:
+    """Ruleset component of a cache key, tied to the loaded rules when given."""
+
+    if repository is None:
+        return ruleset_version
+    return f"{ruleset_version}@{repository.fingerprint()}"
+
+
+@dataclass(frozen=True)
+class CacheStats:
+    hits: int
+    misses: int
+    entries: int
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+class MatchCache:
+    """SQLite-backed ``(agent, opponent, seed, ruleset, max_steps) -> result`` store."""
+
+    def __init__(self, path: Union[str, Path] = ":memory:") -> None:
+        self._conn = sqlite3.connect(str(path), check_same_thread=False)
+        self._conn.executescript(_SCHEMA)
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+
+    # ---- Public API
+    def get(self, key: CacheKey) -> Optional[Tuple[float, int]]:
+        """Return ``(score, turns)`` for ``key`` or ``None``."""
+
+        return self.get_many([key]).get(key)
+
+    def get_many(self, keys: Sequence[CacheKey]) -> Dict[CacheKey, Tuple[float, int]]:
+        found: Dict[CacheKey, Tuple[float, int]] = {}
+        with self._lock:
+            for key in keys:
+                row = self._conn.execute(
+                    "SELECT score, turns FROM match_results "
+                    "WHERE agent = ? AND opponent = ? AND seed = ? AND ruleset = ? AND max_steps = ?",
+                    key,
+                ).fetchone()
+                if row is not None:
+                    found[key] = (row[0], row[1])
+            self._hits += len(found)
+            self._misses += len(keys) - len(found)
+        return found
+
+    def put_many(self, entries: Sequence[Tuple[CacheKey, float, int]]) -> None:
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO match_results "
+                "(agent, opponent, seed, ruleset, max_steps, score, turns) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [(*key, score, turns) for key, score, turns in entries],
+            )
+
+    def invalidate(self, *, keep_ruleset: Optional[str] = None, ruleset: Optional[str] = None) -> int:
+        """Delete stale entries and return how many were removed.
+
+        ``keep_ruleset`` drops everything computed under any other ruleset;
+        ``ruleset`` drops one ruleset; with neither the cache is emptied.
+        """
+
+        with self._lock, self._conn:
+            if keep_ruleset is not None:
+                cursor = self._conn.execute(
+                    "DELETE FROM match_results WHERE ruleset != ?", (keep_ruleset,)
+                )
+            elif ruleset is not None:
+                cursor = self._conn.execute("DELETE FROM match_results WHERE ruleset = ?", (ruleset,))
+            else:
+                cursor = self._conn.execute("DELETE FROM match_results")
+            return cursor.rowcount
+
+    def stats(self) -> CacheStats:
+        with self._lock:
+            (entries,) = self._conn.execute("SELECT COUNT(*) FROM match_results").fetchone()
+            return CacheStats(hits=self._hits, misses=self._misses, entries=entries)
+
+    def close(self) -> None:
+        self._conn.close()
+
+    def __enter__(self) -> "MatchCache":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+
+@dataclass
+class CacheLookup:
+    """Jobs split into cached results and jobs that still need to be played."""
+
+    jobs: Sequence[MatchJob]
+    keys: List[CacheKey]
+    found: Dict[CacheKey, Tuple[float, int]]
+    cache: Optional[MatchCache]
+
+    @property
+    def missing(self) -> List[MatchJob]:
+        return [job for job, key in zip(self.jobs, self.keys) if key not in self.found]
+
+    def merge(self, played: Sequence[MatchResult]) -> List[MatchResult]:
+        """Combine cached and freshly ``played`` results (for :attr:`missing`, in
+        order) into job order, storing the fresh ones."""
+
+        fresh = iter(played)
+        results: List[MatchResult] = []
+        entries: List[Tuple[CacheKey, float, int]] = []
+        for job, key in zip(self.jobs, self.keys):
+            if key in self.found:
+                score, turns = self.found[key]
+                results.append(MatchResult(job.player_one, job.player_two, job.seed, score, turns))
+            else:
+                result = next(fresh)
+                results.append(result)
+                entries.append((key, result.score, result.turns))
+        if self.cache is not None and entries:
+            self.cache.put_many(entries)
+        return results
+
+
+def lookup(
+    jobs: Sequence[MatchJob],
+    *,
+    cache: Optional[MatchCache],
+    fingerprints: Mapping[str, str],
+    ruleset: str,
+    max_steps: int = DEFAULT_MAX_STEPS,
+) -> CacheLookup:
+    """Look ``jobs`` up in ``cache``; with no cache every job is missing."""
+
+    keys = [
+        (fingerprints[job.player_one], fingerprints[job.player_two], job.seed, ruleset, max_steps)
+        for job in jobs
+    ]
+    found = cache.get_many(keys) if cache is not None else {}
+    return CacheLookup(jobs=jobs, keys=keys, found=found, cache=cache)
+
+
+def play_cached(
+    jobs: Sequence[MatchJob],
+    play: Callable[[Sequence[MatchJob]], Sequence[MatchResult]],
+    *,
+    cache: Optional[MatchCache],
+    fingerprints: Mapping[str, str],
+    ruleset: str,
+    max_steps: int = DEFAULT_MAX_STEPS,
+) -> List[MatchResult]:
+    """Resolve ``jobs`` from ``cache`` and ``play`` only the misses, in job order."""
+
+    pending = lookup(
+        jobs, cache=cache, fingerprints=fingerprints, ruleset=ruleset, max_steps=max_steps
+    )
+    missing = pending.missing
+    return pending.merge(play(missing) if missing else [])
+
+
+__all__ = [
+    "CacheKey",
+    "CacheLookup",
+    "CacheStats",
+    "DEFAULT_RULESET_VERSION",
+    "MatchCache",
+    "lookup",
+    "play_cached",
+    "ruleset_key",
+]
@@ -0,0 +1,297 @@
+"""Opponent-pool league with persistent ratings.
+
+A :class:`League` keeps agent snapshots, schedules matches between them and
+rates the results with both Elo and TrueSkill.  Each round picks the pairings
+whose outcome is least predictable (see
+:func:`~evaluation.ratings.informative_pairings`), plays them on a process
+pool with seats alternating between games, and applies one batched rating
+update for the whole round.
+
+Everything lives in a SQLite file: snapshots (pickled), ratings, match
+results and the next game index.  Game seeds are derived from the league's
+master seed and that index, so reopening the file resumes the league exactly
+where it stopped.  An optional :class:`~evaluation.cache.MatchCache` is
+consulted before any game is simulated.
+"""
+
+from __future__ import annotations
+
+import os
+import pickle
+import sqlite3
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Sequence, Union
+
+import numpy as np
+
+from agents.base import BatchAgent
+from core.random_control import RNGStreams
+from evaluation.cache import (
+    DEFAULT_RULESET_VERSION,
+    MatchCache,
+    play_cached,
+    ruleset_key,
+)
+from evaluation.match import (
+    DEFAULT_MAX_STEPS,
+    MatchJob,
+    MatchResult,
+    agent_fingerprint,
+    game_seed,
+    play_jobs,
+)
+from evaluation.ratings import (
+    TrueSkillConfig,
+    elo_update,
+    informative_pairings,
+    result_matrices,
+    trueskill_update,
+)
+from rules.loader import RuleRepository
+
+#: Elo rating given to new snapshots.
+INITIAL_ELO = 1500.0
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS agents (
+    name TEXT PRIMARY KEY,
+    fingerprint TEXT NOT NULL,
+    payload BLOB NOT NULL,
+    created REAL NOT NULL,
+    elo REAL NOT NULL,
+    mu REAL NOT NULL,
+    sigma REAL NOT NULL,
+    games INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS matches (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    player_one TEXT NOT NULL REFERENCES agents(name),
+    player_two TEXT NOT NULL REFERENCES agents(name),
+    seed INTEGER NOT NULL,
+    score REAL NOT NULL,
+    turns INTEGER NOT NULL
+);
+"""
+
+
+@dataclass(frozen=True)
+class AgentSnapshot:
+    """A frozen agent registered in the league."""
+
+    name: str
+    agent: BatchAgent
+    fingerprint: str
+    created: float
+
+
+@dataclass(frozen=True)
+class Rating:
+    """Current ratings of one snapshot."""
+
+    name: str
+    elo: float
+    mu: float
+    sigma: float
+    games: int
+
+    @property
+    def conservative(self) -> float:
+        """TrueSkill skill estimate that is exceeded with ~99% probability."""
+
+        return self.mu - 3.0 * self.sigma
+
+
+class League:
+    """Schedules, plays and rates matches between agent snapshots."""
+
+    def __init__(
+        self,
+        path: Union[str, Path] = ":memory:",
+        *,
+        master_seed: Optional[int] = None,
+        workers: Optional[int] = None,
+        elo_k: float = 16.0,
+        trueskill: TrueSkillConfig = TrueSkillConfig(),
+        max_steps: int = DEFAULT_MAX_STEPS,
+        cache: Optional[MatchCache] = None,
+        ruleset_version: str = DEFAULT_RULESET_VERSION,
+        rules: Optional[RuleRepository] = None,
+    ) -> None:
+        self._conn = sqlite3.connect(str(path))
+        self._conn.executescript(_SCHEMA)
+        self._workers = workers
+        self._elo_k = elo_k
+        self._trueskill = trueskill
+        self._max_steps = max_steps
+        self._cache = cache
+        self._ruleset = ruleset_key(ruleset_version, rules)
+        self._snapshots: Dict[str, AgentSnapshot] = {}
+
+        stored_seed = self._meta("master_seed")
+        if stored_seed is not None:
+            self.master_seed = int(stored_seed)
+        else:
+            self.master_seed = RNGStreams(master_seed).master_seed
+            self._set_meta("master_seed", str(self.master_seed))
+            self._set_meta("next_game", "0")
+            self._conn.commit()
+        for name, fingerprint, payload, created in self._conn.execute(
+            "SELECT name, fingerprint, payload, created FROM agents ORDER BY created, name"
+        ):
+            self._snapshots[name] = AgentSnapshot(name, pickle.loads(payload), fingerprint, created)
+
+    # ---- Public API
+    @property
+    def names(self) -> List[str]:
+        return list(self._snapshots)
+
+    def snapshot(self, name: str) -> AgentSnapshot:
+        return self._snapshots[name]
+
+    def add_snapshot(self, name: str, agent: BatchAgent) -> AgentSnapshot:
+        """Freeze ``agent`` into the pool under ``name``."""
+
+        if name in self._snapshots:
+            raise ValueError(f"Snapshot {name!r} already exists")
+        payload = pickle.dumps(agent)
+        snapshot = AgentSnapshot(name, pickle.loads(payload), agent_fingerprint(agent), time.time())
+        with self._conn:
+            self._conn.execute(
+                "INSERT INTO agents (name, fingerprint, payload, created, elo, mu, sigma) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (
+                    name,
+                    snapshot.fingerprint,
+                    payload,
+                    snapshot.created,
+                    INITIAL_ELO,
+                    self._trueskill.mu,
+                    self._trueskill.sigma,
+                ),
+            )
+        self._snapshots[name] = snapshot
+        return snapshot
+
+    def ratings(self) -> List[Rating]:
+        """All ratings, best conservative TrueSkill estimate first."""
+
+        rows = self._conn.execute("SELECT name, elo, mu, sigma, games FROM agents").fetchall()
+        ratings = [Rating(*row) for row in rows]
+        return sorted(ratings, key=lambda rating: rating.conservative, reverse=True)
+
+    def results(self) -> List[MatchResult]:
+        rows = self._conn.execute(
+            "SELECT player_one, player_two, seed, score, turns FROM matches ORDER BY id"
+        ).fetchall()
+        return [MatchResult(*row) for row in rows]
+
+    def schedule(self, num_pairings: int, games_per_pairing: int) -> List[MatchJob]:
+        """Plan the next round: informative pairings, alternating seats."""
+
+        if games_per_pairing <= 0:
+            raise ValueError("games_per_pairing must be positive")
+        names = self.names
+        ratings = {rating.name: rating for rating in self.ratings()}
+        mu = np.array([ratings[name].mu for name in names])
+        sigma = np.array([ratings[name].sigma for name in names])
+        pairings = informative_pairings(mu, sigma, num_pairings, self._trueskill)
+
+        next_game = int(self._meta("next_game") or 0)
+        jobs: List[MatchJob] = []
+        for first, second in pairings:
+            for game in range(games_per_pairing):
+                seats = (names[first], names[second]) if game % 2 == 0 else (names[second], names[first])
+                jobs.append(MatchJob(*seats, seed=game_seed(self.master_seed, next_game)))
+                next_game += 1
+        return jobs
+
+    def play(self, jobs: Sequence[MatchJob]) -> List[MatchResult]:
+        """Play ``jobs``, record the results and update all ratings in one batch."""
+
+        fingerprints = {name: snapshot.fingerprint for name, snapshot in self._snapshots.items()}
+        results = play_cached(
+            jobs,
+            lambda missing: list(self._play(missing)),
+            cache=self._cache,
+            fingerprints=fingerprints,
+            ruleset=self._ruleset,
+            max_steps=self._max_steps,
+        )
+        self.record(results, games_scheduled=len(jobs))
+        return results
+
+    def run_round(self, *, num_pairings: int = 4, games_per_pairing: int = 8) -> List[MatchResult]:
+        return self.play(self.schedule(num_pairings, games_per_pairing))
+
+    def record(self, results: Sequence[MatchResult], *, games_scheduled: Optional[int] = None) -> None:
+        """Persist ``results`` and apply the round's Elo and TrueSkill updates."""
+
+        if not results:
+            return
+        names = self.names
+        index = {name: idx for idx, name in enumerate(names)}
+        current = {rating.name: rating for rating in self.ratings()}
+        elo = np.array([current[name].elo for name in names])
+        mu = np.array([current[name].mu for name in names])
+        sigma = np.array([current[name].sigma for name in names])
+
+        scores, games = result_matrices(results, index)
+        elo = elo_update(elo, scores, games, k=self._elo_k)
+        first = np.array([index[result.player_one] for result in results])
+        second = np.array([index[result.player_two] for result in results])
+        outcome = np.array([result.score for result in results])
+        mu, sigma = trueskill_update(mu, sigma, first, second, outcome, self._trueskill)
+        played = games.sum(axis=1)
+
+        with self._conn:
+            self._conn.executemany(
+                "INSERT INTO matches (player_one, player_two, seed, score, turns) VALUES (?, ?, ?, ?, ?)",
+                [(r.player_one, r.player_two, r.seed, r.score, r.turns) for r in results],
+            )
+            self._conn.executemany(
+                "UPDATE agents SET elo = ?, mu = ?, sigma = ?, games = games + ? WHERE name = ?",
+                [
+                    (float(elo[idx]), float(mu[idx]), float(sigma[idx]), int(played[idx]), name)
+                    for idx, name in enumerate(names)
+                ],
+            )
+            advance = games_scheduled if games_scheduled is not None else len(results)
+            next_game = int(self._meta("next_game") or 0) + advance
+            self._set_meta("next_game", str(next_game))
+
+    def close(self) -> None:
+        self._conn.close()
+
+    def __enter__(self) -> "League":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    # ---- Internals
+    def _play(self, jobs: Sequence[MatchJob]) -> Iterator[MatchResult]:
+        agents = {name: snapshot.agent for name, snapshot in self._snapshots.items()}
+        if self._workers == 0:
+            yield from play_jobs(agents, jobs, self._max_steps)
+            return
+        workers = self._workers or os.cpu_count() or 1
+        size = max(1, -(-len(jobs) // workers))
+        chunks = [list(jobs[start : start + size]) for start in range(0, len(jobs), size)]
+        with ProcessPoolExecutor(max_workers=max(1, min(workers, len(chunks)))) as pool:
+            futures = [pool.submit(play_jobs, agents, chunk, self._max_steps) for chunk in chunks]
+            for future in futures:
+                yield from future.result()
+
+    def _meta(self, key: str) -> Optional[str]:
+        row = self._conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def _set_meta(self, key: str, value: str) -> None:
+        self._conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, value))
+
+
+__all__ = ["AgentSnapshot", "INITIAL_ELO", "League", "Rating"]
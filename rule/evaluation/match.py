@@ -0,0 +1,136 @@
+"""Head-to-head matches between batch agents on :class:`BattleEnv`.
+
+A match is fully determined by its seed: the environment draws from
+``StreamKey(seed)`` and agents that expose ``reseed(seed)`` are reseeded from
+streams derived from the same seed, so replaying a :class:`MatchJob` always
+produces the same :class:`MatchResult`.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import pickle
+from dataclasses import dataclass
+from typing import Any, List, Mapping, Sequence
+
+import numpy as np
+
+from agents.base import NO_ACTION, BatchAgent
+from core.random_control import StreamKey
+from core.state_machine import PlayerSide
+from env.battle_env import BattleEnv
+
+#: Step cap after which an unfinished match is scored as a draw.
+DEFAULT_MAX_STEPS = 1_000
+
+_SEATS = (PlayerSide.PLAYER_ONE, PlayerSide.PLAYER_TWO)
+
+
+@dataclass(frozen=True)
+class MatchJob:
+    """One game to play: ``player_one`` takes the first seat."""
+
+    player_one: str
+    player_two: str
+    seed: int
+
+
+@dataclass(frozen=True)
+class MatchResult:
+    """Outcome of a :class:`MatchJob`.
+
+    ``score`` is from ``player_one``'s point of view: 1 for a win, 0.5 for a
+    draw (including games stopped at the step cap) and 0 for a loss.
+    """
+
+    player_one: str
+    player_two: str
+    seed: int
+    score: float
+    turns: int
+
+
+def agent_fingerprint(agent: Any) -> str:
+    """Content hash of an agent, used to recognise identical snapshots.
+
+    Agents may define ``fingerprint()`` (for example hashing only their
+    weights); otherwise the pickled agent is hashed.
+    """
+
+    custom = getattr(agent, "fingerprint", None)
+    if callable(custom):
+        return str(custom())
+    return hashlib.blake2b(pickle.dumps(agent), digest_size=16).hexdigest()
+
+
+def game_seed(master_seed: int, index: int) -> int:
+    """Derive the seed of game ``index`` in a series; fits in a signed 64-bit column."""
+
+    state = StreamKey(master_seed, env_index=index).seed_sequence().generate_state(1, np.uint64)
+    return int(state[0] >> np.uint64(1))
+
+
+def play_match(
+    agent_one: BatchAgent,
+    agent_two: BatchAgent,
+    seed: int,
+    *,
+    max_steps: int = DEFAULT_MAX_STEPS,
+    names: Sequence[str] = ("player_one", "player_two"),
+) -> MatchResult:
+    """Play one game with ``agent_one`` in the first seat."""
+
+    agents = {seat: agent for seat, agent in zip(_SEATS, (agent_one, agent_two))}
+    for worker_id, agent in enumerate((agent_one, agent_two), start=1):
+        reseed = getattr(agent, "reseed", None)
+        if callable(reseed):
+            reseed(int(StreamKey(seed, worker_id=worker_id).seed_sequence().generate_state(1)[0]))
+
+    env = BattleEnv(rng_key=StreamKey(seed))
+    env.reset()
+    for _ in range(max_steps):
+        if env.done:
+            break
+        mask = env.action_mask()
+        action = int(agents[env.active_player].act_batch(env.encode_observation()[None], mask[None])[0])
+        if action == NO_ACTION or not mask[action]:
+            raise ValueError(f"Agent chose illegal action {action} in match seed {seed}")
+        env.step_index(action)
+
+    if env.winner is PlayerSide.PLAYER_ONE:
+        score = 1.0
+    elif env.winner is PlayerSide.PLAYER_TWO:
+        score = 0.0
+    else:
+        score = 0.5
+    return MatchResult(
+        player_one=names[0], player_two=names[1], seed=seed, score=score, turns=env.turn_number
+    )
+
+
+def play_jobs(
+    agents: Mapping[str, BatchAgent], jobs: Sequence[MatchJob], max_steps: int = DEFAULT_MAX_STEPS
+) -> List[MatchResult]:
+    """Play ``jobs`` in order; the unit of work sent to pool workers."""
+
+    return [
+        play_match(
+            agents[job.player_one],
+            agents[job.player_two],
+            job.seed,
+            max_steps=max_steps,
+            names=(job.player_one, job.player_two),
+        )
+        for job in jobs
+    ]
+
+
+__all__ = [
+    "DEFAULT_MAX_STEPS",
+    "MatchJob",
+    "MatchResult",
+    "agent_fingerprint",
+    "game_seed",
+    "play_jobs",
+    "play_match",
+]
@@ -0,0 +1,216 @@
+"""Vectorised Elo and TrueSkill updates over batches of match results.
+
+Elo updates from a whole round of results at once: every game is evaluated
+against the ratings from the start of the round and the per-player
+adjustments are summed with ``np.add.at``.  This keeps an update over
+thousands of games to a handful of array operations and makes the result
+independent of the order in which games finished.
+
+TrueSkill cannot be summed that way, because every game shrinks the
+variance the next game is weighted with.  :func:`trueskill_update` instead
+splits the games into waves in which no player appears twice and updates
+one wave at a time, which gives exactly the result of applying the games
+one after another.
+"""
+
+from __future__ import annotations
+
+import math
+from dataclasses import dataclass
+from statistics import NormalDist
+from typing import Iterable, List, Mapping, Tuple
+
+import numpy as np
+
+from evaluation.match import MatchResult
+
+_erfc = np.vectorize(math.erfc, otypes=[np.float64])
+_SQRT2 = math.sqrt(2.0)
+
+
+def _norm_pdf(x: np.ndarray) -> np.ndarray:
+    return np.exp(-0.5 * x * x) / math.sqrt(2.0 * math.pi)
+
+
+def _norm_cdf(x: np.ndarray) -> np.ndarray:
+    return 0.5 * _erfc(-x / _SQRT2)
+
+
+# ---- Elo
+
+
+def elo_expected(ratings_a: np.ndarray, ratings_b: np.ndarray) -> np.ndarray:
+    """Expected score of ``a`` against ``b`` under the logistic Elo model."""
+
+    return 1.0 / (1.0 + np.power(10.0, (np.asarray(ratings_b) - np.asarray(ratings_a)) / 400.0))
+
+
+def result_matrices(
+    results: Iterable[MatchResult], index: Mapping[str, int]
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Return ``(scores, games)`` matrices for ``results``.
+
+    ``scores[i, j]`` is the total score player ``i`` earned against ``j`` and
+    ``games[i, j]`` the number of games they played, in either seat.
+    """
+
+    rows = [(index[r.player_one], index[r.player_two], r.score) for r in results]
+    size = len(index)
+    scores = np.zeros((size, size), dtype=np.float64)
+    games = np.zeros((size, size), dtype=np.float64)
+    if not rows:
+        return scores, games
+    first, second, score = (np.asarray(column) for column in zip(*rows))
+    np.add.at(scores, (first, second), score)
+    np.add.at(scores, (second, first), 1.0 - score)
+    np.add.at(games, (first, second), 1.0)
+    np.add.at(games, (second, first), 1.0)
+    return scores, games
+
+
+def elo_update(
+    ratings: np.ndarray, scores: np.ndarray, games: np.ndarray, *, k: float = 16.0
+) -> np.ndarray:
+    """Apply one batched Elo update over a full result matrix."""
+
+    ratings = np.asarray(ratings, dtype=np.float64)
+    expected = elo_expected(ratings[:, None], ratings[None, :])
+    return ratings + k * (scores - games * expected).sum(axis=1)
+
+
+# ---- TrueSkill
+
+
+@dataclass(frozen=True)
+class TrueSkillConfig:
+    """Parameters of the two-player TrueSkill model."""
+
+    mu: float = 25.0
+    sigma: float = 25.0 / 3.0
+    beta: float = 25.0 / 6.0
+    tau: float = 25.0 / 300.0
+    draw_probability: float = 0.02
+
+    @property
+    def draw_margin(self) -> float:
+        return NormalDist().inv_cdf((self.draw_probability + 1.0) / 2.0) * _SQRT2 * self.beta
+
+
+def _win_factors(t: np.ndarray, eps: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    x = t - eps
+    v = _norm_pdf(x) / np.maximum(_norm_cdf(x), 1e-300)
+    return v, v * (v + x)
+
+
+def _draw_factors(t: np.ndarray, eps: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    upper, lower = eps - t, -eps - t
+    denom = np.maximum(_norm_cdf(upper) - _norm_cdf(lower), 1e-300)
+    v = (_norm_pdf(lower) - _norm_pdf(upper)) / denom
+    w = v * v + (upper * _norm_pdf(upper) - lower * _norm_pdf(lower)) / denom
+    return v, w
+
+
+def trueskill_update(
+    mu: np.ndarray,
+    sigma: np.ndarray,
+    first: np.ndarray,
+    second: np.ndarray,
+    scores: np.ndarray,
+    config: TrueSkillConfig = TrueSkillConfig(),
+) -> Tuple[np.ndarray, np.ndarray]:
+    """TrueSkill update for games ``first[g]`` vs ``second[g]``, in order.
+
+    ``scores`` holds ``first``'s score (1, 0.5 or 0).  Returns new
+    ``(mu, sigma)`` arrays equal to those of updating game by game; games
+    without a player in common are updated together.
+    """
+
+    mu = np.array(mu, dtype=np.float64)
+    var = np.array(sigma, dtype=np.float64) ** 2
+    first = np.asarray(first, dtype=np.int64)
+    second = np.asarray(second, dtype=np.int64)
+    scores = np.asarray(scores, dtype=np.float64)
+
+    # Orient every game from the winner's point of view; draws keep their order.
+    swap = scores < 0.5
+    winner = np.where(swap, second, first)
+    loser = np.where(swap, first, second)
+    draw = scores == 0.5
+
+    waves = _waves(first, second, len(mu))
+    order = np.argsort(waves, kind="stable")
+    bounds = np.flatnonzero(np.diff(waves[order])) + 1
+    for games in np.split(order, bounds) if order.size else ():
+        win, lose = winner[games], loser[games]
+        var_win = var[win] + config.tau**2
+        var_lose = var[lose] + config.tau**2
+        c2 = 2.0 * config.beta**2 + var_win + var_lose
+        c = np.sqrt(c2)
+        t = (mu[win] - mu[lose]) / c
+        eps = config.draw_margin / c
+        v_win, w_win = _win_factors(t, eps)
+        v_draw, w_draw = _draw_factors(t, eps)
+        v = np.where(draw[games], v_draw, v_win)
+        w = np.where(draw[games], w_draw, w_win)
+        mu[win] += var_win / c * v
+        mu[lose] -= var_lose / c * v
+        var[win] = var_win * (1.0 - var_win / c2 * w)
+        var[lose] = var_lose * (1.0 - var_lose / c2 * w)
+    return mu, np.sqrt(var)
+
+
+def _waves(first: np.ndarray, second: np.ndarray, players: int) -> np.ndarray:
+    """Earliest wave of every game such that each player's games keep their order."""
+
+    next_wave = [0] * players
+    waves = np.empty(first.size, dtype=np.int64)
+    for game, (a, b) in enumerate(zip(first.tolist(), second.tolist())):
+        wave = max(next_wave[a], next_wave[b])
+        waves[game] = wave
+        next_wave[a] = next_wave[b] = wave + 1
+    return waves
+
+
+def win_probability(
+    mu: np.ndarray, sigma: np.ndarray, config: TrueSkillConfig = TrueSkillConfig()
+) -> np.ndarray:
+    """Matrix of TrueSkill win probabilities of row player against column player."""
+
+    var = np.asarray(sigma, dtype=np.float64) ** 2
+    spread = np.sqrt(2.0 * config.beta**2 + var[:, None] + var[None, :])
+    return _norm_cdf((mu[:, None] - mu[None, :]) / spread)
+
+
+def informative_pairings(
+    mu: np.ndarray,
+    sigma: np.ndarray,
+    count: int,
+    config: TrueSkillConfig = TrueSkillConfig(),
+) -> List[Tuple[int, int]]:
+    """Return up to ``count`` pairs ``(i, j)`` whose next game is most informative.
+
+    A pairing scores ``p (1 - p) (sigma_i^2 + sigma_j^2)``: close matches
+    between uncertain players move the ratings the most per game played.
+    """
+
+    size = len(mu)
+    if size < 2 or count <= 0:
+        return []
+    p = win_probability(np.asarray(mu, dtype=np.float64), sigma, config)
+    var = np.asarray(sigma, dtype=np.float64) ** 2
+    info = p * (1.0 - p) * (var[:, None] + var[None, :])
+    rows, cols = np.triu_indices(size, k=1)
+    values = info[rows, cols]
+    top = np.argsort(-values, kind="stable")[:count]
+    return [(int(rows[idx]), int(cols[idx])) for idx in top]
+
+
+__all__ = [
+    "TrueSkillConfig",
+    "elo_expected",
+    "elo_update",
+    "informative_pairings",
+    "result_matrices",
+    "trueskill_update",
+    "win_probability",
+]
@@ -0,0 +1,325 @@
+"""Sequential win-rate testing between two agents.
+
+Instead of a fixed, conservatively large number of games, the evaluator plays
+games in small batches and stops as soon as the evidence is conclusive:
+
+* ``method="sprt"`` runs a generalised sequential probability ratio test of
+  ``H0: elo = elo0`` against ``H1: elo = elo1`` with error rates ``alpha`` and
+  ``beta`` (the normal approximation used by engine-testing frameworks);
+* ``method="confidence"`` stops once the confidence interval of the score
+  excludes 0.5.
+
+Games are played in *mirrored pairs*: both games of a pair share a seed and
+the agents swap seats, which cancels most of the luck of the draw.  The pair
+average is the unit of observation.  Batches run on a process pool and are
+consumed in submission order, so a run is reproducible for a given master
+seed; outstanding batches are cancelled as soon as a verdict is reached.
+With a :class:`~evaluation.cache.MatchCache`, games already played between
+the same agent versions are read back instead of simulated.
+"""
+
+from __future__ import annotations
+
+import math
+import os
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from contextlib import closing
+from dataclasses import dataclass
+from statistics import NormalDist
+from typing import Deque, Generator, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from agents.base import BatchAgent
+from core.random_control import RNGStreams
+from evaluation.cache import (
+    DEFAULT_RULESET_VERSION,
+    CacheLookup,
+    MatchCache,
+    lookup,
+    ruleset_key,
+)
+from evaluation.match import (
+    DEFAULT_MAX_STEPS,
+    MatchJob,
+    MatchResult,
+    agent_fingerprint,
+    game_seed,
+    play_jobs,
+)
+from rules.loader import RuleRepository
+
+ACCEPT_H0 = "H0"
+ACCEPT_H1 = "H1"
+INCONCLUSIVE = "inconclusive"
+
+_CANDIDATE = "candidate"
+_BASELINE = "baseline"
+#: Pairs played before any verdict; a few pairs say little about a win rate.
+_MIN_PAIRS = 30
+#: Weight, in pairs, of the prior variance the observed variance is shrunk toward.
+_PRIOR_PAIRS = 16
+
+
+def elo_to_score(elo: float) -> float:
+    return 1.0 / (1.0 + 10.0 ** (-elo / 400.0))
+
+
+def score_to_elo(score: float) -> float:
+    score = min(max(score, 1e-6), 1.0 - 1e-6)
+    return -400.0 * math.log10(1.0 / score - 1.0)
+
+
+@dataclass(frozen=True)
+class SPRTConfig:
+    """Hypotheses and error rates of the test."""
+
+    elo0: float = 0.0
+    elo1: float = 10.0
+    alpha: float = 0.05
+    beta: float = 0.05
+
+    @property
+    def lower_bound(self) -> float:
+        return math.log(self.beta / (1.0 - self.alpha))
+
+    @property
+    def upper_bound(self) -> float:
+        return math.log((1.0 - self.beta) / self.alpha)
+
+
+def prior_variance(config: SPRTConfig, games: int = 2) -> float:
+    """Variance of the mean of ``games`` decisive games scoring between the hypotheses."""
+
+    score = 0.5 * (elo_to_score(config.elo0) + elo_to_score(config.elo1))
+    return score * (1.0 - score) / games
+
+
+def shrunk_variance(scores: np.ndarray, prior: float, weight: float) -> float:
+    """Sample variance of ``scores`` shrunk toward ``prior`` held with ``weight`` samples.
+
+    A handful of identical results would otherwise claim near-zero variance
+    and make any test conclusive.
+    """
+
+    n = len(scores)
+    sample = float(np.var(scores)) if n else 0.0
+    return (n * sample + weight * prior) / (n + weight)
+
+
+def sprt_llr(pair_scores: np.ndarray, config: SPRTConfig) -> float:
+    """Log-likelihood ratio of ``H1`` over ``H0`` for mean pair scores in ``[0, 1]``.
+
+    The pair-score variance is shrunk toward :func:`prior_variance`.
+    """
+
+    n = len(pair_scores)
+    if n == 0:
+        return 0.0
+    mean = float(np.mean(pair_scores))
+    var = shrunk_variance(np.asarray(pair_scores), prior_variance(config), _PRIOR_PAIRS)
+    s0, s1 = elo_to_score(config.elo0), elo_to_score(config.elo1)
+    return n * (s1 - s0) * (2.0 * mean - s0 - s1) / (2.0 * var)
+
+
+@dataclass(frozen=True)
+class EvaluationReport:
+    """Outcome of :meth:`SequentialEvaluator.run`.
+
+    ``score`` is the candidate's mean score and ``interval`` its confidence
+    interval.  ``fixed_games`` is the number of unpaired games a fixed-size
+    test with the same error rates would need at the observed per-game score
+    variance.
+    """
+
+    verdict: str
+    games: int
+    score: float
+    interval: tuple[float, float]
+    llr: float
+    fixed_games: int
+
+    @property
+    def elo(self) -> float:
+        return score_to_elo(self.score)
+
+    @property
+    def games_saved(self) -> int:
+        return max(0, self.fixed_games - self.games)
+
+
+class SequentialEvaluator:
+    """Plays mirrored game pairs until a sequential test reaches a verdict."""
+
+    def __init__(
+        self,
+        candidate: BatchAgent,
+        baseline: BatchAgent,
+        *,
+        config: SPRTConfig = SPRTConfig(),
+        method: str = "sprt",
+        confidence: float = 0.95,
+        max_games: int = 10_000,
+        pairs_per_batch: int = 8,
+        workers: Optional[int] = None,
+        master_seed: Optional[int] = None,
+        max_steps: int = DEFAULT_MAX_STEPS,
+        cache: Optional[MatchCache] = None,
+        ruleset_version: str = DEFAULT_RULESET_VERSION,
+        rules: Optional[RuleRepository] = None,
+    ) -> None:
+        if method not in ("sprt", "confidence"):
+            raise ValueError(f"Unknown method {method!r}")
+        if max_games < 2 or pairs_per_batch <= 0:
+            raise ValueError("max_games must be at least 2 and pairs_per_batch positive")
+        self._agents = {_CANDIDATE: candidate, _BASELINE: baseline}
+        self._config = config
+        self._method = method
+        self._z = NormalDist().inv_cdf(0.5 + confidence / 2.0)
+        self._max_pairs = max_games // 2
+        self._pairs_per_batch = pairs_per_batch
+        self._workers = workers
+        self._master_seed = RNGStreams(master_seed).master_seed
+        self._max_steps = max_steps
+        self._cache = cache
+        self._ruleset = ruleset_key(ruleset_version, rules)
+        self._fingerprints = {name: agent_fingerprint(agent) for name, agent in self._agents.items()}
+
+    # ---- Public API
+    def jobs(self, pair_index: int) -> List[MatchJob]:
+        """The two mirrored games of pair ``pair_index``."""
+
+        seed = game_seed(self._master_seed, pair_index)
+        return [MatchJob(_CANDIDATE, _BASELINE, seed), MatchJob(_BASELINE, _CANDIDATE, seed)]
+
+    def run(self) -> EvaluationReport:
+        pair_scores: List[float] = []
+        game_scores: List[float] = []
+        report = self._report(pair_scores, game_scores, INCONCLUSIVE)
+        # Closing the generator cancels the batches still queued in the pool.
+        with closing(self._batches()) as batches:
+            for results in batches:
+                for first, second in zip(results[::2], results[1::2]):
+                    game_scores.extend((first.score, 1.0 - second.score))
+                    pair_scores.append(0.5 * (game_scores[-2] + game_scores[-1]))
+                report = self._report(pair_scores, game_scores, self._verdict(pair_scores))
+                if report.verdict != INCONCLUSIVE:
+                    break
+        return report
+
+    # ---- Internals
+    def _batch_jobs(self) -> Iterator[List[MatchJob]]:
+        for start in range(0, self._max_pairs, self._pairs_per_batch):
+            stop = min(start + self._pairs_per_batch, self._max_pairs)
+            yield [job for pair in range(start, stop) for job in self.jobs(pair)]
+
+    def _lookup(self, jobs: List[MatchJob]) -> CacheLookup:
+        return lookup(
+            jobs,
+            cache=self._cache,
+            fingerprints=self._fingerprints,
+            ruleset=self._ruleset,
+            max_steps=self._max_steps,
+        )
+
+    def _batches(self) -> Generator[List[MatchResult], None, None]:
+        if self._workers == 0:
+            for jobs in self._batch_jobs():
+                pending_lookup = self._lookup(jobs)
+                missing = pending_lookup.missing
+                yield pending_lookup.merge(
+                    play_jobs(self._agents, missing, self._max_steps) if missing else []
+                )
+            return
+
+        workers = self._workers or os.cpu_count() or 1
+        batches = self._batch_jobs()
+        pending: Deque[Tuple[CacheLookup, Optional[Future]]] = deque()
+        # No ``with`` block: leaving it would wait for every in-flight batch
+        # even after a verdict has been reached.
+        pool = ProcessPoolExecutor(max_workers=workers)
+
+        def submit(jobs: List[MatchJob]) -> None:
+            batch_lookup = self._lookup(jobs)
+            missing = batch_lookup.missing
+            future = (
+                pool.submit(play_jobs, self._agents, missing, self._max_steps) if missing else None
+            )
+            pending.append((batch_lookup, future))
+
+        try:
+            for jobs in batches:
+                submit(jobs)
+                if len(pending) >= 2 * workers:
+                    break
+            while pending:
+                batch_lookup, future = pending.popleft()
+                results = batch_lookup.merge(future.result() if future is not None else [])
+                next_jobs = next(batches, None)
+                if next_jobs is not None:
+                    submit(next_jobs)
+                yield results
+        finally:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    def _verdict(self, pair_scores: Sequence[float]) -> str:
+        if len(pair_scores) < _MIN_PAIRS:
+            return INCONCLUSIVE
+        if self._method == "sprt":
+            llr = sprt_llr(np.asarray(pair_scores), self._config)
+            if llr >= self._config.upper_bound:
+                return ACCEPT_H1
+            if llr <= self._config.lower_bound:
+                return ACCEPT_H0
+            return INCONCLUSIVE
+        low, high = self._interval(np.asarray(pair_scores))
+        if low > 0.5:
+            return ACCEPT_H1
+        if high < 0.5:
+            return ACCEPT_H0
+        return INCONCLUSIVE
+
+    def _interval(self, scores: np.ndarray) -> tuple[float, float]:
+        mean = float(scores.mean())
+        var = shrunk_variance(scores, prior_variance(self._config), _PRIOR_PAIRS)
+        half = self._z * math.sqrt(var / len(scores))
+        return mean - half, mean + half
+
+    def _fixed_games(self, scores: np.ndarray) -> int:
+        config = self._config
+        normal = NormalDist()
+        z = normal.inv_cdf(1.0 - config.alpha) + normal.inv_cdf(1.0 - config.beta)
+        delta = abs(elo_to_score(config.elo1) - elo_to_score(config.elo0))
+        var = shrunk_variance(scores, prior_variance(config, games=1), 2 * _PRIOR_PAIRS)
+        return math.ceil(z * z * var / (delta * delta))
+
+    def _report(
+        self, pair_scores: Sequence[float], game_scores: Sequence[float], verdict: str
+    ) -> EvaluationReport:
+        scores = np.asarray(pair_scores, dtype=np.float64)
+        if len(scores) == 0:
+            return EvaluationReport(INCONCLUSIVE, 0, 0.5, (0.0, 1.0), 0.0, 0)
+        return EvaluationReport(
+            verdict=verdict,
+            games=2 * len(scores),
+            score=float(scores.mean()),
+            interval=self._interval(scores),
+            llr=sprt_llr(scores, self._config),
+            fixed_games=self._fixed_games(np.asarray(game_scores, dtype=np.float64)),
+        )
+
+
+__all__ = [
+    "ACCEPT_H0",
+    "ACCEPT_H1",
+    "EvaluationReport",
+    "INCONCLUSIVE",
+    "SPRTConfig",
+    "SequentialEvaluator",
+    "elo_to_score",
+    "prior_variance",
+    "score_to_elo",
+    "shrunk_variance",
+    "sprt_llr",
+]
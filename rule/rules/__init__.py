@@ -1,5 +1,7 @@
 """Public package interface for the rules/IR subsystem."""
 
+from .effects import MutationJournal
+from .events import EVENT_DTYPE, EventKind, EventLog
 from .engine import EffectContext, RuleEngine
 from .errors import (
     EffectExecutionError,
@@ -9,6 +11,7 @@ from .errors import (
     RuleVersionMismatchError,
 )
 from .loader import RuleRepository
+from .state import CowDict, CowList, CowState, StaleViewError, state_store
 from .schema import (
     AtomicEffect,
     CardRule,
@@ -21,24 +24,38 @@ from .schema import (
     TriggerType,
     get_ir_json_schema,
 )
+from .text_index import CardTextIndex, CompiledRuleCache, TextEntry, TextReference
 
 __all__ = [
     "AtomicEffect",
     "CardRule",
+    "CardTextIndex",
+    "CompiledRuleCache",
     "Condition",
+    "CowDict",
+    "CowList",
+    "CowState",
     "EffectContext",
     "EffectExecutionError",
     "EffectNode",
+    "EVENT_DTYPE",
+    "EventKind",
+    "EventLog",
     "GateEffect",
     "IRValidationError",
     "Modifier",
+    "MutationJournal",
     "OncePerTurnViolation",
     "RuleEngine",
     "RuleNotFoundError",
     "RuleRepository",
     "RuleVersionMismatchError",
     "SequenceEffect",
+    "StaleViewError",
+    "TextEntry",
+    "TextReference",
     "Trigger",
     "TriggerType",
     "get_ir_json_schema",
+    "state_store",
 ]
@@ -2,9 +2,13 @@
 
 from __future__ import annotations
 
-from typing import Any, Dict, MutableMapping, Optional, Protocol, TypeVar
+from collections.abc import MutableMapping, MutableSequence
+from typing import Any, Callable, Dict, Optional, Protocol, TypeVar, overload
+
+import numpy as np
 
 from .errors import EffectExecutionError
+from .events import EventKind
 
 if False:  # pragma: no cover - typing only
     from .engine import EffectContext
@@ -20,13 +24,39 @@ class EffectHandler(Protocol):
 HandlerT = TypeVar("HandlerT", bound=EffectHandler)
 
 
+class MutationJournal(Protocol):
+    """Undo log the built-in handlers record their mutations in.
+
+    :class:`core.journal.UndoJournal` implements it; set
+    :attr:`EffectContext.journal <rules.engine.EffectContext.journal>` to make
+    handler effects reversible.
+    """
+
+    def set_item(self, target: MutableMapping[Any, Any], key: Any, value: Any) -> None:  # pragma: no cover - protocol
+        ...
+
+    def list_append(self, target: MutableSequence[Any], value: Any) -> None:  # pragma: no cover - protocol
+        ...
+
+    def list_pop(self, target: MutableSequence[Any], index: int = -1) -> Any:  # pragma: no cover - protocol
+        ...
+
+
 class EffectRegistry:
     """Registry keeping the mapping between effect identifiers and callables."""
 
     def __init__(self) -> None:
         self._handlers: Dict[str, EffectHandler] = {}
 
-    def register(self, name: str, handler: Optional[HandlerT] = None):  # type: ignore[override]
+    @overload
+    def register(self, name: str) -> Callable[[HandlerT], HandlerT]: ...
+
+    @overload
+    def register(self, name: str, handler: HandlerT) -> HandlerT: ...
+
+    def register(
+        self, name: str, handler: Optional[HandlerT] = None
+    ) -> Callable[[HandlerT], HandlerT] | HandlerT:
         if handler is None:
             def decorator(func: HandlerT) -> HandlerT:
                 self.register(name, func)
@@ -44,19 +74,56 @@ class EffectRegistry:
         except KeyError as exc:  # pragma: no cover - defensive branch
             raise EffectExecutionError(f"Unknown effect '{name}'") from exc
 
-    def apply(self, name: str, context: "EffectContext", parameters: Dict[str, Any]) -> None:
+    def apply(self, name: str, context: "EffectContext", parameters: Dict[str, Any]) -> Optional[np.ndarray]:
+        """Run the handler for ``name``.
+
+        Returns a view of the events the handler appended to
+        ``context.events``, or ``None`` when the context has no event log.
+        """
+
         handler = self.get(name)
+        events = context.events
+        if events is None:
+            handler(context, parameters)
+            return None
+        start = len(events)
         handler(context, parameters)
+        return events.view(start)
+
+
+def _set_item(journal: Optional[MutationJournal], mapping: MutableMapping[Any, Any], key: Any, value: Any) -> None:
+    if journal is None:
+        mapping[key] = value
+    else:
+        journal.set_item(mapping, key, value)
+
+
+def _setdefault(journal: Optional[MutationJournal], mapping: MutableMapping[str, Any], key: str) -> Any:
+    if key not in mapping:
+        _set_item(journal, mapping, key, {})
+    return mapping[key]
+
+
+def _move(journal: Optional[MutationJournal], source: MutableSequence[Any], index: int, dest: MutableSequence[Any]) -> Any:
+    if journal is None:
+        card = source.pop(index)
+        dest.append(card)
+    else:
+        card = journal.list_pop(source, index)
+        journal.list_append(dest, card)
+    return card
 
 
-def _ensure_zone(mapping: MutableMapping[str, Any], key: str) -> MutableMapping[str, Any]:
+def _ensure_zone(
+    mapping: MutableMapping[str, Any], key: str, journal: Optional[MutationJournal] = None
+) -> MutableSequence[Any]:
     zone = mapping.get(key)
     if zone is None:
-        zone = []
-        mapping[key] = zone
-    if not isinstance(zone, list):
+        _set_item(journal, mapping, key, [])
+        zone = mapping[key]
+    if not isinstance(zone, MutableSequence):
         raise EffectExecutionError(f"Zone '{key}' is not a list-like container")
-    return zone  # type: ignore[return-value]
+    return zone
 
 
 registry = EffectRegistry()
@@ -68,16 +135,27 @@ def draw_cards(context: "EffectContext", parameters: Dict[str, Any]) -> None:
 
     player = parameters.get("player", context.controller)
     count = int(parameters.get("count", 1))
-    players = context.state.setdefault("players", {})
+    journal = context.journal
+    players = _setdefault(journal, context.state, "players")
     player_state = players.get(player)
     if player_state is None:
         raise EffectExecutionError(f"Player '{player}' not found in context state")
-    deck = _ensure_zone(player_state, "deck")
-    hand = _ensure_zone(player_state, "hand")
+    deck = _ensure_zone(player_state, "deck", journal)
+    hand = _ensure_zone(player_state, "hand", journal)
+    events = context.events
     for _ in range(count):
         if not deck:
             break
-        hand.append(deck.pop(0))
+        card = _move(journal, deck, 0, hand)
+        if events is not None:
+            events.record(
+                EventKind.DRAW,
+                rule=context.source_rule,
+                player=player,
+                card=card,
+                source="deck",
+                destination="hand",
+            )
 
 
 @registry.register("SearchDeck")
@@ -89,16 +167,29 @@ def search_deck(context: "EffectContext", parameters: Dict[str, Any]) -> None:
     if not card_name:
         raise EffectExecutionError("SearchDeck requires 'card_name'")
     destination = parameters.get("destination", "hand")
-    players = context.state.setdefault("players", {})
+    journal = context.journal
+    players = _setdefault(journal, context.state, "players")
     player_state = players.get(player)
     if player_state is None:
         raise EffectExecutionError(f"Player '{player}' not found in context state")
-    deck = _ensure_zone(player_state, "deck")
-    dest_zone = _ensure_zone(player_state, destination)
+    deck = _ensure_zone(player_state, "deck", journal)
+    dest_zone = _ensure_zone(player_state, destination, journal)
+    events = context.events
     for idx, card in enumerate(deck):
         if card == card_name:
-            dest_zone.append(deck.pop(idx))
+            _move(journal, deck, idx, dest_zone)
+            if events is not None:
+                events.record(
+                    EventKind.SEARCH_HIT,
+                    rule=context.source_rule,
+                    player=player,
+                    card=card_name,
+                    source="deck",
+                    destination=destination,
+                )
             return
+    if events is not None:
+        events.record(EventKind.SEARCH_MISS, rule=context.source_rule, player=player, card=card_name, source="deck")
     raise EffectExecutionError(f"Card '{card_name}' not found in deck")
 
 
@@ -112,9 +203,13 @@ def add_damage(context: "EffectContext", parameters: Dict[str, Any]) -> None:
         raise EffectExecutionError("AddDamage requires a 'target'")
     if amount < 0:
         raise EffectExecutionError("AddDamage amount must be non-negative")
-    damage_pool = context.state.setdefault("damage", {})
+    damage_pool = _setdefault(context.journal, context.state, "damage")
     current = int(damage_pool.get(target, 0))
-    damage_pool[target] = current + amount
+    _set_item(context.journal, damage_pool, target, current + amount)
+    if context.events is not None:
+        context.events.record(
+            EventKind.DAMAGE_ADDED, rule=context.source_rule, card=target, amount=amount
+        )
 
 
-__all__ = ["EffectRegistry", "registry", "draw_cards", "search_deck", "add_damage"]
+__all__ = ["EffectRegistry", "MutationJournal", "registry", "draw_cards", "search_deck", "add_damage"]
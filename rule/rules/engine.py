@@ -2,11 +2,13 @@
 
 from __future__ import annotations
 
+from collections.abc import Mapping
 from dataclasses import dataclass, field
-from typing import Any, Dict, Optional
+from typing import Any, Dict, MutableMapping, Optional
 
-from .effects import EffectRegistry, registry
-from .errors import IRValidationError, OncePerTurnViolation
+from .effects import EffectRegistry, MutationJournal, registry
+from .errors import EffectExecutionError, IRValidationError, OncePerTurnViolation
+from .events import EventLog
 from .schema import (
     AtomicEffect,
     CardRule,
@@ -17,6 +19,7 @@ from .schema import (
     SequenceEffect,
     TriggerType,
 )
+from .state import CowState, state_store
 
 
 @dataclass
@@ -34,14 +37,22 @@ class RuntimeState:
 
 @dataclass
 class EffectContext:
-    """Runtime context passed to effect handlers."""
+    """Runtime context passed to effect handlers.
+
+    When ``journal`` is set, the built-in handlers record every state mutation
+    in it so the caller can undo them (see :class:`core.journal.UndoJournal`).
+    When ``events`` is set, they report what they did as typed records (see
+    :mod:`rules.events`).
+    """
 
     controller: str
-    state: Dict[str, Any]
+    state: MutableMapping[str, Any]
     turn_identifier: str
     source_rule: Optional[str] = None
     variables: Dict[str, Any] = field(default_factory=dict)
     runtime: RuntimeState = field(default_factory=RuntimeState)
+    journal: Optional[MutationJournal] = None
+    events: Optional[EventLog] = None
 
     def derive(self, **variables: Any) -> "EffectContext":
         """Return a new context with extended temporary variables."""
@@ -55,6 +66,29 @@ class EffectContext:
             source_rule=self.source_rule,
             variables=combined,
             runtime=self.runtime,
+            journal=self.journal,
+            events=self.events,
+        )
+
+    def fork(self) -> "EffectContext":
+        """Return an independent context for speculative execution.
+
+        The state is forked in O(1) through :class:`~rules.state.CowState`.
+        A context holding a plain dict is switched to a copy-on-write view of
+        it first, so the original dict is never modified afterwards.
+        """
+
+        store = state_store(self.state)
+        if store is None:
+            store = CowState(dict(self.state))
+            self.state = store.root
+        return EffectContext(
+            controller=self.controller,
+            state=store.fork().root,
+            turn_identifier=self.turn_identifier,
+            source_rule=self.source_rule,
+            variables=dict(self.variables),
+            runtime=RuntimeState(dict(self.runtime.once_per_turn_usage)),
         )
 
 
@@ -65,12 +99,31 @@ class RuleEngine:
         self._registry = effect_registry or registry
 
     def execute(self, rule: CardRule, context: EffectContext) -> bool:
-        """Execute a rule if its trigger conditions are satisfied."""
+        """Execute a rule if its trigger conditions are satisfied.
+
+        With copy-on-write state (see :mod:`rules.state`) execution is atomic:
+        an :class:`EffectExecutionError` raised halfway through a sequence
+        rolls the state back to where it was before the effect started.
+        """
 
         if not self._can_trigger(rule, context):
             return False
         self._apply_modifiers(rule.modifiers, context)
-        self._execute_node(rule.effect, context)
+        store = state_store(context.state)
+        if store is None or context.state is not store.root:
+            self._execute_node(rule.effect, context)
+            return True
+        token = store.checkpoint()
+        logged = len(context.events) if context.events is not None else 0
+        try:
+            self._execute_node(rule.effect, context)
+        except EffectExecutionError:
+            store.rollback(token)
+            context.state = store.root
+            if context.events is not None:
+                context.events.truncate(logged)
+            raise
+        store.commit(token)
         return True
 
     # ------------------------------------------------------------------ helpers
@@ -127,7 +180,7 @@ class RuleEngine:
             # Try variables first, then fall back to state.
             value = context.variables.get(head, context.state.get(head))
         for part in rest:
-            if isinstance(value, dict):
+            if isinstance(value, Mapping):
                 value = value.get(part)
             else:
                 return None
@@ -0,0 +1,210 @@
+"""Typed operation log emitted by effect handlers.
+
+Every built-in handler reports what it did as fixed-width records in an
+:class:`EventLog`: which card was drawn or found and which zones it moved
+between, how much damage was added, whether a deck search missed.  Records live in one
+preallocated ``int32`` buffer per game, and strings (players, zones, cards,
+rule ids) are interned to integer symbols, so logging an event writes seven
+integers and creates no per-event objects.
+
+:meth:`EventLog.view` exposes the records as a zero-copy read-only array for
+replay rendering and feature extraction, :meth:`EventLog.digest` hashes them
+incrementally, and :meth:`EventLog.to_dicts` builds verbose dictionaries only
+when asked.
+"""
+
+from __future__ import annotations
+
+import hashlib
+from enum import IntEnum
+from typing import Any, Dict, Hashable, List, Mapping, Optional
+
+import numpy as np
+
+#: Symbol id used for columns that do not apply to an event.
+NO_SYMBOL = -1
+
+EVENT_DTYPE = np.dtype(
+    [
+        ("kind", np.int32),
+        ("rule", np.int32),
+        ("player", np.int32),
+        ("card", np.int32),
+        ("source", np.int32),
+        ("destination", np.int32),
+        ("amount", np.int32),
+    ]
+)
+_FIELDS = len(EVENT_DTYPE.names or ())
+
+
+class EventKind(IntEnum):
+    """Kinds of events recorded in an :class:`EventLog`."""
+
+    DRAW = 0
+    SEARCH_HIT = 1
+    SEARCH_MISS = 2
+    DAMAGE_ADDED = 3
+
+
+class EventLog:
+    """Append-only, growable log of typed effect events."""
+
+    def __init__(self, capacity: int = 1024) -> None:
+        if capacity <= 0:
+            raise ValueError("capacity must be positive")
+        self._allocate(capacity)
+        self._size = 0
+        self._symbols: List[Hashable] = []
+        self._symbol_ids: Dict[Optional[Hashable], int] = {None: NO_SYMBOL}
+        self._hasher = hashlib.blake2b(digest_size=16)
+        self._hashed = 0
+
+    # ---- Recording
+    def intern(self, value: Optional[Hashable]) -> int:
+        """Return the symbol id of ``value``, assigning one on first use."""
+
+        symbol = self._symbol_ids.get(value)
+        if symbol is None:
+            symbol = len(self._symbols)
+            self._symbols.append(value)
+            self._symbol_ids[value] = symbol
+        return symbol
+
+    def record(
+        self,
+        kind: EventKind,
+        *,
+        rule: Optional[Hashable] = None,
+        player: Optional[Hashable] = None,
+        card: Optional[Any] = None,
+        source: Optional[Hashable] = None,
+        destination: Optional[Hashable] = None,
+        amount: int = 0,
+    ) -> None:
+        """Append one event.
+
+        Cards that cannot be interned as they are (card dictionaries) are
+        logged by their ``"id"`` or ``"name"``, falling back to their ``repr``.
+        """
+
+        size = self._size
+        if size == self._capacity:
+            self._grow()
+        ids = self._symbol_ids
+        intern = self.intern
+        cells = self._cells
+        base = size * _FIELDS
+        cells[base] = kind
+        cells[base + 1] = ids[rule] if rule in ids else intern(rule)
+        cells[base + 2] = ids[player] if player in ids else intern(player)
+        try:
+            cells[base + 3] = ids[card] if card in ids else intern(card)
+        except TypeError:
+            cells[base + 3] = intern(_card_symbol(card))
+        cells[base + 4] = ids[source] if source in ids else intern(source)
+        cells[base + 5] = ids[destination] if destination in ids else intern(destination)
+        cells[base + 6] = amount
+        self._size = size + 1
+
+    def truncate(self, length: int) -> None:
+        """Drop every event after the first ``length`` (e.g. after a rollback)."""
+
+        if not 0 <= length <= self._size:
+            raise ValueError(f"Cannot truncate a log of {self._size} events to {length}")
+        self._size = length
+        if self._hashed > length:
+            self._restart_digest()
+
+    def clear(self) -> None:
+        """Forget all events and symbols, keeping the allocated buffer."""
+
+        self._size = 0
+        self._symbols.clear()
+        self._symbol_ids = {None: NO_SYMBOL}
+        self._restart_digest()
+
+    # ---- Export
+    def __len__(self) -> int:
+        return self._size
+
+    def view(self, start: int = 0, stop: Optional[int] = None) -> np.ndarray:
+        """Read-only structured array of the events in ``[start, stop)``, without copying.
+
+        The view shares memory with the log; copy it to keep it across
+        :meth:`truncate` or :meth:`clear`.
+        """
+
+        stop = self._size if stop is None else min(stop, self._size)
+        events = self._buffer[start:stop].view(EVENT_DTYPE).reshape(-1)
+        events.flags.writeable = False
+        return events
+
+    def symbol(self, symbol_id: int) -> Optional[Hashable]:
+        """Inverse of :meth:`intern`."""
+
+        return None if symbol_id == NO_SYMBOL else self._symbols[symbol_id]
+
+    @property
+    def symbols(self) -> List[Hashable]:
+        """Interned values indexed by symbol id."""
+
+        return list(self._symbols)
+
+    def digest(self) -> str:
+        """Hash of the event stream, updated incrementally from the last call.
+
+        Symbol ids are hashed as-is; they are assigned in first-use order, so
+        equal event streams from the same starting log hash equal.
+        """
+
+        if self._hashed < self._size:
+            self._hasher.update(self._buffer[self._hashed : self._size].tobytes())
+            self._hashed = self._size
+        return self._hasher.hexdigest()
+
+    def to_dicts(self, start: int = 0, stop: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Verbose per-event dictionaries with symbols resolved; not for hot paths."""
+
+        symbol = self.symbol
+        return [
+            {
+                "kind": EventKind(int(row["kind"])).name,
+                "rule": symbol(int(row["rule"])),
+                "player": symbol(int(row["player"])),
+                "card": symbol(int(row["card"])),
+                "source": symbol(int(row["source"])),
+                "destination": symbol(int(row["destination"])),
+                "amount": int(row["amount"]),
+            }
+            for row in self.view(start, stop)
+        ]
+
+    # ---- Internals
+    def _allocate(self, capacity: int) -> None:
+        self._capacity = capacity
+        self._buffer = np.zeros((capacity, _FIELDS), dtype=np.int32)
+        # Scalar writes through a memoryview are several times cheaper than
+        # assigning a structured row.
+        self._cells = self._buffer.data.cast("B").cast("i")
+
+    def _grow(self) -> None:
+        old, size = self._buffer, self._size
+        self._allocate(2 * self._capacity)
+        self._buffer[:size] = old[:size]
+
+    def _restart_digest(self) -> None:
+        self._hasher = hashlib.blake2b(digest_size=16)
+        self._hashed = 0
+
+
+def _card_symbol(card: Any) -> Hashable:
+    if isinstance(card, Mapping):
+        for key in ("id", "name"):
+            value = card.get(key)
+            if isinstance(value, str):
+                return value
+    return repr(card)
+
+
+__all__ = ["EVENT_DTYPE", "EventKind", "EventLog", "NO_SYMBOL"]
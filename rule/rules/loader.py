@@ -2,6 +2,7 @@
 
 from __future__ import annotations
 
+import hashlib
 import json
 from pathlib import Path
 from typing import Any, Dict, Iterable, Mapping, Optional
@@ -16,6 +17,7 @@ class RuleRepository:
     def __init__(self) -> None:
         self._rules: Dict[str, CardRule] = {}
         self._json_cache: Dict[Path, float] = {}
+        self._fingerprint: Optional[str] = None
 
     # ------------------------------------------------------------------ loading
     def load_from_json(self, path: Path, *, force: bool = False) -> None:
@@ -41,6 +43,7 @@ class RuleRepository:
             if "version" in payload and rule.version != payload["version"]:
                 raise RuleVersionMismatchError(rule.rule_id, payload["version"], rule.version)
             self._rules[rule.rule_id] = rule
+            self._fingerprint = None
 
     # ------------------------------------------------------------------- access
     def get(self, rule_id: str, *, version: Optional[str] = None) -> CardRule:
@@ -52,12 +55,29 @@ class RuleRepository:
             raise RuleVersionMismatchError(rule_id, version, rule.version)
         return rule
 
+    def fingerprint(self) -> str:
+        """Content hash of every loaded rule.
+
+        The hash changes whenever a rule is added or replaced, which lets
+        caches of simulation results detect that the rules they were computed
+        under are stale.
+        """
+
+        if self._fingerprint is None:
+            digest = hashlib.blake2b(digest_size=16)
+            for rule_id in sorted(self._rules):
+                digest.update(self._rules[rule_id].model_dump_json().encode("utf-8"))
+                digest.update(b"\0")
+            self._fingerprint = digest.hexdigest()
+        return self._fingerprint
+
     def _store_collection(self, payload: Any) -> None:
         if isinstance(payload, Mapping) and "rules" in payload:
             payload = payload["rules"]
         collection = CardRuleCollection.model_validate(payload)
         for rule in collection.root:
             self._rules[rule.rule_id] = rule
+        self._fingerprint = None
 
 
 __all__ = ["RuleRepository"]
@@ -0,0 +1,290 @@
+"""Copy-on-write game state for speculative rule execution.
+
+:class:`CowState` stores the usual nested ``dict``/``list`` game state but
+hands out :class:`CowDict` and :class:`CowList` views instead of the raw
+containers.  The views implement ``MutableMapping``/``MutableSequence``, so
+effect handlers written against those interfaces work unchanged.  The first
+write to a container copies it and every container above it (path copying);
+all other containers stay shared.
+
+This makes the operations search code needs cheap:
+
+* :meth:`CowState.fork` returns an independent state in O(1);
+* :meth:`CowState.checkpoint` / :meth:`~CowState.rollback` /
+  :meth:`~CowState.commit` undo a partially executed effect by restoring one
+  root reference, which :class:`~rules.engine.RuleEngine` uses to make rule
+  execution atomic.
+
+Containers that are shared with a fork or checkpoint are never modified in
+place.  Slicing a :class:`CowList` returns a plain list of views (scalars as
+they are), so mutating a sliced container still copies on write.  Values
+returned by ``pop`` are the raw stored objects; mutate nested containers only
+through views.
+"""
+
+from __future__ import annotations
+
+from collections.abc import MutableMapping, MutableSequence
+from typing import Any, Dict, Iterator, List, Mapping, Optional, Union
+
+Container = Union[Dict[Any, Any], List[Any]]
+
+
+class StaleViewError(RuntimeError):
+    """Raised when a view is used after a rollback or detachment invalidated it."""
+
+
+class CowState:
+    """Owner of a copy-on-write nested state tree."""
+
+    def __init__(self, data: Optional[Mapping[str, Any]] = None) -> None:
+        # The initial dict is treated as shared: it is never modified.
+        self._root: Dict[str, Any] = data if isinstance(data, dict) else dict(data or {})
+        self._owned: Dict[int, Container] = {}
+        self._generation = 0
+        self._root_view: Optional[CowDict] = None
+        self._checkpoints: List[Dict[str, Any]] = []
+
+    # ---- Public API
+    @property
+    def root(self) -> "CowDict":
+        """Mutable view of the whole state."""
+
+        view = self._root_view
+        if view is None or view._data is not self._root:
+            view = CowDict(self, None, None, self._root)
+            self._root_view = view
+        return view
+
+    @property
+    def data(self) -> Dict[str, Any]:
+        """The current state as plain containers; treat it as read-only."""
+
+        return self._root
+
+    def fork(self) -> "CowState":
+        """Return an independent copy of this state in O(1)."""
+
+        self._share()
+        return CowState(self._root)
+
+    def checkpoint(self) -> int:
+        """Remember the current state and return a token for :meth:`rollback`."""
+
+        self._share()
+        self._checkpoints.append(self._root)
+        return len(self._checkpoints)
+
+    def rollback(self, token: int) -> None:
+        """Restore the state captured by ``token`` and drop later checkpoints."""
+
+        self._validate(token)
+        self._root = self._checkpoints[token - 1]
+        del self._checkpoints[token - 1 :]
+        self._owned = {}
+        self._generation += 1
+        self._root_view = None
+
+    def commit(self, token: int) -> None:
+        """Keep all changes made since ``token`` and forget the checkpoint."""
+
+        self._validate(token)
+        del self._checkpoints[token - 1 :]
+
+    # ---- Internals
+    def _share(self) -> None:
+        # Everything reachable from the root is now shared; copy before writing.
+        self._owned = {}
+
+    def _validate(self, token: int) -> None:
+        if not 1 <= token <= len(self._checkpoints):
+            raise ValueError(f"Unknown checkpoint {token}")
+
+    def _own(self, container: Container) -> bool:
+        return self._owned.get(id(container)) is container
+
+    def _adopt(self, container: Container) -> None:
+        self._owned[id(container)] = container
+
+
+def state_store(state: Any) -> Optional[CowState]:
+    """Return the :class:`CowState` behind a view, or ``None`` for plain containers."""
+
+    return state._state if isinstance(state, _CowView) else None
+
+
+def _unwrap(value: Any) -> Any:
+    return value._current() if isinstance(value, _CowView) else value
+
+
+class _CowView:
+    __slots__ = ("_state", "_parent", "_key", "_data", "_generation", "_children")
+
+    def __init__(self, state: CowState, parent: Optional["_CowView"], key: Any, data: Container) -> None:
+        self._state = state
+        self._parent = parent
+        self._key = key
+        self._data: Any = data
+        self._generation = state._generation
+        self._children: Dict[Any, _CowView] = {}
+
+    def _current(self) -> Any:
+        if self._generation != self._state._generation:
+            raise StaleViewError("View was invalidated by a rollback; read it again from the state")
+        return self._data
+
+    def _writable(self) -> Any:
+        data = self._current()
+        state = self._state
+        if state._own(data):
+            return data
+        if self._key is _DETACHED:
+            raise StaleViewError("View was detached from its list; read it again from the state")
+        copy = type(data)(data)
+        if self._parent is None:
+            state._root = copy
+        else:
+            self._parent._writable()[self._key] = copy
+        state._adopt(copy)
+        self._data = copy
+        return copy
+
+    def _wrap(self, key: Any, value: Any) -> Any:
+        if isinstance(value, dict):
+            view_type: type = CowDict
+        elif isinstance(value, list):
+            view_type = CowList
+        else:
+            return value
+        child = self._children.get(key)
+        if child is None or child._data is not value:
+            if child is not None:
+                child._detach()
+            child = view_type(self._state, self, key, value)
+            self._children[key] = child
+        return child
+
+    def _detach(self) -> None:
+        self._key = _DETACHED
+        self._parent = None
+
+    def _detach_child(self, key: Any) -> None:
+        child = self._children.pop(key, None)
+        if child is not None:
+            child._detach()
+
+    def _detach_children(self) -> None:
+        for child in self._children.values():
+            child._detach()
+        self._children.clear()
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self._current()!r})"
+
+
+_DETACHED = object()
+
+
+class CowDict(_CowView, MutableMapping):
+    """``MutableMapping`` view of a dict inside a :class:`CowState`."""
+
+    __slots__ = ()
+
+    def __getitem__(self, key: Any) -> Any:
+        return self._wrap(key, self._current()[key])
+
+    def __setitem__(self, key: Any, value: Any) -> None:
+        self._writable()[key] = _unwrap(value)
+        self._detach_child(key)
+
+    def __delitem__(self, key: Any) -> None:
+        del self._writable()[key]
+        self._detach_child(key)
+
+    def __iter__(self) -> Iterator[Any]:
+        return iter(self._current())
+
+    def __len__(self) -> int:
+        return len(self._current())
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._current()
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, (CowDict, dict)):
+            return self._current() == _unwrap(other)
+        return NotImplemented
+
+    __hash__ = None  # type: ignore[assignment]
+
+    def get(self, key: Any, default: Any = None) -> Any:
+        data = self._current()
+        if key in data:
+            return self._wrap(key, data[key])
+        return default
+
+
+class CowList(_CowView, MutableSequence):
+    """``MutableSequence`` view of a list inside a :class:`CowState`."""
+
+    __slots__ = ()
+
+    def __getitem__(self, index: Any) -> Any:
+        data = self._current()
+        if isinstance(index, slice):
+            positions = range(*index.indices(len(data)))
+            return [self._wrap(position, data[position]) for position in positions]
+        if index < 0:
+            index += len(data)
+        return self._wrap(index, data[index])
+
+    def __setitem__(self, index: Any, value: Any) -> None:
+        data = self._writable()
+        if isinstance(index, slice):
+            data[index] = [_unwrap(item) for item in value]
+            self._detach_children()
+        else:
+            data[index] = _unwrap(value)
+            self._detach_child(index if index >= 0 else index + len(data))
+
+    def __delitem__(self, index: Any) -> None:
+        del self._writable()[index]
+        self._detach_children()
+
+    def __len__(self) -> int:
+        return len(self._current())
+
+    def __iter__(self) -> Iterator[Any]:
+        for index, value in enumerate(self._current()):
+            yield self._wrap(index, value)
+
+    def __contains__(self, value: object) -> bool:
+        return _unwrap(value) in self._current()
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, (CowList, list, tuple)):
+            return self._current() == list(_unwrap(other))
+        return NotImplemented
+
+    __hash__ = None  # type: ignore[assignment]
+
+    def insert(self, index: int, value: Any) -> None:
+        self._writable().insert(index, _unwrap(value))
+        self._detach_children()
+
+    def append(self, value: Any) -> None:
+        self._writable().append(_unwrap(value))
+
+    def pop(self, index: int = -1) -> Any:
+        value = self._writable().pop(index)
+        self._detach_children()
+        return value
+
+    def count(self, value: Any) -> int:
+        return self._current().count(_unwrap(value))
+
+    def index(self, value: Any, *args: Any) -> int:
+        return self._current().index(_unwrap(value), *args)
+
+
+__all__ = ["CowDict", "CowList", "CowState", "StaleViewError", "state_store"]
@@ -0,0 +1,351 @@
+"""Deduplicated index of attack and ability texts in the card corpus.
+
+The set files under ``ptcg-data-update-tool/cards/en`` repeat the same rules
+text many times: every reprint carries its printing's attacks again, and
+generic attacks ("Flip a coin. If heads, the Defending Pokémon is now
+Paralyzed.") appear on hundreds of different cards.  A text to IR compiler
+only needs to see each distinct text once.
+
+:class:`CardTextIndex` normalises every attack and ability text (whitespace
+folded, the card's own name replaced by ``{self}`` and other Pokémon names
+by ``{pokemon:N}``) and groups the printings that share a normalised text
+under one content hash.  Each :class:`TextReference` keeps the names that
+were replaced, so a compiled rule can be bound back to a concrete card.
+
+:class:`CompiledRuleCache` persists compiled :class:`~rules.schema.CardRule`
+objects keyed by that hash.  Compiling an index against an existing cache
+only compiles texts the cache has not seen, so a new set release costs as
+many compilations as it introduces new texts.  Hashes depend on the set of
+known Pokémon names, which only grows with Pokémon that older texts cannot
+mention.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import re
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Mapping, Optional, Tuple
+
+from core.card_db import iter_corpus
+
+from .errors import IRValidationError
+from .schema import CardRule
+
+SELF_PLACEHOLDER = "{self}"
+POKEMON_PLACEHOLDER = "{{pokemon:{}}}"
+
+#: Card fields holding indexed texts, and the kind recorded for each.
+TEXT_FIELDS = (("attacks", "attack"), ("abilities", "ability"))
+
+CACHE_FORMAT_VERSION = 1
+
+_POKEMON_SUPERTYPES = {"pokémon", "pokemon"}
+_NAME_START_RE = re.compile(r"(?<![\w'])[A-Z]")
+_LEADING_WORD_RE = re.compile(r"[^\W_]+")
+
+
+def text_hash(kind: str, text: str) -> str:
+    """Content hash of a normalised text of ``kind``."""
+
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(kind.encode("utf-8"))
+    digest.update(b"\0")
+    digest.update(text.encode("utf-8"))
+    return digest.hexdigest()
+
+
+class PokemonNameMatcher:
+    """Finds Pokémon names in rules text, preferring the longest match.
+
+    Names are bucketed by their leading word, so matching costs one dict
+    lookup per capitalised word instead of one regex branch per name.
+    """
+
+    def __init__(self, names: Iterable[str] = ()) -> None:
+        self._buckets: Dict[str, List[str]] = {}
+        for name in names:
+            self.add(name)
+
+    def add(self, name: str) -> None:
+        name = name.strip()
+        match = _LEADING_WORD_RE.match(name)
+        if match is None or not name[0].isupper():
+            return
+        bucket = self._buckets.setdefault(match.group(), [])
+        if name not in bucket:
+            bucket.append(name)
+            bucket.sort(key=len, reverse=True)
+
+    def __contains__(self, name: object) -> bool:
+        if not isinstance(name, str):
+            return False
+        match = _LEADING_WORD_RE.match(name)
+        return match is not None and name in self._buckets.get(match.group(), ())
+
+    def replace(self, text: str, self_name: Optional[str] = None) -> Tuple[str, Tuple[str, ...]]:
+        """Replace Pokémon names in ``text`` with placeholders.
+
+        ``self_name`` becomes :data:`SELF_PLACEHOLDER`; any other name becomes
+        ``{pokemon:N}`` where ``N`` numbers distinct names in order of first
+        appearance.  Returns the new text and the replaced names by ``N``.
+        """
+
+        parts: List[str] = []
+        bindings: List[str] = []
+        cursor = 0
+        for start_match in _NAME_START_RE.finditer(text):
+            start = start_match.start()
+            if start < cursor:
+                continue
+            name = self._match_at(text, start, self_name)
+            if name is None:
+                continue
+            if name == self_name:
+                placeholder = SELF_PLACEHOLDER
+            else:
+                if name not in bindings:
+                    bindings.append(name)
+                placeholder = POKEMON_PLACEHOLDER.format(bindings.index(name))
+            parts.append(text[cursor:start])
+            parts.append(placeholder)
+            cursor = start + len(name)
+        parts.append(text[cursor:])
+        return "".join(parts), tuple(bindings)
+
+    def _match_at(self, text: str, start: int, self_name: Optional[str]) -> Optional[str]:
+        word = _LEADING_WORD_RE.match(text, start)
+        if word is None:
+            return None
+        candidates = self._buckets.get(word.group(), ())
+        if self_name and self_name.startswith(word.group()) and self_name not in candidates:
+            candidates = sorted((*candidates, self_name), key=len, reverse=True)
+        for name in candidates:
+            end = start + len(name)
+            if text.startswith(name, start) and not (end < len(text) and _is_word_char(text[end])):
+                return name
+        return None
+
+
+def _is_word_char(char: str) -> bool:
+    return char.isalnum() or char == "_"
+
+
+def normalize_text(
+    text: str,
+    *,
+    self_name: Optional[str] = None,
+    matcher: Optional[PokemonNameMatcher] = None,
+) -> Tuple[str, Tuple[str, ...]]:
+    """Fold whitespace and replace Pokémon names with placeholders.
+
+    Without a ``matcher`` only ``self_name`` is replaced.
+    """
+
+    folded = " ".join(text.split())
+    return (matcher or PokemonNameMatcher()).replace(folded, self_name)
+
+
+@dataclass(frozen=True)
+class TextReference:
+    """One printing of a normalised text."""
+
+    card_id: str
+    kind: str
+    name: str
+    bindings: Tuple[str, ...] = ()
+
+
+@dataclass
+class TextEntry:
+    """A distinct normalised text and every printing that uses it."""
+
+    text_hash: str
+    kind: str
+    text: str
+    references: List[TextReference] = field(default_factory=list)
+
+
+class CardTextIndex:
+    """Groups the attack and ability texts of a card corpus by content hash."""
+
+    def __init__(self, matcher: Optional[PokemonNameMatcher] = None) -> None:
+        self.matcher = matcher or PokemonNameMatcher()
+        self._entries: Dict[str, TextEntry] = {}
+        self._by_card: Dict[str, List[str]] = {}
+        self.printings = 0
+
+    @classmethod
+    def from_cards(cls, cards: Iterable[Mapping[str, Any]]) -> "CardTextIndex":
+        """Index ``cards``, recognising the names of every Pokémon among them."""
+
+        cards = list(cards)
+        matcher = PokemonNameMatcher()
+        for card in cards:
+            if str(card.get("supertype", "")).lower() in _POKEMON_SUPERTYPES:
+                matcher.add(card["name"])
+        index = cls(matcher)
+        index.add_cards(cards)
+        return index
+
+    @classmethod
+    def from_corpus(cls, directory: Path) -> "CardTextIndex":
+        return cls.from_cards(iter_corpus(directory))
+
+    # ---- Public API
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __iter__(self) -> Iterator[TextEntry]:
+        return iter(self._entries.values())
+
+    def __contains__(self, text_hash: object) -> bool:
+        return text_hash in self._entries
+
+    def get(self, text_hash: str) -> TextEntry:
+        return self._entries[text_hash]
+
+    def hashes_for(self, card_id: str) -> List[str]:
+        """Text hashes used by ``card_id``, in printed order."""
+
+        return list(self._by_card.get(card_id, ()))
+
+    def add_cards(self, cards: Iterable[Mapping[str, Any]]) -> None:
+        for card in cards:
+            self.add_card(card)
+
+    def add_card(self, card: Mapping[str, Any]) -> None:
+        """Index the texts of one card; re-adding a card id is a no-op."""
+
+        card_id = card["id"]
+        if card_id in self._by_card:
+            return
+        hashes = self._by_card[card_id] = []
+        for field_name, kind in TEXT_FIELDS:
+            for item in card.get(field_name) or ():
+                raw = item.get("text") or ""
+                if not raw.strip():
+                    continue
+                text, bindings = normalize_text(raw, self_name=card["name"], matcher=self.matcher)
+                digest = text_hash(kind, text)
+                entry = self._entries.get(digest)
+                if entry is None:
+                    entry = self._entries[digest] = TextEntry(digest, kind, text)
+                entry.references.append(
+                    TextReference(card_id, kind, item.get("name", ""), bindings)
+                )
+                hashes.append(digest)
+                self.printings += 1
+
+
+class CompiledRuleCache:
+    """Persistent ``text hash -> CardRule`` cache for compiled texts.
+
+    ``compiler_version`` identifies the compiler that produced the rules; a
+    cache file written by another version is ignored.  Texts the compiler
+    could not handle are cached as ``None`` so they are not retried until
+    the version changes.
+    """
+
+    def __init__(self, path: Path, *, compiler_version: str = "0") -> None:
+        self.path = Path(path)
+        self.compiler_version = compiler_version
+        self._rules: Dict[str, Optional[CardRule]] = {}
+        self._dirty = False
+        if self.path.exists():
+            self._load()
+
+    # ---- Public API
+    def __len__(self) -> int:
+        return len(self._rules)
+
+    def __contains__(self, text_hash: object) -> bool:
+        return text_hash in self._rules
+
+    def get(self, text_hash: str) -> Optional[CardRule]:
+        return self._rules.get(text_hash)
+
+    def put(self, text_hash: str, rule: Optional[CardRule]) -> None:
+        self._rules[text_hash] = rule
+        self._dirty = True
+
+    def pending(self, index: CardTextIndex) -> List[TextEntry]:
+        """Entries of ``index`` that have not been compiled yet."""
+
+        return [entry for entry in index if entry.text_hash not in self._rules]
+
+    def compile(
+        self,
+        index: CardTextIndex,
+        compiler: Callable[[TextEntry], Optional[CardRule]],
+        *,
+        save: bool = True,
+    ) -> int:
+        """Compile the pending entries of ``index`` and return how many were compiled."""
+
+        pending = self.pending(index)
+        for entry in pending:
+            self.put(entry.text_hash, compiler(entry))
+        if save:
+            self.save()
+        return len(pending)
+
+    def rules_for(self, index: CardTextIndex, card_id: str) -> List[CardRule]:
+        """Compiled rules of every text printed on ``card_id``."""
+
+        rules = (self._rules.get(digest) for digest in index.hashes_for(card_id))
+        return [rule for rule in rules if rule is not None]
+
+    def save(self) -> None:
+        """Write the cache atomically if it changed since it was loaded."""
+
+        if not self._dirty:
+            return
+        payload = {
+            "format": CACHE_FORMAT_VERSION,
+            "compiler_version": self.compiler_version,
+            "rules": {
+                digest: None if rule is None else rule.model_dump(mode="json", by_alias=True)
+                for digest, rule in sorted(self._rules.items())
+            },
+        }
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        scratch = self.path.with_name(self.path.name + ".tmp")
+        scratch.write_text(json.dumps(payload, ensure_ascii=False), encoding="utf-8")
+        os.replace(scratch, self.path)
+        self._dirty = False
+
+    # ---- Internals
+    def _load(self) -> None:
+        try:
+            payload = json.loads(self.path.read_text(encoding="utf-8"))
+        except json.JSONDecodeError as exc:
+            raise IRValidationError(f"Corrupt compiled rule cache {self.path}: {exc}") from exc
+        if (
+            payload.get("format") != CACHE_FORMAT_VERSION
+            or payload.get("compiler_version") != self.compiler_version
+        ):
+            return
+        self._rules = {
+            digest: None if data is None else CardRule.model_validate(data)
+            for digest, data in payload.get("rules", {}).items()
+        }
+
+
+__all__ = [
+    "CACHE_FORMAT_VERSION",
+    "CardTextIndex",
+    "CompiledRuleCache",
+    "POKEMON_PLACEHOLDER",
+    "PokemonNameMatcher",
+    "SELF_PLACEHOLDER",
+    "TEXT_FIELDS",
+    "TextEntry",
+    "TextReference",
+    "iter_corpus",
+    "normalize_text",
+    "text_hash",
+]
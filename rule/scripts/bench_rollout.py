@@ -0,0 +1,84 @@
+"""Benchmark vectorised GAE against a per-element Python loop.
+
+Usage: ``python scripts/bench_rollout.py --steps 128 --envs 256``
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+
+import numpy as np
+
+from env.vector_env import SyncBattleVectorEnv
+from training.rollout import RolloutBuffer, active_players, compute_gae
+
+
+def naive_gae(rewards, values, dones, last_values, players, last_players, gamma, gae_lambda):
+    steps, envs = rewards.shape
+    advantages = np.zeros((steps, envs), dtype=np.float32)
+    for env in range(envs):
+        running = 0.0
+        sign_next = 1.0 - 2.0 * last_players[env]
+        next_value = last_values[env] * sign_next
+        for t in reversed(range(steps)):
+            sign = 1.0 - 2.0 * players[t, env]
+            value = values[t, env] * sign
+            continuing = 0.0 if dones[t, env] else 1.0
+            delta = rewards[t, env] + gamma * continuing * next_value - value
+            running = delta + gamma * gae_lambda * continuing * running
+            advantages[t, env] = running * sign
+            next_value = value
+    return advantages
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--steps", type=int, default=128)
+    parser.add_argument("--envs", type=int, default=256)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    env = SyncBattleVectorEnv(args.envs, master_seed=args.seed, copy=False)
+    buffer = RolloutBuffer(args.steps, args.envs)
+    observations, _ = env.reset()
+
+    start = time.perf_counter()
+    while not buffer.full:
+        mask = observations["action_mask"]
+        actions = np.argmax(rng.random(mask.shape) * mask, axis=1)
+        observation, action_mask = observations["observation"].copy(), mask.copy()
+        observations, rewards, terminated, truncated, _ = env.step(actions)
+        buffer.add(observation, action_mask, actions, rewards, terminated, truncated,
+                   values=rng.standard_normal(args.envs).astype(np.float32))
+    collect = time.perf_counter() - start
+
+    last_values = rng.standard_normal(args.envs).astype(np.float32)
+    last_players = active_players(observations["observation"])
+
+    start = time.perf_counter()
+    buffer.compute_returns_and_advantages(last_values, observations["observation"])
+    vectorised = time.perf_counter() - start
+
+    start = time.perf_counter()
+    expected = naive_gae(
+        buffer.rewards, buffer.values, buffer.dones, last_values,
+        buffer.players, last_players, 0.99, 0.95,
+    )
+    naive = time.perf_counter() - start
+
+    advantages, _ = compute_gae(
+        buffer.rewards, buffer.values, buffer.dones, last_values,
+        gamma=0.99, gae_lambda=0.95, players=buffer.players, last_players=last_players,
+    )
+    np.testing.assert_allclose(advantages, expected, rtol=1e-4, atol=1e-4)
+
+    samples = args.steps * args.envs
+    print(f"collect: {samples / collect:,.0f} samples/s")
+    print(f"GAE vectorised: {vectorised * 1e3:.2f} ms, naive loop: {naive * 1e3:.2f} ms "
+          f"({naive / vectorised:.0f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+import numpy as np
+import pytest
+
+from core.card_db import CardDatabase
+from core.card_tables import BoardView, CardTables
+from core.errors import IllegalActionError
+from core.state_machine import ActionType, Phase, PlayerSide, StateSnapshot
+from env.action_codec import CODEC_TYPES, ActionCodec, ActionLayout, StructuredAction
+from env.battle_env import ACTION_TYPES, ActionRulebook, BattleEnv, TurnTracker
+
+
+def pokemon(card_id, name, stage, attacks, *, evolves_from=None, ability=None):
+    card = {"id": card_id, "name": name, "supertype": "Pokémon", "subtypes": [stage],
+            "attacks": [{"name": f"{name} {idx}", "cost": cost} for idx, cost in enumerate(attacks)],
+            "convertedRetreatCost": 1}
+    if evolves_from:
+        card["evolvesFrom"] = evolves_from
+    if ability:
+        card["abilities"] = [{"name": ability, "text": "", "type": "Ability"}]
+    return card
+
+
+DB = CardDatabase([
+    pokemon("s-1", "Charmander", "Basic", [["Fire"], ["Fire", "Colorless"]]),
+    pokemon("s-2", "Charmeleon", "Stage 1", [["Fire", "Fire", "Colorless"]], evolves_from="Charmander"),
+    pokemon("s-3", "Charizard", "Stage 2", [["Fire", "Fire", "Fire", "Colorless"]], evolves_from="Charmeleon",
+            ability="Infernal Reign"),
+    {"id": "t-1", "name": "Rare Candy", "supertype": "Trainer", "subtypes": ["Item"]},
+    {"id": "e-1", "name": "Fire Energy", "supertype": "Energy", "subtypes": ["Basic"]},
+    {"id": "e-2", "name": "Basic Lightning Energy", "supertype": "Energy", "subtypes": ["Basic"]},
+    {"id": "e-3", "name": "Double Turbo Energy", "supertype": "Energy", "subtypes": ["Special"]},
+])
+IDX = DB.index_of
+
+
+@pytest.fixture(scope="module")
+def codec() -> ActionCodec:
+    return ActionCodec()
+
+
+def test_every_index_round_trips(codec) -> None:
+    assert CODEC_TYPES == ACTION_TYPES
+    seen = set()
+    for index in range(codec.size):
+        action = codec.decode(index)
+        assert codec.encode(action.action_type, action.source, action.target, action.payment) == index
+        assert codec.type_of[index] == CODEC_TYPES.index(action.action_type)
+        assert codec.target_of[index] == (-1 if action.target is None else action.target)
+        seen.add(action)
+    assert len(seen) == codec.size == len(codec)
+    assert codec.shape(ActionType.PLAY_CARD) == (20, 7, 1)
+    assert codec.decode(codec.encode(ActionType.PLAY_CARD, 3)) == StructuredAction(ActionType.PLAY_CARD, 3)
+
+
+def test_encoding_is_stable_and_bounds_checked(codec) -> None:
+    assert codec.encode(ActionType.PLAY_CARD, 0, 0) == 0
+    assert codec.encode(ActionType.ATTACH_ENERGY, 0, 0) == 140
+    assert codec.encode(ActionType.PASS) == codec.size - 1
+    assert ActionCodec(ActionLayout(payments=2)).size == codec.size + 6 + 4
+    with pytest.raises(ValueError):
+        codec.encode(ActionType.PLAY_CARD, 20)
+    with pytest.raises(ValueError):
+        codec.encode(ActionType.PLAY_CARD, 0, 6)
+    with pytest.raises(ValueError):
+        codec.encode(ActionType.RETREAT)
+    with pytest.raises(ValueError):
+        codec.encode(ActionType.DECLARE_ATTACK, 0, 1)
+    with pytest.raises(IllegalActionError):
+        codec.decode(codec.size)
+
+
+def test_board_mask_lists_card_arguments(codec) -> None:
+    tables = CardTables(DB)
+    rulebook = ActionRulebook(tables)
+    snapshot = StateSnapshot(Phase.MAIN_PHASE, PlayerSide.PLAYER_ONE, 1)
+    board = BoardView.from_cards(
+        tables,
+        [IDX("s-1"), IDX("s-1")],
+        [[IDX("e-1"), IDX("e-3")], []],
+        hand=[IDX("s-3"), IDX("t-1"), IDX("e-2"), IDX("s-2")],
+        fresh=[False, True],
+    )
+    mask = rulebook.structured_mask(codec, snapshot, TurnTracker(), board)
+    legal = {codec.decode(int(index)) for index in np.flatnonzero(codec.flatten(mask))}
+    assert legal == {
+        StructuredAction(ActionType.PLAY_CARD, 3, 0),
+        StructuredAction(ActionType.PLAY_CARD, 1, 0),
+        StructuredAction(ActionType.ATTACH_ENERGY, 2, 0),
+        StructuredAction(ActionType.ATTACH_ENERGY, 2, 1),
+        StructuredAction(ActionType.RETREAT, 0, 1),
+        StructuredAction(ActionType.DECLARE_ATTACK, 0),
+        StructuredAction(ActionType.DECLARE_ATTACK, 1),
+        StructuredAction(ActionType.END_TURN),
+        StructuredAction(ActionType.PASS),
+    }
+    assert codec.arguments(mask, ActionType.DECLARE_ATTACK)[:, 0, 0].tolist() == [True, True, False, False]
+    # Neither Charmander has an ability.
+    assert not mask.types[CODEC_TYPES.index(ActionType.USE_ABILITY)]
+
+    tracker = TurnTracker(usage={ActionType.DECLARE_ATTACK: 1})
+    stuck = BoardView.from_cards(tables, [IDX("s-3")], [[IDX("e-1")]], hand=[IDX("s-2")])
+    mask = rulebook.structured_mask(codec, snapshot, tracker, stuck)
+    types = {CODEC_TYPES[index] for index in np.flatnonzero(mask.types)}
+    assert types == {ActionType.USE_ABILITY, ActionType.END_TURN, ActionType.PASS}
+
+
+def test_env_steps_structured_actions(codec) -> None:
+    env = BattleEnv(seed=3)
+    env.reset()
+    mask = env.structured_action_mask(codec)
+    legal = np.flatnonzero(mask)
+    assert {codec.decode(int(index)).action_type for index in legal} == {
+        ACTION_TYPES[index] for index in np.flatnonzero(env.action_mask())
+    }
+    assert all(index == codec.default_index(codec.decode(int(index)).action_type) for index in legal)
+
+    attach = codec.default_index(ActionType.ATTACH_ENERGY)
+    assert codec.validate(attach, mask).action_type == ActionType.ATTACH_ENERGY
+    env.step_structured(attach, codec)
+    mask = env.structured_action_mask(codec, out=mask)
+    with pytest.raises(IllegalActionError):
+        codec.validate(attach, mask)
+    with pytest.raises(IllegalActionError):
+        env.step_structured(attach, codec)
+    with pytest.raises(IllegalActionError):
+        env.step_structured(codec.encode(ActionType.PLAY_CARD, 2), codec)
@@ -0,0 +1,59 @@
+import numpy as np
+import pytest
+
+from agents.base import NO_ACTION, mask_from_observation
+from agents.random_agent import RandomAgent
+from agents.rule_based_agent import RuleBasedAgent
+from core.state_machine import ActionType
+from env.battle_env import ACTION_TYPES, BattleEnv
+from env.vector_env import SyncBattleVectorEnv
+
+
+def test_random_agent_batch_is_legal_and_uniform() -> None:
+    masks = np.zeros((20_000, len(ACTION_TYPES)), dtype=bool)
+    masks[:, [0, 2, 4]] = True
+    masks[-1] = False
+    actions = RandomAgent(seed=0).act_batch(None, masks)
+
+    assert actions[-1] == NO_ACTION
+    counts = np.bincount(actions[:-1], minlength=len(ACTION_TYPES))
+    assert set(np.flatnonzero(counts)) == {0, 2, 4}
+    assert counts[[0, 2, 4]] / (len(masks) - 1) == pytest.approx([1 / 3] * 3, abs=0.02)
+
+
+def test_random_agent_act_uses_legal_actions() -> None:
+    env = BattleEnv(seed=0)
+    observation = env.reset()
+    legal = {payload["action_type"] for payload in observation["legal_actions"]}
+    agent = RandomAgent(seed=1)
+    assert all(agent.act(observation)["action_type"] in legal for _ in range(20))
+    assert agent.act({"turn": 0}) == {}
+
+
+def test_rule_based_agent_follows_priority_table() -> None:
+    agent = RuleBasedAgent((ActionType.DECLARE_ATTACK, ActionType.END_TURN))
+    masks = np.zeros((3, len(ACTION_TYPES)), dtype=bool)
+    masks[0, [ACTION_TYPES.index(ActionType.PLAY_CARD), ACTION_TYPES.index(ActionType.END_TURN)]] = True
+    masks[1, ACTION_TYPES.index(ActionType.PLAY_CARD)] = True
+    actions = agent.act_batch(None, masks)
+
+    assert ACTION_TYPES[actions[0]] is ActionType.END_TURN
+    assert ACTION_TYPES[actions[1]] is ActionType.PLAY_CARD
+    assert actions[2] == NO_ACTION
+    with pytest.raises(ValueError):
+        RuleBasedAgent((ActionType.PASS, ActionType.PASS))
+
+
+def test_agents_drive_vector_env() -> None:
+    envs = SyncBattleVectorEnv(4, master_seed=3)
+    observations, _ = envs.reset()
+    agent = RuleBasedAgent()
+    for _ in range(10):
+        actions = agent.act_batch(observations["observation"], observations["action_mask"])
+        assert observations["action_mask"][np.arange(4), actions].all()
+        observations, *_ = envs.step(actions)
+
+
+def test_mask_from_observation_ignores_unknown_actions() -> None:
+    mask = mask_from_observation({"legal_actions": [{"action_type": "PASS"}, {"action_type": "NOPE"}]})
+    assert mask.tolist() == [t is ActionType.PASS for t in ACTION_TYPES]
@@ -0,0 +1,27 @@
+import json
+
+import pytest
+
+from core.card_db import DEFAULT_CORPUS_DIR, CardDatabase, set_id_of
+
+
+def test_database_indexes_corpus_files_in_order(tmp_path) -> None:
+    (tmp_path / "b.json").write_text(json.dumps([{"id": "b-1", "name": "Bulbasaur"}]))
+    (tmp_path / "a.json").write_text(json.dumps([{"id": "a-1", "name": "Abra"}, {"id": "a-2", "name": "Kadabra"}]))
+    database = CardDatabase.from_corpus(tmp_path)
+
+    assert database.ids() == ["a-1", "a-2", "b-1"]
+    assert database.index_of("b-1") == 2
+    assert database.get("a-2")["name"] == "Kadabra" and database.get("x-1") is None
+    assert set_id_of("swsh12pt5-160") == "swsh12pt5"
+    with pytest.raises(ValueError):
+        CardDatabase([{"id": "a-1"}, {"id": "a-1"}])
+    with pytest.raises(FileNotFoundError):
+        CardDatabase.from_corpus(tmp_path / "missing")
+
+
+@pytest.mark.skipif(not DEFAULT_CORPUS_DIR.is_dir(), reason="card corpus not available")
+def test_default_corpus_loads() -> None:
+    database = CardDatabase.from_corpus()
+    assert len(database) > 10000
+    assert database.get("base1-4")["name"] == "Charizard"
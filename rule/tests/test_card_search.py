@@ -0,0 +1,88 @@
+import pytest
+
+import app
+from core.card_db import CardDatabase
+from core.card_search import CardSearchIndex, tokenize
+
+
+def card(card_id, name, supertype="Pokémon", *, types=(), subtypes=("Basic",), attacks=(), rules=(), mark=None, legal=("unlimited",)):
+    record = {
+        "id": card_id,
+        "name": name,
+        "supertype": supertype,
+        "subtypes": list(subtypes),
+        "types": list(types),
+        "attacks": [{"name": attack, "text": text} for attack, text in attacks],
+        "rules": list(rules),
+        "legalities": {fmt: "Legal" for fmt in legal},
+    }
+    if mark:
+        record["regulationMark"] = mark
+    return record
+
+
+CARDS = [
+    card("s1-1", "Pikachu", types=["Lightning"], attacks=[("Thunder Shock", "Flip a coin. If heads, the Defending Pokémon is now Paralyzed.")], legal=("unlimited", "expanded")),
+    card("s1-2", "Raichu", types=["Lightning"], subtypes=["Stage 1"], attacks=[("Thunder", "Flip a coin. If tails, Raichu does 30 damage to itself.")]),
+    card("s2-1", "Pikachu ex", types=["Lightning"], subtypes=["Basic", "ex"], attacks=[("Topaz Bolt", "Discard 3 Energy from this Pokémon.")], mark="H", legal=("unlimited", "expanded", "standard")),
+    card("s2-2", "Professor's Research", "Trainer", subtypes=["Supporter"], rules=["Discard your hand and draw 7 cards."], mark="H", legal=("unlimited", "expanded", "standard")),
+    card("s2-3", "Charmander", types=["Fire"], attacks=[("Ember", "Discard an Energy from this Pokémon.")], mark="G"),
+]
+
+
+@pytest.fixture(scope="module")
+def index() -> CardSearchIndex:
+    return CardSearchIndex.build(CardDatabase(CARDS))
+
+
+def test_tokenize_folds_case_and_accents() -> None:
+    assert tokenize("Professor's Pokémon-EX") == ["professor", "s", "pokemon", "ex"]
+
+
+def test_term_and_prefix_queries_are_ranked(index) -> None:
+    result = index.search("pika")
+    assert [hit.card_id for hit in result.hits] == ["s1-1", "s2-1"]
+    assert index.search("pika ").total == 0
+    assert index.search("pikachu", prefix=False).total == 2
+
+    discard = index.search("discard energy")
+    assert {hit.card_id for hit in discard.hits} == {"s2-1", "s2-3"}
+    assert [hit.card_id for hit in index.search("flip").hits] == ["s1-1", "s1-2"]
+    assert index.search("thunder").hits[0].card_id in {"s1-1", "s1-2"}
+    assert index.search("zzz").total == 0
+
+
+def test_facet_filters_and_counts(index) -> None:
+    result = index.search(filters={"types": ["Lightning", "Fire"], "legality": ["expanded"]})
+    assert [hit.card_id for hit in result.hits] == ["s1-1", "s2-1"]
+    assert result.facets["subtypes"] == {"Basic": 2, "ex": 1}
+    assert result.facets["regulationMark"] == {"H": 1}
+
+    assert index.search("discard", filters={"supertype": ["Trainer"]}).hits[0].name == "Professor's Research"
+    assert index.search(filters={"regulationMark": ["Z"]}).total == 0
+    with pytest.raises(ValueError):
+        index.search(filters={"rarity": ["Common"]})
+    with pytest.raises(TypeError):
+        index.search(filters={"types": "Fire"})
+
+
+def test_pagination_and_persistence(index, tmp_path) -> None:
+    everything = index.search(limit=100)
+    pages = [index.search(offset=offset, limit=2, facets=False).hits for offset in (0, 2, 4)]
+    assert [hit for page in pages for hit in page] == everything.hits
+    assert pages[0] and not index.search(offset=2, limit=2, facets=False).facets
+
+    path = tmp_path / "cards.npz"
+    index.save(path)
+    loaded = CardSearchIndex.load(path)
+    assert loaded.search("pika", filters={"legality": ["standard"]}) == index.search(
+        "pika", filters={"legality": ["standard"]}
+    )
+
+
+def test_search_endpoint_paginates(index, monkeypatch) -> None:
+    monkeypatch.setattr(app, "_card_index", index)
+    response = app.search_cards(q="", types=["Lightning"], page=2, page_size=2)
+    assert response.total == 3 and response.page == 2
+    assert [hit.card_id for hit in response.results] == ["s2-1"]
+    assert response.facets["types"] == {"Lightning": 3}
@@ -0,0 +1,122 @@
+import numpy as np
+import pytest
+
+from core.card_db import CardDatabase
+from core.card_tables import BoardView, CardTables, ENERGY_TYPES, can_pay, cost_vector
+from core.errors import IllegalActionError
+from core.state_machine import ActionType, Phase, PlayerSide, StateSnapshot
+from env.battle_env import ActionRulebook, TurnTracker
+
+
+def pokemon(card_id, name, stage, attacks, *, evolves_from=None, retreat=1):
+    card = {"id": card_id, "name": name, "supertype": "Pokémon", "subtypes": [stage],
+            "attacks": [{"name": f"{name} {idx}", "cost": cost} for idx, cost in enumerate(attacks)],
+            "convertedRetreatCost": retreat}
+    if evolves_from:
+        card["evolvesFrom"] = evolves_from
+    return card
+
+
+CARDS = [
+    pokemon("s-1", "Charmander", "Basic", [["Fire"], ["Fire", "Colorless"]]),
+    pokemon("s-2", "Charmeleon", "Stage 1", [["Fire", "Fire", "Colorless"]], evolves_from="Charmander"),
+    pokemon("s-3", "Charizard", "Stage 2", [["Fire", "Fire", "Fire", "Colorless"]], evolves_from="Charmeleon", retreat=3),
+    pokemon("s-4", "Pikachu", "Basic", [[], ["Lightning", "Lightning"]], retreat=0),
+    pokemon("o-3", "Charizard", "Stage 2", [["Colorless"] * 5], evolves_from="Charmeleon"),
+    {"id": "t-1", "name": "Rare Candy", "supertype": "Trainer", "subtypes": ["Item"]},
+    {"id": "t-2", "name": "Potion", "supertype": "Trainer", "subtypes": ["Item"]},
+    {"id": "e-1", "name": "Fire Energy", "supertype": "Energy", "subtypes": ["Basic"]},
+    {"id": "e-2", "name": "Basic Lightning Energy", "supertype": "Energy", "subtypes": ["Basic"]},
+    {"id": "e-3", "name": "Double Turbo Energy", "supertype": "Energy", "subtypes": ["Special"]},
+]
+DB = CardDatabase(CARDS)
+IDX = DB.index_of
+
+
+@pytest.fixture(scope="module")
+def tables() -> CardTables:
+    return CardTables(DB)
+
+
+def energy(**counts):
+    vector = np.zeros(len(ENERGY_TYPES), dtype=np.int32)
+    for name, count in counts.items():
+        vector[ENERGY_TYPES.index(name)] = count
+    return vector
+
+
+def test_can_pay_uses_any_surplus_for_colorless() -> None:
+    cost = cost_vector(["Fire", "Fire", "Colorless"])
+    assert can_pay(cost, energy(Fire=3))
+    assert can_pay(cost, energy(Fire=2, Water=1))
+    assert not can_pay(cost, energy(Fire=1, Water=2))
+    assert not can_pay(cost, energy(Fire=2))
+    assert can_pay(cost_vector(["Colorless"]), energy(Colorless=1))
+    assert not can_pay(cost_vector(["Fire"]), energy(Colorless=2))
+    with pytest.raises(ValueError):
+        cost_vector(["Plasma"])
+
+
+def test_evolution_graph_and_stage_skips(tables) -> None:
+    assert tables.evolves_to("Charmander") == ["Charmeleon"]
+    assert tables.evolves_to("Charmeleon") == ["Charizard"]
+    assert tables.evolves_to("Missingno") == []
+
+    hand = np.array([IDX("s-2"), IDX("s-3"), IDX("o-3"), IDX("s-4")])
+    board = np.array([IDX("s-1"), IDX("s-4")])
+    np.testing.assert_array_equal(tables.evolution_pairs(hand, board)[:, 0], [True, False, False, False])
+    np.testing.assert_array_equal(tables.stage_skip_pairs(hand, board)[:, 0], [False, True, True, False])
+    assert not tables.stage_skip_pairs(hand, board)[:, 1].any()
+
+
+def test_payable_attacks_match_scalar_check(tables) -> None:
+    in_play = np.array([IDX("s-1"), IDX("s-3"), IDX("s-4")])
+    attached = np.stack([energy(Fire=1), energy(Fire=3, Water=1), energy(Lightning=1)])
+    owners, rows, payable = tables.payable_attacks(in_play, attached)
+
+    assert owners.tolist() == [0, 0, 1, 2, 2]
+    expected = [
+        bool(can_pay(cost_vector(attack["cost"]), attached[owner]))
+        for owner, card in enumerate(DB[i] for i in in_play)
+        for attack in card["attacks"]
+    ]
+    assert payable.tolist() == expected == [True, False, True, True, False]
+    assert (tables.attack_card[rows] == in_play[owners]).all()
+
+
+def test_board_options(tables) -> None:
+    board = BoardView.from_cards(
+        tables,
+        [IDX("s-1"), IDX("s-1")],
+        [[IDX("e-1"), IDX("e-3")], []],
+        hand=[IDX("s-3"), IDX("t-1"), IDX("e-2"), IDX("s-2")],
+        fresh=[False, True],
+    )
+    options = tables.options(board)
+    assert options.attacks.tolist() == [0, 1]
+    assert options.can_retreat and options.can_attach
+    assert options.playable.tolist() == [False, True, False, True]
+    assert options.evolutions.tolist() == [[3, 0]]
+    assert options.stage_skips.tolist() == [[0, 0]]
+
+    no_candy = BoardView.from_cards(tables, [IDX("s-4")], [[]], hand=[IDX("t-1"), IDX("s-3")])
+    options = tables.options(no_candy)
+    assert options.playable.tolist() == [False, False]
+    assert options.attacks.tolist() == [tables.attack_offsets[IDX("s-4")]]
+    assert not options.can_retreat and not options.can_attach
+
+
+def test_rulebook_prunes_actions_with_a_board(tables) -> None:
+    rulebook = ActionRulebook(tables)
+    snapshot = StateSnapshot(Phase.MAIN_PHASE, PlayerSide.PLAYER_ONE, 1)
+    tracker = TurnTracker()
+    names = lambda board=None: {spec.action_type for spec in rulebook.legal_actions(snapshot, tracker, board)}
+
+    stuck = BoardView.from_cards(tables, [IDX("s-3")], [[IDX("e-1")]], hand=[IDX("e-1")])
+    assert names() - names(stuck) == {ActionType.DECLARE_ATTACK, ActionType.RETREAT, ActionType.PLAY_CARD}
+    assert ActionType.ATTACH_ENERGY in names(stuck)
+    with pytest.raises(IllegalActionError):
+        rulebook.validate_type(snapshot, tracker, ActionType.DECLARE_ATTACK, stuck)
+    assert rulebook.validate_type(snapshot, tracker, ActionType.END_TURN, stuck).action_type == ActionType.END_TURN
+    with pytest.raises(ValueError):
+        ActionRulebook().legal_actions(snapshot, tracker, stuck)
@@ -3,6 +3,7 @@ import pytest
 from core import (
     CardSuperType,
     Deck,
+    DeckListCache,
     Zone,
     ZoneType,
     load_deck_from_json,
@@ -129,3 +130,40 @@ def test_deck_shuffle_and_draw_are_deterministic():
     assert len(drawn) == 2
     assert len(deck) == 1
     assert drawn[0] != drawn[1]
+
+
+def test_decklist_cache_parses_identical_lists_once():
+    cache = DeckListCache()
+    text = "Pokémon: 2\n2 Pikachu SVI 33\n\nTrainer: 1\n1 Nest Ball SVI 181\n"
+    reformatted = "  Pokémon: 2\n  2 Pikachu SVI 33\n  Trainer: 1\n  1 Nest Ball SVI 181"
+
+    first = cache.parse_limitless(text)
+    second = cache.parse_limitless(reformatted)
+
+    assert first is second
+    assert (cache.hits, cache.misses) == (1, 1)
+    assert first.total_cards == 3
+    assert cache.definition(first.entries[0][0]).name == "Pikachu"
+
+    deck_a = cache.materialize(first, name="A")
+    deck_b = cache.materialize(second, name="B")
+    uids_a = {card.card_uid for card in deck_a}
+    uids_b = {card.card_uid for card in deck_b}
+    assert len(uids_a) == 3 and not uids_a & uids_b
+
+
+def test_decklist_cache_bulk_import_shares_definitions():
+    cache = DeckListCache()
+    export = {
+        "alice": "Pokémon: 4\n4 Charmander PAF 7\n",
+        "bob": "Pokémon: 4\n4 Charmander PAF 7\n",
+        "carol": "Pokémon: 2\n2 Charmander PAF 7\nEnergy: 1\n1 Fire Energy SVE 18\n",
+    }
+
+    parsed = cache.parse_many(export)
+    decks = cache.load_many(export)
+
+    assert list(decks) == ["alice", "bob", "carol"]
+    assert parsed["alice"] is parsed["bob"]
+    assert parsed["carol"].entries[0][0] == parsed["alice"].entries[0][0]
+    assert decks["carol"].name == "carol" and len(decks["carol"]) == 3
@@ -0,0 +1,106 @@
+import pytest
+
+from rules.engine import EffectContext, RuleEngine
+from rules.errors import EffectExecutionError
+from rules.schema import AtomicEffect, CardRule, SequenceEffect, Trigger, TriggerType
+from rules.state import CowState, StaleViewError, state_store
+
+
+def make_state() -> dict:
+    return {
+        "players": {
+            "p1": {"deck": ["C1", "C2", "C3"], "hand": []},
+            "p2": {"deck": ["D1"], "hand": []},
+        }
+    }
+
+
+def test_writes_path_copy_and_leave_shared_data_untouched() -> None:
+    original = make_state()
+    store = CowState(original)
+    hand = store.root["players"]["p1"]["hand"]
+    hand.append(store.root["players"]["p1"]["deck"].pop(0))
+
+    assert original == make_state()
+    assert store.data["players"]["p1"] == {"deck": ["C2", "C3"], "hand": ["C1"]}
+    # Untouched subtrees stay shared with the original.
+    assert store.data["players"]["p2"] is original["players"]["p2"]
+
+
+def test_fork_is_independent_in_both_directions() -> None:
+    parent = CowState(make_state())
+    child = parent.fork()
+    child.root["players"]["p1"]["hand"].append("X")
+    parent.root["players"]["p2"]["hand"].append("Y")
+
+    assert parent.data["players"]["p1"]["hand"] == []
+    assert child.data["players"]["p2"]["hand"] == []
+    assert child.root["players"]["p1"]["hand"] == ["X"]
+
+
+def test_rollback_restores_checkpoint_and_invalidates_views() -> None:
+    store = CowState(make_state())
+    deck = store.root["players"]["p1"]["deck"]
+    token = store.checkpoint()
+    deck.pop()
+    store.root["damage"] = {"p2_active": 30}
+    store.rollback(token)
+
+    assert store.data == make_state()
+    with pytest.raises(StaleViewError):
+        deck.append("C4")
+    assert "damage" not in store.root
+
+
+def test_list_views_detach_after_structural_change() -> None:
+    store = CowState({"bench": [{"name": "A", "damage": 0}, {"name": "B", "damage": 0}]})
+    first = store.root["bench"][0]
+    store.root["bench"].pop(0)
+    with pytest.raises(StaleViewError):
+        first["damage"] = 10
+    store.root["bench"][0]["damage"] = 20
+    assert store.data["bench"] == [{"name": "B", "damage": 20}]
+
+
+def test_list_slices_hand_out_views() -> None:
+    store = CowState({"bench": [{"name": "A", "damage": 0}, {"name": "B", "damage": 0}], "ids": [1, 2, 3]})
+    fork = store.fork()
+    store.root["bench"][:][0]["damage"] = 99
+    store.root["bench"][::-1][0]["damage"] = 10
+
+    assert store.data["bench"] == [{"name": "A", "damage": 99}, {"name": "B", "damage": 10}]
+    assert fork.data["bench"] == [{"name": "A", "damage": 0}, {"name": "B", "damage": 0}]
+    assert store.root["ids"][1:] == [2, 3]
+
+
+def test_engine_rolls_back_failed_sequences_and_forks_contexts() -> None:
+    engine = RuleEngine()
+    rule = CardRule(
+        rule_id="draw.then.search",
+        name="Draw then search",
+        version="1.0",
+        trigger=Trigger(type=TriggerType.MANUAL),
+        effect=SequenceEffect(
+            steps=[
+                AtomicEffect(effect="Draw", parameters={"count": 1}),
+                AtomicEffect(effect="SearchDeck", parameters={"card_name": "Missing"}),
+            ]
+        ),
+    )
+    context = EffectContext(controller="p1", state=CowState(make_state()).root, turn_identifier="t1")
+    with pytest.raises(EffectExecutionError):
+        engine.execute(rule, context)
+    assert state_store(context.state).data == make_state()
+
+    plain = EffectContext(controller="p1", state=make_state(), turn_identifier="t1")
+    speculative = plain.fork()
+    draw = CardRule(
+        rule_id="draw",
+        name="Draw",
+        version="1.0",
+        trigger=Trigger(type=TriggerType.MANUAL),
+        effect=AtomicEffect(effect="Draw", parameters={"count": 2}),
+    )
+    engine.execute(draw, speculative)
+    assert speculative.state["players"]["p1"]["hand"] == ["C1", "C2"]
+    assert plain.state["players"]["p1"]["hand"] == []
@@ -0,0 +1,115 @@
+import numpy as np
+import pytest
+
+from core.card_db import CardDatabase
+from core.card_tables import CardTables
+from core.damage import (
+    ADD,
+    AFTER_RESISTANCE,
+    BEFORE_WEAKNESS,
+    FIXED,
+    MULTIPLY,
+    NO_DAMAGE,
+    PLUS,
+    TIMES,
+    VARIABLE,
+    DamageModifiers,
+    DamageTables,
+    parse_damage,
+)
+
+
+def pokemon(card_id, name, types, damages, *, weakness=None, resistance=None):
+    card = {"id": card_id, "name": name, "supertype": "Pokémon", "subtypes": ["Basic"], "types": types,
+            "attacks": [{"name": f"{name} {idx}", "cost": [], "damage": damage}
+                        for idx, damage in enumerate(damages)]}
+    if weakness:
+        card["weaknesses"] = [{"type": weakness[0], "value": weakness[1]}]
+    if resistance:
+        card["resistances"] = [{"type": resistance[0], "value": resistance[1]}]
+    return card
+
+
+CARDS = [
+    pokemon("s-1", "Pikachu", ["Lightning"], ["20", "10+", "20×", "50-", "", "?"]),
+    pokemon("s-2", "Squirtle", ["Water"], ["30"], weakness=("Lightning", "×2")),
+    pokemon("s-3", "Diglett", ["Fighting"], ["10"], resistance=("Lightning", "-30")),
+    pokemon("s-4", "Onix", ["Fighting"], ["10"], weakness=("Lightning", "+20")),
+    {"id": "t-1", "name": "Potion", "supertype": "Trainer", "subtypes": ["Item"]},
+]
+DB = CardDatabase(CARDS)
+IDX = DB.index_of
+
+
+@pytest.fixture(scope="module")
+def damage() -> DamageTables:
+    return DamageTables(CardTables(DB))
+
+
+def test_parse_damage_forms() -> None:
+    assert parse_damage("30") == (FIXED, 30)
+    assert parse_damage("30+") == (PLUS, 30)
+    assert parse_damage("30×") == (TIMES, 30)
+    assert parse_damage("") == (NO_DAMAGE, 0)
+    assert parse_damage(None) == (NO_DAMAGE, 0)
+    assert parse_damage("?") == (VARIABLE, 0)
+    with pytest.raises(ValueError):
+        parse_damage("lots")
+
+
+def test_printed_damage_forms(damage) -> None:
+    pikachu, squirtle = IDX("s-1"), IDX("s-2")
+    assert damage.attack_damage(pikachu, 0, pikachu) == 20
+    assert damage.attack_damage(pikachu, 1, pikachu, extra=30) == 40
+    assert damage.attack_damage(pikachu, 2, pikachu, times=3) == 60
+    assert damage.attack_damage(pikachu, 3, pikachu, extra=20) == 30
+    assert damage.attack_damage(pikachu, 4, squirtle) == 0
+    assert damage.attack_damage(pikachu, 5, pikachu, extra=40) == 40
+    with pytest.raises(IndexError):
+        damage.attack_damage(squirtle, 1, pikachu)
+
+
+def test_weakness_and_resistance(damage) -> None:
+    pikachu = IDX("s-1")
+    assert damage.attack_damage(pikachu, 0, IDX("s-2")) == 40
+    assert damage.attack_damage(pikachu, 0, IDX("s-3")) == 0
+    assert damage.attack_damage(pikachu, 0, IDX("s-4")) == 40
+    assert damage.attack_damage(pikachu, 0, IDX("s-2"), active=False) == 20
+    # Attacks doing no damage are not boosted by Weakness.
+    assert damage.attack_damage(pikachu, 4, IDX("s-4")) == 0
+    assert damage.attack_damage(pikachu, 2, IDX("s-4"), times=0) == 0
+    # Weakness only applies to matching attacker types.
+    assert damage.attack_damage(IDX("s-2"), 0, IDX("s-4")) == 30
+
+
+def test_batched_kernel_matches_scalar_path(damage) -> None:
+    tables = damage.tables
+    defenders = np.flatnonzero(tables.is_pokemon)
+    rows = np.repeat(np.arange(len(tables.attack_card)), len(defenders))
+    attackers = tables.attack_card[rows]
+    targets = np.tile(defenders, len(tables.attack_card))
+    extra = np.full(rows.size, 20)
+    times = np.full(rows.size, 2)
+    batched = damage.damage(rows, attackers, targets, times=times, extra=extra)
+    for i, (row, attacker, target) in enumerate(zip(rows, attackers, targets)):
+        attack = row - tables.attack_offsets[attacker]
+        expected = damage.attack_damage(int(attacker), int(attack), int(target), times=2, extra=20)
+        assert batched[i] == expected
+
+
+def test_modifier_stack_applies_around_weakness(damage) -> None:
+    pikachu, squirtle, diglett = IDX("s-1"), IDX("s-2"), IDX("s-3")
+    rows = np.array([0, 0, 0])
+    modifiers = DamageModifiers.stack(
+        [
+            (0, BEFORE_WEAKNESS, ADD, 30),
+            (1, AFTER_RESISTANCE, ADD, -30),
+            (1, BEFORE_WEAKNESS, MULTIPLY, 2),
+            (2, AFTER_RESISTANCE, ADD, 50),
+        ]
+    )
+    result = damage.damage(
+        rows, [pikachu] * 3, [squirtle, squirtle, diglett], modifiers=modifiers
+    )
+    assert result.tolist() == [100, 50, 50]
+    assert DamageModifiers.stack([]).pair.size == 0
@@ -0,0 +1,93 @@
+import numpy as np
+import pytest
+
+from core import (
+    OpeningHandSampler,
+    batched_permutations,
+    batched_top_cards,
+    load_deck_from_limitless,
+    reset_card_uid_counter,
+)
+from core.card_db import CardDatabase
+from core.card_tables import CardTables
+
+DECK_LIST = """
+Pokémon: 13
+4 Charmander PAF 7
+4 Pidgey OBF 162
+4 Charmeleon MEW 5
+1 Pidgeot ex OBF 164
+
+Trainer: 40
+40 Arven OBF 186
+
+Energy: 7
+7 Fire Energy SVE 18
+"""
+
+
+@pytest.fixture(autouse=True)
+def _reset_uid_counter() -> None:
+    reset_card_uid_counter()
+
+
+def test_batched_permutations_rows_are_permutations() -> None:
+    rng = np.random.default_rng(3)
+    rows = batched_permutations(rng, 50, 60)
+    assert rows.shape == (50, 60)
+    assert (np.sort(rows, axis=1) == np.arange(60)).all()
+
+    top = batched_top_cards(rng, 50, 60, 13)
+    assert top.shape == (50, 13)
+    assert all(len(set(row)) == 13 for row in top.tolist())
+
+
+def test_sampler_matches_hypergeometric_mulligan_rate() -> None:
+    deck = load_deck_from_limitless(DECK_LIST)
+    sampler = OpeningHandSampler(deck, is_basic=lambda card: card.name in {"Charmander", "Pidgey"})
+
+    stats = sampler.sample(200_000, key_cards=["Pidgeot ex"], rng=np.random.default_rng(0))
+
+    # Probability of drawing none of the 8 Basics in 7 cards from 60.
+    expected_mulligan = np.prod([(52 - i) / (60 - i) for i in range(7)])
+    assert stats.mulligan_rate == pytest.approx(expected_mulligan, abs=0.005)
+    assert stats.basic_probability + stats.mulligan_rate == pytest.approx(1.0)
+    # A single copy is prized with probability 6/53 once the hand is known not to hold it.
+    assert stats.prized_any_probability["Pidgeot ex"] == pytest.approx(
+        stats.prized_all_probability["Pidgeot ex"]
+    )
+    assert 0.08 < stats.prized_any_probability["Pidgeot ex"] < 0.12
+
+
+def test_sampler_resolves_stages_from_card_tables() -> None:
+    def pokemon(card_id, name, stage, evolves_from=None):
+        return {"id": card_id, "name": name, "supertype": "Pokémon", "subtypes": [stage],
+                "evolvesFrom": evolves_from}
+
+    tables = CardTables(CardDatabase([
+        pokemon("a-1", "Charmander", "Basic"),
+        pokemon("a-2", "Charmeleon", "Stage 1", "Charmander"),
+        pokemon("a-3", "Pidgey", "Basic"),
+        pokemon("a-4", "Pidgeotto", "Stage 1", "Pidgey"),
+        pokemon("a-5", "Pidgeot ex", "Stage 2", "Pidgeotto"),
+    ]))
+    deck = load_deck_from_limitless(DECK_LIST)
+    stats = OpeningHandSampler(deck, tables=tables).sample(100_000, rng=np.random.default_rng(1))
+    expected_mulligan = np.prod([(52 - i) / (60 - i) for i in range(7)])
+    assert stats.mulligan_rate == pytest.approx(expected_mulligan, abs=0.005)
+
+    with pytest.raises(ValueError):
+        OpeningHandSampler(deck, tables=CardTables(CardDatabase([pokemon("a-1", "Charmander", "Basic")])))
+
+
+def test_sampler_refuses_to_guess_stages() -> None:
+    deck = load_deck_from_limitless(DECK_LIST)
+    with pytest.raises(ValueError, match="No stage"):
+        OpeningHandSampler(deck)
+
+
+def test_sampler_rejects_unknown_key_cards() -> None:
+    deck = load_deck_from_limitless(DECK_LIST)
+    sampler = OpeningHandSampler(deck, is_basic=lambda card: card.name == "Charmander")
+    with pytest.raises(ValueError):
+        sampler.sample(10, key_cards=["Mew"])
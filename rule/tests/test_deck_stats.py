@@ -0,0 +1,96 @@
+import numpy as np
+import pytest
+
+from analytics import SUPPORTER_MODIFIER, BoardGoal, DeckStatsConfig, DeckStatsEngine, simulate_chunk
+from core import load_deck_from_limitless, reset_card_uid_counter
+from core.random_control import StreamKey
+from rules.schema import AtomicEffect, CardRule, Modifier, Trigger, TriggerType
+
+DECK_LIST = """
+Pokémon: 8
+4 Charmander PAF 7
+4 Pidgey OBF 162
+
+Trainer: 8
+4 Nest Ball SVI 181
+4 Professor's Research SVI 189
+
+Energy: 44
+44 Fire Energy SVE 18
+"""
+
+NEST_BALL = CardRule(
+    rule_id="nest.ball",
+    name="Nest Ball",
+    version="1.0",
+    trigger=Trigger(type=TriggerType.MANUAL),
+    effect=AtomicEffect(
+        effect="SearchDeck", parameters={"card_name": "Charmander", "destination": "bench"}
+    ),
+)
+RESEARCH = CardRule(
+    rule_id="professors.research",
+    name="Professor's Research",
+    version="1.0",
+    trigger=Trigger(type=TriggerType.MANUAL),
+    effect=AtomicEffect(effect="Draw", parameters={"count": 7}),
+    modifiers=[Modifier(type="once_per_turn", identifier=SUPPORTER_MODIFIER)],
+)
+
+
+@pytest.fixture(autouse=True)
+def _reset_uid_counter() -> None:
+    reset_card_uid_counter()
+
+
+def _config(**options: object) -> DeckStatsConfig:
+    deck = load_deck_from_limitless(DECK_LIST)
+    goals = [
+        BoardGoal("charmander_benched", {"bench": {"Charmander": 1}}),
+        BoardGoal("two_pidgey_in_hand", {"hand": {"Pidgey": 2}}),
+    ]
+    options.setdefault("basic_names", frozenset({"Charmander", "Pidgey"}))
+    return DeckStatsConfig.from_deck(
+        deck,
+        goals,
+        card_rules={"Nest Ball": NEST_BALL, "Professor's Research": RESEARCH},
+        **options,
+    )
+
+
+def test_simulate_chunk_is_reproducible_and_monotonic() -> None:
+    config = _config(turns=4)
+    key = StreamKey(21)
+    hits = simulate_chunk(config, key, 300)
+
+    assert hits.shape == (2, 4)
+    np.testing.assert_array_equal(hits, simulate_chunk(config, key, 300))
+    assert (np.diff(hits, axis=1) >= 0).all()
+    assert hits.max() <= 300
+
+
+def test_engine_streams_reports_and_stops_on_tolerance() -> None:
+    engine = DeckStatsEngine(_config(), workers=0, chunk_games=200, master_seed=5)
+    reports = list(engine.stream(max_games=20_000, tolerance=0.05))
+
+    assert reports[-1].converged
+    assert reports[-1].games < 20_000
+    assert [report.games for report in reports] == [200 * (i + 1) for i in range(len(reports))]
+    assert reports[-1].max_half_width <= 0.05
+    benched = reports[-1].probabilities["charmander_benched"]
+    assert 0.0 < benched[0] <= benched[-1] <= 1.0
+
+
+def test_process_pool_matches_inline_results() -> None:
+    config = _config(turns=2)
+    inline = DeckStatsEngine(config, workers=0, chunk_games=100, master_seed=3).run(max_games=300)
+    pooled = DeckStatsEngine(config, workers=2, chunk_games=100, master_seed=3).run(max_games=300)
+
+    assert pooled.games == inline.games == 300
+    for goal, values in inline.probabilities.items():
+        np.testing.assert_allclose(pooled.probabilities[goal], values)
+
+
+def test_config_rejects_decks_without_any_basic() -> None:
+    with pytest.raises(ValueError, match="mulligan"):
+        _config(basic_names=frozenset({"Charmandr"}))
@@ -0,0 +1,98 @@
+import numpy as np
+import pytest
+
+from rules.effects import registry
+from rules.engine import EffectContext, RuleEngine
+from rules.errors import EffectExecutionError
+from rules.events import EVENT_DTYPE, NO_SYMBOL, EventKind, EventLog
+from rules.schema import AtomicEffect, CardRule, SequenceEffect, Trigger, TriggerType
+from rules.state import CowState
+
+
+def make_context(events: EventLog, state: dict | None = None) -> EffectContext:
+    state = state or {"players": {"p1": {"deck": ["A", "B", "C"], "hand": []}}}
+    return EffectContext(
+        controller="p1", state=state, turn_identifier="t1", source_rule="rule-1", events=events
+    )
+
+
+def test_handlers_emit_typed_events_and_apply_returns_view() -> None:
+    events = EventLog(capacity=2)
+    context = make_context(events)
+
+    drawn = registry.apply("Draw", context, {"count": 2})
+    registry.apply("SearchDeck", context, {"card_name": "C", "destination": "discard"})
+    registry.apply("AddDamage", context, {"target": "p2_active", "amount": 30})
+
+    assert drawn is not None and drawn.dtype == EVENT_DTYPE
+    assert list(drawn["kind"]) == [EventKind.DRAW, EventKind.DRAW]
+    log = events.view()
+    assert list(log["kind"]) == [EventKind.DRAW, EventKind.DRAW, EventKind.SEARCH_HIT, EventKind.DAMAGE_ADDED]
+    assert log["amount"][-1] == 30 and log["player"][-1] == NO_SYMBOL
+    assert not log.flags.writeable
+    assert events.to_dicts(2, 3) == [
+        {
+            "kind": "SEARCH_HIT",
+            "rule": "rule-1",
+            "player": "p1",
+            "card": "C",
+            "source": "deck",
+            "destination": "discard",
+            "amount": 0,
+        }
+    ]
+
+
+def test_apply_without_event_log_returns_none() -> None:
+    context = EffectContext(controller="p1", state={"players": {"p1": {"deck": ["A"]}}}, turn_identifier="t")
+    assert registry.apply("Draw", context, {}) is None
+
+
+def test_unhashable_cards_are_logged_by_identity() -> None:
+    events = EventLog()
+    deck = [{"id": "sv1-1", "name": "A"}, {"name": "B"}, ["C"]]
+    context = make_context(events, {"players": {"p1": {"deck": deck, "hand": []}}})
+    registry.apply("Draw", context, {"count": 3})
+    assert [event["card"] for event in events.to_dicts()] == ["sv1-1", "B", "['C']"]
+
+
+def test_search_miss_is_logged_before_failure() -> None:
+    events = EventLog()
+    with pytest.raises(EffectExecutionError):
+        registry.apply("SearchDeck", make_context(events), {"card_name": "Z"})
+    assert events.to_dicts()[0]["kind"] == "SEARCH_MISS"
+
+
+def test_digest_is_incremental_and_follows_truncate() -> None:
+    first, second = EventLog(), EventLog()
+    context = make_context(first)
+    registry.apply("Draw", context, {"count": 1})
+    partial = first.digest()
+    registry.apply("Draw", context, {"count": 1})
+    registry.apply("Draw", make_context(second), {"count": 2})
+
+    assert first.digest() == second.digest() != partial
+    first.truncate(1)
+    assert first.digest() == partial
+    np.testing.assert_array_equal(first.view(), second.view(0, 1))
+
+
+def test_rolled_back_rule_discards_its_events() -> None:
+    events = EventLog()
+    store = CowState({"players": {"p1": {"deck": ["A"], "hand": []}}})
+    context = EffectContext(controller="p1", state=store.root, turn_identifier="t1", events=events)
+    rule = CardRule(
+        rule_id="bad",
+        name="Bad",
+        version="1",
+        trigger=Trigger(type=TriggerType.MANUAL),
+        effect=SequenceEffect(
+            steps=[
+                AtomicEffect(effect="Draw", parameters={"count": 1}),
+                AtomicEffect(effect="SearchDeck", parameters={"card_name": "Z"}),
+            ]
+        ),
+    )
+    with pytest.raises(EffectExecutionError):
+        RuleEngine().execute(rule, context)
+    assert len(events) == 0
@@ -0,0 +1,101 @@
+import threading
+
+import numpy as np
+import pytest
+
+from agents.inference import InferenceBroker, LatencyHistogram, NumpyMLP, masked_softmax
+from env.battle_env import ACTION_TYPES, BattleEnv
+
+
+def test_masked_softmax_zeroes_illegal_actions() -> None:
+    logits = np.array([[1.0, 2.0, 3.0], [0.0, 0.0, 0.0]])
+    masks = np.array([[True, False, True], [False, False, False]])
+    probs = masked_softmax(logits, masks)
+    assert probs[0, 1] == 0.0
+    assert probs[0].sum() == pytest.approx(1.0)
+    assert probs[1].tolist() == [0.0, 0.0, 0.0]
+
+
+def test_broker_batches_concurrent_requests() -> None:
+    env = BattleEnv(seed=0)
+    env.reset()
+    model = NumpyMLP(seed=0)
+    expected = masked_softmax(model.forward(env.encode_observation()[None]), env.action_mask()[None])[0]
+
+    with InferenceBroker(model, max_batch_size=16, max_wait=0.05) as broker:
+        futures = [broker.submit_env(env) for _ in range(40)]
+        results = [future.result(timeout=5) for future in futures]
+        stats = broker.stats()
+
+    assert all(np.allclose(result, expected) for result in results)
+    assert results[0].shape == (len(ACTION_TYPES),)
+    assert stats.requests == 40
+    assert stats.batches < 40
+    assert stats.mean_batch_size > 1
+    assert broker.latency.count == 40
+
+
+def test_broker_serves_many_threads() -> None:
+    model = NumpyMLP(seed=1)
+    obs = np.zeros(model.weights[0].shape[0], dtype=np.float32)
+    mask = np.ones(len(ACTION_TYPES), dtype=bool)
+    totals = []
+
+    with InferenceBroker(model, max_batch_size=8, max_wait=0.01) as broker:
+        def worker() -> None:
+            totals.append(sum(broker.infer(obs, mask, timeout=5).sum() for _ in range(10)))
+
+        threads = [threading.Thread(target=worker) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    assert totals == pytest.approx([10.0] * 8)
+    with pytest.raises(RuntimeError):
+        broker.submit(obs, mask)
+
+
+def test_model_errors_propagate_to_futures() -> None:
+    class Broken:
+        def forward(self, observations: np.ndarray) -> np.ndarray:
+            raise ValueError("boom")
+
+    with InferenceBroker(Broken(), max_wait=0.0) as broker:
+        future = broker.submit(np.zeros(3), np.ones(3, dtype=bool))
+        with pytest.raises(ValueError, match="boom"):
+            future.result(timeout=5)
+
+
+def test_close_resolves_every_submitted_future() -> None:
+    model = NumpyMLP(seed=2)
+    obs = np.zeros(model.weights[0].shape[0], dtype=np.float32)
+    mask = np.ones(len(ACTION_TYPES), dtype=bool)
+    futures = []
+    broker = InferenceBroker(model, max_batch_size=4, max_wait=0.01)
+
+    def worker() -> None:
+        for _ in range(50):
+            try:
+                futures.append(broker.submit(obs, mask))
+            except RuntimeError:
+                return
+
+    threads = [threading.Thread(target=worker) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    broker.close()
+    for thread in threads:
+        thread.join()
+
+    assert all(future.done() for future in futures)
+    served = [future for future in futures if future.exception() is None]
+    assert broker.stats().requests == len(served)
+
+
+def test_latency_histogram_quantiles() -> None:
+    histogram = LatencyHistogram(buckets=(0.001, 0.01))
+    histogram.record_many(np.array([0.0005, 0.0005, 0.005, 0.5]))
+    assert histogram.counts == (2, 1, 1)
+    assert histogram.quantile(0.5) == 0.001
+    assert histogram.quantile(0.99) == float("inf")
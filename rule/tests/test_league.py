@@ -0,0 +1,44 @@
+from pathlib import Path
+
+from agents.random_agent import RandomAgent
+from agents.rule_based_agent import RuleBasedAgent
+from evaluation.league import League
+from evaluation.match import play_match
+
+
+def test_play_match_is_reproducible_from_seed() -> None:
+    first = play_match(RandomAgent(seed=1), RuleBasedAgent(), 42)
+    second = play_match(RandomAgent(seed=2), RuleBasedAgent(), 42)
+    assert first == second
+    assert first.score in (0.0, 0.5, 1.0)
+
+
+def test_league_rates_and_resumes(tmp_path: Path) -> None:
+    path = tmp_path / "league.sqlite"
+    with League(path, master_seed=7, workers=0) as league:
+        league.add_snapshot("random", RandomAgent())
+        league.add_snapshot("scripted", RuleBasedAgent())
+        jobs = league.schedule(num_pairings=1, games_per_pairing=6)
+        assert {job.player_one for job in jobs} == {"random", "scripted"}
+        league.play(jobs)
+        best = league.ratings()[0]
+        assert best.name == "scripted"
+        assert best.games == 6
+        master_seed = league.master_seed
+
+    with League(path, workers=0) as resumed:
+        assert resumed.master_seed == master_seed
+        assert resumed.names == ["random", "scripted"]
+        assert len(resumed.results()) == 6
+        next_jobs = resumed.schedule(num_pairings=1, games_per_pairing=2)
+        assert not {job.seed for job in next_jobs} & {job.seed for job in jobs}
+
+
+def test_league_process_pool_matches_inline() -> None:
+    results = {}
+    for workers in (0, 2):
+        with League(master_seed=3, workers=workers) as league:
+            league.add_snapshot("a", RandomAgent())
+            league.add_snapshot("b", RandomAgent())
+            results[workers] = league.run_round(num_pairings=1, games_per_pairing=4)
+    assert results[0] == results[2]
@@ -0,0 +1,104 @@
+import pytest
+
+from core import load_deck_from_json
+from core.card_db import CardDatabase
+from core.errors import DeckValidationError
+from core.legality import (
+    ERR_BANNED,
+    ERR_COPY_LIMIT,
+    ERR_DECK_SIZE,
+    ERR_NO_BASIC_POKEMON,
+    ERR_NOT_LEGAL,
+    ERR_REGULATION_MARK,
+    ERR_UNKNOWN_CARD,
+    DeckValidator,
+)
+
+STANDARD = {"unlimited": "Legal", "expanded": "Legal", "standard": "Legal"}
+EXPANDED = {"unlimited": "Legal", "expanded": "Legal"}
+
+
+def card(card_id, name, supertype, subtypes, legalities, mark=None):
+    record = {"id": card_id, "name": name, "supertype": supertype, "subtypes": subtypes,
+              "number": card_id.split("-")[1], "legalities": legalities}
+    if mark:
+        record["regulationMark"] = mark
+    return record
+
+
+CARDS = [
+    card("new-1", "Pikachu", "Pokémon", ["Basic"], STANDARD, "G"),
+    card("old-5", "Pikachu", "Pokémon", ["Basic"], EXPANDED, "D"),
+    card("new-2", "Raichu", "Pokémon", ["Stage 1"], STANDARD, "H"),
+    card("new-3", "Nest Ball", "Trainer", ["Item"], STANDARD, "G"),
+    card("new-4", "Prime Catcher", "Trainer", ["Item", "ACE SPEC"], STANDARD, "H"),
+    card("new-5", "Master Ball", "Trainer", ["Item", "ACE SPEC"], STANDARD, "H"),
+    card("old-6", "Lysandre's Trump Card", "Trainer", ["Supporter"], {"unlimited": "Legal", "expanded": "Banned"}),
+    card("nrg-1", "Basic Lightning Energy", "Energy", ["Basic"], {"unlimited": "Legal"}),
+]
+SETS = [{"id": "new", "ptcgoCode": "NEW"}, {"id": "old", "ptcgoCode": "OLD"}, {"id": "nrg", "ptcgoCode": "NRG"}]
+
+
+@pytest.fixture(scope="module")
+def validator() -> DeckValidator:
+    return DeckValidator(CardDatabase(CARDS), SETS)
+
+
+def deck_list(*lines: str) -> str:
+    return "Pokémon: 1\n" + "\n".join(lines)
+
+
+LEGAL = deck_list("4 Pikachu NEW 1", "4 Raichu NEW 2", "4 Nest Ball NEW 3", "1 Prime Catcher NEW 4",
+                  "47 Lightning Energy SVE 18")
+
+
+def codes(errors):
+    return [error.code for error in errors]
+
+
+def test_legal_deck_has_no_errors(validator) -> None:
+    assert validator.validate(LEGAL) == []
+    assert validator.validate(LEGAL, "expanded") == []
+    validator.check(LEGAL)
+
+
+def test_reprints_share_the_copy_limit(validator) -> None:
+    deck = LEGAL.replace("4 Pikachu NEW 1", "3 Pikachu NEW 1\n2 Pikachu OLD 5").replace("47 Lightning", "46 Lightning")
+    errors = validator.validate(deck, "expanded")
+    assert codes(errors) == [ERR_COPY_LIMIT]
+    assert "5 copies of Pikachu" in errors[0].message
+    assert codes(validator.validate(deck)) == [ERR_NOT_LEGAL, ERR_COPY_LIMIT]
+
+
+def test_structured_errors_for_every_rule(validator) -> None:
+    deck = deck_list("4 Raichu NEW 2", "1 Prime Catcher NEW 4", "1 Master Ball NEW 5",
+                     "1 Lysandre's Trump Card OLD 6", "2 Mystery Card XYZ 9")
+    errors = validator.validate(deck, "expanded")
+    assert codes(errors) == [ERR_UNKNOWN_CARD, ERR_BANNED, ERR_COPY_LIMIT, ERR_DECK_SIZE, ERR_NO_BASIC_POKEMON]
+    assert errors[0].message == "Unknown card Mystery Card XYZ 9"
+    assert "ACE SPEC" in errors[2].message
+
+    marks = validator.validate(LEGAL, regulation_marks="H")
+    assert codes(marks) == [ERR_REGULATION_MARK, ERR_REGULATION_MARK]
+    with pytest.raises(DeckValidationError) as excinfo:
+        validator.check(deck, "expanded")
+    assert excinfo.value.code == "ERR_INVALID_DECK" and len(excinfo.value.errors) == 5
+    with pytest.raises(ValueError):
+        validator.validate(LEGAL, "legacy")
+
+
+def test_bulk_mode_matches_single_deck_validation(validator) -> None:
+    json_deck = load_deck_from_json({
+        "name": "json",
+        "cards": [
+            {"count": 4, "name": "Pikachu", "supertype": "Pokémon", "set_code": "NEW", "number": "1"},
+            {"count": 56, "name": "Basic Lightning Energy", "supertype": "Energy", "set_code": "NRG", "number": "1"},
+        ],
+    })
+    decks = {"legal": LEGAL, "short": deck_list("4 Pikachu NEW 1"), "json": json_deck, "empty": ""}
+    results = validator.validate_many(decks)
+    assert list(results) == list(decks)
+    assert results == {name: validator.validate(deck) for name, deck in decks.items()}
+    assert results["legal"] == [] and results["json"] == []
+    assert codes(results["short"]) == [ERR_DECK_SIZE]
+    assert codes(results["empty"]) == [ERR_DECK_SIZE, ERR_NO_BASIC_POKEMON]
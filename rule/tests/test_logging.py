@@ -1,7 +1,81 @@
+import io
+import logging
+
+import pytest
+
+from core.logging_config import (
+    SamplingFilter,
+    StepLoggerAdapter,
+    setup_logging,
+    shutdown_logging,
+)
+from env.battle_env import BattleEnv
+
+
+@pytest.fixture
+def stream():
+    buffer = io.StringIO()
+    yield buffer
+    shutdown_logging()
 
-from core.logging_config import setup_logging
 
 def test_logger_init():
     logger = setup_logging()
     logger.info("hello")
     assert logger.name == "ptcg"
+    shutdown_logging()
+
+
+def test_step_records_carry_structured_fields(stream):
+    logger = setup_logging(stream=stream)
+    env = BattleEnv(seed=1)
+    env.reset()
+    steps = StepLoggerAdapter(logging.getLogger("ptcg.env"), env, env_id=7)
+    steps.info("step %d", 1)
+    steps.debug("not emitted")
+    shutdown_logging()
+
+    (line,) = stream.getvalue().splitlines()
+    assert "ptcg.env: step 1" in line
+    assert f"env_id=7 turn=1 player=PLAYER_ONE state_key={env.state_key():016x}" in line
+    assert logger.handlers and logger.propagate is False
+
+
+def test_sampling_keeps_fraction_and_all_warnings(stream):
+    setup_logging(stream=stream, sample_rates={"ptcg.selfplay": 0.25})
+    sampled, other = logging.getLogger("ptcg.selfplay.worker"), logging.getLogger("ptcg.league")
+    env = BattleEnv(seed=1)
+    env.reset()
+    adapter = StepLoggerAdapter(sampled, env, env_id=0)
+    for idx in range(100):
+        sampled.info("step %d", idx)
+    for idx in range(100):
+        adapter.info("adapted %d", idx)
+    sampled.warning("always kept")
+    other.info("unsampled")
+    shutdown_logging()
+
+    lines = stream.getvalue().splitlines()
+    assert sum("step" in line for line in lines) == 25
+    assert sum("adapted" in line for line in lines) == 25
+    assert any("always kept" in line for line in lines)
+    assert any("unsampled" in line for line in lines)
+    with pytest.raises(ValueError):
+        SamplingFilter({"ptcg": 2.0})
+
+
+def test_flight_recorder_dumps_recent_debug_records_on_error(stream):
+    logger = setup_logging(stream=stream, flight_recorder=3)
+    for idx in range(5):
+        logger.debug("trace %d", idx)
+    logger.info("visible")
+    shutdown_logging()
+    assert "trace" not in stream.getvalue()
+
+    logger = setup_logging(stream=stream, flight_recorder=3)
+    for idx in range(5):
+        logger.debug("trace %d", idx)
+    logger.error("boom")
+    shutdown_logging()
+    lines = stream.getvalue().splitlines()
+    assert [line.split(": ")[-1] for line in lines[-4:]] == ["trace 2", "trace 3", "trace 4", "boom"]
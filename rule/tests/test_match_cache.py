@@ -0,0 +1,109 @@
+from pathlib import Path
+
+from agents.random_agent import RandomAgent
+from agents.rule_based_agent import RuleBasedAgent
+from evaluation.cache import MatchCache, play_cached, ruleset_key
+from evaluation.league import League
+from evaluation.match import MatchJob, play_jobs
+from evaluation.sprt import SequentialEvaluator
+from rules.loader import RuleRepository
+
+
+def _rule(version: str) -> dict:
+    return {
+        "rule_id": "draw.rule",
+        "name": "Draw",
+        "version": version,
+        "trigger": {"type": "manual"},
+        "effect": {"type": "atomic", "effect": "Draw", "parameters": {"count": 1}},
+    }
+
+
+def test_play_cached_only_plays_misses(tmp_path: Path) -> None:
+    agents = {"random": RandomAgent(), "scripted": RuleBasedAgent()}
+    fingerprints = {"random": "r1", "scripted": "s1"}
+    jobs = [MatchJob("random", "scripted", seed) for seed in range(4)]
+    played = []
+
+    def play(missing):
+        played.append(len(missing))
+        return play_jobs(agents, missing)
+
+    with MatchCache(tmp_path / "cache.sqlite") as cache:
+        first = play_cached(jobs[:2], play, cache=cache, fingerprints=fingerprints, ruleset="v0")
+        second = play_cached(jobs, play, cache=cache, fingerprints=fingerprints, ruleset="v0")
+        assert played == [2, 2]
+        assert second[:2] == first
+        assert cache.stats().entries == 4
+
+    with MatchCache(tmp_path / "cache.sqlite") as reopened:
+        assert play_cached(jobs, play, cache=reopened, fingerprints=fingerprints, ruleset="v0") == second
+        assert played == [2, 2]
+        assert reopened.stats().hit_rate == 1.0
+
+
+def test_ruleset_key_follows_repository_contents() -> None:
+    repo = RuleRepository()
+    repo.load_from_records([{"payload": _rule("1.0")}])
+    before = ruleset_key("v0", repo)
+    assert before == ruleset_key("v0", repo)
+    repo.load_from_records([{"payload": _rule("2.0")}])
+    assert ruleset_key("v0", repo) != before
+    assert ruleset_key("v0") == "v0"
+
+
+def test_invalidate_drops_stale_rulesets() -> None:
+    with MatchCache() as cache:
+        cache.put_many([(("a", "b", 1, "old", 200), 1.0, 5), (("a", "b", 1, "new", 200), 0.0, 7)])
+        assert cache.invalidate(keep_ruleset="new") == 1
+        assert cache.get(("a", "b", 1, "old", 200)) is None
+        assert cache.get(("a", "b", 1, "new", 200)) == (0.0, 7)
+
+
+def test_step_cap_is_part_of_the_key(tmp_path: Path) -> None:
+    agents = {"random": RandomAgent(), "scripted": RuleBasedAgent()}
+    fingerprints = {"random": "r1", "scripted": "s1"}
+    jobs = [MatchJob("random", "scripted", seed) for seed in range(2)]
+    played = []
+
+    def play(missing):
+        played.append(len(missing))
+        return play_jobs(agents, missing)
+
+    with MatchCache(tmp_path / "cache.sqlite") as cache:
+        for max_steps in (10, 200, 10):
+            play_cached(jobs, play, cache=cache, fingerprints=fingerprints, ruleset="v0", max_steps=max_steps)
+        assert played == [2, 2]
+
+
+def test_league_and_sprt_reuse_cached_games() -> None:
+    with MatchCache() as cache:
+        for _ in range(2):
+            with League(master_seed=5, workers=0, cache=cache) as league:
+                league.add_snapshot("random", RandomAgent())
+                league.add_snapshot("scripted", RuleBasedAgent())
+                league.run_round(num_pairings=1, games_per_pairing=4)
+        assert cache.stats().entries == 4
+        assert cache.stats().hits == 4
+
+        reports = [
+            SequentialEvaluator(
+                RuleBasedAgent(), RandomAgent(), workers=workers, master_seed=1, cache=cache
+            ).run()
+            for workers in (0, 2)
+        ]
+        assert reports[0] == reports[1]
+        assert cache.stats().hits >= 4 + reports[0].games
+
+
+def test_league_keys_results_by_loaded_rules() -> None:
+    repo = RuleRepository()
+    repo.load_from_records([{"payload": _rule("1.0")}])
+    with MatchCache() as cache:
+        for rules in (None, repo):
+            with League(master_seed=5, workers=0, cache=cache, rules=rules) as league:
+                league.add_snapshot("random", RandomAgent())
+                league.add_snapshot("scripted", RuleBasedAgent())
+                league.run_round(num_pairings=1, games_per_pairing=2)
+        assert cache.stats().hits == 0
+        assert cache.invalidate(keep_ruleset=ruleset_key("v0", repo)) == 2
@@ -0,0 +1,82 @@
+import numpy as np
+
+from agents.mcts_agent import ISMCTSAgent, ValueFunctionEvaluator, run_search
+from env.battle_env import ACTION_TYPES, OBSERVATION_SIZE, BattleEnv
+
+
+def _started_env(seed: int = 3) -> BattleEnv:
+    env = BattleEnv(seed=seed)
+    env.reset()
+    return env
+
+
+def test_clone_is_independent_of_original() -> None:
+    env = _started_env()
+    key = env.state_key()
+    clone = env.clone()
+    assert clone.state_key() == key
+
+    clone.step({"action_type": "ATTACH_ENERGY"})
+    clone.step({"action_type": "DECLARE_ATTACK"})
+    assert env.state_key() == key
+    assert clone.state_key() != key
+
+
+def test_search_respects_iteration_limit_and_picks_legal_action() -> None:
+    env = _started_env()
+    agent = ISMCTSAgent(time_budget=None, max_iterations=40, leaf_batch_size=4, seed=0)
+    action = agent.select_action(env)
+
+    stats = agent.last_stats
+    assert stats is not None
+    assert stats.iterations == 40
+    assert sum(stats.root_visits) == 40
+    assert env.action_mask()[action]
+    assert agent.act(env) in ({"action_type": t.name} for t in ACTION_TYPES)
+
+
+def test_value_function_evaluator_receives_leaf_batches() -> None:
+    batch_sizes = []
+
+    def value_fn(batch: np.ndarray) -> np.ndarray:
+        assert batch.shape[1] == OBSERVATION_SIZE
+        batch_sizes.append(batch.shape[0])
+        return np.zeros(batch.shape[0])
+
+    agent = ISMCTSAgent(
+        evaluator=ValueFunctionEvaluator(value_fn),
+        time_budget=None,
+        max_iterations=32,
+        leaf_batch_size=8,
+        seed=1,
+    )
+    agent.search(_started_env())
+    assert max(batch_sizes) > 1
+    assert sum(batch_sizes) <= 32
+
+
+def test_root_parallel_workers_sum_iterations() -> None:
+    with ISMCTSAgent(time_budget=None, max_iterations=10, workers=2, seed=2) as agent:
+        stats = agent.search(_started_env())
+    assert stats.iterations == 20
+
+
+def test_search_reseeds_the_evaluator_per_worker_seed() -> None:
+    class Recorder:
+        def __init__(self) -> None:
+            self.seeds: list[int] = []
+
+        def reseed(self, seed: int) -> None:
+            self.seeds.append(seed)
+
+        def __call__(self, envs) -> np.ndarray:
+            return np.zeros(len(envs))
+
+    recorder = Recorder()
+    options = dict(
+        time_budget=None, max_iterations=4, exploration=1.4, leaf_batch_size=2, virtual_loss=1.0
+    )
+    for seed in (1, 2, 1, None):
+        run_search(_started_env(), evaluator=recorder, seed=seed, **options)
+    first, second, again = recorder.seeds
+    assert first != second and first == again
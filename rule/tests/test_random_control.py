@@ -2,7 +2,14 @@ import random
 
 import numpy as np
 
-from core.random_control import rng_state_digest, seed_everything, global_rng
+from core.random_control import (
+    RNGStreams,
+    StreamKey,
+    global_rng,
+    rng_state_digest,
+    seed_everything,
+)
+from env.battle_env import BattleEnv
 
 
 def test_seed_everything_resets_all_rngs() -> None:
@@ -23,3 +30,37 @@ def test_rng_state_digest_changes_after_sampling() -> None:
     random.random()
     after = rng_state_digest()
     assert before != after
+
+
+def test_stream_keys_are_reproducible_and_independent() -> None:
+    streams = RNGStreams(master_seed=7)
+    key = streams.key(worker_id=3, env_index=2, episode_index=5)
+
+    seed_everything(1)
+    first = streams.generator(key).random(4)
+    seed_everything(2)
+    again = RNGStreams(master_seed=7).generator(StreamKey(7, 3, 2, 5)).random(4)
+    np.testing.assert_allclose(first, again)
+
+    neighbour = streams.generator(key.next_episode()).random(4)
+    assert not np.allclose(first, neighbour)
+    assert len({k.as_tuple() for k in streams.worker_keys(0, 8)}) == 8
+
+
+def test_buffered_rng_matches_underlying_generator() -> None:
+    key = StreamKey(11)
+    buffered = RNGStreams(11).buffered(key, buffer_size=8)
+    flips = [buffered.coin_flip() for _ in range(3)] + list(buffered.coin_flips(10))
+
+    expected = np.random.Generator(np.random.PCG64(key.seed_sequence())).random(16) < 0.5
+    assert flips == list(expected[:13])
+
+
+def test_battle_env_episode_streams_follow_key() -> None:
+    env = BattleEnv(rng_key=StreamKey(5, worker_id=1, env_index=4))
+    first_hash = env.reset()["state_hash"]
+    assert env.reset(episode_index=1)["state_hash"] != first_hash
+    assert env.rng_key == StreamKey(5, 1, 4, 1)
+
+    replay = BattleEnv(rng_key=StreamKey(5, worker_id=1, env_index=4, episode_index=1))
+    assert replay.reset()["state_hash"] == env.state_hash()
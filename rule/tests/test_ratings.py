@@ -0,0 +1,63 @@
+import numpy as np
+import pytest
+
+from evaluation.match import MatchResult
+from evaluation.ratings import (
+    elo_expected,
+    elo_update,
+    informative_pairings,
+    result_matrices,
+    trueskill_update,
+)
+
+
+def test_elo_batch_update_is_zero_sum() -> None:
+    results = [MatchResult("a", "b", seed, 1.0, 10) for seed in range(3)]
+    results.append(MatchResult("c", "a", 9, 0.5, 10))
+    scores, games = result_matrices(results, {"a": 0, "b": 1, "c": 2})
+    assert games[0, 1] == games[1, 0] == 3
+    assert scores[0, 2] == scores[2, 0] == 0.5
+
+    updated = elo_update(np.full(3, 1500.0), scores, games, k=16.0)
+    assert updated.sum() == pytest.approx(4500.0)
+    assert updated[0] == pytest.approx(1500.0 + 16.0 * 1.5)
+    assert elo_expected(np.array(1600.0), np.array(1200.0)) == pytest.approx(10 / 11)
+
+
+def test_trueskill_matches_reference_single_game() -> None:
+    mu = np.array([25.0, 25.0])
+    sigma = np.array([25 / 3, 25 / 3])
+    new_mu, new_sigma = trueskill_update(mu, sigma, [1], [0], [1.0])
+    # Reference values for a 1v1 win with a 2% draw probability.
+    assert new_mu == pytest.approx([20.757, 29.243], abs=1e-3)
+    assert new_sigma == pytest.approx([7.190, 7.190], abs=1e-3)
+
+    drawn_mu, drawn_sigma = trueskill_update(mu, sigma, [0], [1], [0.5])
+    assert drawn_mu == pytest.approx(mu)
+    assert (drawn_sigma < sigma).all()
+
+
+def test_trueskill_round_matches_sequential_updates() -> None:
+    rng = np.random.default_rng(7)
+    first = rng.integers(0, 4, size=40)
+    second = (first + rng.integers(1, 4, size=40)) % 4
+    scores = rng.choice([0.0, 0.5, 1.0], size=40)
+    mu, sigma = np.full(4, 25.0), np.full(4, 25 / 3)
+
+    batched = trueskill_update(mu, sigma, first, second, scores)
+    for game in range(40):
+        mu, sigma = trueskill_update(mu, sigma, first[game : game + 1], second[game : game + 1], scores[game : game + 1])
+    assert batched[0] == pytest.approx(mu)
+    assert batched[1] == pytest.approx(sigma)
+
+    # Eight straight wins leave both players uncertain enough to keep pairing.
+    swept_mu, swept_sigma = trueskill_update(np.full(2, 25.0), np.full(2, 25 / 3), [0] * 8, [1] * 8, [1.0] * 8)
+    assert swept_mu == pytest.approx([34.017, 15.983], abs=1e-3)
+    assert swept_sigma == pytest.approx([5.173, 5.173], abs=1e-3)
+
+
+def test_informative_pairings_prefer_close_uncertain_players() -> None:
+    mu = np.array([25.0, 25.0, 60.0])
+    sigma = np.array([8.0, 8.0, 1.0])
+    assert informative_pairings(mu, sigma, 1) == [(0, 1)]
+    assert len(informative_pairings(mu, sigma, 10)) == 3
@@ -0,0 +1,78 @@
+import multiprocessing as mp
+
+import numpy as np
+import pytest
+
+from training.replay import PrioritizedReplayBuffer
+
+COLUMNS = (("obs", np.float32, (3,)), ("action", np.int32, ()))
+
+
+def batch(start: int, count: int) -> dict:
+    rows = np.arange(start, start + count)
+    return {"obs": np.repeat(rows[:, None], 3, axis=1).astype(np.float32), "action": rows.astype(np.int32)}
+
+
+def _writer(buffer: PrioritizedReplayBuffer, start: int) -> None:
+    for offset in range(0, 40, 10):
+        buffer.add(**batch(start + offset, 10))
+    buffer.close()
+
+
+def test_sampling_follows_priorities_and_ring_overwrites() -> None:
+    with PrioritizedReplayBuffer(6, columns=COLUMNS, alpha=1.0) as buffer:
+        slots = buffer.add(priorities=np.array([1.0, 1.0, 1.0, 1.0]), **batch(0, 4))
+        assert slots.tolist() == [0, 1, 2, 3]
+        buffer.update_priorities(np.array([2]), np.array([96.0]))
+        assert buffer.total_priority == pytest.approx(99.0)
+
+        picked, data, weights = buffer.sample(2000, np.random.default_rng(0), beta=1.0)
+        assert np.mean(picked == 2) == pytest.approx(96 / 99, abs=0.02)
+        np.testing.assert_array_equal(data["action"], picked)
+        assert weights.max() == pytest.approx(1.0) and weights[picked == 2].min() < 0.05
+
+        buffer.add(**batch(4, 4))
+        assert len(buffer) == 6
+        assert buffer.sample(1, np.random.default_rng(1))[1]["obs"].shape == (1, 3)
+        # New rows get the running maximum priority.
+        np.testing.assert_allclose(buffer.priorities(np.array([0, 1, 4, 5])), 96.0)
+
+
+def test_priority_updates_keep_tree_sums_consistent() -> None:
+    rng = np.random.default_rng(3)
+    with PrioritizedReplayBuffer(37, columns=COLUMNS, alpha=0.5) as buffer:
+        buffer.add(**batch(0, 37))
+        for _ in range(5):
+            slots = rng.integers(0, 37, size=8)
+            buffer.update_priorities(slots, rng.random(8) * 10)
+        leaves = buffer.priorities(np.arange(37)) ** 0.5
+        assert buffer.total_priority == pytest.approx(leaves.sum())
+        with pytest.raises(ValueError):
+            buffer.add(**batch(0, 38))
+
+
+def test_empty_buffer_cannot_be_sampled() -> None:
+    with PrioritizedReplayBuffer(4, columns=COLUMNS) as buffer:
+        with pytest.raises(ValueError):
+            buffer.sample(1, np.random.default_rng(0))
+
+
+def test_empty_batches_are_no_ops() -> None:
+    with PrioritizedReplayBuffer(4, columns=COLUMNS) as buffer:
+        assert buffer.add(priorities=np.array([]), **batch(0, 0)).size == 0
+        buffer.update_priorities(np.array([], dtype=np.int64), np.array([]))
+        assert len(buffer) == 0 and buffer.total_priority == 0.0
+
+
+def test_writer_processes_share_the_buffer() -> None:
+    ctx = mp.get_context("spawn")
+    with PrioritizedReplayBuffer(128, columns=COLUMNS, context="spawn") as buffer:
+        writers = [ctx.Process(target=_writer, args=(buffer, start)) for start in (0, 1000)]
+        for process in writers:
+            process.start()
+        for process in writers:
+            process.join(timeout=60)
+        assert [process.exitcode for process in writers] == [0, 0]
+        assert len(buffer) == 80
+        _, data, _ = buffer.sample(80, np.random.default_rng(0))
+        assert set(data["action"].tolist()) <= set(range(40)) | set(range(1000, 1040))
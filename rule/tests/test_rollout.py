@@ -0,0 +1,88 @@
+import numpy as np
+import pytest
+
+from env.vector_env import SyncBattleVectorEnv
+from training.rollout import (
+    RolloutBuffer,
+    active_players,
+    compute_gae,
+    discounted_returns,
+    to_perspective,
+)
+
+
+def reference_gae(rewards, values, dones, last_values, gamma, lam):
+    steps, envs = rewards.shape
+    advantages = np.zeros((steps, envs))
+    for env in range(envs):
+        running, next_value = 0.0, last_values[env]
+        for t in reversed(range(steps)):
+            continuing = 0.0 if dones[t, env] else 1.0
+            delta = rewards[t, env] + gamma * continuing * next_value - values[t, env]
+            running = delta + gamma * lam * continuing * running
+            advantages[t, env] = running
+            next_value = values[t, env]
+    return advantages
+
+
+def random_rollout(seed: int, steps: int = 12, envs: int = 5):
+    rng = np.random.default_rng(seed)
+    rewards = rng.standard_normal((steps, envs)).astype(np.float32)
+    values = rng.standard_normal((steps, envs)).astype(np.float32)
+    dones = rng.random((steps, envs)) < 0.2
+    last_values = rng.standard_normal(envs).astype(np.float32)
+    return rewards, values, dones, last_values
+
+
+def test_gae_matches_reference_loop() -> None:
+    rewards, values, dones, last_values = random_rollout(0)
+    advantages, returns = compute_gae(rewards, values, dones, last_values, gamma=0.9, gae_lambda=0.8)
+    expected = reference_gae(rewards, values, dones, last_values, 0.9, 0.8)
+    np.testing.assert_allclose(advantages, expected, rtol=1e-5, atol=1e-5)
+    np.testing.assert_allclose(returns, expected + values, rtol=1e-5, atol=1e-5)
+
+
+def test_gae_with_lambda_one_equals_discounted_returns() -> None:
+    rewards, values, dones, last_values = random_rollout(1)
+    _, returns = compute_gae(rewards, values, dones, last_values, gamma=0.95, gae_lambda=1.0)
+    expected = discounted_returns(rewards, dones, gamma=0.95, last_values=last_values)
+    np.testing.assert_allclose(returns, expected, rtol=1e-4, atol=1e-4)
+
+
+def test_perspective_gae_equals_player_one_frame_flipped() -> None:
+    rewards, values, dones, last_values = random_rollout(2)
+    players = np.random.default_rng(3).integers(0, 2, size=rewards.shape).astype(np.int8)
+    last_players = np.array([0, 1, 1, 0, 1], dtype=np.int8)
+
+    advantages, _ = compute_gae(
+        rewards, values, dones, last_values,
+        gamma=0.9, gae_lambda=0.8, players=players, last_players=last_players,
+    )
+    p1_frame = reference_gae(
+        rewards, to_perspective(values, players), dones,
+        to_perspective(last_values, last_players), 0.9, 0.8,
+    )
+    np.testing.assert_allclose(advantages, to_perspective(p1_frame, players), rtol=1e-5, atol=1e-5)
+    with pytest.raises(ValueError):
+        compute_gae(rewards, values, dones, last_values, gamma=0.9, gae_lambda=0.8, players=players)
+
+
+def test_buffer_fills_from_vector_env_and_yields_minibatches() -> None:
+    env = SyncBattleVectorEnv(3, master_seed=4)
+    buffer = RolloutBuffer(6, 3)
+    observations, _ = env.reset()
+    while not buffer.full:
+        actions = np.argmax(observations["action_mask"], axis=1)
+        step = env.step(actions)
+        buffer.add(observations["observation"], observations["action_mask"], actions, *step[1:4])
+        observations = step[0]
+    with pytest.raises(RuntimeError):
+        buffer.add(observations["observation"], observations["action_mask"], actions, *step[1:4])
+
+    np.testing.assert_array_equal(buffer.players, active_players(buffer.observations))
+    buffer.compute_returns_and_advantages(np.zeros(3, dtype=np.float32), observations["observation"])
+    batches = list(buffer.minibatches(5, np.random.default_rng(0)))
+    assert sum(len(batch["actions"]) for batch in batches) == 18
+    assert batches[0]["observations"].shape == (5, buffer.observations.shape[-1])
+    buffer.reset()
+    assert buffer.step == 0
@@ -36,3 +36,15 @@ def test_load_from_records_validates_version() -> None:
     assert repo.get("draw.rule").version == "1.0"
     with pytest.raises(RuleVersionMismatchError):
         repo.load_from_records([{ "payload": sample_rule_payload("1.0"), "version": "2.0" }])
+
+
+def test_fingerprint_changes_when_rules_change() -> None:
+    repo = RuleRepository()
+    empty = repo.fingerprint()
+    repo.load_from_records([{"payload": sample_rule_payload("1.0")}])
+    loaded = repo.fingerprint()
+    assert loaded != empty
+    repo.load_from_records([{"payload": sample_rule_payload("1.0")}])
+    assert repo.fingerprint() == loaded
+    repo.load_from_records([{"payload": sample_rule_payload("2.0")}])
+    assert repo.fingerprint() != loaded
@@ -0,0 +1,68 @@
+import numpy as np
+import pytest
+
+from agents.random_agent import RandomAgent
+from agents.rule_based_agent import RuleBasedAgent
+from evaluation.sprt import (
+    ACCEPT_H0,
+    ACCEPT_H1,
+    INCONCLUSIVE,
+    SequentialEvaluator,
+    SPRTConfig,
+    elo_to_score,
+    score_to_elo,
+    sprt_llr,
+)
+
+
+def test_elo_score_round_trip_and_llr_sign() -> None:
+    assert score_to_elo(elo_to_score(35.0)) == pytest.approx(35.0)
+    config = SPRTConfig(elo0=0.0, elo1=20.0)
+    strong = np.array([0.75, 0.5, 1.0, 0.75])
+    weak = 1.0 - strong
+    assert sprt_llr(strong, config) > 0 > sprt_llr(weak, config)
+
+
+def test_mirrored_pairs_share_seed_and_swap_seats() -> None:
+    evaluator = SequentialEvaluator(RandomAgent(), RandomAgent(), workers=0, master_seed=1)
+    first, second = evaluator.jobs(0)
+    assert first.seed == second.seed
+    assert (first.player_one, first.player_two) == (second.player_two, second.player_one)
+
+
+def test_sprt_stops_early_and_reports_games_saved() -> None:
+    report = SequentialEvaluator(
+        RandomAgent(), RandomAgent(), workers=0, master_seed=1, max_games=2_000
+    ).run()
+    assert report.verdict == ACCEPT_H0
+    assert 60 <= report.games < 1_000
+    assert report.games_saved > 1_000
+
+
+def test_sprt_does_not_stop_on_a_handful_of_pairs() -> None:
+    config = SPRTConfig()
+    for pairs in (np.ones(2), np.zeros(3), np.full(3, 0.5), np.full(8, 0.75)):
+        assert config.lower_bound < sprt_llr(pairs, config) < config.upper_bound
+    # Even a clean sweep needs the minimum number of pairs.
+    report = SequentialEvaluator(RuleBasedAgent(), RandomAgent(), workers=0, master_seed=4).run()
+    assert report.verdict == ACCEPT_H1
+    assert report.games >= 60
+
+
+def test_verdicts_agree_between_pool_and_inline() -> None:
+    reports = [
+        SequentialEvaluator(RuleBasedAgent(), RandomAgent(), workers=workers, master_seed=4).run()
+        for workers in (0, 2)
+    ]
+    assert reports[0] == reports[1]
+    assert reports[0].verdict == ACCEPT_H1
+
+
+def test_confidence_method_respects_game_cap() -> None:
+    report = SequentialEvaluator(
+        RandomAgent(), RandomAgent(), method="confidence", workers=0, master_seed=2, max_games=32
+    ).run()
+    assert report.verdict == INCONCLUSIVE
+    assert report.games == 32
+    with pytest.raises(ValueError):
+        SequentialEvaluator(RandomAgent(), RandomAgent(), method="bayes")
@@ -12,11 +12,20 @@ def test_state_hash_is_deterministic() -> None:
     env.step({"action_type": "DECLARE_ATTACK"})
     assert env.state_hash() != initial_hash
 
-    env.reset()
+    env.reset(episode_index=env.rng_key.episode_index)
     reset_hash = env.state_hash()
     assert reset_hash == initial_hash
 
 
+def test_bare_resets_move_on_to_the_next_episode() -> None:
+    env = BattleEnv(seed=99)
+    first = env.reset()["state_hash"]
+    assert env.rng_key.episode_index == 0
+    second = env.reset()["state_hash"]
+    assert env.rng_key.episode_index == 1 and second != first
+    assert BattleEnv(seed=99).reset(episode_index=1)["state_hash"] == second
+
+
 def test_state_hash_exposed_in_step_result() -> None:
     env = BattleEnv(seed=11)
     env.reset()
@@ -0,0 +1,114 @@
+from pathlib import Path
+
+import pytest
+
+from rules.errors import IRValidationError
+from rules.schema import CardRule
+from rules.text_index import (
+    CardTextIndex,
+    CompiledRuleCache,
+    PokemonNameMatcher,
+    normalize_text,
+)
+
+CORPUS_DIR = Path(__file__).resolve().parents[2] / "ptcg-data-update-tool" / "cards" / "en"
+
+PARALYZE = "Flip a coin. If heads, the Defending Pokémon is now Paralyzed."
+
+
+def pokemon(card_id: str, name: str, *attacks: str, ability: str = "") -> dict:
+    card = {
+        "id": card_id,
+        "name": name,
+        "supertype": "Pokémon",
+        "attacks": [{"name": f"Attack {idx}", "text": text} for idx, text in enumerate(attacks)],
+    }
+    if ability:
+        card["abilities"] = [{"name": "Power", "text": ability, "type": "Ability"}]
+    return card
+
+
+CARDS = [
+    pokemon("a-1", "Pikachu", PARALYZE, "Search your deck for Raichu and put it into your hand."),
+    pokemon("b-7", "Pikachu", "Flip a coin.  If heads, the Defending Pokémon\nis now Paralyzed."),
+    pokemon("c-3", "Voltorb", PARALYZE, "", "Search your deck for Electrode and put it into your hand."),
+    pokemon("d-9", "Raichu", ability="Once during your turn, if Raichu is on your Bench, draw a card."),
+    pokemon("e-2", "Electrode", ability="Once during your turn, if Electrode is on your Bench, draw a card."),
+    {"id": "t-1", "name": "Rare Candy", "supertype": "Trainer", "rules": ["Choose 1 of your Basic Pokémon."]},
+]
+
+
+def compile_stub(entry):
+    return CardRule.model_validate(
+        {
+            "rule_id": entry.text_hash,
+            "name": entry.text[:20],
+            "version": "1",
+            "trigger": {"type": "manual"},
+            "effect": {"type": "atomic", "effect": "Draw", "parameters": {"count": 1}},
+        }
+    )
+
+
+def test_normalize_folds_whitespace_and_replaces_names() -> None:
+    matcher = PokemonNameMatcher(["Nidoran ♂", "Nidoking", "Mr. Mime"])
+    text, bindings = normalize_text(
+        "Search for  Nidoran ♂ or Mr. Mime.\nIf Nidoking's Bench has Nidoran ♂, heal Nidoking.",
+        self_name="Nidoking",
+        matcher=matcher,
+    )
+    assert text == (
+        "Search for {pokemon:0} or {pokemon:1}. "
+        "If {self}'s Bench has {pokemon:0}, heal {self}."
+    )
+    assert bindings == ("Nidoran ♂", "Mr. Mime")
+    assert normalize_text("Nidokings attack", matcher=matcher) == ("Nidokings attack", ())
+
+
+def test_index_deduplicates_texts_across_printings() -> None:
+    index = CardTextIndex.from_cards(CARDS)
+
+    assert index.printings == 7
+    assert len(index) == 3
+    paralyze = next(entry for entry in index if entry.text == PARALYZE)
+    assert [ref.card_id for ref in paralyze.references] == ["a-1", "b-7", "c-3"]
+    search = next(entry for entry in index if entry.text.startswith("Search"))
+    assert {ref.bindings for ref in search.references} == {("Raichu",), ("Electrode",)}
+    bench = next(entry for entry in index if entry.kind == "ability")
+    assert bench.text == "Once during your turn, if {self} is on your Bench, draw a card."
+    assert index.hashes_for("c-3") == [paralyze.text_hash, search.text_hash]
+
+    index.add_card(CARDS[0])
+    assert index.printings == 7
+
+
+def test_cache_only_compiles_new_texts(tmp_path) -> None:
+    path = tmp_path / "compiled.json"
+    calls = []
+
+    def compiler(entry):
+        calls.append(entry.text_hash)
+        return None if entry.kind == "ability" else compile_stub(entry)
+
+    first_release = CardTextIndex(PokemonNameMatcher(["Pikachu", "Raichu"]))
+    first_release.add_cards(CARDS[:2])
+    cache = CompiledRuleCache(path, compiler_version="1")
+    assert cache.compile(first_release, compiler) == 2
+
+    reloaded = CompiledRuleCache(path, compiler_version="1")
+    index = CardTextIndex.from_cards(CARDS)
+    assert reloaded.compile(index, compiler) == 1
+    assert len(calls) == 3 and len(reloaded) == 3
+    assert [rule.rule_id for rule in reloaded.rules_for(index, "c-3")] == index.hashes_for("c-3")
+    assert reloaded.rules_for(index, "d-9") == []
+
+    assert len(CompiledRuleCache(path, compiler_version="2")) == 0
+    path.write_text("{not json")
+    with pytest.raises(IRValidationError):
+        CompiledRuleCache(path)
+
+
+@pytest.mark.skipif(not CORPUS_DIR.is_dir(), reason="card corpus not available")
+def test_corpus_texts_are_heavily_shared() -> None:
+    index = CardTextIndex.from_corpus(CORPUS_DIR)
+    assert len(index) < index.printings / 2
@@ -0,0 +1,93 @@
+import json
+
+import numpy as np
+import pytest
+
+from core.state_machine import ActionType
+from env.battle_env import ACTION_TYPES, OBSERVATION_SIZE, BattleEnv
+from training.dataset import INDEX_FILE, TrajectoryDataset, TrajectoryLoader, TrajectoryWriter
+
+
+def make_batch(start: int, count: int) -> dict:
+    rows = np.arange(start, start + count)
+    return {
+        "obs": np.repeat(rows[:, None], OBSERVATION_SIZE, axis=1).astype(np.float32),
+        "mask": (rows[:, None] + np.arange(len(ACTION_TYPES))) % 2 == 0,
+        "action": rows.astype(np.int32),
+        "reward": (rows * 0.5).astype(np.float32),
+        "done": rows % 7 == 0,
+        "state_hash": rows.astype(np.uint64) * np.uint64(2**40),
+    }
+
+
+@pytest.mark.parametrize("compress", [False, True])
+def test_round_trip_across_chunks(tmp_path, compress) -> None:
+    with TrajectoryWriter(tmp_path, chunk_size=8, compress=compress) as writer:
+        writer.append_batch(**make_batch(0, 13))
+        writer.append_batch(**make_batch(13, 7))
+    dataset = TrajectoryDataset(tmp_path)
+
+    assert len(dataset) == 20 and dataset.num_chunks == 3
+    indices = np.array([19, 0, 8, 7, 15, 3])
+    batch = dataset.gather(indices)
+    expected = make_batch(0, 20)
+    for name, values in expected.items():
+        np.testing.assert_array_equal(batch[name], values[indices])
+    if not compress:
+        assert isinstance(dataset.chunk(0)["obs"], np.memmap)
+
+
+def test_mapped_chunks_are_bounded(tmp_path) -> None:
+    with TrajectoryWriter(tmp_path, chunk_size=4) as writer:
+        writer.append_batch(**make_batch(0, 40))
+    dataset = TrajectoryDataset(tmp_path, mapped_chunks=2)
+    rng = np.random.default_rng(0)
+    expected = make_batch(0, 40)
+    for _ in range(5):
+        indices = rng.integers(0, 40, size=16)
+        np.testing.assert_array_equal(dataset.gather(indices)["action"], expected["action"][indices])
+        assert len(dataset._mapped) <= 2
+
+
+def test_partial_dataset_is_readable_while_writing(tmp_path) -> None:
+    writer = TrajectoryWriter(tmp_path, chunk_size=4)
+    writer.append_batch(**make_batch(0, 6))
+    assert len(TrajectoryDataset(tmp_path)) == 4
+    writer.close()
+    assert len(TrajectoryDataset(tmp_path)) == 6
+    assert json.loads((tmp_path / INDEX_FILE).read_text())["columns"][0]["name"] == "obs"
+    with pytest.raises(FileExistsError):
+        TrajectoryWriter(tmp_path)
+
+
+def test_append_records_env_transitions(tmp_path) -> None:
+    env = BattleEnv(seed=2)
+    env.reset()
+    with TrajectoryWriter(tmp_path, chunk_size=16) as writer:
+        while not env.done:
+            obs, mask, key = env.encode_observation(), env.action_mask(), env.state_key()
+            attack = ACTION_TYPES.index(ActionType.DECLARE_ATTACK)
+            action = attack if mask[attack] else ACTION_TYPES.index(ActionType.END_TURN)
+            reward, done = env.step_index(action)
+            writer.append(obs=obs, mask=mask, action=action, reward=reward, done=done, state_hash=key)
+        rows = writer.rows
+    dataset = TrajectoryDataset(tmp_path)
+    last = dataset.gather(np.array([rows - 1]))
+    assert len(dataset) == rows and bool(last["done"][0])
+
+
+def test_loader_covers_epoch_in_prefetched_batches(tmp_path) -> None:
+    with TrajectoryWriter(tmp_path, chunk_size=16) as writer:
+        writer.append_batch(**make_batch(0, 50))
+    dataset = TrajectoryDataset(tmp_path)
+
+    loader = TrajectoryLoader(dataset, batch_size=8, seed=1, workers=3, prefetch=2)
+    actions = np.concatenate([batch["action"] for batch in loader])
+    assert len(loader) == 7
+    assert sorted(actions.tolist()) == list(range(50))
+
+    repeat = TrajectoryLoader(dataset, batch_size=8, seed=1)
+    again = TrajectoryLoader(dataset, batch_size=8, seed=1)
+    assert [b["action"].tolist() for b in repeat] == [b["action"].tolist() for b in again]
+    dropped = TrajectoryLoader(dataset, batch_size=8, shuffle=False, drop_last=True)
+    assert len(dropped) == 6 and sum(len(b["action"]) for b in dropped) == 48
@@ -0,0 +1,69 @@
+import threading
+
+from agents.transposition import TranspositionTable
+from env.battle_env import BattleEnv
+
+
+def test_move_order_transpositions_share_state_key() -> None:
+    first = BattleEnv(seed=5)
+    first.reset()
+    first.step({"action_type": "ATTACH_ENERGY"})
+    first.step({"action_type": "PLAY_CARD"})
+
+    second = BattleEnv(seed=5)
+    second.reset()
+    second.step({"action_type": "PLAY_CARD"})
+    second.step({"action_type": "ATTACH_ENERGY"})
+
+    assert first.state_key() == second.state_key()
+    assert 0 <= first.state_key() < 2**64
+    second.step({"action_type": "PASS"})
+    assert first.state_key() != second.state_key()
+
+
+def test_update_accumulates_and_reports_hit_rate() -> None:
+    table = TranspositionTable(num_buckets=8)
+    key = 123456789
+    assert table.probe(key) is None
+    table.update(key, 1.0, depth=2)
+    table.update(key, 0.0, depth=1)
+
+    entry = table.probe(key)
+    assert entry is not None
+    assert (entry.visits, entry.depth, entry.value) == (2, 2, 0.5)
+    stats = table.stats()
+    assert (stats.probes, stats.hits) == (2, 1)
+    assert stats.hit_rate == 0.5
+
+
+def test_depth_preferred_slot_survives_shallow_collisions() -> None:
+    table = TranspositionTable(num_buckets=4)
+    deep, shallow_a, shallow_b = 1, 1 + 4, 1 + 8  # all map to bucket 1
+    table.store(deep, depth=10, visits=5, value_sum=2.0)
+    table.store(shallow_a, depth=1, visits=1, value_sum=0.0)
+    table.store(shallow_b, depth=1, visits=1, value_sum=0.0)
+
+    assert table.probe(deep) is not None
+    assert table.probe(shallow_a) is None
+    assert table.probe(shallow_b) is not None
+    assert table.stats().replacements == 1
+
+    table.store(shallow_a, depth=12, visits=1, value_sum=1.0)
+    assert table.probe(shallow_a).depth == 12
+    assert table.probe(deep).depth == 10  # demoted to the always-replace slot
+
+
+def test_concurrent_updates_are_not_lost() -> None:
+    table = TranspositionTable(num_buckets=16, lock_stripes=4)
+
+    def worker() -> None:
+        for _ in range(500):
+            table.update(42, 1.0)
+
+    threads = [threading.Thread(target=worker) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert table.probe(42).visits == 2000
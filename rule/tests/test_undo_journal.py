@@ -0,0 +1,162 @@
+import numpy as np
+import pytest
+
+from core.journal import JournalFullError, UndoJournal
+from env.battle_env import BattleEnv
+from rules.engine import EffectContext, RuleEngine
+from rules.errors import EffectExecutionError
+from rules.schema import AtomicEffect, CardRule, SequenceEffect, Trigger, TriggerType
+
+
+def play_random_game(env: BattleEnv, seed: int) -> list[tuple[str, int]]:
+    rng = np.random.default_rng(seed)
+    states = [(env.state_hash(), env.state_key())]
+    while not env.done:
+        legal = np.flatnonzero(env.action_mask())
+        env.step_index(int(rng.choice(legal)))
+        states.append((env.state_hash(), env.state_key()))
+    return states
+
+
+def test_journal_reverts_attribute_item_and_list_mutations() -> None:
+    class Box:
+        value = 1
+
+    box, mapping, items = Box(), {"a": 1}, [1, 2, 3]
+    journal = UndoJournal(16)
+    journal.mark("first")
+    journal.set_attr(box, "value", 2)
+    journal.set_item(mapping, "a", 5)
+    journal.set_item(mapping, "b", 7)
+    journal.mark("second")
+    journal.list_append(items, journal.list_pop(items, 0))
+    journal.list_pop(items)
+
+    assert journal.undo() == "second"
+    assert items == [1, 2, 3]
+    assert journal.undo() == "first"
+    assert (box.value, mapping, journal.size, journal.steps) == (1, {"a": 1}, 0, 0)
+
+
+def test_journal_rolls_over_oldest_steps() -> None:
+    mapping: dict[str, int] = {}
+    journal = UndoJournal(3, max_steps=2)
+    for value in range(4):
+        journal.mark(value)
+        journal.set_item(mapping, "a", value)
+    assert (journal.steps, journal.size, mapping) == (2, 2, {"a": 3})
+    assert journal.undo(2) == 2
+    assert mapping == {"a": 1}
+    with pytest.raises(ValueError):
+        journal.undo()
+
+    # Mutations also push the oldest steps out, but never the current one.
+    journal.mark("big")
+    journal.set_item(mapping, "b", 1)
+    journal.mark("bigger")
+    journal.set_item(mapping, "c", 1)
+    journal.set_item(mapping, "d", 1)
+    journal.set_item(mapping, "e", 1)
+    assert journal.steps == 1
+    with pytest.raises(JournalFullError):
+        journal.set_item(mapping, "f", 1)
+    assert journal.undo() == "bigger"
+    assert mapping == {"a": 1, "b": 1}
+
+
+def test_env_undo_restores_every_previous_state() -> None:
+    env = BattleEnv(seed=5, journal_capacity=8192)
+    env.reset()
+    states = play_random_game(env, seed=1)
+
+    assert env.winner is not None
+    assert env.undo_depth == len(states) - 1
+    for expected in reversed(states[:-1]):
+        env.undo()
+        assert (env.state_hash(), env.state_key()) == expected
+    assert env.winner is None
+
+
+def test_env_keeps_stepping_past_the_journal_window() -> None:
+    env = BattleEnv(seed=5, journal_capacity=8192, journal_max_steps=4)
+    env.reset()
+    states = play_random_game(env, seed=1)
+
+    assert len(states) > 5 and env.undo_depth == 4
+    env.undo(4)
+    assert (env.state_hash(), env.state_key()) == states[-5]
+    with pytest.raises(ValueError):
+        env.undo()
+
+
+def test_env_reset_records_nothing_in_a_small_journal() -> None:
+    for capacity in (2, 4, 8, 16):
+        env = BattleEnv(seed=1, journal_capacity=capacity)
+        env.reset()
+        assert (env.undo_depth, env.state_hash()) == (0, BattleEnv(seed=1).reset()["state_hash"])
+
+
+def test_env_undo_then_replay_is_deterministic() -> None:
+    env = BattleEnv(seed=9, journal_capacity=8192)
+    env.reset()
+    first = play_random_game(env, seed=3)
+    env.undo(env.undo_depth)
+    assert play_random_game(env, seed=3) == first
+
+
+def test_env_without_journal_rejects_undo_and_clones_drop_it() -> None:
+    with pytest.raises(RuntimeError):
+        BattleEnv(seed=1).undo()
+    env = BattleEnv(seed=1, journal_capacity=64)
+    env.reset()
+    clone = env.clone()
+    clone.step_index(5)
+    assert clone.undo_depth == 0 and env.undo_depth == 0
+
+
+def test_effect_handlers_record_mutations_in_context_journal() -> None:
+    state = {"players": {"p1": {"deck": ["A", "B", "C"], "hand": []}}}
+    journal = UndoJournal(64)
+    context = EffectContext(controller="p1", state=state, turn_identifier="t1", journal=journal)
+    rule = CardRule(
+        rule_id="combo",
+        name="Combo",
+        version="1",
+        trigger=Trigger(type=TriggerType.MANUAL),
+        effect=SequenceEffect(
+            steps=[
+                AtomicEffect(effect="Draw", parameters={"count": 2}),
+                AtomicEffect(effect="SearchDeck", parameters={"card_name": "C", "destination": "discard"}),
+                AtomicEffect(effect="AddDamage", parameters={"target": "p2_active", "amount": 30}),
+            ]
+        ),
+    )
+
+    journal.mark()
+    assert RuleEngine().execute(rule, context)
+    assert state["players"]["p1"] == {"deck": [], "hand": ["A", "B"], "discard": ["C"]}
+    journal.undo()
+    assert state == {"players": {"p1": {"deck": ["A", "B", "C"], "hand": []}}}
+
+
+def test_failed_effect_can_be_undone_through_journal() -> None:
+    state = {"players": {"p1": {"deck": ["A"], "hand": []}}}
+    journal = UndoJournal(64)
+    context = EffectContext(controller="p1", state=state, turn_identifier="t1", journal=journal)
+    rule = CardRule(
+        rule_id="bad",
+        name="Bad",
+        version="1",
+        trigger=Trigger(type=TriggerType.MANUAL),
+        effect=SequenceEffect(
+            steps=[
+                AtomicEffect(effect="Draw", parameters={"count": 1}),
+                AtomicEffect(effect="SearchDeck", parameters={"card_name": "Z"}),
+            ]
+        ),
+    )
+    journal.mark()
+    with pytest.raises(EffectExecutionError):
+        RuleEngine().execute(rule, context)
+    journal.undo()
+    assert state == {"players": {"p1": {"deck": ["A"], "hand": []}}}
@@ -0,0 +1,122 @@
+import numpy as np
+import pytest
+
+from core.errors import IllegalActionError
+from core.state_machine import ActionType, Phase, PlayerSide
+from env.battle_env import ACTION_TYPES, OBSERVATION_SIZE
+from env.gym_env import BattleGymEnv
+from env.vector_env import WINNER_CODES, AsyncBattleVectorEnv, SyncBattleVectorEnv
+
+ATTACK = ACTION_TYPES.index(ActionType.DECLARE_ATTACK)
+
+
+def test_gym_env_exposes_masked_discrete_interface() -> None:
+    env = BattleGymEnv()
+    observation, info = env.reset(seed=4)
+
+    assert observation["observation"].shape == (OBSERVATION_SIZE,)
+    assert observation["action_mask"].shape == (len(ACTION_TYPES),)
+    assert info["rng_key"] == (4, 0, 0, 0)
+
+    attach = ACTION_TYPES.index(ActionType.ATTACH_ENERGY)
+    observation, reward, terminated, truncated, _ = env.step(attach)
+    assert observation["action_mask"][attach] == 0
+    assert not terminated and not truncated
+    with pytest.raises(IllegalActionError):
+        env.step(attach)
+    with pytest.raises(IllegalActionError):
+        env.step(-1)
+
+    _, second_info = env.reset()
+    assert second_info["rng_key"] == (4, 0, 0, 1)
+
+
+def test_gym_env_truncates_after_max_turns() -> None:
+    env = BattleGymEnv(max_turns=2)
+    env.reset(seed=1)
+    end_turn = ACTION_TYPES.index(ActionType.END_TURN)
+    results = [env.step(end_turn) for _ in range(2)]
+    assert [result[3] for result in results] == [False, True]
+
+
+def test_gym_env_seeds_gymnasium_base() -> None:
+    gym = pytest.importorskip("gymnasium")
+    env = BattleGymEnv()
+    assert isinstance(env, gym.Env)
+    assert env.observation_space.contains(env.reset(seed=7)[0])
+    first = env.np_random.integers(1 << 30)
+    env.reset(seed=7)
+    assert env.np_random.integers(1 << 30) == first
+    assert env.action_space.contains(int(np.flatnonzero(env.action_masks())[0]))
+
+
+def test_sync_vector_env_autoresets_finished_games() -> None:
+    envs = SyncBattleVectorEnv(3, master_seed=0)
+    envs.reset()
+    actions = np.full(3, ATTACK)
+    steps = 0
+    while True:
+        steps += 1
+        observation, rewards, terminated, _, infos = envs.step(actions)
+        if terminated.any():
+            break
+
+    assert steps == 23
+    assert terminated.all()
+    np.testing.assert_allclose(rewards, 1.3)
+    assert (infos["final_winner"] == WINNER_CODES[PlayerSide.PLAYER_ONE]).all()
+    # Observations already belong to the next episode, which starts at turn one;
+    # the terminal ones are kept in the infos.
+    turn_column = len(Phase) + len(PlayerSide)
+    assert (observation["observation"][:, turn_column] == 1).all()
+    assert infos["_final_observation"].all()
+    assert (infos["final_observation"][:, turn_column] > 1).all()
+    assert not infos["final_action_mask"].any()
+
+
+def test_vector_env_exposes_truncated_observations() -> None:
+    envs = SyncBattleVectorEnv(2, master_seed=0, max_turns=1)
+    envs.reset()
+    end_turn = ACTION_TYPES.index(ActionType.END_TURN)
+    while True:
+        observation, _, terminated, truncated, infos = envs.step(np.full(2, end_turn))
+        if truncated.any():
+            break
+    assert not terminated.any()
+    np.testing.assert_array_equal(infos["_final_observation"], truncated)
+    assert (infos["final_observation"][truncated] != observation["observation"][truncated]).any()
+
+
+def test_vector_env_rejects_illegal_actions_before_stepping() -> None:
+    envs = SyncBattleVectorEnv(3, master_seed=0)
+    attach = ACTION_TYPES.index(ActionType.ATTACH_ENERGY)
+    envs.reset(seed=0)
+    envs.step(np.full(3, attach))
+    stepped = envs.step(np.full(3, ATTACK))[0]["observation"].copy()
+    envs.reset(seed=0)
+    envs.step(np.full(3, attach))
+    for actions in (np.array([ATTACK, ATTACK, attach]), np.array([ATTACK, -1, ATTACK])):
+        with pytest.raises(IllegalActionError):
+            envs.step(actions)
+    # No env was stepped by the rejected batches.
+    np.testing.assert_array_equal(envs.step(np.full(3, ATTACK))[0]["observation"], stepped)
+
+
+def test_async_vector_env_matches_sync_backend() -> None:
+    sync = SyncBattleVectorEnv(5, master_seed=9)
+    workers = AsyncBattleVectorEnv(5, num_workers=2, master_seed=9)
+    try:
+        sync_obs, _ = sync.reset()
+        async_obs, _ = workers.reset()
+        rng = np.random.default_rng(0)
+        for _ in range(50):
+            mask = sync_obs["action_mask"]
+            actions = np.where(mask, rng.random(mask.shape), -1.0).argmax(axis=1)
+            sync_obs, sync_rewards, sync_done, _, _ = sync.step(actions)
+            async_obs, async_rewards, async_done, _, _ = workers.step(actions)
+            np.testing.assert_array_equal(sync_obs["observation"], async_obs["observation"])
+            np.testing.assert_array_equal(sync_obs["action_mask"], async_obs["action_mask"])
+            np.testing.assert_array_equal(sync_rewards, async_rewards)
+            np.testing.assert_array_equal(sync_done, async_done)
+    finally:
+        workers.close()
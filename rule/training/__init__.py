@@ -0,0 +1,35 @@
+"""Offline training data pipelines built on :mod:`env`."""
+
+from .dataset import (
+    DEFAULT_CHUNK_SIZE,
+    FORMAT_VERSION,
+    TRAJECTORY_COLUMNS,
+    TrajectoryDataset,
+    TrajectoryLoader,
+    TrajectoryWriter,
+)
+from .replay import PrioritizedReplayBuffer
+from .rollout import (
+    RolloutBuffer,
+    active_players,
+    compute_gae,
+    discounted_returns,
+    perspective_sign,
+    to_perspective,
+)
+
+__all__ = [
+    "DEFAULT_CHUNK_SIZE",
+    "FORMAT_VERSION",
+    "PrioritizedReplayBuffer",
+    "RolloutBuffer",
+    "TRAJECTORY_COLUMNS",
+    "TrajectoryDataset",
+    "TrajectoryLoader",
+    "TrajectoryWriter",
+    "active_players",
+    "compute_gae",
+    "discounted_returns",
+    "perspective_sign",
+    "to_perspective",
+]
@@ -0,0 +1,342 @@
+"""Chunked columnar storage for self-play trajectories.
+
+:class:`TrajectoryWriter` streams transitions into fixed-size chunks.  Each
+chunk stores one ``.npy`` file per column (or one ``.npz`` archive when
+compression is enabled) next to an ``index.json`` that lists the schema and
+the chunks written so far.  The index is replaced atomically after every
+chunk, so a dataset that is still being written is always readable up to its
+last complete chunk.
+
+:class:`TrajectoryDataset` memory-maps uncompressed chunks, so opening a
+dataset of billions of transitions costs nothing and random minibatches
+touch only the pages they gather.  Mapped chunks are kept in an LRU cache so
+the number of live maps stays under the kernel limit (``vm.max_map_count``).
+Compressed chunks are decompressed on first access and kept in a small LRU
+cache.  :class:`TrajectoryLoader`
+iterates shuffled minibatches and gathers the next ones on background
+threads while the current one is being consumed.
+
+Default columns follow the :class:`~env.battle_env.BattleEnv` array API:
+``obs`` (:meth:`~env.battle_env.BattleEnv.encode_observation`), ``mask``
+(:meth:`~env.battle_env.BattleEnv.action_mask`), ``action``, ``reward``,
+``done`` and ``state_hash`` (the 64-bit
+:meth:`~env.battle_env.BattleEnv.state_key`).
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import threading
+from collections import OrderedDict, deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Deque, Dict, Iterator, List, Mapping, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from env.battle_env import ACTION_TYPES, OBSERVATION_SIZE
+
+ColumnSpec = Tuple[str, Any, Tuple[int, ...]]
+Batch = Dict[str, np.ndarray]
+
+#: ``(name, dtype, per-row shape)`` of the columns written by default.
+TRAJECTORY_COLUMNS: Tuple[ColumnSpec, ...] = (
+    ("obs", np.float32, (OBSERVATION_SIZE,)),
+    ("mask", np.bool_, (len(ACTION_TYPES),)),
+    ("action", np.int32, ()),
+    ("reward", np.float32, ()),
+    ("done", np.bool_, ()),
+    ("state_hash", np.uint64, ()),
+)
+
+FORMAT_VERSION = 1
+INDEX_FILE = "index.json"
+DEFAULT_CHUNK_SIZE = 65_536
+
+
+class TrajectoryWriter:
+    """Appends transitions to a chunked columnar dataset directory."""
+
+    def __init__(
+        self,
+        directory: Union[str, Path],
+        *,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        compress: bool = False,
+        columns: Sequence[ColumnSpec] = TRAJECTORY_COLUMNS,
+    ) -> None:
+        if chunk_size <= 0:
+            raise ValueError("chunk_size must be positive")
+        self._directory = Path(directory)
+        self._directory.mkdir(parents=True, exist_ok=True)
+        if (self._directory / INDEX_FILE).exists():
+            raise FileExistsError(f"{self._directory} already contains a dataset")
+        self._chunk_size = chunk_size
+        self._compress = compress
+        self._columns = tuple((name, np.dtype(dtype), tuple(shape)) for name, dtype, shape in columns)
+        self._buffers = {
+            name: np.zeros((chunk_size, *shape), dtype=dtype) for name, dtype, shape in self._columns
+        }
+        self._fill = 0
+        self._chunks: List[Dict[str, Any]] = []
+        self._closed = False
+        self._write_index()
+
+    # ---- Public API
+    @property
+    def rows(self) -> int:
+        """Transitions appended so far, including the unflushed chunk."""
+
+        return sum(chunk["rows"] for chunk in self._chunks) + self._fill
+
+    def append(self, **values: Any) -> None:
+        """Append one transition; every column must be given."""
+
+        self._check_open()
+        row = self._fill
+        for name, _, _ in self._columns:
+            self._buffers[name][row] = values[name]
+        self._fill = row + 1
+        if self._fill == self._chunk_size:
+            self.flush()
+
+    def append_batch(self, **columns: np.ndarray) -> None:
+        """Append a batch of transitions given as equally long column arrays."""
+
+        self._check_open()
+        lengths = {len(columns[name]) for name, _, _ in self._columns}
+        if len(lengths) != 1:
+            raise ValueError("All columns of a batch must have the same length")
+        (total,) = lengths
+        start = 0
+        while start < total:
+            take = min(total - start, self._chunk_size - self._fill)
+            for name, _, _ in self._columns:
+                self._buffers[name][self._fill : self._fill + take] = columns[name][start : start + take]
+            self._fill += take
+            start += take
+            if self._fill == self._chunk_size:
+                self.flush()
+
+    def flush(self) -> None:
+        """Write the buffered transitions as a new chunk (a no-op when empty)."""
+
+        if self._fill == 0:
+            return
+        name = f"chunk-{len(self._chunks):06d}"
+        data = {column: buffer[: self._fill] for column, buffer in self._buffers.items()}
+        if self._compress:
+            np.savez_compressed(self._directory / f"{name}.npz", **data)
+        else:
+            for column, values in data.items():
+                np.save(self._directory / f"{name}.{column}.npy", values)
+        self._chunks.append({"name": name, "rows": self._fill, "compressed": self._compress})
+        self._fill = 0
+        self._write_index()
+
+    def close(self) -> None:
+        if not self._closed:
+            self.flush()
+            self._closed = True
+
+    def __enter__(self) -> "TrajectoryWriter":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    # ---- Internals
+    def _check_open(self) -> None:
+        if self._closed:
+            raise RuntimeError("TrajectoryWriter is closed")
+
+    def _write_index(self) -> None:
+        index = {
+            "version": FORMAT_VERSION,
+            "columns": [
+                {"name": name, "dtype": dtype.str, "shape": list(shape)}
+                for name, dtype, shape in self._columns
+            ],
+            "chunks": self._chunks,
+        }
+        path = self._directory / INDEX_FILE
+        tmp = path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(index, indent=2))
+        os.replace(tmp, path)
+
+
+class TrajectoryDataset:
+    """Random access to a dataset written by :class:`TrajectoryWriter`.
+
+    At most ``mapped_chunks`` uncompressed chunks (one map per column each)
+    and ``cached_chunks`` decompressed chunks are held at a time.
+    """
+
+    def __init__(
+        self,
+        directory: Union[str, Path],
+        *,
+        cached_chunks: int = 4,
+        mapped_chunks: int = 1024,
+    ) -> None:
+        self._directory = Path(directory)
+        index = json.loads((self._directory / INDEX_FILE).read_text())
+        if index.get("version") != FORMAT_VERSION:
+            raise ValueError(f"Unsupported trajectory format version {index.get('version')!r}")
+        self._columns: Tuple[ColumnSpec, ...] = tuple(
+            (column["name"], np.dtype(column["dtype"]), tuple(column["shape"]))
+            for column in index["columns"]
+        )
+        self._chunks: List[Dict[str, Any]] = index["chunks"]
+        rows = np.array([chunk["rows"] for chunk in self._chunks], dtype=np.int64)
+        self._offsets = np.concatenate(([0], np.cumsum(rows)))
+        self._cached_chunks = max(1, cached_chunks)
+        self._mapped_chunks = max(1, mapped_chunks)
+        self._mapped: "OrderedDict[int, Mapping[str, np.ndarray]]" = OrderedDict()
+        self._decompressed: "OrderedDict[int, Mapping[str, np.ndarray]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    # ---- Public API
+    def __len__(self) -> int:
+        return int(self._offsets[-1])
+
+    @property
+    def columns(self) -> Tuple[ColumnSpec, ...]:
+        return self._columns
+
+    @property
+    def num_chunks(self) -> int:
+        return len(self._chunks)
+
+    def chunk(self, index: int) -> Mapping[str, np.ndarray]:
+        """Columns of chunk ``index``; memory-mapped unless the chunk is compressed."""
+
+        with self._lock:
+            return self._load_chunk(index)
+
+    def gather(self, indices: np.ndarray, out: Optional[Batch] = None) -> Batch:
+        """Rows ``indices`` (global, any order) of every column.
+
+        ``out`` may hold preallocated arrays of at least ``len(indices)`` rows
+        to gather into, which avoids allocating a batch per call.
+        """
+
+        indices = np.asarray(indices, dtype=np.int64)
+        if len(indices) and (indices.min() < 0 or indices.max() >= len(self)):
+            raise IndexError("Trajectory index out of range")
+        count = len(indices)
+        if out is None:
+            out = {name: np.empty((count, *shape), dtype=dtype) for name, dtype, shape in self._columns}
+        chunk_ids = np.searchsorted(self._offsets, indices, side="right") - 1
+        order = np.argsort(chunk_ids, kind="stable")
+        boundaries = np.flatnonzero(np.diff(chunk_ids[order])) + 1
+        for group in np.split(order, boundaries):
+            if not len(group):
+                continue
+            chunk_id = int(chunk_ids[group[0]])
+            local = indices[group] - self._offsets[chunk_id]
+            columns = self.chunk(chunk_id)
+            for name, _, _ in self._columns:
+                out[name][group] = columns[name][local]
+        return {name: values[:count] for name, values in out.items()}
+
+    def sample(self, batch_size: int, rng: np.random.Generator) -> Batch:
+        return self.gather(rng.integers(0, len(self), size=batch_size))
+
+    def iter_chunks(self) -> Iterator[Mapping[str, np.ndarray]]:
+        for index in range(self.num_chunks):
+            yield self.chunk(index)
+
+    # ---- Internals
+    def _load_chunk(self, index: int) -> Mapping[str, np.ndarray]:
+        mapped = self._mapped.get(index)
+        if mapped is not None:
+            self._mapped.move_to_end(index)
+            return mapped
+        cached = self._decompressed.get(index)
+        if cached is not None:
+            self._decompressed.move_to_end(index)
+            return cached
+        info = self._chunks[index]
+        if info["compressed"]:
+            with np.load(self._directory / f"{info['name']}.npz") as archive:
+                loaded = {name: archive[name] for name, _, _ in self._columns}
+            self._decompressed[index] = loaded
+            if len(self._decompressed) > self._cached_chunks:
+                self._decompressed.popitem(last=False)
+            return loaded
+        mapped = {
+            name: np.load(self._directory / f"{info['name']}.{name}.npy", mmap_mode="r")
+            for name, _, _ in self._columns
+        }
+        self._mapped[index] = mapped
+        if len(self._mapped) > self._mapped_chunks:
+            self._mapped.popitem(last=False)
+        return mapped
+
+
+class TrajectoryLoader:
+    """Iterates minibatches of a :class:`TrajectoryDataset` with thread prefetching.
+
+    Each iteration is one epoch.  Batches are yielded in a deterministic order
+    for a given ``seed`` while up to ``prefetch`` later batches are gathered
+    on ``workers`` threads.
+    """
+
+    def __init__(
+        self,
+        dataset: TrajectoryDataset,
+        batch_size: int,
+        *,
+        shuffle: bool = True,
+        drop_last: bool = False,
+        prefetch: int = 2,
+        workers: int = 2,
+        seed: Optional[int] = None,
+    ) -> None:
+        if batch_size <= 0 or workers <= 0 or prefetch <= 0:
+            raise ValueError("batch_size, workers and prefetch must be positive")
+        self._dataset = dataset
+        self._batch_size = batch_size
+        self._shuffle = shuffle
+        self._drop_last = drop_last
+        self._prefetch = prefetch
+        self._workers = workers
+        self._rng = np.random.default_rng(seed)
+
+    def __len__(self) -> int:
+        full, rest = divmod(len(self._dataset), self._batch_size)
+        return full + (1 if rest and not self._drop_last else 0)
+
+    def __iter__(self) -> Iterator[Batch]:
+        size = len(self._dataset)
+        order = self._rng.permutation(size) if self._shuffle else np.arange(size)
+        stops = range(self._batch_size, size + self._batch_size, self._batch_size)
+        slices = (
+            order[stop - self._batch_size : stop]
+            for stop in stops
+            if stop <= size or not self._drop_last
+        )
+        pending: Deque[Future] = deque()
+        with ThreadPoolExecutor(max_workers=self._workers) as pool:
+            try:
+                for indices in slices:
+                    pending.append(pool.submit(self._dataset.gather, indices))
+                    if len(pending) > self._prefetch:
+                        yield pending.popleft().result()
+                while pending:
+                    yield pending.popleft().result()
+            finally:
+                for future in pending:
+                    future.cancel()
+
+
+__all__ = [
+    "DEFAULT_CHUNK_SIZE",
+    "FORMAT_VERSION",
+    "TRAJECTORY_COLUMNS",
+    "TrajectoryDataset",
+    "TrajectoryLoader",
+    "TrajectoryWriter",
+]
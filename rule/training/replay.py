@@ -0,0 +1,253 @@
+"""Prioritized experience replay over shared memory.
+
+:class:`PrioritizedReplayBuffer` keeps transitions and an array-based
+sum-tree of their priorities in one :mod:`multiprocessing.shared_memory`
+block.  Self-play writer processes and a learner process all map the same
+block, so transitions are never pickled: a writer copies its batch into the
+ring storage, the learner samples straight out of it.
+
+The sum-tree stores ``priority ** alpha`` in its leaves and partial sums in
+the inner nodes.  Updates walk from the touched leaves to the root and
+sampling descends from the root, both in ``O(log n)`` and vectorised over
+the whole batch.  Sampling is stratified: the total mass is split into
+``batch_size`` equal segments and one point is drawn from each.  New
+transitions get the largest priority seen so far, so every transition is
+sampled at least once with high probability.
+
+Every operation holds one inter-process lock.  To share a buffer, pass it
+to :class:`multiprocessing.Process` as an argument; the child re-attaches to
+the same block and lock.
+"""
+
+from __future__ import annotations
+
+import multiprocessing as mp
+from multiprocessing.shared_memory import SharedMemory
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from training.dataset import TRAJECTORY_COLUMNS, ColumnSpec
+
+Batch = Dict[str, np.ndarray]
+
+_MIN_PRIORITY = 1e-6
+
+_Placement = Tuple[str, np.dtype, Tuple[int, ...], int]
+
+
+def _layout(
+    capacity: int, leaves: int, columns: Sequence[ColumnSpec]
+) -> Tuple[List[_Placement], int]:
+    fields: List[ColumnSpec] = [
+        ("_header", np.int64, (2,)),
+        ("_max_priority", np.float64, (1,)),
+        ("_tree", np.float64, (2 * leaves,)),
+    ]
+    fields.extend((name, dtype, (capacity, *shape)) for name, dtype, shape in columns)
+    offset = 0
+    placed: List[_Placement] = []
+    for name, dtype, shape in fields:
+        itemsize = np.dtype(dtype).itemsize
+        offset = -(-offset // itemsize) * itemsize  # align
+        placed.append((name, np.dtype(dtype), shape, offset))
+        offset += itemsize * int(np.prod(shape, dtype=np.int64))
+    return placed, offset
+
+
+class PrioritizedReplayBuffer:
+    """Ring buffer of transitions sampled in proportion to their priority."""
+
+    def __init__(
+        self,
+        capacity: int,
+        *,
+        columns: Sequence[ColumnSpec] = TRAJECTORY_COLUMNS,
+        alpha: float = 0.6,
+        context: Optional[str] = None,
+    ) -> None:
+        if capacity <= 0:
+            raise ValueError("capacity must be positive")
+        self.capacity = capacity
+        self.alpha = alpha
+        self._columns = tuple((name, np.dtype(dtype), tuple(shape)) for name, dtype, shape in columns)
+        self._leaves = 1 << (capacity - 1).bit_length()
+        _, nbytes = _layout(capacity, self._leaves, self._columns)
+        self._shm = SharedMemory(create=True, size=nbytes)
+        self._owner = True
+        self._lock = mp.get_context(context).Lock()
+        self._map()
+        self._header[:] = 0
+        self._max_priority[0] = 1.0
+        self._tree[:] = 0.0
+        self._closed = False
+
+    # ---- Public API
+    def __len__(self) -> int:
+        return int(self._header[1])
+
+    @property
+    def total_priority(self) -> float:
+        return float(self._tree[1])
+
+    def add(self, priorities: Optional[np.ndarray] = None, **columns: np.ndarray) -> np.ndarray:
+        """Append a batch of transitions and return the slots they were stored in.
+
+        Without ``priorities`` the batch gets the maximum priority seen so
+        far.  Once full, the oldest transitions are overwritten.
+        """
+
+        lengths = {len(columns[name]) for name, _, _ in self._columns}
+        if len(lengths) != 1:
+            raise ValueError("All columns of a batch must have the same length")
+        (count,) = lengths
+        if count > self.capacity:
+            raise ValueError(f"Batch of {count} exceeds the replay capacity {self.capacity}")
+        if count == 0:
+            return np.empty(0, dtype=np.int64)
+        with self._lock:
+            cursor, size = int(self._header[0]), int(self._header[1])
+            slots = (cursor + np.arange(count)) % self.capacity
+            for name, _, _ in self._columns:
+                self._arrays[name][slots] = columns[name]
+            self._header[0] = (cursor + count) % self.capacity
+            self._header[1] = min(size + count, self.capacity)
+            if priorities is None:
+                values = np.full(count, self._max_priority[0])
+            else:
+                values = self._clip(priorities)
+                self._max_priority[0] = max(float(self._max_priority[0]), float(values.max()))
+            self._set_priorities(slots, values)
+        return slots
+
+    def sample(
+        self,
+        batch_size: int,
+        rng: np.random.Generator,
+        *,
+        beta: float = 0.4,
+    ) -> Tuple[np.ndarray, Batch, np.ndarray]:
+        """Draw ``batch_size`` transitions in proportion to their priority.
+
+        Returns ``(slots, batch, weights)`` where ``weights`` are importance
+        sampling corrections ``(N * P(i)) ** -beta`` normalised by their
+        maximum.
+        """
+
+        with self._lock:
+            size = int(self._header[1])
+            if size == 0:
+                raise ValueError("Cannot sample from an empty replay buffer")
+            total = self._tree[1]
+            points = (np.arange(batch_size) + rng.random(batch_size)) * (total / batch_size)
+            slots = self._descend(points)
+            # Rounding at segment edges can land on an empty leaf; keep samples valid.
+            np.minimum(slots, size - 1, out=slots)
+            probabilities = self._tree[self._leaves + slots] / total
+            batch = {name: self._arrays[name][slots] for name, _, _ in self._columns}
+        weights = (size * np.maximum(probabilities, _MIN_PRIORITY)) ** -beta
+        weights /= weights.max()
+        return slots, batch, weights.astype(np.float32)
+
+    def update_priorities(self, slots: np.ndarray, priorities: np.ndarray) -> None:
+        """Set new priorities (e.g. absolute TD errors) for sampled ``slots``."""
+
+        slots = np.asarray(slots, dtype=np.int64)
+        values = self._clip(priorities)
+        with self._lock:
+            self._max_priority[0] = max(float(self._max_priority[0]), float(values.max(initial=0.0)))
+            self._set_priorities(slots, values)
+
+    def priorities(self, slots: np.ndarray) -> np.ndarray:
+        """Current priorities of ``slots`` (before the ``alpha`` exponent)."""
+
+        with self._lock:
+            leaves = self._tree[self._leaves + np.asarray(slots, dtype=np.int64)]
+        return leaves ** (1.0 / self.alpha)
+
+    def close(self) -> None:
+        """Detach from the shared block; the creating process also frees it."""
+
+        if self._closed:
+            return
+        self._closed = True
+        del self._arrays, self._header, self._max_priority, self._tree
+        self._shm.close()
+        if self._owner:
+            self._shm.unlink()
+
+    def __enter__(self) -> "PrioritizedReplayBuffer":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def __del__(self) -> None:  # pragma: no cover - best effort cleanup
+        try:
+            self.close()
+        except Exception:
+            pass
+
+    # ---- Pickling (attach in child processes)
+    def __getstate__(self) -> Dict[str, Any]:
+        return {
+            "capacity": self.capacity,
+            "alpha": self.alpha,
+            "columns": self._columns,
+            "leaves": self._leaves,
+            "name": self._shm.name,
+            "lock": self._lock,
+        }
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.capacity = state["capacity"]
+        self.alpha = state["alpha"]
+        self._columns = state["columns"]
+        self._leaves = state["leaves"]
+        self._lock = state["lock"]
+        self._shm = SharedMemory(name=state["name"])
+        self._owner = False
+        self._closed = False
+        self._map()
+
+    # ---- Internals
+    def _map(self) -> None:
+        placed, _ = _layout(self.capacity, self._leaves, self._columns)
+        views: Dict[str, np.ndarray] = {
+            name: np.ndarray(shape, dtype=dtype, buffer=self._shm.buf, offset=offset)
+            for name, dtype, shape, offset in placed
+        }
+        self._header = views.pop("_header")
+        self._max_priority = views.pop("_max_priority")
+        self._tree = views.pop("_tree")
+        self._arrays = views
+
+    def _clip(self, priorities: np.ndarray) -> np.ndarray:
+        return np.maximum(np.abs(np.asarray(priorities, dtype=np.float64)), _MIN_PRIORITY)
+
+    def _set_priorities(self, slots: np.ndarray, priorities: np.ndarray) -> None:
+        if slots.size == 0:
+            return
+        tree = self._tree
+        nodes = slots + self._leaves
+        tree[nodes] = priorities**self.alpha
+        nodes = np.unique(nodes // 2)
+        while nodes[0] >= 1:
+            tree[nodes] = tree[2 * nodes] + tree[2 * nodes + 1]
+            if nodes[0] == 1:
+                break
+            nodes = np.unique(nodes // 2)
+
+    def _descend(self, points: np.ndarray) -> np.ndarray:
+        tree = self._tree
+        nodes = np.ones(len(points), dtype=np.int64)
+        while nodes[0] < self._leaves:
+            left = 2 * nodes
+            left_mass = tree[left]
+            go_right = points >= left_mass
+            points = np.where(go_right, points - left_mass, points)
+            nodes = left + go_right
+        return nodes - self._leaves
+
+
+__all__ = ["PrioritizedReplayBuffer"]
@@ -0,0 +1,248 @@
+"""Preallocated rollout storage with vectorised advantage estimation.
+
+:class:`RolloutBuffer` holds ``(T, N)`` arrays for ``T`` steps of ``N``
+environments and is filled one batched step at a time straight from the
+outputs of :mod:`env.vector_env`.  Returns and GAE(λ) advantages are then
+computed for all environments at once; only the unavoidable backward
+recursion over time remains a Python loop.
+
+Rewards from :class:`~env.battle_env.BattleEnv` are zero-sum and expressed
+from ``PLAYER_ONE``'s point of view (``_push_reward`` subtracts rewards
+earned by ``PLAYER_TWO``).  Values and advantages in a self-play rollout are
+wanted from the point of view of the player who acted, which alternates
+within an episode.  :func:`compute_gae` handles this by moving values into
+``PLAYER_ONE``'s frame, running the recursion there and moving the
+advantages back, which is exact for a zero-sum game.
+
+Truncated episodes are treated like terminated ones: the recursion does not
+bootstrap across any ``done`` flag.
+"""
+
+from __future__ import annotations
+
+from typing import Dict, Iterator, Optional, Tuple
+
+import numpy as np
+
+from core.state_machine import Phase, PlayerSide
+from env.battle_env import ACTION_TYPES, OBSERVATION_SIZE
+
+#: Offset of the active-player one-hot in an encoded observation.
+_ACTIVE_PLAYER_OFFSET = len(Phase)
+_PLAYER_TWO = list(PlayerSide).index(PlayerSide.PLAYER_TWO)
+
+
+def active_players(observations: np.ndarray) -> np.ndarray:
+    """Player codes (``0`` for ``PLAYER_ONE``, ``1`` for ``PLAYER_TWO``) of
+    the player to act in each encoded observation."""
+
+    return observations[..., _ACTIVE_PLAYER_OFFSET + _PLAYER_TWO].astype(np.int8)
+
+
+def perspective_sign(players: np.ndarray) -> np.ndarray:
+    """``+1`` for ``PLAYER_ONE`` and ``-1`` for ``PLAYER_TWO``."""
+
+    return (1 - 2 * np.asarray(players, dtype=np.float32)).astype(np.float32)
+
+
+def to_perspective(rewards: np.ndarray, players: np.ndarray) -> np.ndarray:
+    """Flip ``PLAYER_ONE``-frame rewards into the frame of ``players``.
+
+    The mapping is its own inverse, so it also converts actor-frame values
+    back into ``PLAYER_ONE``'s frame.
+    """
+
+    return rewards * perspective_sign(players)
+
+
+def discounted_returns(
+    rewards: np.ndarray,
+    dones: np.ndarray,
+    *,
+    gamma: float,
+    last_values: Optional[np.ndarray] = None,
+) -> np.ndarray:
+    """Discounted returns of ``(T, N)`` rewards, resetting after ``dones``."""
+
+    steps = rewards.shape[0]
+    returns = np.empty_like(rewards, dtype=np.float32)
+    running = (
+        np.zeros(rewards.shape[1:], dtype=np.float32)
+        if last_values is None
+        else np.asarray(last_values, dtype=np.float32).copy()
+    )
+    continuing = 1.0 - dones.astype(np.float32)
+    for t in range(steps - 1, -1, -1):
+        running = rewards[t] + gamma * continuing[t] * running
+        returns[t] = running
+    return returns
+
+
+def compute_gae(
+    rewards: np.ndarray,
+    values: np.ndarray,
+    dones: np.ndarray,
+    last_values: np.ndarray,
+    *,
+    gamma: float,
+    gae_lambda: float,
+    players: Optional[np.ndarray] = None,
+    last_players: Optional[np.ndarray] = None,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """GAE(λ) advantages and λ-returns for ``(T, N)`` arrays.
+
+    ``dones[t]`` marks that the episode ended with step ``t``; ``last_values``
+    estimate the states after the final step.  Without ``players`` all
+    quantities share one frame.  With ``players`` (the acting player of each
+    step, and ``last_players`` for the final states) rewards are taken in
+    ``PLAYER_ONE``'s frame while values and the results are in the acting
+    player's frame.
+    """
+
+    values = np.asarray(values, dtype=np.float32)
+    last_values = np.asarray(last_values, dtype=np.float32)
+    if players is not None:
+        if last_players is None:
+            raise ValueError("last_players is required together with players")
+        values = to_perspective(values, players)
+        last_values = to_perspective(last_values, last_players)
+    steps = rewards.shape[0]
+    advantages = np.empty_like(values)
+    continuing = 1.0 - dones.astype(np.float32)
+    discount = gamma * gae_lambda
+    running = np.zeros_like(last_values)
+    next_values = last_values
+    for t in range(steps - 1, -1, -1):
+        delta = rewards[t] + gamma * continuing[t] * next_values - values[t]
+        running = delta + discount * continuing[t] * running
+        advantages[t] = running
+        next_values = values[t]
+    returns = advantages + values
+    if players is not None:
+        sign = perspective_sign(players)
+        advantages *= sign
+        returns *= sign
+    return advantages, returns
+
+
+class RolloutBuffer:
+    """Fixed-size ``(num_steps, num_envs)`` storage for on-policy training."""
+
+    def __init__(
+        self,
+        num_steps: int,
+        num_envs: int,
+        *,
+        observation_size: int = OBSERVATION_SIZE,
+        num_actions: int = len(ACTION_TYPES),
+    ) -> None:
+        if num_steps <= 0 or num_envs <= 0:
+            raise ValueError("num_steps and num_envs must be positive")
+        shape = (num_steps, num_envs)
+        self.num_steps = num_steps
+        self.num_envs = num_envs
+        self.observations = np.zeros((*shape, observation_size), dtype=np.float32)
+        self.action_masks = np.zeros((*shape, num_actions), dtype=np.bool_)
+        self.actions = np.zeros(shape, dtype=np.int64)
+        self.rewards = np.zeros(shape, dtype=np.float32)
+        self.dones = np.zeros(shape, dtype=np.bool_)
+        self.values = np.zeros(shape, dtype=np.float32)
+        self.log_probs = np.zeros(shape, dtype=np.float32)
+        self.players = np.zeros(shape, dtype=np.int8)
+        self.advantages = np.zeros(shape, dtype=np.float32)
+        self.returns = np.zeros(shape, dtype=np.float32)
+        self.step = 0
+
+    # ---- Public API
+    @property
+    def full(self) -> bool:
+        return self.step == self.num_steps
+
+    def add(
+        self,
+        observation: np.ndarray,
+        action_mask: np.ndarray,
+        actions: np.ndarray,
+        rewards: np.ndarray,
+        terminated: np.ndarray,
+        truncated: Optional[np.ndarray] = None,
+        *,
+        values: Optional[np.ndarray] = None,
+        log_probs: Optional[np.ndarray] = None,
+    ) -> None:
+        """Store one batched step.
+
+        ``observation``/``action_mask`` are the inputs the actions were chosen
+        from; ``rewards``/``terminated``/``truncated`` are what the vector env
+        returned for them.
+        """
+
+        if self.full:
+            raise RuntimeError("RolloutBuffer is full; call reset() after computing advantages")
+        t = self.step
+        self.observations[t] = observation
+        self.action_masks[t] = action_mask
+        self.actions[t] = actions
+        self.rewards[t] = rewards
+        np.logical_or(terminated, truncated if truncated is not None else False, out=self.dones[t])
+        self.players[t] = active_players(observation)
+        if values is not None:
+            self.values[t] = values
+        if log_probs is not None:
+            self.log_probs[t] = log_probs
+        self.step = t + 1
+
+    def compute_returns_and_advantages(
+        self,
+        last_values: np.ndarray,
+        last_observation: np.ndarray,
+        *,
+        gamma: float = 0.99,
+        gae_lambda: float = 0.95,
+    ) -> None:
+        """Fill :attr:`advantages` and :attr:`returns` in each acting player's frame."""
+
+        steps = self.step
+        advantages, returns = compute_gae(
+            self.rewards[:steps],
+            self.values[:steps],
+            self.dones[:steps],
+            last_values,
+            gamma=gamma,
+            gae_lambda=gae_lambda,
+            players=self.players[:steps],
+            last_players=active_players(last_observation),
+        )
+        self.advantages[:steps] = advantages
+        self.returns[:steps] = returns
+
+    def minibatches(self, batch_size: int, rng: np.random.Generator) -> Iterator[Dict[str, np.ndarray]]:
+        """Shuffled minibatches over all stored ``(step, env)`` samples."""
+
+        count = self.step * self.num_envs
+        flat = {
+            "observations": self.observations[: self.step].reshape(count, -1),
+            "action_masks": self.action_masks[: self.step].reshape(count, -1),
+            "actions": self.actions[: self.step].reshape(count),
+            "log_probs": self.log_probs[: self.step].reshape(count),
+            "values": self.values[: self.step].reshape(count),
+            "advantages": self.advantages[: self.step].reshape(count),
+            "returns": self.returns[: self.step].reshape(count),
+        }
+        order = rng.permutation(count)
+        for start in range(0, count, batch_size):
+            indices = order[start : start + batch_size]
+            yield {name: values[indices] for name, values in flat.items()}
+
+    def reset(self) -> None:
+        self.step = 0
+
+
+__all__ = [
+    "RolloutBuffer",
+    "active_players",
+    "compute_gae",
+    "discounted_returns",
+    "perspective_sign",
+    "to_perspective",
+]